@@ -1,32 +1,82 @@
-from flask import Flask, request, jsonify, render_template
-from transformers import AutoTokenizer, AutoModelForCausalLM
-import torch
+from flask import Flask, request, jsonify, render_template, Response
 import time
+import logging
 
 from core.character import Character
 from core.session import SessionMemory
 from core.narrative import NarrativeEngine
-from core.utils import detect_incomplete_response, retry_if_empty, save_rating_to_json
-from core.location import Location
-
-import os, uuid
+from core.utils import detect_incomplete_response, retry_if_empty, save_rating_to_json, RATINGS_DIR
+from core.location import Location, SceneCatalog
+from core.tagger import TagEngine
+from core.backend import create_backend
+from core.cache import ResponseCache, CachingBackend
+from core.dedup import RequestRegistry, PendingRequest
+from core.cancel import DisconnectWatcher
+from core.metrics import Metrics, RequestTimer
+from core.images import ImageIndex
+from core.gallery import GalleryCollection, ThumbnailCache, create_gallery_blueprint
+from core.assets import AssetManifest, register_assets, register_precompressed
+from core.traces import TraceRecorder
+from core.chat_prompt import ChatPromptRenderer
+
+import os, uuid, threading, json
 from core.character import Character
 
 
 app = Flask(__name__, template_folder="templates")
-
-# # 🔧 Model i tokenizer
-MODEL_PATH = "Bielik-7B-Instruct-v0.1"
-tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
-tokenizer.pad_token = tokenizer.eos_token
-model = AutoModelForCausalLM.from_pretrained(
-    MODEL_PATH,
-    torch_dtype=torch.float16,
-    device_map="auto"
-)
-
-# 🧠 Pamięć sesji
-session = SessionMemory()
+log = logging.getLogger("chat")
+
+# 📦 Bundle JS z hashem w nazwie (manifest z builderJS*.py) → szablony przez asset_url(), cache na rok
+register_assets(app, AssetManifest("static/data/manifest.json", "/static/data/"))
+register_precompressed(app)
+
+# 📊 Metryki: /metrics (Prometheus) + opcjonalnie jedna linia JSON na żądanie (logger "chat.metrics")
+METRICS_JSON_LOG = os.environ.get("METRICS_JSON_LOG", "0") == "1"
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"), format="%(message)s")
+metrics = Metrics(json_log=METRICS_JSON_LOG)
+
+# 🎞️ Ślad ruchu (opt-in): TRACE_FILE=traces/trace.jsonl → zanonimizowane żądania do odtworzenia w benchmarks/loadgen.py
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+traces = TraceRecorder(TRACE_FILE or None)
+if traces.enabled:
+    print("🎞️ Zapis śladu ruchu:", TRACE_FILE)
+
+# # 🔧 Model i backend inferencji (cuda | cpu | cpu-int8 | gguf)
+MODEL_PATH = os.environ.get("MODEL_PATH", "Bielik-7B-Instruct-v0.1")
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "cuda")
+backend = create_backend(INFERENCE_BACKEND, MODEL_PATH)
+print("⚙️ Backend inferencji:", backend.name, "→", MODEL_PATH)
+
+# 🗃️ Cache odpowiedzi (opt-in): identyczny prompt + konfiguracja + model → bez ponownej generacji
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "0") == "1"
+# Domyślnie tylko wywołania deterministyczne (do_sample=False) — dziś to streszczenia rozmowy (summarize_chat);
+# odpowiedzi postaci i retry są losowane. Trafienie w cache nie ma pomiarów (timer, P(EOS)), a losowa odpowiedź RP
+# powtarzałaby się słowo w słowo — RESPONSE_CACHE_SAMPLED=1 (cache także odpowiedzi) to świadomy wybór.
+RESPONSE_CACHE_SAMPLED = os.environ.get("RESPONSE_CACHE_SAMPLED", "0") == "1"
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 256))
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 600))
+if RESPONSE_CACHE:
+    backend = CachingBackend(backend, ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL), cache_sampled=RESPONSE_CACHE_SAMPLED)
+    print("🗃️ Cache odpowiedzi:", RESPONSE_CACHE_SIZE, "wpisów, TTL", RESPONSE_CACHE_TTL, "s",
+          "(także losowane)" if RESPONSE_CACHE_SAMPLED else "(tylko deterministyczne)")
+
+# 🧠 Pamięć sesji (+ opcjonalnie długoterminowa: wektory wiadomości na dysku, top-k wspomnień w promptcie)
+LONG_TERM_MEMORY = os.environ.get("LONG_TERM_MEMORY", "0") == "1"
+long_term_memory = None
+if LONG_TERM_MEMORY:
+    from core.memory import LongTermMemory, create_embedder
+    long_term_memory = LongTermMemory(
+        os.environ.get("MEMORY_SESSION", "default"),
+        create_embedder(os.environ.get("MEMORY_EMBEDDER", "hashing")),
+        directory=os.environ.get("MEMORY_DIR", "memory"),
+    )
+    print("🧠 Pamięć długoterminowa:", len(long_term_memory), "wiadomości,", long_term_memory.embedder.name)
+MEMORY_OPTIONS = {
+    "k": int(os.environ.get("MEMORY_TOP_K", 3)),
+    "exclude_recent": int(os.environ.get("MEMORY_EXCLUDE_RECENT", 6)),
+    "min_score": float(os.environ.get("MEMORY_MIN_SCORE", 0.35)),
+}
+session = SessionMemory(long_term=long_term_memory)
 
 # 🧝‍♀️ Postacie w scenie
 characters = []
@@ -40,14 +90,123 @@ for filename in os.listdir("characters"):
 print("🧝‍♀️ Załadowane postacie:", [c.name for c in characters])
 
 
-# 🌍 Lokalizacja
-
-from core.location import Location
-location = Location.from_json("locations/forest.json")
-print("🌍 Aktywna lokalizacja:", location.name)
+# 🌍 Lokalizacje: katalog scen (blok get_context renderowany przez szablon raz na lokację),
+# domyślna scena nowej rozmowy i wykrywanie zmiany sceny po tagach kategorii "location" (core/tags.json)
+SCENE_DIRS = os.environ.get("SCENE_DIRS", "locations,narative_data/locations").split(",")
+DEFAULT_LOCATION = os.environ.get("DEFAULT_LOCATION", "forest")
+# opt-in: wykrywanie po rdzeniach słów bywa nietrafne, a każda zmiana sceny unieważnia stan KV prefiksu
+SCENE_AUTO_SWITCH = os.environ.get("SCENE_AUTO_SWITCH", "0") == "1"
+scenes = SceneCatalog.from_directories(SCENE_DIRS)
+location = scenes.get(DEFAULT_LOCATION) or next(iter(scenes), None)
+if location is None:
+    location = Location.from_json("locations/forest.json")
+    scenes.add(location)
+scene_tagger = TagEngine(os.environ.get("SCENE_TAGS", "core/tags.json"))
+session.location = location
+print("🌍 Aktywna lokalizacja:", location.name, "| lokacje:", [l.key for l in scenes])
+
+# 🧾 Nagłówki person i bloki scen kompilowane raz z szablonu (PROMPT_TEMPLATE, prompts/*.json) —
+# przy każdej turze składany jest już tylko ogon promptu (streszczenie, historia, wejście).
+# Stanu modelu dla stałego początku promptu nie liczymy tu: robi to backend przy pierwszym użyciu (PREFIX_CACHE_SIZE).
+for c in characters:
+    c.compile()
+scenes.compile()
+
+# 💬 Format promptu: template (prompts/*.json, "### ODPOWIEDŹ\nPostać:") | chat (natywny szablon czatu tokenizera)
+PROMPT_MODE = os.environ.get("PROMPT_MODE", "template")
+chat_renderer = None
+if PROMPT_MODE == "chat":
+    if getattr(getattr(backend, "tokenizer", None), "chat_template", None):
+        chat_renderer = ChatPromptRenderer(backend.tokenizer)
+        print("💬 Prompt w formacie czatu modelu (segmenty cache'owane:", chat_renderer.decomposable, ")")
+    else:
+        print("⚠️ PROMPT_MODE=chat: backend", backend.name, "nie ma szablonu czatu — używam prompts/*.json")
+
+# 📚 Wiedza o świecie (opt-in): indeks kart postaci/lokacji, do promptu tylko fragmenty pasujące do tury
+LORE_INDEX = os.environ.get("LORE_INDEX", "0") == "1"
+lore_index = None
+if LORE_INDEX:
+    from core.lore import LoreIndex
+    LORE_EMBEDDER = os.environ.get("LORE_EMBEDDER", "")
+    lore_embedder = None
+    if LORE_EMBEDDER:
+        from core.memory import create_embedder
+        lore_embedder = create_embedder(LORE_EMBEDDER)
+    lore_index = LoreIndex(embedder=lore_embedder, token_counter=lambda text: len(backend.encode(text)))
+    lore_index.load_directories(os.environ.get("LORE_DIRS", "characters,locations,narative_data").split(","))
+    print("📚 Lore:", len(lore_index), "fragmentów", "(+ wektory)" if lore_embedder else "")
+LORE_OPTIONS = {
+    "budget": int(os.environ.get("LORE_BUDGET", 200)),
+    "k": int(os.environ.get("LORE_TOP_K", 6)),
+}
 
 # 🧠 Silnik narracyjny
-engine = NarrativeEngine(characters, location=location)
+engine = NarrativeEngine(characters, location=location, chat=chat_renderer,
+                         memory=long_term_memory, memory_options=MEMORY_OPTIONS,
+                         lore=lore_index, lore_options=LORE_OPTIONS,
+                         scenes=scenes, tagger=scene_tagger)
+
+# 🩺 Jakość odpowiedzi (opt-in): klasyfikator (cechy tekstu + P(EOS) z backendu) zamiast heurystyki
+# detect_incomplete_response — mniej zbędnych retry. QUALITY_MODEL=plik z wagami; bez niego trening przy starcie
+# (ratings/ + przykłady syntetyczne). Domyślnie wyłączony, dopóki wagi nie zostaną sprawdzone na prawdziwych
+# ocenionych odpowiedziach (benchmarks/bench_quality.py --ratings ratings --save-model ...).
+QUALITY_CLASSIFIER = os.environ.get("QUALITY_CLASSIFIER", "0") == "1"
+QUALITY_MODEL = os.environ.get("QUALITY_MODEL", "")
+QUALITY_THRESHOLD = float(os.environ.get("QUALITY_THRESHOLD", 0.5))
+quality_classifier = None
+if QUALITY_CLASSIFIER:
+    try:
+        from core.quality import QualityClassifier
+    except ImportError:
+        print("⚠️ QUALITY_CLASSIFIER wymaga numpy — zostaje heurystyka detect_incomplete_response")
+    else:
+        if QUALITY_MODEL and os.path.exists(QUALITY_MODEL):
+            quality_classifier = QualityClassifier.load(QUALITY_MODEL, QUALITY_THRESHOLD)
+            print("🩺 Klasyfikator jakości:", QUALITY_MODEL)
+        else:
+            quality_classifier, rated = QualityClassifier.train(RATINGS_DIR)
+            quality_classifier.threshold = QUALITY_THRESHOLD
+            print("🩺 Klasyfikator jakości: wytrenowany przy starcie,", rated, "przykładów z", RATINGS_DIR)
+
+
+def assess_response(text, eos_prob=None):
+    """{"quality": ok|cut|empty, ...} — z klasyfikatora (z pewnością wyniku) albo z heurystyki."""
+    if quality_classifier is not None:
+        return quality_classifier.assess(text, eos_prob)
+    if not text.strip():
+        return {"quality": "empty"}
+    return {"quality": "cut" if detect_incomplete_response(text) else "ok"}
+
+
+# 🔁 Deduplikacja /generate po requestId klienta (retry po timeoucie nie generuje drugi raz)
+DEDUP_WAIT_TIMEOUT = float(os.environ.get("DEDUP_WAIT_TIMEOUT", 300))
+# ile sekund po rozłączeniu klienta czekamy na jego retry, zanim przerwiemy generację
+DEDUP_ABANDON_GRACE = float(os.environ.get("DEDUP_ABANDON_GRACE", 2))
+request_registry = RequestRegistry(abandon_grace=DEDUP_ABANDON_GRACE)
+
+# 🎰 Sloty generacji — ile model.generate może działać naraz; przerwane żądanie zwalnia slot od razu
+GENERATION_SLOTS = int(os.environ.get("GENERATION_SLOTS", 1))
+generation_slots = threading.BoundedSemaphore(GENERATION_SLOTS)
+
+
+def acquire_slot(cancel_event):
+    # Najpierw flaga przerwania — już anulowane żądanie nie zajmuje wolnego slotu
+    while not cancel_event.is_set():
+        if generation_slots.acquire(timeout=0.1):
+            return True
+    return False
+
+
+# 🖼️ Indeks obrazów narracyjnych (tagi → pliki), odświeżany przy zmianach w katalogu
+image_index = ImageIndex("static/NarrativeIMG", "/static/NarrativeIMG/")
+image_index.refresh(force=True)
+
+# 🖼️ Galeria: lista obrazów ze stronicowaniem + miniatury cache'owane na dysku
+GALLERY_COLLECTIONS = [
+    GalleryCollection("resources", "static/resources", "/static/resources/"),
+    GalleryCollection("avatars", "static/NarrativeIMG/Avatars", "/static/NarrativeIMG/Avatars/"),
+]
+app.register_blueprint(create_gallery_blueprint(GALLERY_COLLECTIONS, ThumbnailCache("static/thumbs")))
 
 
     # Helper to find message by message_id
@@ -68,114 +227,326 @@ def index():
 def generate():
     data = request.get_json()
     user_input = data.get("prompt", "")
-    session.add_message("Użytkownik", user_input)
-
-    final_prompt, active_character = engine.build_prompt(user_input, session.summary, session.clean_history())
-
-    start_time = time.time()
-    inputs = tokenizer(final_prompt, return_tensors="pt", padding=True).to("cuda")
-    outputs = model.generate(
-        **inputs,
-        max_new_tokens=200,
-        temperature=0.7,
-        top_p=0.9,
-        repetition_penalty=1.3,
-        no_repeat_ngram_size=3,
-        do_sample=True,
-        early_stopping=True,
-        eos_token_id=tokenizer.eos_token_id,
-        pad_token_id=tokenizer.pad_token_id
-    )
-    end_time = time.time()
-    duration = round(end_time - start_time, 2)
-
-    raw_output = tokenizer.decode(outputs[0], skip_special_tokens=True, clean_up_tokenization_spaces=True)
-    response = raw_output.split(f"{active_character}:")[-1].strip()
-    response = retry_if_empty(response, final_prompt, tokenizer, model)
-
-    quality = "ok"
-    if detect_incomplete_response(response):
-        quality = "cut"
-    elif not response.strip():
-        quality = "empty"
-
-    session.add_message(active_character, response, quality=quality)
-
-    if len(session.history) % 6 == 0:
-        from core.session import summarize_chat
-        new_summary = summarize_chat(session.history, tokenizer, model)
-        session.update_summary(new_summary)
-        print("📝 Nowe streszczenie:", session.summary)
-        print("🧠 Aktywna postać:", active_character)
-
-    print("🌍 Lokalizacja:", engine.location.name)
-    print("🧠 Historia:", len(session.history))
-    print("📜 Prompt:\n", final_prompt)
-    print("🕒 Czas generowania:", duration, "sekundy")
-    print("📦 Odpowiedź:\n", response)
+    request_id = data.get("requestId") or request.headers.get("Idempotency-Key")
+
+    if request_id:
+        pending, owner, result = request_registry.begin(request_id)
+        if result is not None:
+            # Już obsłużone — oddajemy ten sam wynik, bez generacji i bez duplikatu w historii
+            return jsonify(result)
+        if not owner:
+            # Duplikat w trakcie generacji — dołączamy do trwającego żądania
+            try:
+                return jsonify(request_registry.wait(pending, DEDUP_WAIT_TIMEOUT))
+            except TimeoutError:
+                return jsonify({"error": "Generowanie nadal trwa."}), 503
+    else:
+        # Bez requestId nie deduplikujemy, ale nadal chcemy móc przerwać po rozłączeniu klienta
+        pending = PendingRequest(None)
+
+    timer = RequestTimer("generate")
+    try:
+        with DisconnectWatcher(request.environ, lambda: request_registry.abandon(pending)):
+            payload = run_generation(user_input, pending.cancelled, timer)
+    except Exception as e:
+        if request_id:
+            request_registry.fail(pending, e)
+        observe_request(timer, client_key(request.headers, request.remote_addr), data, status=500)
+        raise
+    if request_id:
+        request_registry.finish(pending, payload)
+    observe_request(timer, client_key(request.headers, request.remote_addr), data)
+    return jsonify(payload)
+
+
+@app.route("/cancel", methods=["POST"])
+def cancel():
+    # brak albo niepoprawne ciało żądania → nic do przerwania (404), nie błąd serwera
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    if request_registry.cancel(data.get("requestId", "")):
+        return jsonify({"status": "cancelled"})
+    return jsonify({"status": "not_found"}), 404
+
+
+@app.route("/images/resolve", methods=["GET"])
+def resolve_images():
+    tags = [t.strip() for t in request.args.get("tags", "").split(",") if t.strip()]
+    max_results = min(request.args.get("max", 4, type=int), 50)
+    return jsonify({"urls": image_index.resolve(tags, max_results)})
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def run_generation(user_input, cancel_event, timer):
+    # Slot przed zapisem tury: żądanie przerwane w kolejce nie zostawia śladu w historii sesji,
+    # a prompt budujemy z historią zawierającą odpowiedzi żądań obsłużonych przed nami
+    with timer.phase("slot_wait"):
+        acquired = acquire_slot(cancel_event)
+    if not acquired:
+        # Przerwane jeszcze w kolejce — model nawet nie ruszył
+        timer.quality = "cancelled"
+        return {
+            "messageID": None,
+            "response": "",
+            "quality": "cancelled",
+            "generation_time": "0 sekundy"
+        }
+
+    try:
+        with timer.phase("persist"):
+            session.add_message("Użytkownik", user_input)
+
+        with timer.phase("prompt_build"):
+            if SCENE_AUTO_SWITCH:
+                detected = engine.detect_location(user_input)
+                if detected is not None and detected is not session.location:
+                    session.location = detected
+                    log.debug("🌍 Zmiana sceny: %s", detected.name)
+            final_prompt, active_character = engine.build_prompt(
+                user_input, session.summary, session.clean_history(), location=session.location
+            )
+            prefix = engine.prompt_prefix(active_character, session.location)
+
+        start_time = time.time()
+        raw_output = backend.generate(
+            final_prompt,
+            cancel_event=cancel_event,
+            timer=timer,
+            max_new_tokens=200,
+            temperature=0.7,
+            top_p=0.9,
+            repetition_penalty=1.3,
+            no_repeat_ngram_size=3,
+            do_sample=True,
+            early_stopping=True,
+            prefix=prefix,
+            **engine.generation_options()
+        )
+        end_time = time.time()
+        duration = round(end_time - start_time, 2)
+
+        response = engine.extract_response(raw_output, active_character)
+
+        if cancel_event.is_set():
+            # Zapisujemy to, co zdążyło powstać — bez retry i bez streszczenia
+            quality = "cancelled"
+            if response:
+                with timer.phase("persist"):
+                    session.add_message(active_character, response, quality=quality)
+        else:
+            eos_prob = timer.eos_prob
+            with timer.phase("retry"):
+                retried = retry_if_empty(
+                    response, final_prompt, backend,
+                    is_incomplete=lambda text: assess_response(text, eos_prob)["quality"] != "ok",
+                    extract=lambda raw: engine.extract_response(raw, active_character),
+                    cancel_event=cancel_event,
+                    **engine.generation_options()
+                )
+            if retried is not response:
+                eos_prob = None  # retry idzie bez timera — P(EOS) dotyczyło pierwszej odpowiedzi
+            response = retried
+
+            if cancel_event.is_set():
+                # Przerwane w trakcie retry — jak wyżej: zapis tego, co powstało, bez oceny i streszczenia
+                quality = "cancelled"
+                if response:
+                    with timer.phase("persist"):
+                        session.add_message(active_character, response, quality=quality)
+            else:
+                assessment = assess_response(response, eos_prob)
+                quality = assessment["quality"]
+
+                with timer.phase("persist"):
+                    session.add_message(active_character, response, quality=quality)
+
+                if len(session.history) % 6 == 0:
+                    from core.session import summarize_chat
+                    with timer.phase("summarize"):
+                        new_summary = summarize_chat(session.history, backend, cancel_event=cancel_event)
+                    # przerwane streszczenie jest niepełne — zostaje poprzednie
+                    if not cancel_event.is_set():
+                        session.update_summary(new_summary)
+                        log.debug("📝 Nowe streszczenie: %s", session.summary)
+    finally:
+        generation_slots.release()
+
+    timer.quality = quality
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("🧠 Postać: %s | 🌍 %s | historia: %d", active_character, session.location.name, len(session.history))
+        log.debug("📜 Prompt:\n%s", final_prompt)
+        log.debug("📦 Odpowiedź:\n%s", response)
 
     message_id = f"{len(session.history) - 1} {uuid.uuid4().hex}"
 
-    return jsonify({
+    payload = {
         "messageID": message_id,
         "response": response,
+        "quality": quality,
         "generation_time": f"{duration} sekundy"
-    })
+    }
+    if quality != "cancelled" and "confidence" in assessment:
+        payload["quality_confidence"] = assessment["confidence"]
+    return payload
 
 
-@app.route("/rate", methods=["POST"])
-def rate():
-    data = request.get_json()
+def trace_fields(endpoint, data):
+    """Tylko kształt żądania (długości, @wzmianka, liczba ocen) — treść nie trafia do śladu."""
+    data = data or {}
+    if endpoint == "generate":
+        user_input = data.get("prompt", "")
+        mention = next((name for name in engine.characters if f"@{name}" in user_input), None)
+        return {"prompt_chars": len(user_input), "prompt_tokens": backend.count_tokens(user_input), "mention": mention}
+    if endpoint == "rate":
+        return {"ratings": len(data.get("ratings") or {})}
+    if endpoint == "edit":
+        return {"edited_chars": len(data.get("edited") or data.get("editedText") or ""), "tags": len(data.get("tags") or [])}
+    return {}
+
+
+def client_key(headers, address):
+    """Klucz rozmowy w śladzie: jawny identyfikator klienta (np. loadgen), inaczej adres IP."""
+    return headers.get("X-Conversation-Id") or address
+
+
+def observe_request(timer, client, data, status=200):
+    """Metryki + (opcjonalnie) linia śladu — wspólne dla tras Flaska i asgi.py."""
+    metrics.observe(timer)
+    if traces.enabled:
+        traces.record(timer.endpoint, client, timer, status=status, **trace_fields(timer.endpoint, data))
+
+
+# Logika /rate, /edit, /messages i /tags jako zwykłe funkcje (dane → wynik) —
+# korzystają z nich zarówno trasy Flaska, jak i asgi.py.
+def rate_message(data, timer):
     ratings = data.get("ratings", {})
     for i in reversed(range(len(session.history))):
         if session.history[i]["sender"] in engine.characters:
-            prompt, active_char = engine.build_prompt(session.history[i]["text"], session.summary, session.get_recent())
-            message_id = find_message_by_id(data.get("messageID", ""))
-            save_rating_to_json(
-                message_id,
-                prompt,
-                session.history[i]["text"],
-                ratings,
-                active_char,
-                engine.location.name
-            )
+            with timer.phase("prompt_build"):
+                prompt, active_char = engine.build_prompt(
+                    session.history[i]["text"], session.summary, session.get_recent(), location=session.location
+                )
+            with timer.phase("persist"):
+                save_rating_to_json(
+                    prompt,
+                    session.history[i]["text"],
+                    ratings,
+                    active_char,
+                    session.location.name
+                )
             break
-    return jsonify({"status": "ok"})
+    return {"status": "ok"}
 
 
-
-@app.route("/edit", methods=["POST"])
-def edit():
-    data = request.get_json()
-    edited_text = data.get("edited", "")
+def edit_message(data, timer):
+    # Front (BackendAPI.edit) wysyła editedText/msgId — obsługujemy obie wersje kluczy
+    edited_text = data.get("edited") or data.get("editedText", "")
     tags = data.get("tags", [])
     if not edited_text.strip():
-        return jsonify({"status": "empty"})
+        return {"status": "empty"}
 
     for i in reversed(range(len(session.history))):
         if session.history[i]["sender"] in engine.characters:
-            prompt, active_char = engine.build_prompt(session.history[i]["text"], session.summary, session.get_recent())
-            from core.utils import save_rating_to_json
-            message_id = find_message_by_id(data.get("messageID", ""))
-        
-            save_rating_to_json(
-                message_id,
-                prompt, edited_text,
-                session.history[i].get("ratings", {}),
-                active_char, engine.location.name,
-                tags=tags
-            )
+            with timer.phase("prompt_build"):
+                prompt, active_char = engine.build_prompt(
+                    session.history[i]["text"], session.summary, session.get_recent(), location=session.location
+                )
+            with timer.phase("persist"):
+                save_rating_to_json(
+                    prompt, edited_text,
+                    session.history[i].get("ratings", {}),
+                    active_char, session.location.name,
+                    tags=tags,
+                    original=session.history[i]["text"]
+                )
             break
+    return {"status": "saved"}
+
+
+def post_message(data):
+    sender = data.get("sender", "Użytkownik")
+    text = data.get("text", "")
+    session.add_message(sender, text)
+    return {
+        "id": f"{len(session.history) - 1} {uuid.uuid4().hex}",
+        "text": text,
+        "tags": data.get("tags", []),
+        "sender": sender,
+        "avatarUrl": data.get("avatar", f"/static/NarrativeIMG/Avatars/{sender}.png"),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def location_info(loc):
+    return {"key": loc.key, "name": loc.name, "description": loc.description}
 
-    return jsonify({"status": "saved"})
 
+def list_locations():
+    return {"current": session.location.key, "locations": [location_info(l) for l in scenes]}
 
 
+def switch_location(data):
+    """Zmiana sceny rozmowy — podmiana gotowego bloku sceny (bez ponownego renderowania opisu)."""
+    target = scenes.get((data or {}).get("location", ""))
+    if target is None:
+        return None
+    session.location = target
+    return {"status": "ok", "location": location_info(target)}
+
 
+def load_tags():
+    with open("tags.json", "r", encoding="utf-8") as f:
+        return json.load(f)
 
 
+@app.route("/rate", methods=["POST"])
+def rate():
+    timer = RequestTimer("rate")
+    data = request.get_json()
+    payload = rate_message(data, timer)
+    observe_request(timer, client_key(request.headers, request.remote_addr), data)
+    return jsonify(payload)
 
 
+@app.route("/edit", methods=["POST"])
+def edit():
+    timer = RequestTimer("edit")
+    data = request.get_json()
+    payload = edit_message(data, timer)
+    observe_request(timer, client_key(request.headers, request.remote_addr), data)
+    return jsonify(payload)
+
+
+@app.route("/messages", methods=["POST"])
+def messages():
+    return jsonify(post_message(request.get_json()))
+
+
+@app.route("/locations", methods=["GET"])
+def locations():
+    return jsonify(list_locations())
+
+
+@app.route("/location", methods=["POST"])
+def location_switch():
+    payload = switch_location(request.get_json(silent=True))
+    if payload is None:
+        return jsonify({"error": "Nieznana lokacja.", "locations": [l.key for l in scenes]}), 404
+    return jsonify(payload)
+
+
+@app.route("/tags", methods=["GET"])
+def tags():
+    try:
+        return jsonify(load_tags())
+    except Exception as e:
+        print(f"[ERROR] Nie udało się wczytać tags.json: {e}")
+        return jsonify({"error": "Nie można załadować tagów."}), 500
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:
+    from starlette.middleware.wsgi import WSGIMiddleware
+
+import app as chat
+from core.dedup import PendingRequest
+from core.metrics import RequestTimer
+
+# Tryb ASGI: te same kontrakty co app.py (/generate, /rate, /edit, /tags, /messages, /cancel),
+# ale oczekujące żądanie to korutyna, a nie wątek — tysiące otwartych połączeń kosztują tyle co pamięć
+# na ich gniazda. Model pracuje na osobnej puli wątków o rozmiarze GENERATION_SLOTS, więc kolejka
+# czekających żądań to kolejka zadań puli, a nie zablokowane wątki serwera.
+# Wszystko inne (strony, static, galeria, /metrics, /images/resolve) obsługuje aplikacja Flask z app.py.
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port 5000
+#
+# Model i stan sesji ładuje import app.py (INFERENCE_BACKEND=fake pozwala uruchomić bez modelu).
+
+DISCONNECT_POLL = float(os.environ.get("DISCONNECT_POLL", 0.5))
+generation_executor = ThreadPoolExecutor(max_workers=chat.GENERATION_SLOTS, thread_name_prefix="generate")
+
+
+def client_host(request):
+    return chat.client_key(request.headers, request.client.host if request.client else None)
+
+
+def queued_generation(user_input, cancel_event, timer, submitted_at):
+    # Czas w kolejce puli; semafor slotów w run_generation mierzy osobno slot_wait (razem: RequestTimer.queue_wait)
+    timer.add("executor_wait", time.perf_counter() - submitted_at)
+    return chat.run_generation(user_input, cancel_event, timer)
+
+
+async def wait_for_generation(request, future, pending):
+    """Czeka na wynik generacji; rozłączenie klienta przerywa ją tak jak DisconnectWatcher w app.py (po okresie łaski)."""
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=DISCONNECT_POLL)
+        if done:
+            return future.result()
+        if not pending.cancelled.is_set() and await request.is_disconnected():
+            # abandon() blokuje na czas DEDUP_ABANDON_GRACE — nie w pętli zdarzeń
+            await run_in_threadpool(chat.request_registry.abandon, pending)
+
+
+async def generate(request):
+    data = await request.json()
+    user_input = data.get("prompt", "")
+    request_id = data.get("requestId") or request.headers.get("Idempotency-Key")
+
+    if request_id:
+        pending, owner, result = chat.request_registry.begin(request_id)
+        if result is not None:
+            return JSONResponse(result)
+        if not owner:
+            try:
+                return JSONResponse(await run_in_threadpool(chat.request_registry.wait, pending, chat.DEDUP_WAIT_TIMEOUT))
+            except TimeoutError:
+                return JSONResponse({"error": "Generowanie nadal trwa."}, status_code=503)
+    else:
+        pending = PendingRequest(None)
+
+    timer = RequestTimer("generate")
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        generation_executor, queued_generation, user_input, pending.cancelled, timer, time.perf_counter()
+    )
+    try:
+        payload = await wait_for_generation(request, future, pending)
+    except Exception as e:
+        if request_id:
+            chat.request_registry.fail(pending, e)
+        chat.observe_request(timer, client_host(request), data, status=500)
+        raise
+    if request_id:
+        chat.request_registry.finish(pending, payload)
+    chat.observe_request(timer, client_host(request), data)
+    return JSONResponse(payload)
+
+
+async def cancel(request):
+    # jak get_json(silent=True) w app.py: brak albo niepoprawne ciało → 404, nie 500
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        data = {}
+    if chat.request_registry.cancel(data.get("requestId", "")):
+        return JSONResponse({"status": "cancelled"})
+    return JSONResponse({"status": "not_found"}, status_code=404)
+
+
+async def rate(request):
+    timer = RequestTimer("rate")
+    data = await request.json()
+    payload = await run_in_threadpool(chat.rate_message, data, timer)
+    chat.observe_request(timer, client_host(request), data)
+    return JSONResponse(payload)
+
+
+async def edit(request):
+    timer = RequestTimer("edit")
+    data = await request.json()
+    payload = await run_in_threadpool(chat.edit_message, data, timer)
+    chat.observe_request(timer, client_host(request), data)
+    return JSONResponse(payload)
+
+
+async def messages(request):
+    # Z LONG_TERM_MEMORY zapis wiadomości dopisuje na dysk i może liczyć embeddingi — poza pętlą zdarzeń
+    data = await request.json()
+    return JSONResponse(await run_in_threadpool(chat.post_message, data))
+
+
+async def tags(request):
+    try:
+        return JSONResponse(await run_in_threadpool(chat.load_tags))
+    except Exception as e:
+        print(f"[ERROR] Nie udało się wczytać tags.json: {e}")
+        return JSONResponse({"error": "Nie można załadować tagów."}, status_code=500)
+
+
+app = Starlette(routes=[
+    Route("/generate", generate, methods=["POST"]),
+    Route("/cancel", cancel, methods=["POST"]),
+    Route("/rate", rate, methods=["POST"]),
+    Route("/edit", edit, methods=["POST"]),
+    Route("/messages", messages, methods=["POST"]),
+    Route("/tags", tags, methods=["GET"]),
+    Mount("/", WSGIMiddleware(chat.app)),
+])
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="192.168.0.87", port=5000)
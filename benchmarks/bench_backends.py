@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Porównanie backendów inferencji: tokeny/s i pamięć (RSS) procesu.
+
+Każdy backend mierzony jest w osobnym podprocesie, żeby RSS jednego
+nie zawyżał wyniku drugiego.
+
+    python benchmarks/bench_backends.py --backends cuda cpu cpu-int8
+    python benchmarks/bench_backends.py --backends gguf --model models/bielik-7b.Q4_K_M.gguf
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROMPT = (
+    "Postać RP: Lytha\n"
+    "Rasa: Elfka\n"
+    "Rola: Medyczka z leśnego klanu\n"
+    "Język: polski\n"
+    "\n{user}: Opowiedz mi o lesie, w którym mieszkasz.\n### ODPOWIEDŹ\nLytha:"
+)
+
+
+def rss_mb():
+    """Bieżące i szczytowe RSS w MB (z /proc, a poza Linuksem — z getrusage)."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["VmRSS"].split()[0]) / 1024, int(fields["VmHWM"].split()[0]) / 1024
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return peak, peak
+
+
+def run_single(name, model_path, runs, max_new_tokens):
+    from core.backend import create_backend
+
+    t0 = time.perf_counter()
+    backend = create_backend(name, model_path)
+    load_s = time.perf_counter() - t0
+    rss_loaded, _ = rss_mb()
+
+    prompt_tokens = backend.count_tokens(PROMPT)
+    # Rozgrzewka — pierwsze wywołanie płaci za alokacje i kompilację kerneli
+    backend.generate(PROMPT, max_new_tokens=8, do_sample=False)
+
+    tokens, elapsed = 0, 0.0
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        output = backend.generate(PROMPT, max_new_tokens=max_new_tokens, do_sample=False)
+        elapsed += time.perf_counter() - t0
+        tokens += max(backend.count_tokens(output) - prompt_tokens, 0)
+
+    _, rss_peak = rss_mb()
+    return {
+        "backend": name,
+        "load_s": round(load_s, 2),
+        "tokens": tokens,
+        "tokens_per_s": round(tokens / elapsed, 2) if elapsed else 0.0,
+        "rss_loaded_mb": round(rss_loaded, 1),
+        "rss_peak_mb": round(rss_peak, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["cuda", "cpu-int8"])
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH", "Bielik-7B-Instruct-v0.1"))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.single, args.model, args.runs, args.max_new_tokens)))
+        return
+
+    results = []
+    for name in args.backends:
+        print(f"⏱️ {name} ...", flush=True)
+        proc = subprocess.run(
+            [sys.executable, __file__, "--single", name, "--model", args.model,
+             "--runs", str(args.runs), "--max-new-tokens", str(args.max_new_tokens)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"❌ {name}: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'backend':<10} {'load s':>8} {'tok/s':>8} {'RSS MB':>10} {'peak MB':>10}")
+    for r in results:
+        print(f"{r['backend']:<10} {r['load_s']:>8} {r['tokens_per_s']:>8} {r['rss_loaded_mb']:>10} {r['rss_peak_mb']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Mikrobenchmarki ścieżek wykonywanych przy każdym żądaniu (czysty Python, bez modelu):
+
+    Character.generate_prompt, SessionMemory.clean_history, NarrativeEngine.detect_target,
+    NarrativeEngine.build_prompt, TagEngine.extract_tags, detect_incomplete_response, LoreIndex.select
+
+Dane są syntetyczne: obsada 10–10 000 postaci, historia 10–100 000 wiadomości, 10–10 000 reguł tagów,
+10–10 000 wpisów lore.
+Dla każdego przypadku raportujemy czas jednego wywołania w funkcji rozmiaru i nachylenie krzywej
+w skali log-log (~0 = stały czas, ~1 = liniowo, ~2 = kwadratowo) — to pokazuje, co się „rozsypie”
+przy dużej sesji albo dużej obsadzie, zanim zobaczą to użytkownicy.
+
+    python benchmarks/bench_hotpaths.py --save benchmarks/baselines/hotpaths.json
+    python benchmarks/bench_hotpaths.py --baseline benchmarks/baselines/hotpaths.json --max-regression 25
+    python benchmarks/bench_hotpaths.py --quick --cases clean_history build_prompt
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.character import Character  # noqa: E402
+from core.location import Location  # noqa: E402
+from core.lore import LoreIndex  # noqa: E402
+from core.narrative import NarrativeEngine  # noqa: E402
+from core.session import SessionMemory  # noqa: E402
+from core.tagger import TagEngine  # noqa: E402
+from core.utils import detect_incomplete_response  # noqa: E402
+
+CAST_SIZES = (10, 100, 1000, 10000)
+HISTORY_SIZES = (10, 100, 1000, 10000, 100000)
+RULE_SIZES = (10, 100, 1000, 10000)
+TEXT_SIZES = (10, 100, 1000, 10000)  # słowa w odpowiedzi
+LORE_SIZES = (10, 100, 1000, 10000)  # wpisy świata
+QUICK_LIMIT = 1000
+
+WORDS = ("las", "szumi", "cicho", "ścieżka", "prowadzi", "dalej", "mrok", "uśmiecha", "się", "wskazuje",
+         "drogę", "do", "polany", "elfka", "zioła", "rana", "ogień", "noc", "gwiazdy", "strażnik")
+SEED = 1234
+
+
+def synthetic_character(i, rng, relationships=5):
+    return Character(
+        name=f"Postać{i}",
+        race=rng.choice(("Elfka", "Człowiek", "Krasnolud", "Ork")),
+        role="Wędrowiec z leśnego klanu",
+        style="opiekuńcza, tajemnicza",
+        tone="łagodny",
+        emotions=["spokój", "ciekawość"],
+        backstory=" ".join(rng.choice(WORDS) for _ in range(40)),
+        relationships={f"Postać{rng.randrange(10000)}": "przyjaciel" for _ in range(relationships)},
+    )
+
+
+def synthetic_cast(size, rng):
+    return [synthetic_character(i, rng) for i in range(size)]
+
+
+def synthetic_session(size, rng, duplicate_ratio=0.1):
+    """Historia z ~10% powtórzonych wiadomości (to właśnie usuwa deduplikacja)."""
+    session = SessionMemory()
+    texts = []
+    for i in range(size):
+        if texts and rng.random() < duplicate_ratio:
+            text = rng.choice(texts)
+        else:
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))) + "."
+            texts.append(text)
+        session.add_message("Użytkownik" if i % 2 == 0 else "Lytha", text)
+    return session
+
+
+def location():
+    return Location("Leśna polana", "Cicha, mglista ścieżka wśród pradawnych drzew")
+
+
+# Każdy przypadek: (wymiar, rozmiary, setup(rozmiar, rng) → funkcja bez argumentów)
+def case_generate_prompt(size, rng):
+    character = synthetic_character(0, rng)
+    history = synthetic_session(size, rng).history
+    return lambda: character.generate_prompt("Opowiedz mi o lesie.", "Streszczenie rozmowy.", history)
+
+
+def case_clean_history(size, rng):
+    session = synthetic_session(size, rng)
+    return session.clean_history
+
+
+def case_detect_target(size, rng):
+    engine = NarrativeEngine(synthetic_cast(size, rng), location=location())
+    # najgorszy przypadek: brak wzmianki — pętla przechodzi całą obsadę, potem list(keys) dla domyślnej postaci.
+    # (Wzmianka o „ostatniej” postaci nie nadaje się: @Postać9 jest prefiksem @Postać9999 i pętla kończy się wcześniej.)
+    text = "co słychać w lesie?"
+    return lambda: engine.detect_target(text)
+
+
+def case_build_prompt(size, rng):
+    engine = NarrativeEngine(synthetic_cast(size, rng), location=location())
+    history = synthetic_session(6, rng).history
+    text = f"@Postać{size // 2} co słychać?"
+    return lambda: engine.build_prompt(text, "", history)
+
+
+def case_request_path(size, rng):
+    """clean_history + build_prompt tak jak w run_generation — historia rośnie, obsada stała (10)."""
+    engine = NarrativeEngine(synthetic_cast(10, rng), location=location())
+    session = synthetic_session(size, rng)
+    return lambda: engine.build_prompt("@Postać3 co słychać?", session.summary, session.clean_history())
+
+
+def case_extract_tags(size, rng):
+    tagger = TagEngine(tag_file="")
+    tagger.rules = {f"tag-{i}": [f"rdzeń{i}x{j}" for j in range(4)] for i in range(size)}
+    tagger.rules["tag-location"] = ["forest", "las"]
+    text = " ".join(rng.choice(WORDS) for _ in range(60))
+    return lambda: tagger.extract_tags(text)
+
+
+def case_detect_incomplete(size, rng):
+    text = " ".join(rng.choice(WORDS) for _ in range(size)) + " i"
+    return lambda: detect_incomplete_response(text)
+
+
+def case_lore_select(size, rng):
+    lore = LoreIndex()
+    for i in range(size):
+        lore.add_entry(f"Miejsce{i}", {"description": " ".join(rng.choice(WORDS) for _ in range(50)) + f" znak{i}"})
+    lore.build()
+    # słowa z małego słownika są w każdym wpisie — najgorszy przypadek dla list wystąpień
+    text = f"Opowiedz o polany i zioła przy znak{size // 2}"
+    return lambda: lore.select(text, budget=200)
+
+
+CASES = {
+    "generate_prompt": ("historia", HISTORY_SIZES, case_generate_prompt),
+    "clean_history": ("historia", HISTORY_SIZES, case_clean_history),
+    "request_path": ("historia", HISTORY_SIZES, case_request_path),
+    "detect_target": ("obsada", CAST_SIZES, case_detect_target),
+    "build_prompt": ("obsada", CAST_SIZES, case_build_prompt),
+    "extract_tags": ("reguły", RULE_SIZES, case_extract_tags),
+    "detect_incomplete_response": ("słowa", TEXT_SIZES, case_detect_incomplete),
+    "lore_select": ("wpisy", LORE_SIZES, case_lore_select),
+}
+
+
+def measure(fn, repeat, min_time):
+    """Najlepszy czas jednego wywołania (µs); liczba pętli dobierana jak w timeit.autorange."""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return best / loops * 1e6
+
+
+def slope(points):
+    """Nachylenie regresji log(czas) ~ log(rozmiar) — wykładnik złożoności widoczny w pomiarze."""
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(max(us, 1e-3)) for _, us in points]
+    if len(xs) < 2:
+        return None
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    den = sum((x - mx) ** 2 for x in xs)
+    return round(sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den, 2) if den else None
+
+
+def run(cases, quick, repeat, min_time):
+    results = {}
+    for name in cases:
+        dimension, sizes, setup = CASES[name]
+        if quick:
+            sizes = [s for s in sizes if s <= QUICK_LIMIT]
+        points = []
+        for size in sizes:
+            fn = setup(size, random.Random(SEED))
+            fn()  # rozgrzewka
+            us = measure(fn, repeat, min_time)
+            points.append((size, us))
+            print(f"  {name:<28}{dimension:>9}={size:<7}{us:>12.2f} µs", flush=True)
+        results[name] = {
+            "dimension": dimension,
+            "points": {str(size): round(us, 3) for size, us in points},
+            "slope": slope(points),
+        }
+    return results
+
+
+def compare(results, baseline, max_regression):
+    rows, regressed = [], False
+    for name, current in results.items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous:
+            continue
+        for size, us in current["points"].items():
+            old = previous["points"].get(size)
+            if not old:
+                continue
+            delta = (us - old) / old * 100
+            flag = ""
+            if max_regression is not None and delta > max_regression:
+                flag, regressed = "❌", True
+            rows.append((name, size, old, us, delta, flag))
+    return rows, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--quick", action="store_true", help=f"rozmiary tylko do {QUICK_LIMIT}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimalny czas jednej serii pomiaru (s)")
+    parser.add_argument("--save", help="zapis wyników jako baseline (JSON)")
+    parser.add_argument("--baseline", help="baseline do porównania")
+    parser.add_argument("--max-regression", type=float, help="próg spowolnienia w %% (kod wyjścia 1 po przekroczeniu)")
+    args = parser.parse_args()
+
+    print(f"⏱️ Mikrobenchmarki ({'quick' if args.quick else 'pełne rozmiary'})")
+    results = run(args.cases, args.quick, args.repeat, args.min_time)
+
+    print(f"\n📈 Krzywe skalowania (nachylenie log-log: 0 = stały czas, 1 = liniowo):")
+    for name, r in results.items():
+        points = " ".join(f"{size}:{us:.1f}" for size, us in r["points"].items())
+        print(f"  {name:<28}{r['dimension']:>9}  slope={r['slope']}  [{points}] µs")
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            rows, regressed = compare(results, json.load(f), args.max_regression)
+        print("\n📊 Porównanie z baseline:")
+        for name, size, old, new, delta, flag in rows:
+            print(f"  {name:<28}{size:>7}{old:>12.2f} → {new:<12.2f}{delta:+7.1f}% {flag}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "quick": args.quick, "cases": results},
+                      f, indent=2, ensure_ascii=False)
+        print(f"💾 Zapisano baseline: {args.save}")
+    if regressed:
+        print(f"❌ Spowolnienie powyżej {args.max_regression}% względem baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Klasyfikator jakości (core/quality.py) vs heurystyka detect_incomplete_response.
+
+Dla każdego zbioru: precyzja / czułość / F1 wykrywania odpowiedzi urwanych oraz fałszywe alarmy
+— każdy to zbędne retry_if_empty, czyli pełna ponowna generacja (--retry-cost sekund GPU).
+Zbiory:
+  - syntetyczne: inne ziarno niż przy treningu, P(EOS) symulowane (z EOS i bez),
+  - ręczne: krótka lista typowych odpowiedzi RP z etykietami (GOLDEN),
+  - ratings/: pary (oryginał, edycja) i dobrze ocenione odpowiedzi, jeśli katalog istnieje.
+Klasyfikator do oceny jest trenowany tylko na danych syntetycznych (bez przecieku z ratings/).
+Na koniec przepustowość: heurystyka (pętla) vs score() całej partii.
+
+    python benchmarks/bench_quality.py
+    python benchmarks/bench_quality.py --ratings ratings --save-model models/quality.json
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from core.quality import QualityClassifier, load_ratings, synthetic_examples  # noqa: E402
+from core.utils import RATINGS_DIR, detect_incomplete_response  # noqa: E402
+
+EVAL_SEED = 4321
+# (odpowiedź, 1 = urwana)
+GOLDEN = (
+    ("Tak.", 0),
+    ("Chodźmy!", 0),
+    ("Dobrze, pójdę z tobą.", 0),
+    ("*uśmiecha się delikatnie*", 0),
+    ("*kiwa głową* Rozumiem.", 0),
+    ("„Nie bój się” — szepcze Lytha.", 0),
+    ("Lytha przykłada dłoń do rany. „To tylko zadrapanie...”", 0),
+    ("Może... kiedyś.", 0),
+    ("Las cichnie, a mgła gęstnieje. Coś jest nie tak…", 0),
+    ("Hestia spogląda na ciebie z niepokojem. — Musimy się pospieszyć!", 0),
+    ("Zioła są gotowe. Wypij to powoli, a ból minie.", 0),
+    ("Kto tam?", 0),
+    ("Lytha opatruje twoją ranę, delikatnie oczyszczając ją wywarem z ziół. Po chwili podnosi wzrok.", 0),
+    ("*bierze głęboki oddech* Dobrze. Opowiem ci o pożarze wioski.", 0),
+    ("Naprawdę tak uważasz?", 0),
+    ("Lytha uśmiecha się i", 1),
+    ("Las szumi cicho, a ścieżka prowadzi", 1),
+    ("Przykłada dłoń do twojej rany, a potem", 1),
+    ("*uśmiecha się delikatnie i sięga po", 1),
+    ("„Nie bój się, jestem przy tobie, zaraz", 1),
+    ("Hestia spogląda na ciebie z niepokojem,", 1),
+    ("Zioła są gotowe. Wypij to powoli, a", 1),
+    ("Lytha opatruje twoją ranę, delikatnie oczyszczając ją wywarem z", 1),
+    ("Musimy iść do zamku, zanim zapadnie", 1),
+    ("Kiedy dotarli do polany, Lytha zatrzymała się nagle i spojrzała w stronę", 1),
+    ("Opowiem ci o pożarze wioski. To było dawno temu, gdy byłam jeszcze", 1),
+    ("Wiatr przynosi zapach dymu:", 1),
+    ("", 1),
+)
+
+
+def rates(predicted, labels):
+    predicted, labels = np.asarray(predicted, dtype=bool), np.asarray(labels, dtype=bool)
+    tp = int((predicted & labels).sum())
+    fp = int((predicted & ~labels).sum())
+    fn = int((~predicted & labels).sum())
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1, "false_positives": fp, "n": len(labels)}
+
+
+def evaluate(name, texts, labels, classifier, eos=None, retry_cost=6.0):
+    rows = [("heurystyka", rates([detect_incomplete_response(t) for t in texts], labels))]
+    rows.append(("klasyfikator", rates(classifier.score(texts) >= classifier.threshold, labels)))
+    if eos is not None:
+        rows.append(("klasyfikator + P(EOS)", rates(classifier.score(texts, eos) >= classifier.threshold, labels)))
+    print(f"\n📋 {name} (n={len(texts)}, urwanych: {sum(labels)})")
+    print(f"  {'metoda':<24}{'precyzja':>10}{'czułość':>10}{'F1':>8}{'zbędne retry':>15}{'GPU s':>9}")
+    for method, r in rows:
+        print(f"  {method:<24}{r['precision']:>10.3f}{r['recall']:>10.3f}{r['f1']:>8.3f}"
+              f"{r['false_positives']:>15}{r['false_positives'] * retry_cost:>9.0f}")
+
+
+def throughput(classifier, size=10000):
+    texts, eos, _ = synthetic_examples(size, random.Random(EVAL_SEED + 1))
+    t0 = time.perf_counter()
+    for t in texts:
+        detect_incomplete_response(t)
+    heuristic = (time.perf_counter() - t0) / size * 1e6
+    t0 = time.perf_counter()
+    classifier.score(texts, eos)
+    batch = (time.perf_counter() - t0) / size * 1e6
+    t0 = time.perf_counter()
+    for t, p in zip(texts[:1000], eos[:1000]):
+        classifier.assess(t, p)
+    single = (time.perf_counter() - t0) / 1000 * 1e6
+    print(f"\n⏱️ Przepustowość ({size} odpowiedzi): heurystyka {heuristic:.2f} µs/odp., "
+          f"klasyfikator partią {batch:.2f} µs/odp., pojedynczo {single:.1f} µs/odp.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ratings", default=RATINGS_DIR, help="katalog ocen/edycji do ewaluacji")
+    parser.add_argument("--samples", type=int, default=3000, help="liczba syntetycznych przykładów testowych")
+    parser.add_argument("--retry-cost", type=float, default=6.0, help="sekundy GPU jednej zbędnej regeneracji")
+    parser.add_argument("--save-model", help="trening na ratings/ + syntetycznych i zapis wag (QUALITY_MODEL)")
+    args = parser.parse_args()
+
+    classifier, _ = QualityClassifier.train(ratings_dir="")
+    texts, eos, labels = synthetic_examples(args.samples, random.Random(EVAL_SEED))
+    evaluate("Syntetyczne (inne ziarno niż trening)", texts, labels, classifier, eos, args.retry_cost)
+    evaluate("Ręczne (GOLDEN)", [t for t, _ in GOLDEN], [y for _, y in GOLDEN], classifier, retry_cost=args.retry_cost)
+    rated_texts, rated_labels = load_ratings(args.ratings)
+    if rated_texts:
+        evaluate(f"Oceny ({args.ratings})", rated_texts, rated_labels, classifier, retry_cost=args.retry_cost)
+    else:
+        print(f"\nℹ️ Brak przykładów w {args.ratings} — pomijam ewaluację na ocenach")
+    throughput(classifier)
+
+    if args.save_model:
+        trained, rated = QualityClassifier.train(ratings_dir=args.ratings)
+        trained.save(args.save_model)
+        print(f"💾 Zapisano model ({rated} przykładów z {args.ratings}): {args.save_model}")
+
+
+if __name__ == "__main__":
+    main()
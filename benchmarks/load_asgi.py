@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Współbieżność: Flask (wątek na połączenie) vs ASGI (asgi.py, korutyna na połączenie).
+
+Serwer startuje w podprocesie z INFERENCE_BACKEND=fake (bez modelu), po czym N klientów
+jednocześnie otwiera połączenie i wysyła /generate. Model obsługuje GENERATION_SLOTS żądań naraz,
+więc reszta czeka — i właśnie koszt czekania (wątki, RSS, błędy połączeń) porównujemy.
+
+    python benchmarks/load_asgi.py --modes flask asgi --connections 500 --slots 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "flask": [sys.executable, "-c", "import sys, app; app.app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"],
+    "asgi": [sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--log-level", "warning", "--port"],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def proc_status(pid):
+    """(wątki, RSS w MB) procesu serwera z /proc."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["Threads"]), int(fields["VmRSS"].split()[0]) / 1024
+    except (OSError, KeyError):
+        return 0, 0.0
+
+
+async def post_json(port, path, payload, timeout):
+    """Minimalny klient HTTP/1.1 na asyncio (bez zależności) — jedno połączenie, jedno żądanie."""
+    body = json.dumps(payload).encode("utf-8")
+    reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+    try:
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii") + body
+        )
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    status = int(raw.split(b" ", 2)[1]) if raw.startswith(b"HTTP/") else 0
+    return status
+
+
+async def wait_ready(port, deadline):
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /tags HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            if (await reader.read()).startswith(b"HTTP/1.1 200"):
+                writer.close()
+                return True
+            writer.close()
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    return False
+
+
+async def run_load(port, pid, connections, timeout):
+    peak = {"threads": 0, "rss_mb": 0.0}
+    stop = asyncio.Event()
+
+    async def sample():
+        while not stop.is_set():
+            threads, rss = proc_status(pid)
+            peak["threads"] = max(peak["threads"], threads)
+            peak["rss_mb"] = max(peak["rss_mb"], rss)
+            await asyncio.sleep(0.1)
+
+    async def one(i):
+        t0 = time.perf_counter()
+        try:
+            status = await post_json(port, "/generate", {"prompt": f"Cześć @Lytha, pytanie {i}"}, timeout)
+        except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+            status = 0
+        return status, time.perf_counter() - t0
+
+    sampler = asyncio.create_task(sample())
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(connections)))
+    wall = time.perf_counter() - t0
+    stop.set()
+    await sampler
+
+    latencies = sorted(lat for status, lat in results if status == 200)
+    errors = sum(1 for status, _ in results if status != 200)
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 3) if latencies else None
+
+    return {
+        "ok": len(latencies),
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_s": pct(50),
+        "p95_s": pct(95),
+        "p99_s": pct(99),
+        "peak_threads": peak["threads"],
+        "peak_rss_mb": round(peak["rss_mb"], 1),
+    }
+
+
+def run_mode(mode, args):
+    port = free_port()
+    env = dict(
+        os.environ,
+        INFERENCE_BACKEND="fake",
+        GENERATION_SLOTS=str(args.slots),
+        FAKE_PREFILL_MS=str(args.prefill_ms),
+        FAKE_TOKEN_MS=str(args.token_ms),
+        FAKE_NEW_TOKENS=str(args.new_tokens),
+        LOG_LEVEL="WARNING",
+    )
+    proc = subprocess.Popen(SERVERS[mode] + [str(port)], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not asyncio.run(wait_ready(port, time.monotonic() + 60)):
+            return {"mode": mode, "error": "serwer nie wystartował"}
+        idle_threads, idle_rss = proc_status(proc.pid)
+        result = asyncio.run(run_load(port, proc.pid, args.connections, args.timeout))
+        return dict({"mode": mode, "idle_threads": idle_threads, "idle_rss_mb": round(idle_rss, 1)}, **result)
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["flask", "asgi"], choices=sorted(SERVERS))
+    parser.add_argument("--connections", type=int, default=300)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--prefill-ms", type=float, default=20)
+    parser.add_argument("--token-ms", type=float, default=5)
+    parser.add_argument("--new-tokens", type=int, default=40)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    results = [run_mode(mode, args) for mode in args.modes]
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Generator obciążenia: odtwarza ślady rozmów na /generate, /rate i /edit i raportuje
+przepustowość, p50/p95/p99 oraz odsetek błędów osobno dla każdego endpointu.
+
+Serwer startuje w podprocesie z INFERENCE_BACKEND=fake (opóźnienia prefill/token z FAKE_*),
+a oceny i edycje trafiają do katalogu tymczasowego (RATINGS_DIR), nie do ratings/.
+Można też podać --url działającego serwera (wtedy FAKE_* ustawia się po jego stronie).
+
+Ślad (JSONL, jedna linia = jedno żądanie):
+    {"t": 0.0, "conv": "c1", "endpoint": "generate", "prompt_chars": 64, "mention": "Lytha"}
+    {"t": 2.1, "conv": "c1", "endpoint": "rate"}
+    {"t": 5.4, "conv": "c1", "endpoint": "edit", "edited_chars": 180}
+Bez --trace generowane są syntetyczne rozmowy (--conversations × --turns).
+Ślad nagrany przez serwer (TRACE_FILE, core/traces.py) ma ten sam format — dodatkowe pola
+(status, total_s, summary, ...) służą do opisu kształtu ruchu (--describe), odtwarzanie je pomija.
+Każda rozmowa to zamknięta pętla: kolejne żądanie wychodzi po odpowiedzi na poprzednie
+i nie wcześniej niż w chwili t (× 1/speed) — tak jak zachowuje się użytkownik czatu.
+--speeds 1 2 4 odtwarza ślad kolejno w tempie 1×, 2× i 4× (każde tempo na świeżym serwerze).
+
+    python benchmarks/loadgen.py --server asgi --conversations 20 --turns 5 --out wyniki.json
+    python benchmarks/loadgen.py --server asgi --baseline wyniki.json --max-regression 10
+    python benchmarks/loadgen.py --trace traces/trace.jsonl --describe --speeds 1 2 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_asgi import ROOT, SERVERS, free_port, proc_status, wait_ready  # noqa: E402
+
+ENDPOINTS = ("generate", "rate", "edit")
+PROMPT_WORDS = ("Cześć", "co", "słychać", "w", "lesie", "opowiedz", "mi", "o", "polanie",
+                "dokąd", "prowadzi", "ta", "ścieżka", "czy", "widziałaś", "coś", "dziwnego")
+# Metryki porównywane z baseline: (klucz, czy większa wartość jest lepsza)
+COMPARED = (("throughput_rps", True), ("p50_s", False), ("p95_s", False), ("p99_s", False), ("error_rate", False))
+
+
+async def request_json(host, port, method, path, payload, timeout, conversation=None):
+    """(status, ciało JSON lub None) — klient HTTP/1.1 na asyncio, jedno połączenie na żądanie."""
+    extra = f"X-Conversation-Id: {conversation}\r\n" if conversation else ""
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n{extra}"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii") + body
+        )
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    head, _, content = raw.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1]) if head.startswith(b"HTTP/") else 0
+    try:
+        data = json.loads(content.decode("utf-8"))
+    except ValueError:
+        data = None
+    return status, data
+
+
+def synthetic_trace(conversations, turns, rate_ratio, edit_ratio, think_s, seed):
+    """Rozmowy: generate, po nim z pewnym prawdopodobieństwem ocena i/lub edycja odpowiedzi."""
+    rng = random.Random(seed)
+    events = []
+    for c in range(conversations):
+        t = rng.uniform(0, think_s)
+        for _ in range(turns):
+            events.append({"t": round(t, 3), "conv": f"c{c}", "endpoint": "generate",
+                           "prompt_chars": rng.randint(20, 200), "mention": "Lytha" if rng.random() < 0.5 else None})
+            if rng.random() < rate_ratio:
+                t += rng.uniform(0, think_s)
+                events.append({"t": round(t, 3), "conv": f"c{c}", "endpoint": "rate"})
+            if rng.random() < edit_ratio:
+                t += rng.uniform(0, think_s)
+                events.append({"t": round(t, 3), "conv": f"c{c}", "endpoint": "edit",
+                               "edited_chars": rng.randint(50, 400)})
+            t += rng.uniform(0, think_s)
+    return events
+
+
+def load_trace(path):
+    with open(path, "r", encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    events = [e for e in events if e.get("endpoint") in ENDPOINTS]
+    # ślad sklejony z kilku nagrań albo zaczynający się później — odtwarzanie startuje od razu
+    first = min((e.get("t", 0) for e in events), default=0)
+    return [dict(e, t=e.get("t", 0) - first) for e in events]
+
+
+def describe_trace(events):
+    """Kształt ruchu: długości tur, udział @wzmianek, proporcje rate/edit, częstość streszczeń."""
+    generate = [e for e in events if e["endpoint"] == "generate"]
+    counts = {endpoint: sum(1 for e in events if e["endpoint"] == endpoint) for endpoint in ENDPOINTS}
+    prompt_chars = sorted(e.get("prompt_chars", 0) for e in generate)
+    span = max((e.get("t", 0) for e in events), default=0)
+    shape = {
+        "requests": len(events),
+        "conversations": len({e.get("conv", "default") for e in events}),
+        "span_s": round(span, 1),
+        "rate_per_generate": round(counts["rate"] / counts["generate"], 3) if counts["generate"] else None,
+        "edit_per_generate": round(counts["edit"] / counts["generate"], 3) if counts["generate"] else None,
+        "mention_ratio": round(sum(1 for e in generate if e.get("mention")) / len(generate), 3) if generate else None,
+        "summary_ratio": round(sum(1 for e in generate if e.get("summary")) / len(generate), 3) if generate else None,
+        "prompt_chars_p50": percentile(prompt_chars, 50),
+        "prompt_chars_p95": percentile(prompt_chars, 95),
+    }
+    print("\n🔎 Kształt śladu:")
+    for key, value in shape.items():
+        print(f"  {key:<20}{value}")
+    return shape
+
+
+def make_text(rng, chars):
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rng.choice(PROMPT_WORDS))
+    return " ".join(words)
+
+
+def make_payload(event, rng, last_message_id):
+    endpoint = event["endpoint"]
+    if endpoint == "generate":
+        prompt = make_text(rng, event.get("prompt_chars") or 4 * event.get("prompt_tokens", 15))
+        if event.get("mention"):
+            prompt = f"@{event['mention']} {prompt}"
+        return {"prompt": prompt}
+    if endpoint == "rate":
+        ratings = {k: rng.randint(1, 5) for k in ("Narracja", "Styl", "Logika", "Immersja")}
+        return {"messageId": last_message_id, "messageID": last_message_id, "ratings": ratings}
+    edited = make_text(rng, event.get("edited_chars", 120)) + "."
+    return {"editedText": edited, "edited": edited, "msgId": last_message_id,
+            "messageID": last_message_id, "tags": []}
+
+
+async def run_trace(host, port, events, speed, timeout, pid=None, seed=0):
+    by_conv = {}
+    for event in sorted(events, key=lambda e: e.get("t", 0)):
+        by_conv.setdefault(event.get("conv", "default"), []).append(event)
+
+    results = []
+    peak = {"threads": 0, "rss_mb": 0.0}
+    stop = asyncio.Event()
+    start = time.perf_counter()
+
+    async def sample():
+        while pid and not stop.is_set():
+            threads, rss = proc_status(pid)
+            peak["threads"] = max(peak["threads"], threads)
+            peak["rss_mb"] = max(peak["rss_mb"], rss)
+            await asyncio.sleep(0.1)
+
+    async def conversation(name, conv_events):
+        rng = random.Random(f"{seed}:{name}")
+        last_message_id = None
+        for event in conv_events:
+            delay = event.get("t", 0) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            endpoint = event["endpoint"]
+            t0 = time.perf_counter()
+            try:
+                status, data = await request_json(host, port, "POST", f"/{endpoint}",
+                                                  make_payload(event, rng, last_message_id), timeout, name)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                status, data = 0, None
+            results.append((endpoint, status, time.perf_counter() - t0))
+            if endpoint == "generate" and isinstance(data, dict):
+                last_message_id = data.get("messageID")
+
+    sampler = asyncio.create_task(sample())
+    await asyncio.gather(*(conversation(name, evs) for name, evs in by_conv.items()))
+    wall = time.perf_counter() - start
+    stop.set()
+    await sampler
+    return results, wall, peak
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))], 4)
+
+
+def summarize(results, wall):
+    report = {"wall_s": round(wall, 2), "endpoints": {}}
+    for endpoint in ("all",) + ENDPOINTS:
+        rows = [r for r in results if endpoint == "all" or r[0] == endpoint]
+        if not rows:
+            continue
+        latencies = sorted(lat for _, status, lat in rows if status == 200)
+        errors = sum(1 for _, status, _ in rows if status != 200)
+        report["endpoints"][endpoint] = {
+            "count": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4),
+            "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+            "mean_s": round(sum(latencies) / len(latencies), 4) if latencies else None,
+            "p50_s": percentile(latencies, 50),
+            "p95_s": percentile(latencies, 95),
+            "p99_s": percentile(latencies, 99),
+        }
+    return report
+
+
+def compare(report, baseline, max_regression):
+    """Różnice względem baseline w %; zwraca (wiersze tabeli, czy jest regresja ponad próg)."""
+    rows, regressed = [], False
+    for endpoint, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(endpoint)
+        if not previous:
+            continue
+        for key, higher_is_better in COMPARED:
+            old, new = previous.get(key), current.get(key)
+            if old is None or new is None:
+                continue
+            if key == "error_rate":
+                # odsetek błędów porównujemy w punktach procentowych, nie względnie
+                delta = (new - old) * 100
+                worse = delta > 0
+            else:
+                if not old:
+                    continue
+                delta = (new - old) / old * 100
+                worse = delta < 0 if higher_is_better else delta > 0
+            flag = ""
+            if worse and max_regression is not None and abs(delta) > max_regression:
+                flag, regressed = "❌", True
+            rows.append((endpoint, key, old, new, delta, flag))
+    return rows, regressed
+
+
+def print_report(report, comparison=None):
+    print(f"\n📊 Tempo {report.get('speed', 1.0)}× — czas całkowity: {report['wall_s']} s")
+    print(f"{'endpoint':<10}{'n':>6}{'błędy':>8}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for endpoint, s in report["endpoints"].items():
+        fmt = lambda v: f"{v:.3f}" if v is not None else "-"  # noqa: E731
+        print(f"{endpoint:<10}{s['count']:>6}{s['error_rate']:>8.1%}{s['throughput_rps']:>9.2f}"
+              f"{fmt(s['p50_s']):>9}{fmt(s['p95_s']):>9}{fmt(s['p99_s']):>9}")
+    if comparison:
+        print("\n📈 Porównanie z baseline:")
+        for endpoint, key, old, new, delta, flag in comparison:
+            unit = " pp" if key == "error_rate" else "%"
+            print(f"  {endpoint:<9}{key:<15}{old:>10} → {new:<10}{delta:+7.1f}{unit} {flag}")
+
+
+def start_server(mode, args, ratings_dir):
+    port = free_port()
+    env = dict(
+        os.environ,
+        INFERENCE_BACKEND="fake",
+        GENERATION_SLOTS=str(args.slots),
+        FAKE_PREFILL_MS=str(args.prefill_ms),
+        FAKE_PREFILL_MS_PER_TOKEN=str(args.prefill_ms_per_token),
+        FAKE_TOKEN_MS=str(args.token_ms),
+        FAKE_TOKEN_JITTER=str(args.token_jitter),
+        FAKE_NEW_TOKENS=str(args.new_tokens),
+        FAKE_SEED=str(args.seed),
+        RATINGS_DIR=ratings_dir,
+        LOG_LEVEL="WARNING",
+    )
+    proc = subprocess.Popen(SERVERS[mode] + [str(port)], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc, port
+
+
+def run_speed(args, events, speed):
+    """Jeden przebieg śladu w danym tempie; własny serwer startuje od zera (czysta sesja)."""
+    proc = None
+    with tempfile.TemporaryDirectory(prefix="loadgen-ratings-") as ratings_dir:
+        try:
+            if args.url:
+                parts = urlsplit(args.url)
+                host, port = parts.hostname, parts.port or 80
+            else:
+                proc, port = start_server(args.server, args, ratings_dir)
+                host = "127.0.0.1"
+                if not asyncio.run(wait_ready(port, time.monotonic() + 60)):
+                    print("❌ Serwer nie wystartował")
+                    sys.exit(2)
+            print(f"▶️ Odtwarzanie w tempie {speed}×")
+            results, wall, peak = asyncio.run(
+                run_trace(host, port, events, speed, args.timeout, proc.pid if proc else None, args.seed))
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(10)
+
+    report = summarize(results, wall)
+    report["speed"] = speed
+    report["config"] = {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "max_regression", "speeds")}
+    if proc is not None:
+        report["server"] = {"peak_threads": peak["threads"], "peak_rss_mb": round(peak["rss_mb"], 1)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="asgi", choices=sorted(SERVERS))
+    parser.add_argument("--url", help="adres działającego serwera (zamiast uruchamiania własnego)")
+    parser.add_argument("--trace", help="plik JSONL ze śladem rozmów")
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--rate-ratio", type=float, default=0.3)
+    parser.add_argument("--edit-ratio", type=float, default=0.1)
+    parser.add_argument("--think-s", type=float, default=1.0, help="maks. przerwa użytkownika między żądaniami")
+    parser.add_argument("--speed", type=float, default=1.0, help="tempo odtwarzania śladu (2 = dwa razy szybciej)")
+    parser.add_argument("--speeds", type=float, nargs="+", help="kilka przebiegów w kolejnych tempach, np. 1 2 4")
+    parser.add_argument("--describe", action="store_true", help="wypisz kształt śladu (tury, @wzmianki, rate/edit, streszczenia)")
+    parser.add_argument("--slots", type=int, default=1)
+    parser.add_argument("--prefill-ms", type=float, default=50)
+    parser.add_argument("--prefill-ms-per-token", type=float, default=0.05)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--token-jitter", type=float, default=5)
+    parser.add_argument("--new-tokens", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--out", help="zapis raportu (JSON) — np. jako nowy baseline")
+    parser.add_argument("--baseline", help="raport z poprzedniego przebiegu do porównania")
+    parser.add_argument("--max-regression", type=float, help="próg regresji w %% (kod wyjścia 1 po przekroczeniu)")
+    args = parser.parse_args()
+
+    events = load_trace(args.trace) if args.trace else synthetic_trace(
+        args.conversations, args.turns, args.rate_ratio, args.edit_ratio, args.think_s, args.seed)
+    print(f"🚀 {len(events)} żądań w {len({e.get('conv', 'default') for e in events})} rozmowach")
+
+    shape = describe_trace(events) if args.describe else None
+
+    runs = [run_speed(args, events, speed) for speed in (args.speeds or [args.speed])]
+    report = runs[0] if len(runs) == 1 else {"runs": runs}
+    if shape:
+        report["trace_shape"] = shape
+
+    regressed = False
+    for run in runs:
+        comparison = None
+        if args.baseline:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+            # baseline z przebiegu wielu temp → porównujemy to samo tempo
+            for candidate in baseline.get("runs", [baseline]):
+                if candidate.get("speed", 1.0) == run["speed"]:
+                    comparison, worse = compare(run, candidate, args.max_regression)
+                    regressed = regressed or worse
+        print_report(run, comparison)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Zapisano raport: {args.out}")
+    if regressed:
+        print(f"❌ Regresja powyżej {args.max_regression}% względem baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
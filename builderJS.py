@@ -1,28 +1,80 @@
 import os
 import re
+import json
 import time
+import hashlib
+import threading
+from contextlib import contextmanager
 from rjsmin import jsmin
 
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # bez watchdog → polling katalogów
+    Observer = None
+    FileSystemEventHandler = object
+
 SRC_CLASS_DIR = "src/class/"
 SRC_CONFIG_DIR = "src/config/"
 DOC_DIR = "src/tmp/"
 OUTPUT_DIR = "static/data/"
+MANIFEST = os.path.join(OUTPUT_DIR, "manifest.json")  # nazwa logiczna → plik z hashem (core/assets.py)
+HASH_LENGTH = 10
 
 MINIFY = False
 GENERATE_DOCS = False
+DEBOUNCE = 0.3        # s ciszy po ostatnim zapisie, zanim ruszy przebudowa (edytory zapisują seriami)
+POLL_INTERVAL = 1.0   # s — tylko gdy nie ma watchdog
 last_modified = {}
+sources = {}          # ścieżka → treść; czytamy ponownie tylko zmienione pliki
 
 # --- I/O ---
 def read_file(path):
     with open(path, "r", encoding="utf-8") as f:
         return f.read()
 
+def read_source(path):
+    if path not in sources:
+        sources[path] = read_file(path)
+    return sources[path]
+
+@contextmanager
+def timed(step, timings):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((step, time.perf_counter() - t0))
+
 def write_file(path, content):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         f.write(content)
 
 # --- Bundle ---
+def write_hashed(name, content):
+    """
+    Zapisuje <nazwa>.<hash>.js, usuwa poprzednie wersje (razem z ich .map i skompresowanymi kopiami .gz/.br,
+    jak builderJS_New.write_hashed) i aktualizuje manifest.json.
+    """
+    stem, ext = name.rsplit(".", 1)
+    hashed = f"{stem}.{hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]}.{ext}"
+    write_file(os.path.join(OUTPUT_DIR, hashed), content)
+    pattern = re.compile(rf"^{re.escape(stem)}\.[0-9a-f]{{{HASH_LENGTH}}}\.{re.escape(ext)}(\..+)?$")
+    for fname in os.listdir(OUTPUT_DIR):
+        if not fname.startswith(hashed) and pattern.match(fname):
+            os.remove(os.path.join(OUTPUT_DIR, fname))
+
+    manifest = {}
+    if os.path.exists(MANIFEST):
+        try:
+            manifest = json.loads(read_file(MANIFEST))
+        except ValueError:
+            pass
+    manifest[name] = hashed
+    write_file(MANIFEST, json.dumps(dict(sorted(manifest.items())), indent=2) + "\n")
+    return hashed
+
 def get_output_filename():
     for fname in os.listdir(SRC_CONFIG_DIR):
         if fname.startswith("init_") and fname.endswith(".js"):
@@ -48,15 +100,15 @@ def build_bundle():
 
     parts = []
     for fname in final_order:
-        parts.append(f"// 📦 {fname}\n{read_file(os.path.join(SRC_CLASS_DIR, fname))}\n")
+        parts.append(f"// 📦 {fname}\n{read_source(os.path.join(SRC_CLASS_DIR, fname))}\n")
 
     # Dodawanie pliku init_
     init_name = get_output_filename().strip()
-    parts.append(f"// 🚀 init_{init_name}\n{read_file(os.path.join(SRC_CONFIG_DIR, f'init_{init_name}'))}\n")
+    parts.append(f"// 🚀 init_{init_name}\n{read_source(os.path.join(SRC_CONFIG_DIR, f'init_{init_name}'))}\n")
 
     # Dodawanie DiagnosticsTests.js na samym końcu, po pliku init_
     if diagnostics_test_file:
-        parts.append(f"// 📦 {diagnostics_test_file}\n{read_file(os.path.join(SRC_CLASS_DIR, diagnostics_test_file))}\n")
+        parts.append(f"// 📦 {diagnostics_test_file}\n{read_source(os.path.join(SRC_CLASS_DIR, diagnostics_test_file))}\n")
 
     bundle = "\n".join(parts)
     if MINIFY:
@@ -64,7 +116,8 @@ def build_bundle():
 
     out_path = os.path.join(OUTPUT_DIR, init_name)
     write_file(out_path, bundle)
-    print(f"📦 Zapisano scalony plik: {out_path}")
+    hashed = write_hashed(init_name, bundle)
+    print(f"📦 Zapisano scalony plik: {out_path} (+ {hashed})")
 
 # --- Parsery JSDoc ---
 def clean_jsdoc_block(block):
@@ -281,34 +334,33 @@ def generate_doc_for_class(code, project_class_names):
 
     return class_name, "\n".join(lines)
 
-def build_docs():
-    if not GENERATE_DOCS:
-        return
-    os.makedirs(DOC_DIR, exist_ok=True)
-
-    class_sources = {}
-    project_class_names = set()
-    for fname in os.listdir(SRC_CLASS_DIR):
+def scan_classes():
+    """Zwraca {nazwa_klasy: plik} dla src/class (treść z cache źródeł)."""
+    class_files = {}
+    for fname in sorted(os.listdir(SRC_CLASS_DIR)):
         if fname.endswith(".js"):
-            code = read_file(os.path.join(SRC_CLASS_DIR, fname))
-            cname = extract_class_name_from_code(code)
+            cname = extract_class_name_from_code(read_source(os.path.join(SRC_CLASS_DIR, fname)))
             if cname:
-                class_sources[cname] = code
-                project_class_names.add(cname)
-
-    # Generuj .md dla każdej klasy
-    generated_class_names = set()
-    for cname, code in class_sources.items():
-        _, md = generate_doc_for_class(code, project_class_names)
+                class_files[cname] = fname
+    return class_files
+
+def build_class_docs(class_files, only_files=None):
+    """Generuje .md dla klas z src/class; only_files ogranicza do zmienionych plików."""
+    project_class_names = set(class_files)
+    for cname, fname in class_files.items():
+        if only_files is not None and fname not in only_files:
+            continue
+        _, md = generate_doc_for_class(read_source(os.path.join(SRC_CLASS_DIR, fname)), project_class_names)
         if md:
             write_file(os.path.join(DOC_DIR, f"{cname}.md"), md)
-            generated_class_names.add(cname)
 
+def build_init_docs(class_files):
     # Dodaj dokumentację modułów startowych init_*.js
+    generated_class_names = set(class_files)
     for fname in os.listdir(SRC_CONFIG_DIR):
         if fname.startswith("init_") and fname.endswith(".js"):
             name = fname.replace("init_", "").replace(".js", "")
-            code = read_file(os.path.join(SRC_CONFIG_DIR, fname))
+            code = read_source(os.path.join(SRC_CONFIG_DIR, fname))
             # Wyszukaj wszystkie klasy w pliku startowym
             class_blocks = re.findall(r'(\/\*\*[\s\S]*?\*\/\s*class\s+[A-Z][A-Za-z0-9_]+[\s\S]*?\n})', code)
             class_docs = []
@@ -345,6 +397,7 @@ def build_docs():
                 lines = [f"# 🚀 Moduł startowy: `{name}`\n", "```js", global_code, "```"]
                 write_file(os.path.join(DOC_DIR, f"init_{name}.md"), "\n".join(lines))
 
+def merge_docs():
     # Scal dokumenty w jeden plik
     all_docs = []
     for fname in sorted(os.listdir(DOC_DIR)):
@@ -355,6 +408,15 @@ def build_docs():
     write_file(os.path.join(DOC_DIR, "dokumentacja.md"), "\n\n---\n\n".join(all_docs))
     print("📚 Scalono dokumentację do src/tmp/dokumentacja.md")
 
+def build_docs():
+    if not GENERATE_DOCS:
+        return
+    os.makedirs(DOC_DIR, exist_ok=True)
+    class_files = scan_classes()
+    build_class_docs(class_files)
+    build_init_docs(class_files)
+    merge_docs()
+
 # --- Orkiestracja ---
 def build_all():
     print("🔄 Aktualizacja...")
@@ -362,25 +424,128 @@ def build_all():
     if GENERATE_DOCS:
         build_docs()
 
+known_classes = {}
+
+def rebuild_changed(paths):
+    """
+    Przebudowa tylko tego, co zależy od zmienionych plików:
+    - bundle: każdy plik .js z src/class i init_*.js wchodzi do bundla,
+    - strony klas: tylko zmienione pliki; gdy zmienił się zbiór klas (nowy/usunięty/zmiana nazwy),
+      wszystkie — bo sekcja „Zależności” filtruje po nazwach klas projektu,
+    - strony init_*: tylko gdy zmienił się init albo zbiór klas,
+    - dokumentacja.md: scalenie, gdy zmieniła się którakolwiek strona.
+    """
+    global known_classes
+    timings = []
+    for path in paths:
+        sources.pop(path, None)
+    class_changed = {os.path.basename(p) for p in paths if os.path.dirname(p) == SRC_CLASS_DIR.rstrip("/")}
+    init_changed = any(os.path.dirname(p) == SRC_CONFIG_DIR.rstrip("/") for p in paths)
+
+    print(f"🔄 Zmiany: {', '.join(sorted(os.path.basename(p) for p in paths))}")
+    try:
+        with timed("bundle", timings):
+            build_bundle()
+        if GENERATE_DOCS:
+            os.makedirs(DOC_DIR, exist_ok=True)
+            with timed("scan", timings):
+                class_files = scan_classes()
+            names_changed = class_files != known_classes
+            known_classes = class_files
+            with timed("docs:klasy", timings):
+                build_class_docs(class_files, None if names_changed else class_changed)
+            if names_changed or init_changed:
+                with timed("docs:init", timings):
+                    build_init_docs(class_files)
+            with timed("docs:scalenie", timings):
+                merge_docs()
+    except Exception as e:
+        print(f"❌ Błąd podczas budowania: {e}")
+    total = sum(t for _, t in timings)
+    print("⏱️ " + ", ".join(f"{name} {t * 1000:.1f} ms" for name, t in timings) + f" | razem {total * 1000:.1f} ms")
+
+class ChangeCollector(FileSystemEventHandler):
+    """
+    Zbiera zmienione pliki .js i odpala przebudowę po DEBOUNCE s ciszy (seria zapisów = jedna przebudowa).
+    Przebudowy idą po kolei (build_lock): timer odpalony w trakcie trwającej przebudowy czeka na jej koniec
+    i bierze wszystko, co zebrało się w międzyczasie — dwa buildy nigdy nie piszą bundla i manifestu naraz.
+    """
+
+    def __init__(self):
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.timer = None
+
+    # Tylko zapisy — odczyty plików przez sam build (opened/closed_no_write) nie mogą wyzwalać przebudowy
+    WRITE_EVENTS = {"created", "modified", "moved", "deleted", "closed"}
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in self.WRITE_EVENTS:
+            return
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path and path.endswith(".js"):
+                self.add(os.path.relpath(path))
+
+    def add(self, path):
+        with self.lock:
+            self.pending.add(path)
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(DEBOUNCE, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        with self.build_lock:
+            with self.lock:
+                paths, self.pending = self.pending, set()
+                self.timer = None
+            if paths:
+                rebuild_changed(paths)
+
+def snapshot():
+    state = {}
+    for folder in [SRC_CLASS_DIR, SRC_CONFIG_DIR]:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(".js"):
+                    state[os.path.join(folder.rstrip("/"), entry.name)] = entry.stat().st_mtime_ns
+    return state
+
 def monitor_changes():
+    global known_classes
     print("👀 Obserwuję zmiany w:", SRC_CLASS_DIR, SRC_CONFIG_DIR)
-    while True:
-        changed = False
+    t0 = time.perf_counter()
+    build_all()
+    known_classes = scan_classes()
+    print(f"⏱️ Pełny build {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    collector = ChangeCollector()
+    if Observer is not None:
+        # inotify/FSEvents przez watchdog — brak aktywności CPU w bezczynności
+        observer = Observer()
         for folder in [SRC_CLASS_DIR, SRC_CONFIG_DIR]:
-            for fname in os.listdir(folder):
-                if not fname.endswith(".js"):
-                    continue
-                path = os.path.join(folder, fname)
-                mtime = os.path.getmtime(path)
-                if path not in last_modified or last_modified[path] != mtime:
-                    last_modified[path] = mtime
-                    changed = True
-        if changed:
-            try:
-                build_all()
-            except Exception as e:
-                print(f"❌ Błąd podczas budowania: {e}")
-        time.sleep(0.5)
+            observer.schedule(collector, folder, recursive=False)
+        observer.start()
+        try:
+            while observer.is_alive():
+                observer.join(1)
+        finally:
+            observer.stop()
+            observer.join()
+        return
+
+    print(f"ℹ️ Brak pakietu watchdog — polling co {POLL_INTERVAL}s (pip install watchdog)")
+    last_modified.update(snapshot())
+    while True:
+        time.sleep(POLL_INTERVAL)
+        current = snapshot()
+        changed = {p for p in current.keys() | last_modified.keys() if current.get(p) != last_modified.get(p)}
+        last_modified.clear()
+        last_modified.update(current)
+        for path in changed:
+            collector.add(path)
 
 if __name__ == "__main__":
     os.makedirs(DOC_DIR, exist_ok=True)
@@ -1,9 +1,21 @@
 #!/usr/bin/env python3
+import os
 import re
+import sys
+import json
+import gzip
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from jsmin import jsmin
 from datetime import datetime
 
+try:
+    import brotli
+except ImportError:  # rozmiar brotli w raporcie będzie null
+    brotli = None
+
 # =========================
 # KONFIGURACJA
 # =========================
@@ -11,9 +23,43 @@ SRC_CONFIG = Path("./src/config")
 SRC_CLASS  = Path("./src/class")
 STATIC_DATA = Path("./static/data")
 DOCS_PAGES  = Path("./documentation/Pages")
+# Bundle z hashem treści w nazwie (chat.<hash>.js) + mapa nazwa logiczna → plik, czytana przez core/assets.py
+MANIFEST = STATIC_DATA / "manifest.json"
+HASH_LENGTH = 10
+
+# Source mapy (.js.map obok bundla). Bez minifikacji mapowanie jest dokładne co do linii;
+# z minifikacją — z dokładnością do modułu (każda klasa minifikowana osobno, od nowej linii).
+SOURCE_MAPS = True
+
+# Budżety rozmiaru: nazwa bundla → maks. bajtów po gzip (tego, co faktycznie trafia do przeglądarki).
+# Przekroczenie to [WARN]; z BUILD_FAIL_ON_BUDGET=1 build kończy się kodem 1.
+SIZE_BUDGETS = {
+    "chat.js": 60_000,
+    "home.js": 45_000,
+    "characters.js": 45_000,
+}
+FAIL_ON_BUDGET = os.environ.get("BUILD_FAIL_ON_BUDGET", "0") == "1"
+
+# Prekompresja: obok plików tekstowych w static/ powstają .gz i .br (brotli opcjonalnie),
+# serwowane przez core/assets.py wg Accept-Encoding. Obrazy są już skompresowane — pomijamy.
+PRECOMPRESS = True
+PRECOMPRESS_ROOT = Path("./static")
+PRECOMPRESS_EXTENSIONS = {".js", ".css", ".map", ".json", ".svg", ".html", ".txt"}
+PRECOMPRESS_MIN_BYTES = 1024
 
 MINIFY = False
 GENERATE_DOCS_MD = True
+# Scalona dokumentacja projektu (generateMarkdownDoc.py) składana z fragmentów w documentation/Pages
+GENERATE_PROJECT_DOC = True
+
+# Cache budowania: per plik (hash treści → referencje, extends) i per bundle (hash domknięcia zależności)
+BUILD_CACHE = Path("./.build_cache/builderJS_New.json")
+# Wersja formatu/skanera — zmiana unieważnia zapisane skany plików
+BUILD_CACHE_VERSION = 2
+# Raport z ostatniego builda (czasy faz, rozmiary bundli) — JSON do porównań między buildami
+BUILD_REPORT = Path("./.build_cache/build_report.json")
+# Liczba procesów dla bundli i stron dokumentacji (1 = bez puli, wszystko w bieżącym procesie)
+BUILD_WORKERS = int(os.environ.get("BUILD_WORKERS", os.cpu_count() or 1))
 
 # Wymuszeni liderzy kolejności (jeśli istnieją):
 FORCE_FIRST = ["Diagnostics"]
@@ -30,75 +76,259 @@ ALIASES = {
 def read_file(p: Path) -> str:
     return p.read_text(encoding="utf-8") if p.exists() else ""
 
-def get_providers_and_extends():
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class BuildCache:
+    """
+    Trwały cache budowania.
+    - files:   {ścieżka: {hash, refs, extends}} — wynik skanu pliku, ważny dopóki hash treści się nie zmieni,
+    - bundles: {init: sygnatura} — hash domknięcia zależności; ta sama sygnatura = bundle aktualny,
+    - docs:    {symbol: hash} — hash pliku, z którego ostatnio wygenerowano stronę dokumentacji.
+    Treść plików czytamy raz na build (self.sources), niezależnie od liczby bundli.
+    """
+
+    def __init__(self, path: Path = BUILD_CACHE):
+        self.path = path
+        self.files = {}
+        self.bundles = {}
+        self.docs = {}
+        self.sources = {}
+        self.scanned = 0
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == BUILD_CACHE_VERSION:
+                    self.files = data.get("files", {})
+                    self.bundles = data.get("bundles", {})
+                    self.docs = data.get("docs", {})
+            except (ValueError, OSError):
+                pass
+
+    def source(self, p: Path) -> str:
+        key = str(p)
+        if key not in self.sources:
+            self.sources[key] = read_file(p)
+        return self.sources[key]
+
+    def scan(self, p: Path, symbol: str) -> dict:
+        """Referencje i extends pliku — z cache, jeśli treść się nie zmieniła."""
+        code = self.source(p)
+        h = content_hash(code)
+        entry = self.files.get(str(p))
+        if entry and entry["hash"] == h and entry.get("symbol") == symbol:
+            return entry
+        m = re.search(rf"\bclass\s+{re.escape(symbol)}\s+extends\s+([A-Z]\w+)", code)
+        entry = {
+            "hash": h,
+            "symbol": symbol,
+            "refs": sorted(find_symbol_tokens(code)),
+            "extends": m.group(1) if m else None,
+        }
+        self.files[str(p)] = entry
+        self.scanned += 1
+        return entry
+
+    def save(self):
+        live = set(self.sources)
+        self.files = {k: v for k, v in self.files.items() if k in live or Path(k).exists()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps({"version": BUILD_CACHE_VERSION, "files": self.files, "bundles": self.bundles, "docs": self.docs}, indent=1),
+            encoding="utf-8"
+        )
+
+def get_providers_and_extends(cache: BuildCache = None):
     """
     Buduje mapę dostawców symboli na podstawie plików .js:
     - providers: {SymbolName: Path} — SymbolName to stem pliku lub alias
     - extends_map: {ClassName: BaseName} tylko dla plików z klasą i extends
     Uwaga: nie wymagamy 'class X' aby włączyć plik do providers — to naprawia przypadek Utils, Logger, itp.
+    Skan pliku (referencje + extends) trafia do cache i jest powtarzany tylko po zmianie treści.
     """
+    cache = cache or BuildCache()
     providers = {}
     extends_map = {}
 
-    for f in SRC_CLASS.glob("*.js"):
+    for f in sorted(SRC_CLASS.glob("*.js")):
         stem = f.stem
         symbol = ALIASES.get(stem, stem)
         providers[symbol] = f
 
-        code = read_file(f)
         # Jeśli jest klasa i extends — zapisz do extends_map, żeby można było posortować
-        m = re.search(rf"\bclass\s+{re.escape(symbol)}\s+extends\s+([A-Z]\w+)", code)
-        if m:
-            extends_map[symbol] = m.group(1)
+        base = cache.scan(f, symbol)["extends"]
+        if base:
+            extends_map[symbol] = base
 
     return providers, extends_map
 
+# Słowa, po których "/" otwiera literał regex, a nie dzielenie
+REGEX_PRECEDING_WORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else", "yield", "await"}
+
+def js_identifiers(code: str) -> set[str]:
+    """
+    Jednoprzebiegowy lekser JS zwracający nazwy identyfikatorów faktycznie użytych w kodzie.
+    Pomija komentarze, stringi, literały regex i tekst szablonów `...` (ale skanuje wnętrze ${...},
+    także zagnieżdżone), a także nazwy właściwości po kropce (obj.Foo, obj?.Foo).
+    """
+    found = set()
+    n = len(code)
+    i = 0
+    prev = ""          # ostatni znaczący token: identyfikator/słowo, liczba ("0") albo znak interpunkcji
+    braces = []        # stos: True = klamra otwarta przez ${ w szablonie, False = zwykła klamra
+
+    def skip_template(i):
+        # i wskazuje znak po otwierającym ` lub po } zamykającym ${...}; zwraca (pozycja, czy_wejście_w_${)
+        while i < n:
+            c = code[i]
+            if c == "\\":
+                i += 2
+            elif c == "`":
+                return i + 1, False
+            elif c == "$" and i + 1 < n and code[i + 1] == "{":
+                return i + 2, True
+            else:
+                i += 1
+        return n, False
+
+    while i < n:
+        c = code[i]
+        if c in " \t\r\n":
+            i += 1
+        elif c == "/" and i + 1 < n and code[i + 1] == "/":
+            nl = code.find("\n", i)
+            i = n if nl < 0 else nl
+        elif c == "/" and i + 1 < n and code[i + 1] == "*":
+            end = code.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif c in "'\"":
+            i += 1
+            while i < n and code[i] != c and code[i] != "\n":
+                i += 2 if code[i] == "\\" else 1
+            i += 1
+            prev = "0"
+        elif c == "`":
+            i, opened = skip_template(i + 1)
+            if opened:
+                braces.append(True)
+                prev = "("
+            else:
+                prev = "0"
+        elif c == "/":
+            if prev and (prev[0].isalnum() or prev[0] in "_$)]}") and prev not in REGEX_PRECEDING_WORDS:
+                i += 1  # dzielenie
+                prev = "/"
+                continue
+            # literał regex: do niezacytowanego "/" poza klasą znaków [...]
+            i += 1
+            in_class = False
+            while i < n and code[i] != "\n":
+                ch = code[i]
+                if ch == "\\":
+                    i += 2
+                    continue
+                if ch == "[":
+                    in_class = True
+                elif ch == "]":
+                    in_class = False
+                elif ch == "/" and not in_class:
+                    break
+                i += 1
+            i += 1
+            while i < n and (code[i].isalnum() or code[i] == "_"):
+                i += 1  # flagi
+            prev = "0"
+        elif c.isalpha() or c in "_$":
+            j = i + 1
+            while j < n and (code[j].isalnum() or code[j] in "_$"):
+                j += 1
+            word = code[i:j]
+            if prev != ".":
+                found.add(word)
+            prev = word
+            i = j
+        elif c.isdigit():
+            j = i + 1
+            while j < n and (code[j].isalnum() or code[j] in "._"):
+                j += 1
+            prev = "0"
+            i = j
+        elif c == "{":
+            braces.append(False)
+            prev = "{"
+            i += 1
+        elif c == "}":
+            if braces and braces.pop():
+                i, opened = skip_template(i + 1)
+                if opened:
+                    braces.append(True)
+                    prev = "("
+                else:
+                    prev = "0"
+            else:
+                prev = "}"
+                i += 1
+        elif c == "." and code.startswith("...", i):
+            prev = "..."
+            i += 3
+        else:
+            # "?." traktujemy jak "." (optional chaining), ale nie "?.5" (operator warunkowy + liczba)
+            if c == "?" and i + 1 < n and code[i + 1] == "." and not (i + 2 < n and code[i + 2].isdigit()):
+                prev = "."
+                i += 2
+                continue
+            prev = c
+            i += 1
+    return found
+
+def find_symbol_tokens(code: str) -> set[str]:
+    """Identyfikatory PascalCase/UpperCamelCase użyte w kodzie (kandydaci na globalne symbole)."""
+    return {name for name in js_identifiers(code) if name[0].isupper()}
+
 def find_used_symbols(code: str, available_symbols: set[str]) -> set[str]:
     """
     Szuka użyć globalnych symboli: bierzemy wszystkie tokeny PascalCase/UpperCamelCase
     i filtrujemy do znanych symboli (nazw plików/aliasów).
     """
-    tokens = set(re.findall(r"\b([A-Z][A-Za-z0-9_]*)\b", code))
-    return tokens & available_symbols
+    return find_symbol_tokens(code) & available_symbols
 
-def resolve_all_dependencies(seed_symbols, providers, extends_map):
+def resolve_all_dependencies(seed_symbols, providers, extends_map, cache: BuildCache = None):
     """
-    Głęboka (do punktu stałego) analiza zależności:
-    - rekurencyjnie skanuje kody już znalezionych symboli,
-    - dodaje nowe symbole, jeśli są użyte,
+    Domknięcie zależności jako przejście grafu:
+    - referencje każdego symbolu pochodzą z cache skanu (bez ponownego czytania plików),
+    - każdy symbol odwiedzamy dokładnie raz,
     - dba o bazę z 'extends' (jeśli występuje).
     """
+    cache = cache or BuildCache()
     available_symbols = set(providers.keys())
-    needed = set(seed_symbols)
+    needed = set()
+    stack = sorted(seed_symbols)
 
-    # Punkt stały: dopóki przybywa nowych symboli — skanuj dalej
-    while True:
-        size_before = len(needed)
+    while stack:
+        sym = stack.pop()
+        if sym in needed:
+            continue
+        needed.add(sym)
 
-        for sym in list(needed):
-            code = read_file(providers[sym])
-            refs = find_used_symbols(code, available_symbols)
+        refs = set(cache.scan(providers[sym], sym)["refs"]) & available_symbols
 
-            # Dodaj bazę z 'extends' (tylko jeśli ten plik faktycznie definiuje klasę z extends)
-            base = extends_map.get(sym)
-            if base and base in available_symbols:
-                refs.add(base)
+        # Dodaj bazę z 'extends' (tylko jeśli ten plik faktycznie definiuje klasę z extends)
+        base = extends_map.get(sym)
+        if base and base in available_symbols:
+            refs.add(base)
 
-            needed |= refs
-
-        if len(needed) == size_before:
-            break
+        stack.extend(sorted(refs - needed))
 
     # Topologiczne sortowanie po extends tam gdzie ma sens
     indeg = {s: 0 for s in needed}
     graph = {s: [] for s in needed}
-    for s in needed:
+    for s in sorted(needed):
         base = extends_map.get(s)
         if base and base in needed:
             indeg[s] += 1
             graph[base].append(s)
 
-    queue = [s for s, d in indeg.items() if d == 0]
+    queue = sorted(s for s, d in indeg.items() if d == 0)
     ordered = []
     while queue:
         node = queue.pop(0)
@@ -122,6 +352,15 @@ def resolve_all_dependencies(seed_symbols, providers, extends_map):
 # =========================
 
 def generate_docs(symbol, code):
+    """Zapisuje stronę dokumentacji tylko wtedy, gdy jej treść się zmieniła. Zwraca True, jeśli zapisano."""
+    md = render_docs(symbol, code)
+    page = DOCS_PAGES / f"{symbol}.md"
+    if page.exists() and page.read_text(encoding="utf-8") == md:
+        return False
+    page.write_text(md, encoding="utf-8")
+    return True
+
+def render_docs(symbol, code):
     md = []
     lines = code.splitlines()
 
@@ -238,7 +477,7 @@ def generate_docs(symbol, code):
     md.extend(stripped)
     md.append("```")
 
-    (DOCS_PAGES / f"{symbol}.md").write_text("\n".join(md), encoding="utf-8")
+    return "\n".join(md)
 
 
 
@@ -392,62 +631,373 @@ def update_copilot_files(symbols):
     for s in sorted(symbols):
         nav.append(f"# {s}: https://chatrpai.github.io/documentation/Pages/{s}.md")
         idx.append(f"# {s}")
-    (DOCS_PAGES / "copilot_navigate.md").write_text("\n".join(nav), encoding="utf-8")
-    (DOCS_PAGES / "_index.md").write_text("\n".join(idx), encoding="utf-8")
+    for name, lines in (("copilot_navigate.md", nav), ("_index.md", idx)):
+        page = DOCS_PAGES / name
+        text = "\n".join(lines)
+        if not page.exists() or page.read_text(encoding="utf-8") != text:
+            page.write_text(text, encoding="utf-8")
 
 # =========================
 # BUDOWANIE
 # =========================
 
-def build_bundle_for_init(init_file: Path):
-    providers, extends_map = get_providers_and_extends()
+def bundle_signature(init_file: Path, ordered, providers, cache: BuildCache) -> str:
+    """Hash domknięcia: init + kolejne pliki bundla (z hashami treści) + ustawienia wpływające na wynik."""
+    parts = [f"init:{content_hash(cache.source(init_file))}", f"minify:{MINIFY}", f"maps:{SOURCE_MAPS}"]
+    for sym in ordered:
+        parts.append(f"{sym}:{cache.scan(providers[sym], sym)['hash']}")
+    if not MINIFY:
+        parts.append(f"tail:{content_hash(cache.source(SRC_CLASS / 'DiagnosticsTests.js'))}")
+    return content_hash("\n".join(parts))
+
+def plan_bundle(init_file: Path, cache: BuildCache, providers, extends_map) -> dict:
+    """Kolejność symboli, sygnatura i źródła bundla — bez zapisu na dysk (to robi emit_bundle)."""
     available_symbols = set(providers.keys())
 
-    init_code = read_file(init_file)
+    init_code = cache.source(init_file)
     seed = find_used_symbols(init_code, available_symbols)
 
     # Jeśli Context występuje w init — dołóż (czasem przekazywany jako symbol)
     if "Context" in available_symbols and re.search(r"\bContext\b", init_code):
         seed.add("Context")
 
-    ordered = resolve_all_dependencies(seed, providers, extends_map)
-
-    print(f"[INFO] init: {init_file.name} → użyte symbole: {len(ordered)}")
-    merged = ""
-
-    for sym in ordered:
-        print(f"[ADD] {sym}")
-        merged += read_file(providers[sym]) + "\n"
+    ordered = resolve_all_dependencies(seed, providers, extends_map, cache)
+    out_name = init_file.stem.replace("init_", "") + ".js"
+    signature = bundle_signature(init_file, ordered, providers, cache)
+    hashed = read_manifest().get(out_name)
 
+    modules = [(sym, providers[sym]) for sym in ordered]
     # init zawsze po klasach/modułach
-    merged += init_code + "\n"
-
+    modules.append((init_file.stem, init_file))
     # DiagnosticsTests.js z ./src/class na sam koniec (gdy nie minifikujemy)
     if not MINIFY:
         diag_tests = SRC_CLASS / "DiagnosticsTests.js"
         if diag_tests.exists():
-            print("[ADD] DiagnosticsTests.js (tail)")
-            merged += read_file(diag_tests) + "\n"
+            modules.append(("DiagnosticsTests", diag_tests))
+    parts = [(name, path.as_posix(), cache.source(path)) for name, path in modules]
+
+    return {
+        "init": init_file.name,
+        "out_name": out_name,
+        "ordered": ordered,
+        "signature": signature,
+        "parts": parts,
+        "fresh": (
+            cache.bundles.get(init_file.name) == signature
+            and (STATIC_DATA / out_name).exists()
+            and hashed is not None
+            and (STATIC_DATA / hashed).exists()
+        ),
+    }
+
+def read_manifest() -> dict:
+    try:
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def write_manifest(entries: dict):
+    MANIFEST.write_text(json.dumps(dict(sorted(entries.items())), indent=2) + "\n", encoding="utf-8")
+
+def write_hashed(out_name: str, content: str, source_map: dict = None) -> str:
+    """
+    Zapisuje <stem>.<hash>.js obok zwykłego pliku i usuwa poprzednie wersje z hashem (razem z .map).
+    Zwykła nazwa zostaje dla stron serwowanych poza Flaskiem (bez manifestu).
+    Hash liczony jest z kodu bez komentarza sourceMappingURL, więc nie zależy od nazwy mapy.
+    """
+    stem, ext = out_name.rsplit(".", 1)
+    hashed = f"{stem}.{hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]}.{ext}"
+    write_with_map(STATIC_DATA / hashed, content, source_map)
+    pattern = re.compile(rf"^{re.escape(stem)}\.[0-9a-f]{{{HASH_LENGTH}}}\.{re.escape(ext)}(\..+)?$")
+    for old in STATIC_DATA.glob(f"{stem}.*.{ext}*"):
+        if not old.name.startswith(hashed) and pattern.match(old.name):
+            old.unlink()
+    return hashed
+
+def write_with_map(path: Path, content: str, source_map: dict = None):
+    if source_map is None:
+        path.write_text(content, encoding="utf-8")
+        return
+    map_name = path.name + ".map"
+    path.write_text(content + f"//# sourceMappingURL={map_name}\n", encoding="utf-8")
+    (path.parent / map_name).write_text(json.dumps(dict(source_map, file=path.name)), encoding="utf-8")
+
+VLQ_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+def vlq(value: int) -> str:
+    value = (-value << 1) | 1 if value < 0 else value << 1
+    out = ""
+    while True:
+        digit = value & 31
+        value >>= 5
+        out += VLQ_CHARS[digit | (32 if value else 0)]
+        if not value:
+            return out
 
-    if MINIFY:
-        merged = jsmin(merged)
+def build_source_map(chunks) -> dict:
+    """
+    Source map v3. chunks: [(indeks źródła, liczba linii w bundlu, exact)] w kolejności bundla.
+    exact=True → linia i bundla ↔ linia i pliku; exact=False → każda linia ↔ początek modułu.
+    """
+    lines = []
+    prev_src = prev_line = 0
+    for src, count, exact in chunks:
+        for i in range(count):
+            line = i if exact else 0
+            lines.append("A" + vlq(src - prev_src) + vlq(line - prev_line) + "A")
+            prev_src, prev_line = src, line
+    return {"version": 3, "mappings": ";".join(lines)}
+
+def precompress(path: Path) -> int:
+    """Zapisuje <plik>.gz i <plik>.br, jeśli ich brak albo są starsze od pliku. Zwraca liczbę zapisanych wariantów."""
+    if path.stat().st_size < PRECOMPRESS_MIN_BYTES:
+        return 0
+    variants = [(path.with_name(path.name + ".gz"), lambda d: gzip.compress(d, 9, mtime=0))]
+    if brotli:
+        variants.append((path.with_name(path.name + ".br"), lambda d: brotli.compress(d, quality=11)))
+    mtime = path.stat().st_mtime_ns
+    written = 0
+    data = None
+    for target, compress in variants:
+        if target.exists() and target.stat().st_mtime_ns >= mtime:
+            continue
+        if data is None:
+            data = path.read_bytes()
+        tmp = target.with_name(target.name + f".{os.getpid()}.tmp")
+        tmp.write_bytes(compress(data))
+        os.replace(tmp, target)
+        written += 1
+    return written
+
+def precompress_static(root: Path = PRECOMPRESS_ROOT) -> int:
+    """Prekompresja całego static/ (tylko nowe/zmienione pliki) + usuwanie wariantów po usuniętych plikach."""
+    written = 0
+    for path in sorted(root.rglob("*")):
+        if not path.is_file():
+            continue
+        if path.suffix in (".gz", ".br"):
+            original = path.with_suffix("")
+            if original.suffix in PRECOMPRESS_EXTENSIONS and not original.exists():
+                path.unlink()
+            continue
+        if path.suffix in PRECOMPRESS_EXTENSIONS:
+            written += precompress(path)
+    return written
+
+def gzip_size(data: bytes) -> int:
+    return len(gzip.compress(data, 9, mtime=0))
+
+def brotli_size(data: bytes):
+    return len(brotli.compress(data, quality=11)) if brotli else None
+
+def emit_bundle(out_name: str, parts: list) -> dict:
+    """
+    Scalenie (+ minifikacja), zapis bundla i mapy, rozmiary per moduł.
+    parts: [(nazwa modułu, ścieżka źródła, kod)]. Funkcja modułu — uruchamiana w puli procesów.
+    """
+    t0 = time.perf_counter()
+    chunks, modules, code_parts = [], [], []
+    for idx, (name, _, code) in enumerate(parts):
+        raw = code.encode("utf-8")
+        minified = jsmin(code).strip()
+        shipped = minified if MINIFY else code
+        code_parts.append(shipped)
+        chunks.append((idx, shipped.count("\n") + 1, not MINIFY))
+        modules.append({
+            "module": name,
+            "raw": len(raw),
+            "min": len(minified.encode("utf-8")),
+            "gzip": gzip_size(minified.encode("utf-8")),
+            "brotli": brotli_size(minified.encode("utf-8")),
+        })
+    merged = "\n".join(code_parts) + "\n"
+
+    source_map = None
+    if SOURCE_MAPS:
+        source_map = build_source_map(chunks)
+        source_map["sources"] = ["../../" + path for _, path, _ in parts]
+        source_map["sourcesContent"] = [code for _, _, code in parts]
 
     STATIC_DATA.mkdir(parents=True, exist_ok=True)
-    out_name = init_file.stem.replace("init_", "") + ".js"
-    (STATIC_DATA / out_name).write_text(merged, encoding="utf-8")
-    print(f"[OK] Wygenerowano: {out_name}")
+    write_with_map(STATIC_DATA / out_name, merged, source_map)
+    hashed = write_hashed(out_name, merged, source_map)
+    if PRECOMPRESS:
+        # Najdroższa część (brotli q11) — tu, w procesie z puli, a nie w pętli po static/
+        for name in (out_name, hashed):
+            precompress(STATIC_DATA / name)
+    data = merged.encode("utf-8")
+    return {
+        "bytes": len(data),
+        "gzip": gzip_size(data),
+        "brotli": brotli_size(data),
+        "hashed": hashed,
+        "modules": modules,
+        "seconds": time.perf_counter() - t0,
+    }
+
+def check_budgets(bundles: dict) -> list:
+    """Lista przekroczeń SIZE_BUDGETS (gzip całego bundla)."""
+    over = []
+    for name, limit in SIZE_BUDGETS.items():
+        info = bundles.get(name)
+        if info and info.get("gzip") and info["gzip"] > limit:
+            over.append(f"{name}: {info['gzip']} B gzip > budżet {limit} B")
+    return over
+
+def print_size_report(name: str, result: dict):
+    print(f"[SIZE] {name}: {result['bytes']} B, gzip {result['gzip']} B"
+          + (f", brotli {result['brotli']} B" if result["brotli"] is not None else ""))
+    for m in sorted(result["modules"], key=lambda m: -m["gzip"]):
+        br = m["brotli"] if m["brotli"] is not None else "-"
+        print(f"       {m['module']:<24} raw {m['raw']:>7}  min {m['min']:>7}  gzip {m['gzip']:>6}  br {br:>6}")
+
+def emit_doc(symbol: str, code: str) -> dict:
+    t0 = time.perf_counter()
+    written = generate_docs(symbol, code)
+    return {"written": written, "seconds": time.perf_counter() - t0}
+
+def build_bundle_for_init(init_file: Path, cache: BuildCache = None, providers=None, extends_map=None):
+    """Pojedynczy bundle w bieżącym procesie (build_all robi to samo dla wszystkich init_*.js naraz)."""
+    cache = cache or BuildCache()
+    if providers is None:
+        providers, extends_map = get_providers_and_extends(cache)
+
+    plan = plan_bundle(init_file, cache, providers, extends_map)
+    ordered = plan["ordered"]
+    if plan["fresh"]:
+        print(f"[SKIP] {plan['out_name']} — bez zmian w domknięciu zależności ({len(ordered)} symboli)")
+        return ordered
+
+    print(f"[INFO] init: {init_file.name} → użyte symbole: {len(ordered)}")
+    result = emit_bundle(plan["out_name"], plan["parts"])
+    manifest = read_manifest()
+    manifest[plan["out_name"]] = result["hashed"]
+    write_manifest(manifest)
+    cache.bundles[init_file.name] = plan["signature"]
+    print(f"[OK] Wygenerowano: {plan['out_name']} → {result['hashed']}")
+    print_size_report(plan["out_name"], result)
+    for problem in check_budgets({plan["out_name"]: result}):
+        print(f"[WARN] {problem}")
 
     if GENERATE_DOCS_MD:
         DOCS_PAGES.mkdir(parents=True, exist_ok=True)
-        for sym in ordered:
-            generate_docs(sym, read_file(providers[sym]))
+        for sym in stale_docs(ordered, cache, providers):
+            generate_docs(sym, cache.source(providers[sym]))
+            cache.docs[sym] = cache.scan(providers[sym], sym)["hash"]
         update_copilot_files(ordered)
 
+    return ordered
+
+def stale_docs(symbols, cache: BuildCache, providers) -> list:
+    """Symbole, których strona nie istnieje albo powstała z innej wersji pliku."""
+    stale = []
+    for sym in symbols:
+        h = cache.scan(providers[sym], sym)["hash"]
+        if cache.docs.get(sym) != h or not (DOCS_PAGES / f"{sym}.md").exists():
+            stale.append(sym)
+    return stale
+
 def build_all():
-    for init_file in SRC_CONFIG.glob("init_*.js"):
-        build_bundle_for_init(init_file)
+    """
+    Jeden graf dostawców/extends dla wszystkich init_*.js, potem równolegle (pula procesów):
+    - zapis bundli, których domknięcie się zmieniło,
+    - strony dokumentacji — każda dokładnie raz, nawet gdy symbol jest w kilku bundlach.
+    Na koniec raport JSON z czasami faz i rozmiarami bundli (BUILD_REPORT).
+    """
+    t_start = time.perf_counter()
+    report = {"started": datetime.now().isoformat(timespec="seconds"), "workers": BUILD_WORKERS,
+              "phases_s": {}, "bundles": {}, "docs": {}}
+
+    try:
+        previous = json.loads(BUILD_REPORT.read_text(encoding="utf-8")).get("bundles", {})
+    except (OSError, ValueError):
+        previous = {}
+
+    t0 = time.perf_counter()
+    cache = BuildCache()
+    providers, extends_map = get_providers_and_extends(cache)
+    plans = [plan_bundle(f, cache, providers, extends_map) for f in sorted(SRC_CONFIG.glob("init_*.js"))]
+    report["phases_s"]["graph"] = round(time.perf_counter() - t0, 4)
+
+    all_symbols = sorted({sym for plan in plans for sym in plan["ordered"]})
+    doc_jobs = stale_docs(all_symbols, cache, providers) if GENERATE_DOCS_MD else []
+    bundle_jobs = [plan for plan in plans if not plan["fresh"]]
+    for plan in plans:
+        if plan["fresh"]:
+            print(f"[SKIP] {plan['out_name']} — bez zmian w domknięciu zależności ({len(plan['ordered'])} symboli)")
+            # Rozmiary (gzip/brotli/moduły) przenosimy z poprzedniego raportu — plik się nie zmienił
+            report["bundles"][plan["out_name"]] = dict(
+                previous.get(plan["out_name"], {}),
+                symbols=len(plan["ordered"]),
+                file=read_manifest()[plan["out_name"]],
+                bytes=(STATIC_DATA / plan["out_name"]).stat().st_size,
+                skipped=True,
+            )
+
+    t0 = time.perf_counter()
+    if doc_jobs:
+        DOCS_PAGES.mkdir(parents=True, exist_ok=True)
+    jobs = len(bundle_jobs) + len(doc_jobs)
+    if BUILD_WORKERS > 1 and jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(BUILD_WORKERS, jobs)) as pool:
+            bundle_futures = [pool.submit(emit_bundle, p["out_name"], p["parts"]) for p in bundle_jobs]
+            doc_futures = {sym: pool.submit(emit_doc, sym, cache.source(providers[sym])) for sym in doc_jobs}
+            bundle_results = [f.result() for f in bundle_futures]
+            doc_results = {sym: f.result() for sym, f in doc_futures.items()}
+    else:
+        bundle_results = [emit_bundle(p["out_name"], p["parts"]) for p in bundle_jobs]
+        doc_results = {sym: emit_doc(sym, cache.source(providers[sym])) for sym in doc_jobs}
+    report["phases_s"]["emit"] = round(time.perf_counter() - t0, 4)
+
+    manifest = read_manifest()
+    for plan, result in zip(bundle_jobs, bundle_results):
+        cache.bundles[plan["init"]] = plan["signature"]
+        manifest[plan["out_name"]] = result["hashed"]
+        print(f"[OK] Wygenerowano: {plan['out_name']} → {result['hashed']} ({len(plan['ordered'])} symboli)")
+        print_size_report(plan["out_name"], result)
+        report["bundles"][plan["out_name"]] = {
+            "symbols": len(plan["ordered"]),
+            "file": result["hashed"],
+            "bytes": result["bytes"],
+            "gzip": result["gzip"],
+            "brotli": result["brotli"],
+            "seconds": round(result["seconds"], 4),
+            "skipped": False,
+            "modules": result["modules"],
+        }
+    for sym, result in doc_results.items():
+        cache.docs[sym] = cache.scan(providers[sym], sym)["hash"]
+        report["docs"][sym] = {"written": result["written"], "seconds": round(result["seconds"], 4)}
+    if bundle_jobs:
+        write_manifest(manifest)
+    if GENERATE_DOCS_MD and (bundle_jobs or doc_jobs):
+        update_copilot_files(all_symbols)
+    if GENERATE_DOCS_MD and GENERATE_PROJECT_DOC:
+        from generateMarkdownDoc import generate_project_doc
+        t0 = time.perf_counter()
+        generate_project_doc()
+        report["phases_s"]["project_doc"] = round(time.perf_counter() - t0, 4)
+    if PRECOMPRESS:
+        t0 = time.perf_counter()
+        report["precompressed"] = precompress_static()
+        report["phases_s"]["precompress"] = round(time.perf_counter() - t0, 4)
+
+    cache.save()
+    report["budget_exceeded"] = check_budgets(report["bundles"])
+    for problem in report["budget_exceeded"]:
+        print(f"[WARN] {problem}")
+    report["scanned_files"] = cache.scanned
+    report["total_s"] = round(time.perf_counter() - t_start, 4)
+    BUILD_REPORT.parent.mkdir(parents=True, exist_ok=True)
+    BUILD_REPORT.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    written = sum(1 for d in report["docs"].values() if d["written"])
+    print(f"[INFO] Bundle: {len(bundle_jobs)}/{len(plans)}, strony dokumentacji: {written}/{len(doc_jobs)} zapisane, "
+          f"przeskanowane pliki: {cache.scanned} (reszta z cache), {report['total_s']} s → {BUILD_REPORT}")
+    return report
 
 if __name__ == "__main__":
     print(f"[INFO] Start builderJS.py {datetime.now()}")
-    build_all()
+    report = build_all()
     print(f"[INFO] Zakończono {datetime.now()}")
+    if FAIL_ON_BUDGET and report["budget_exceeded"]:
+        sys.exit(1)
@@ -0,0 +1,122 @@
+import json
+import mimetypes
+import os
+import re
+import threading
+
+from flask import request, send_file
+from werkzeug.security import safe_join
+
+# chat.1a2b3c4d5e.js — nazwa z hashem treści; taki plik nigdy się nie zmienia, więc może być cache'owany „na zawsze”
+HASHED_ASSET = re.compile(r"\.[0-9a-f]{8,}\.(js|css)(\.map)?$")
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Warianty generowane przez builderJS_New.py (precompress_static), w kolejności preferencji
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+class AssetManifest:
+    """
+    manifest.json zapisywany przez builderJS*.py: nazwa logiczna (chat.js) → plik z hashem (chat.<hash>.js).
+    Plik jest wczytywany ponownie po zmianie mtime, więc przebudowa bundla nie wymaga restartu serwera.
+    Brak manifestu lub wpisu → zwykła nazwa (np. przed pierwszym buildem).
+    """
+
+    def __init__(self, path="static/data/manifest.json", url_prefix="/static/data/"):
+        self.path = path
+        self.url_prefix = url_prefix
+        self._entries = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            entries = {}
+            if mtime is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        entries = json.load(f)
+                except (OSError, ValueError):
+                    return
+            self._entries = entries
+            self._mtime = mtime
+
+    def url(self, name):
+        self._reload()
+        return self.url_prefix + self._entries.get(name, name)
+
+
+def register_assets(app, manifest):
+    """
+    - w szablonach: {{ asset_url('chat.js') }} → /static/data/chat.<hash>.js
+    - pliki z hashem w nazwie dostają Cache-Control: public, max-age=1 rok, immutable
+    """
+
+    @app.context_processor
+    def asset_helpers():
+        return {"asset_url": manifest.url}
+
+    @app.after_request
+    def immutable_assets(response):
+        if (
+            response.status_code in (200, 304)
+            and request.path.startswith(manifest.url_prefix)
+            and HASHED_ASSET.search(request.path)
+        ):
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
+
+    return manifest
+
+
+def register_precompressed(app):
+    """
+    Pliki statyczne z gotowym wariantem .br/.gz (z builda) serwowane bez kompresji w locie:
+    - wariant wybierany wg Accept-Encoding (br > gzip), tylko jeśli nie jest starszy od oryginału,
+    - Content-Type oryginału, Content-Encoding wariantu, osobny ETag dla każdego wariantu,
+    - Vary: Accept-Encoding przy każdej odpowiedzi dla pliku, który ma warianty (także nieskompresowanej).
+    """
+    prefix = app.static_url_path.rstrip("/") + "/"
+
+    def static_path():
+        if request.method not in ("GET", "HEAD") or not request.path.startswith(prefix):
+            return None
+        path = safe_join(app.static_folder, request.path[len(prefix):])
+        return path if path and os.path.isfile(path) else None
+
+    def fresh_variant(path, suffix):
+        try:
+            return os.stat(path + suffix).st_mtime_ns >= os.stat(path).st_mtime_ns
+        except OSError:
+            return False
+
+    @app.before_request
+    def serve_precompressed():
+        path = static_path()
+        if path is None:
+            return None
+        for encoding, suffix in PRECOMPRESSED:
+            if request.accept_encodings[encoding] and fresh_variant(path, suffix):
+                mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                response = send_file(path + suffix, mimetype=mimetype, conditional=True, etag=True)
+                response.headers["Content-Encoding"] = encoding
+                response.vary.add("Accept-Encoding")
+                return response
+        return None
+
+    @app.after_request
+    def vary_on_encoding(response):
+        if "Content-Encoding" not in response.headers:
+            path = static_path()
+            if path and any(os.path.isfile(path + suffix) for _, suffix in PRECOMPRESSED):
+                response.vary.add("Accept-Encoding")
+        return response
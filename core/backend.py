@@ -0,0 +1,464 @@
+import copy
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from core.metrics import TimingCriteria
+
+# Backend inferencji — jedno miejsce, które wie, gdzie i jak działa model.
+# app.py, retry_if_empty i summarize_chat wołają tylko backend.generate(prompt, ...),
+# więc przełączenie GPU ↔ CPU (int8) ↔ GGUF (int4) to zmiana jednej zmiennej środowiskowej.
+#
+#   INFERENCE_BACKEND=cuda      → fp16, device_map="auto" (dotychczasowe zachowanie)
+#   INFERENCE_BACKEND=cpu       → fp32 na CPU, bez kwantyzacji (punkt odniesienia)
+#   INFERENCE_BACKEND=cpu-int8  → dynamiczna kwantyzacja nn.Linear do int8 (torch)
+#   INFERENCE_BACKEND=gguf      → model .gguf (np. Q4_K_M) przez llama-cpp-python
+#   INFERENCE_BACKEND=fake      → bez modelu: sztuczne opóźnienia prefill/token (testy obciążeniowe, benchmarks/)
+#
+# PREFIX_CACHE_SIZE=N (domyślnie 0 = wyłączone): stan KV dla N ostatnich prefiksów promptu (persona + scena,
+# NarrativeEngine.prompt_prefix) — prefill liczy tylko ogon tury. Pamięć: ~0,5 MB na token prefiksu dla 7B w fp16.
+
+
+class CancelCriteria:
+    """
+    Kryterium stopu sprawdzane po każdym wygenerowanym tokenie:
+    ustawienie cancel_event przerywa dekodowanie, a model.generate zwraca to, co już powstało.
+    """
+
+    def __init__(self, cancel_event):
+        self.cancel_event = cancel_event
+
+    def __call__(self, input_ids, scores=None, **kwargs):
+        stop = self.cancel_event.is_set()
+        if hasattr(input_ids, "shape") and hasattr(input_ids, "device"):
+            import torch
+            return torch.full((input_ids.shape[0],), stop, dtype=torch.bool, device=input_ids.device)
+        return stop
+
+
+class PrefixCache:
+    """LRU: tekst prefiksu → stan modelu po jego przetworzeniu (np. (tokeny, past_key_values)). Bezpieczny wątkowo."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, prefix):
+        with self._lock:
+            entry = self._entries.get(prefix)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(prefix)
+            self.hits += 1
+            return entry
+
+    def put(self, prefix, entry):
+        with self._lock:
+            self._entries[prefix] = entry
+            self._entries.move_to_end(prefix)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class EosProbability:
+    """
+    Procesor logitów, który niczego nie zmienia: trzyma logity ostatniego kroku, żeby po generacji policzyć
+    P(EOS) — czy model sam chciał tu skończyć. Softmax tylko raz, na końcu (bez synchronizacji GPU co krok).
+    """
+
+    def __init__(self, eos_token_id):
+        self.eos_token_id = eos_token_id
+        self.last_scores = None
+
+    def __call__(self, input_ids, scores):
+        self.last_scores = scores[0]
+        return scores
+
+    def probability(self):
+        if self.last_scores is None or self.eos_token_id is None:
+            return None
+        import torch
+
+        return float(torch.softmax(self.last_scores.float(), dim=-1)[self.eos_token_id])
+
+
+class InferenceBackend:
+    name = "base"
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.tokenizer = None
+        self.model = None
+        self.prefix_cache = PrefixCache(PREFIX_CACHE_SIZE) if PREFIX_CACHE_SIZE > 0 else None
+
+    def load(self):
+        raise NotImplementedError
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer(text)["input_ids"])
+
+    def encode(self, text: str) -> list:
+        """Tokeny fragmentu tekstu bez tokenów specjalnych (BOS) — np. koszt fragmentu lore w limicie LORE_BUDGET."""
+        return self.tokenizer(text, add_special_tokens=False)["input_ids"]
+
+    def generate(self, prompt: str, cancel_event=None, timer=None, **gen_kwargs) -> str:
+        """
+        Zwraca prompt + odpowiedź (dotychczasowy kontrakt). Opcje poza parametrami generowania:
+        - return_prompt=False → tylko nowe tokeny (tryb czatu, bez cięcia po „Postać:”),
+        - add_special_tokens=False → prompt ma już BOS/znaczniki z szablonu czatu,
+        - prefix="…" → początek promptu wspólny dla wielu tur (persona + scena); z PREFIX_CACHE_SIZE jego stan KV
+          jest liczony raz i używany ponownie.
+        """
+        raise NotImplementedError
+
+
+class TransformersBackend(InferenceBackend):
+    """
+    Wspólna część backendów opartych o transformers:
+    tokenizacja → model.generate → dekodowanie pełnego wyjścia (prompt + odpowiedź).
+    """
+    device = "cpu"
+
+    def load(self):
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+        self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.model = self.load_model()
+        self.model.eval()
+        return self
+
+    def load_model(self):
+        raise NotImplementedError
+
+    def generate(self, prompt: str, cancel_event=None, timer=None, **gen_kwargs) -> str:
+        import torch
+        from transformers import LogitsProcessorList, StoppingCriteriaList
+
+        criteria = StoppingCriteriaList()
+        if cancel_event is not None:
+            criteria.append(CancelCriteria(cancel_event))
+
+        return_prompt = gen_kwargs.pop("return_prompt", True)
+        add_special_tokens = gen_kwargs.pop("add_special_tokens", True)
+        prefix = gen_kwargs.pop("prefix", None)
+
+        t0 = time.perf_counter()
+        inputs = self.tokenizer(prompt, return_tensors="pt", padding=True, add_special_tokens=add_special_tokens).to(self.device)
+        if timer is not None:
+            timer.add("tokenize", time.perf_counter() - t0)
+        if prefix and self.prefix_cache is not None and prompt.startswith(prefix):
+            past = self.prefix_state(prefix, inputs["input_ids"], add_special_tokens, timer)
+            if past is not None:
+                gen_kwargs["past_key_values"] = past
+        if timer is not None:
+            clock = TimingCriteria()
+            criteria.append(clock)
+            eos = EosProbability(self.tokenizer.eos_token_id)
+            gen_kwargs["logits_processor"] = LogitsProcessorList([eos])
+        if criteria:
+            gen_kwargs["stopping_criteria"] = criteria
+
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                eos_token_id=self.tokenizer.eos_token_id,
+                pad_token_id=self.tokenizer.pad_token_id,
+                **gen_kwargs
+            )
+        if timer is not None:
+            clock.report(timer, time.perf_counter())
+            timer.eos_prob = eos.probability()
+        output_ids = outputs[0] if return_prompt else outputs[0][inputs["input_ids"].shape[1]:]
+        return self.tokenizer.decode(output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+
+    def prefix_state(self, prefix, input_ids, add_special_tokens, timer=None):
+        """
+        Kopia stanu KV prefiksu do model.generate(past_key_values=...) — generate przetwarza już tylko resztę promptu.
+        Stan liczony przy pierwszym użyciu prefiksu (persona + scena) i trzymany w LRU. Gdy tokenizacja na granicy
+        prefiksu różni się od tokenizacji całego promptu, stan jest przycinany do wspólnej części tokenów.
+        """
+        entry = self.prefix_cache.get(prefix)
+        if entry is None:
+            t0 = time.perf_counter()
+            entry = self.prefill_prefix(prefix, add_special_tokens)
+            self.prefix_cache.put(prefix, entry)
+            if timer is not None:
+                timer.add("prefix_prefill", time.perf_counter() - t0)
+        ids, past = entry
+        prompt_ids = input_ids[0].tolist()
+        common = 0
+        for a, b in zip(ids, prompt_ids):
+            if a != b:
+                break
+            common += 1
+        # co najmniej jeden token promptu musi zostać do przetworzenia w generate
+        common = min(common, len(prompt_ids) - 1)
+        if common <= 0 or (common < len(ids) and not hasattr(past, "crop")):
+            return None  # starsze modele z krotkami zamiast Cache nie dają się przyciąć
+        # generate dopisuje do cache — każda tura dostaje własną kopię
+        past = copy.deepcopy(past)
+        if common < len(ids):
+            past.crop(common)
+        return past
+
+    def prefill_prefix(self, prefix, add_special_tokens):
+        """Jeden przebieg modelu po samym prefiksie → (tokeny prefiksu, past_key_values) do PrefixCache."""
+        import torch
+
+        ids = self.tokenizer(prefix, return_tensors="pt", add_special_tokens=add_special_tokens)["input_ids"].to(self.device)
+        with torch.inference_mode():
+            past = self.model(input_ids=ids, use_cache=True).past_key_values
+        return ids[0].tolist(), past
+
+
+class CudaBackend(TransformersBackend):
+    name = "cuda"
+    device = "cuda"
+
+    def load_model(self):
+        import torch
+        from transformers import AutoModelForCausalLM
+
+        return AutoModelForCausalLM.from_pretrained(
+            self.model_path,
+            torch_dtype=torch.float16,
+            device_map="auto"
+        )
+
+
+class CpuBackend(TransformersBackend):
+    name = "cpu"
+
+    def load_model(self):
+        import torch
+        from transformers import AutoModelForCausalLM
+
+        torch.set_num_threads(CPU_THREADS)
+        return AutoModelForCausalLM.from_pretrained(
+            self.model_path,
+            torch_dtype=torch.float32,
+            low_cpu_mem_usage=True
+        )
+
+
+class CpuInt8Backend(CpuBackend):
+    name = "cpu-int8"
+
+    def load_model(self):
+        import torch
+
+        model = super().load_model()
+        # Wagi warstw liniowych → int8, aktywacje kwantyzowane w locie.
+        # Embeddingi i normy zostają w fp32 — to one decydują o jakości, a ważą niewiele.
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class GgufBackend(InferenceBackend):
+    """
+    Skwantyzowany model GGUF (int4/int5/int8) uruchamiany przez llama.cpp.
+    MODEL_PATH musi wskazywać plik .gguf. Wymaga: pip install llama-cpp-python
+    """
+    name = "gguf"
+
+    # Nazwy parametrów transformers → llama.cpp
+    PARAM_MAP = {
+        "max_new_tokens": "max_tokens",
+        "temperature": "temperature",
+        "top_p": "top_p",
+        "repetition_penalty": "repeat_penalty",
+    }
+
+    def load(self):
+        try:
+            from llama_cpp import Llama
+        except ImportError as e:
+            raise RuntimeError("Backend 'gguf' wymaga pakietu llama-cpp-python") from e
+
+        self.model = Llama(
+            model_path=self.model_path,
+            n_ctx=GGUF_CONTEXT,
+            n_threads=CPU_THREADS,
+            verbose=False
+        )
+        if self.prefix_cache is not None:
+            # llama.cpp sam wznawia od najdłuższego wspólnego prefiksu tokenów z zapisanym stanem —
+            # cache stanów w RAM wystarcza, żeby persona + scena każdej pary nie była liczona od nowa
+            from llama_cpp import LlamaRAMCache
+
+            self.model.set_cache(LlamaRAMCache(capacity_bytes=GGUF_PREFIX_CACHE_BYTES))
+        return self
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.model.tokenize(text.encode("utf-8")))
+
+    def encode(self, text: str) -> list:
+        return self.model.tokenize(text.encode("utf-8"), add_bos=False)
+
+    def generate(self, prompt: str, cancel_event=None, timer=None, **gen_kwargs) -> str:
+        from llama_cpp import StoppingCriteriaList
+
+        return_prompt = gen_kwargs.pop("return_prompt", True)
+        # llama.cpp sam decyduje o BOS przy tokenizacji promptu — opcja dotyczy tylko tokenizera transformers
+        gen_kwargs.pop("add_special_tokens", None)
+        # prefiks obsługuje LlamaRAMCache (load) po tokenach promptu
+        gen_kwargs.pop("prefix", None)
+        params = {self.PARAM_MAP[k]: v for k, v in gen_kwargs.items() if k in self.PARAM_MAP}
+        if not gen_kwargs.get("do_sample", True):
+            params["temperature"] = 0.0
+        criteria = StoppingCriteriaList()
+        if cancel_event is not None:
+            criteria.append(CancelCriteria(cancel_event))
+        if timer is not None:
+            # llama.cpp tokenizuje wewnątrz wywołania, więc tokenize wlicza się tu w prefill
+            clock = TimingCriteria()
+            criteria.append(clock)
+        if criteria:
+            params["stopping_criteria"] = criteria
+        result = self.model(prompt, **params)
+        if timer is not None:
+            clock.report(timer, time.perf_counter())
+            # llama.cpp podaje tylko powód końca: "stop" = model wybrał EOS; "length" = limit tokenów (nie wiadomo)
+            stopped = result["choices"][0].get("finish_reason") == "stop" and not (cancel_event and cancel_event.is_set())
+            timer.eos_prob = 1.0 if stopped else None
+        # Tak jak w transformers: zwracamy prompt + odpowiedź, żeby wywołujący ciął po "Postać:"
+        text = result["choices"][0]["text"]
+        return prompt + text if return_prompt else text
+
+
+class FakeBackend(InferenceBackend):
+    """
+    Atrapa modelu do testów obciążeniowych: nie ładuje wag, tylko odtwarza czas pracy i kształt odpowiedzi.
+    - prefill: FAKE_PREFILL_MS + FAKE_PREFILL_MS_PER_TOKEN × liczba „tokenów” promptu,
+    - dekodowanie: FAKE_TOKEN_MS (± FAKE_TOKEN_JITTER) na token,
+    - długość odpowiedzi losowana wokół FAKE_NEW_TOKENS (nie więcej niż max_new_tokens),
+    - FAKE_CUT_RATE odpowiedzi urwanych w pół zdania i FAKE_EMPTY_RATE pustych — żeby ścieżki
+      detect_incomplete_response i retry_if_empty też były obciążone,
+    - cancel_event i timer działają jak w prawdziwych backendach (ttft, prefill, decode, new_tokens, eos_prob).
+    Słowa pochodzą z tekstów postaci i lokacji (characters/, locations/), a gdy ich brak — z FAKE_WORDS.
+    """
+    name = "fake"
+
+    FAKE_WORDS = ("Las", "szumi", "cicho,", "a", "ścieżka", "prowadzi", "dalej", "w", "mrok.",
+                  "Lytha", "uśmiecha", "się", "i", "wskazuje", "drogę", "do", "polany.")
+    CORPUS_DIRS = ("characters", "locations")
+
+    def load(self):
+        self.rng = random.Random(FAKE_SEED)
+        self.lock = threading.Lock()
+        self.words = self.load_corpus() or list(self.FAKE_WORDS)
+        return self
+
+    def load_corpus(self):
+        words = []
+        for folder in self.CORPUS_DIRS:
+            if not os.path.isdir(folder):
+                continue
+            for filename in sorted(os.listdir(folder)):
+                if not filename.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(folder, filename), "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                for value in data.values() if isinstance(data, dict) else []:
+                    if isinstance(value, str) and " " in value:
+                        words.extend(value.split())
+        return words
+
+    def count_tokens(self, text: str) -> int:
+        # ~1 token na 4 znaki — rząd wielkości zgodny z tokenizerami BPE dla polskiego tekstu
+        return max(1, len(text) // 4)
+
+    def encode(self, text: str) -> list:
+        # Deterministyczne „id” po 4 znaki — tyle samo tokenów, ile podaje count_tokens
+        return [zlib.crc32(text[i:i + 4].encode("utf-8")) % 32000 for i in range(0, len(text), 4)]
+
+    def plan_response(self, max_new_tokens):
+        """(liczba tokenów, tryb) — losowane pod blokadą, bo wątki generacji dzielą jeden generator."""
+        with self.lock:
+            roll = self.rng.random()
+            n = max(1, min(max_new_tokens, int(self.rng.gauss(FAKE_NEW_TOKENS, FAKE_NEW_TOKENS / 4))))
+            start = self.rng.randrange(len(self.words))
+            jitter = [self.rng.uniform(-FAKE_TOKEN_JITTER, FAKE_TOKEN_JITTER) for _ in range(n)]
+        if roll < FAKE_EMPTY_RATE:
+            return 0, start, jitter, "empty"
+        if roll < FAKE_EMPTY_RATE + FAKE_CUT_RATE:
+            return n, start, jitter, "cut"
+        return n, start, jitter, "ok"
+
+    def generate(self, prompt: str, cancel_event=None, timer=None, **gen_kwargs) -> str:
+        started = time.perf_counter()
+        prefill_tokens = self.count_tokens(prompt)
+        prefix = gen_kwargs.get("prefix")
+        if prefix and self.prefix_cache is not None and prompt.startswith(prefix):
+            # jak w prawdziwych backendach: trafiony prefiks nie jest liczony ponownie
+            if self.prefix_cache.get(prefix) is not None:
+                prefill_tokens -= self.count_tokens(prefix)
+            else:
+                self.prefix_cache.put(prefix, True)
+        time.sleep((FAKE_PREFILL_MS + FAKE_PREFILL_MS_PER_TOKEN * prefill_tokens) / 1000)
+        n, start, jitter, mode = self.plan_response(gen_kwargs.get("max_new_tokens", FAKE_NEW_TOKENS))
+        first_token_at = None
+        words = []
+        for i in range(n):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            time.sleep(max(0.0, FAKE_TOKEN_MS + jitter[i]) / 1000)
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            words.append(self.words[(start + i) % len(self.words)])
+        if timer is not None:
+            finished = time.perf_counter()
+            timer.add("prefill", (first_token_at or finished) - started)
+            if first_token_at is not None:
+                timer.add("decode", finished - first_token_at)
+                if timer.ttft is None:
+                    timer.ttft = first_token_at - started
+            timer.new_tokens += len(words)
+            timer.eos_prob = {"ok": FAKE_EOS_PROB, "cut": 1.0 - FAKE_EOS_PROB}.get(mode)
+        text = " ".join(words).rstrip(".,;:!?")
+        if words and mode == "ok":
+            text += "."
+        return prompt + " " + text if gen_kwargs.get("return_prompt", True) else text
+
+
+BACKENDS = {
+    CudaBackend.name: CudaBackend,
+    CpuBackend.name: CpuBackend,
+    CpuInt8Backend.name: CpuInt8Backend,
+    GgufBackend.name: GgufBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+CPU_THREADS = int(os.environ.get("CPU_THREADS", os.cpu_count() or 1))
+GGUF_CONTEXT = int(os.environ.get("GGUF_CONTEXT", 4096))
+PREFIX_CACHE_SIZE = int(os.environ.get("PREFIX_CACHE_SIZE", 0))
+GGUF_PREFIX_CACHE_BYTES = int(os.environ.get("GGUF_PREFIX_CACHE_BYTES", 2 << 30))
+FAKE_PREFILL_MS = float(os.environ.get("FAKE_PREFILL_MS", 50))
+FAKE_PREFILL_MS_PER_TOKEN = float(os.environ.get("FAKE_PREFILL_MS_PER_TOKEN", 0.05))
+FAKE_TOKEN_MS = float(os.environ.get("FAKE_TOKEN_MS", 20))
+FAKE_NEW_TOKENS = int(os.environ.get("FAKE_NEW_TOKENS", 40))
+FAKE_TOKEN_JITTER = float(os.environ.get("FAKE_TOKEN_JITTER", 0))
+FAKE_CUT_RATE = float(os.environ.get("FAKE_CUT_RATE", 0.1))
+FAKE_EMPTY_RATE = float(os.environ.get("FAKE_EMPTY_RATE", 0.02))
+FAKE_SEED = int(os.environ.get("FAKE_SEED", 1234))
+FAKE_EOS_PROB = float(os.environ.get("FAKE_EOS_PROB", 0.9))
+
+
+def create_backend(name: str, model_path: str) -> InferenceBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Nieznany backend inferencji: {name} (dostępne: {', '.join(BACKENDS)})")
+    return BACKENDS[name](model_path).load()
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Cache LRU z TTL dla wyników generowania.
+    Bezpieczny wątkowo — serwer Flaska obsługuje żądania równolegle.
+    """
+
+    def __init__(self, max_entries=256, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_id: str, prompt: str, config: dict) -> str:
+        payload = json.dumps([model_id, prompt, config], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CachingBackend:
+    """
+    Nakładka na backend inferencji: ten sam prompt + ta sama konfiguracja + ten sam model
+    → zwracamy zapamiętany wynik zamiast ponownie wołać model.
+    Obejmuje wszystkie wywołania (generate, retry_if_empty, summarize_chat), bo wszystkie idą przez
+    backend.generate — ale bez cache_sampled tylko deterministyczne, czyli summarize_chat.
+    """
+
+    def __init__(self, backend, cache: ResponseCache, cache_sampled=False):
+        self.backend = backend
+        self.cache = cache
+        # False (domyślnie) → cache'ujemy tylko wywołania deterministyczne (do_sample=False)
+        self.cache_sampled = cache_sampled
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def generate(self, prompt: str, cancel_event=None, timer=None, **gen_kwargs) -> str:
+        if gen_kwargs.get("do_sample") and not self.cache_sampled:
+            return self.backend.generate(prompt, cancel_event=cancel_event, timer=timer, **gen_kwargs)
+        key = ResponseCache.make_key(f"{self.backend.name}:{self.backend.model_path}", prompt, gen_kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        output = self.backend.generate(prompt, cancel_event=cancel_event, timer=timer, **gen_kwargs)
+        # Przerwany wynik jest niepełny — nie może trafić do cache
+        if cancel_event is None or not cancel_event.is_set():
+            self.cache.put(key, output)
+        return output
@@ -0,0 +1,46 @@
+import socket
+import threading
+
+
+def client_disconnected(environ) -> bool:
+    """
+    Sprawdza bez blokowania, czy klient zamknął połączenie.
+    Serwer deweloperski Werkzeuga udostępnia gniazdo w environ["werkzeug.socket"];
+    przy innych serwerach WSGI nie wiemy nic, więc zakładamy, że klient jest.
+    """
+    sock = environ.get("werkzeug.socket")
+    if sock is None:
+        return False
+    try:
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+    except (BlockingIOError, InterruptedError):
+        return False
+    except OSError:
+        return True
+
+
+class DisconnectWatcher:
+    """
+    Wątek pilnujący połączenia na czas generacji: gdy klient zniknie, woła on_disconnect()
+    (np. ustawia flagę przerwania sprawdzaną przez kryterium stopu w pętli dekodowania).
+    """
+
+    def __init__(self, environ, on_disconnect, interval=0.5):
+        self.environ = environ
+        self.on_disconnect = on_disconnect
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if client_disconnected(self.environ):
+                if self.on_disconnect():
+                    return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
@@ -1,5 +1,7 @@
 import json
 
+from core.prompt_template import get_template
+
 class Character:
     def __init__(self, name, race, role, style, tone, emotions, backstory="", relationships=None):
         self.name = name
@@ -10,6 +12,9 @@ class Character:
         self.emotions = emotions
         self.backstory = backstory
         self.relationships = relationships or {}
+        # Skompilowany nagłówek persony (compile)
+        self.template = None
+        self.persona_header = None
 
     @staticmethod
     def from_json(path):
@@ -20,36 +25,34 @@ class Character:
             race=data["race"],
             role=data["role"],
             style=data["style"],
-            tone=data["tone"],
-            emotions=data["emotions"],
+            tone=data.get("tone", ""),
+            emotions=data.get("emotions", []),
             backstory=data.get("backstory", ""),
             relationships=data.get("relationships", {})
         )
 
-    def generate_prompt(self, user_input: str, summary: str = "", history: list = []) -> str:
-        prompt = (
-            f"Postać RP: {self.name}\n"
-            f"Rasa: {self.race}\n"
-            f"Rola: {self.role}\n"
-            f"Styl: {self.style}\n"
-            f"Ton: {self.tone}\n"
-            f"Emocje: {', '.join(self.emotions)}\n"
-            f"Język: polski\n"
-            f"Narracja: emocjonalna, opisowa, interaktywna\n"
-        )
-        if self.backstory:
-            prompt += f"Historia: {self.backstory}\n"
-        if self.relationships:
-            rels = "\n".join([f"- {k}: {v}" for k, v in self.relationships.items()])
-            prompt += f"Relacje:\n{rels}\n"
-        if summary:
-            prompt += f"\n### STRESZCZENIE\n{summary}\n"
+    def compile(self, template=None):
+        """
+        Nagłówek persony (atrybuty, historia, relacje) renderowany raz z szablonu i trzymany jako gotowy string.
+        Wołane leniwie przy pierwszym promptcie; po zmianie atrybutów postaci (albo szablonu) wystarczy wywołać ponownie.
+        """
+        self.template = template or get_template()
+        self.persona_header = self.template.render_header(self)
+        return self.persona_header
 
-        seen = set()
-        for msg in history[-6:]:
-            if msg["text"] not in seen:
-                prompt += f"\n{msg['sender']}: {msg['text']}"
-                seen.add(msg["text"])
+    def generate_prompt(self, user_input: str, summary: str = "", history: list = [], memories: list = (),
+                        lore: list = (), scene: str = "") -> str:
+        if self.persona_header is None:
+            self.compile()
+        # Nagłówek persony i blok sceny (SceneCatalog) są gotowe — przy każdej turze składamy tylko ogon:
+        # streszczenie, lore, wspomnienia, ostatnie wiadomości i wejście użytkownika
+        return self.persona_header + scene + self.template.render_turn(self.name, user_input, summary, history, memories, lore)
 
-        prompt += f"\n{{user}}: {user_input}\n### ODPOWIEDŹ\n{self.name}:"
-        return prompt
+    def generate_messages(self, user_input: str, summary: str = "", history: list = [], memories: list = (),
+                          lore: list = (), scene: str = "") -> list:
+        """Wiadomości dla tokenizer.apply_chat_template (PROMPT_MODE=chat) — persona z tego samego skompilowanego nagłówka."""
+        if self.persona_header is None:
+            self.compile()
+        return self.template.render_messages(
+            self.name, self.persona_header, user_input, summary, history, memories, lore, scene
+        )
@@ -0,0 +1,136 @@
+import logging
+
+log = logging.getLogger("chat")
+
+# Znaczniki-sondy: treść, której na pewno nie ma w szablonie — po niej rozpoznajemy, co szablon dokleja wokół wiadomości
+PROBE = "\x00treść\x00"
+PROBE_SYSTEM = "\x00persona\x00"
+
+# Próbki do weryfikacji składania (polskie znaki, nowe linie, spacje na brzegach, klamry, cudzysłowy)
+SAMPLE_CONVERSATIONS = (
+    (
+        {"role": "system", "content": "Postać RP: Lytha\nRasa: Elfka"},
+        {"role": "user", "content": "Cześć, co słychać w lesie?"},
+        {"role": "assistant", "content": "Las szumi cicho.\nŚcieżka prowadzi dalej."},
+        {"role": "user", "content": "Hestia: Dokąd prowadzi?"},
+        {"role": "assistant", "content": "Do polany, gdzie rosną zioła."},
+        {"role": "user", "content": "Chodźmy tam."},
+    ),
+    (
+        {"role": "user", "content": "  {user} „cytat” \"x\" 100%  "},
+        {"role": "assistant", "content": "\n[/INST] <s> ### ODPOWIEDŹ\n"},
+        {"role": "user", "content": "ok"},
+    ),
+)
+
+
+class ChatPromptRenderer:
+    """
+    Prompt w natywnym formacie modelu (tokenizer.apply_chat_template) bez renderowania całej rozmowy przy każdej turze.
+
+    Przy starcie szablon czatu (Jinja) jest sondowany: dla każdej roli ustalamy stały „owijacz” wiadomości
+    (tekst przed i po treści), a do tego preambułę (np. BOS) i końcówkę add_generation_prompt.
+    Wiadomości są wtedy formatowane zwykłym sklejaniem stringów — każda tura kosztuje tyle, ile jej nowe wiadomości,
+    bez Jinja. Złożenie jest weryfikowane z pełnym renderem na próbkach; szablon, który zależy od pozycji
+    wiadomości albo przetwarza treść (np. trim), dostaje zawsze pełny apply_chat_template.
+    Szablony bez roli system (np. Mistral) dostają personę na początku pierwszej wiadomości użytkownika.
+    """
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.system_role = self._supports_system()
+        self.preamble = ""
+        self.wrappers = {}
+        self.generation_suffix = ""
+        self.decomposable = self._learn_wrappers()
+
+    def _apply(self, messages, add_generation_prompt=False):
+        return self.tokenizer.apply_chat_template(
+            list(messages), tokenize=False, add_generation_prompt=add_generation_prompt
+        )
+
+    def _supports_system(self):
+        try:
+            self._apply(SAMPLE_CONVERSATIONS[0][:2])
+            return True
+        except Exception:
+            return False
+
+    def normalize(self, messages):
+        """Rola system → pierwsza wiadomość użytkownika (gdy szablon jej nie zna); sklejanie sąsiednich wiadomości tej samej roli."""
+        messages = [dict(m) for m in messages]
+        if not self.system_role and messages and messages[0]["role"] == "system":
+            system = messages.pop(0)["content"]
+            if messages and messages[0]["role"] == "user":
+                messages[0]["content"] = f"{system}\n\n{messages[0]['content']}"
+            else:
+                messages.insert(0, {"role": "user", "content": system})
+        merged = []
+        for m in messages:
+            if merged and merged[-1]["role"] == m["role"]:
+                merged[-1]["content"] += "\n" + m["content"]
+            else:
+                merged.append(m)
+        return merged
+
+    def _split_probe(self, text, probe):
+        if text.count(probe) != 1:
+            raise ValueError("treść wiadomości nie trafia do promptu dosłownie")
+        before, _, after = text.partition(probe)
+        return before, after
+
+    def _learn_wrappers(self):
+        try:
+            # user: preambuła + owijacz użytkownika
+            before, close_user = self._split_probe(self._apply([{"role": "user", "content": PROBE}]), PROBE)
+            # assistant po użytkowniku: różnica renderów to owijacz asystenta
+            first = [{"role": "user", "content": "x"}]
+            base = self._apply(first)
+            with_assistant = self._apply(first + [{"role": "assistant", "content": PROBE}])
+            if not with_assistant.startswith(base):
+                raise ValueError("render nie jest przyrostowy")
+            self.wrappers["assistant"] = self._split_probe(with_assistant[len(base):], PROBE)
+            # kolejny user po asystencie — owijacz użytkownika bez preambuły
+            base = self._apply(first + [{"role": "assistant", "content": "y"}])
+            with_user = self._apply(first + [{"role": "assistant", "content": "y"}, {"role": "user", "content": PROBE}])
+            if not with_user.startswith(base):
+                raise ValueError("render nie jest przyrostowy")
+            open_user, close = self._split_probe(with_user[len(base):], PROBE)
+            if close != close_user or not before.endswith(open_user):
+                raise ValueError("pierwsza wiadomość użytkownika formatowana inaczej niż kolejne")
+            self.wrappers["user"] = (open_user, close_user)
+            self.preamble = before[:len(before) - len(open_user)]
+            if self.system_role:
+                text = self._apply([{"role": "system", "content": PROBE_SYSTEM}, {"role": "user", "content": PROBE}])
+                tail = open_user + PROBE + close_user
+                if not text.startswith(self.preamble) or not text.endswith(tail):
+                    raise ValueError("wiadomość systemowa zmienia formatowanie użytkownika")
+                self.wrappers["system"] = self._split_probe(text[len(self.preamble):len(text) - len(tail)], PROBE_SYSTEM)
+            full = self._apply(first)
+            self.generation_suffix = self._apply(first, add_generation_prompt=True)[len(full):]
+
+            for sample in SAMPLE_CONVERSATIONS:
+                sample = self.normalize(sample)
+                if self._assemble(sample) != self._apply(sample, add_generation_prompt=True):
+                    raise ValueError("złożenie różni się od pełnego renderu")
+            return True
+        except Exception as e:
+            log.warning("⚠️ Szablon czatu nie jest składalny (%s) — każdy prompt renderowany w całości", e)
+            self.wrappers = {}
+            return False
+
+    def _assemble(self, messages):
+        pieces = [self.preamble]
+        for m in messages:
+            open_tag, close_tag = self.wrappers[m["role"]]
+            pieces.append(open_tag)
+            pieces.append(m["content"])
+            pieces.append(close_tag)
+        pieces.append(self.generation_suffix)
+        return "".join(pieces)
+
+    def render(self, messages) -> str:
+        messages = self.normalize(messages)
+        if self.decomposable and messages and messages[0]["role"] in ("system", "user"):
+            return self._assemble(messages)
+        return self._apply(messages, add_generation_prompt=True)
@@ -0,0 +1,109 @@
+import threading
+
+from core.cache import ResponseCache
+
+
+class PendingRequest:
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+class RequestRegistry:
+    """
+    Deduplikacja żądań po identyfikatorze nadanym przez klienta (requestId / Idempotency-Key).
+
+    - pierwsze żądanie z danym id zostaje „właścicielem” i wykonuje generację,
+    - duplikat w trakcie generacji czeka na wynik właściciela (attach),
+    - duplikat po zakończeniu dostaje zapamiętaną odpowiedź (completed, LRU + TTL),
+    - przerwana generacja (quality == "cancelled") nie trafia do completed — ponowienie generuje od nowa,
+    - rozłączenie właściciela czeka abandon_grace sekund na retry, zanim przerwie generację.
+    """
+
+    def __init__(self, max_completed=1024, ttl=900, abandon_grace=0.0):
+        self._lock = threading.Lock()
+        self._attached = threading.Condition(self._lock)
+        self._in_flight = {}
+        self.completed = ResponseCache(max_completed, ttl)
+        self.abandon_grace = abandon_grace
+
+    def begin(self, request_id):
+        """
+        Zwraca (pending, owner, result):
+        - result != None → żądanie już zakończone, wystarczy odesłać wynik,
+        - owner == True  → wywołujący wykonuje generację i musi zawołać finish()/fail(),
+        - owner == False → wywołujący czeka przez wait(pending).
+        """
+        with self._lock:
+            result = self.completed.get(request_id)
+            if result is not None:
+                return None, False, result
+            pending = self._in_flight.get(request_id)
+            if pending is not None:
+                pending.waiters += 1
+                self._attached.notify_all()
+                return pending, False, None
+            pending = PendingRequest(request_id)
+            self._in_flight[request_id] = pending
+            return pending, True, None
+
+    def finish(self, pending, result):
+        with self._lock:
+            # Przerwanej odpowiedzi nie zapamiętujemy: retry po rozłączeniu dostałby pusty wynik zamiast generacji
+            if result.get("quality") != "cancelled":
+                self.completed.put(pending.request_id, result)
+            self._in_flight.pop(pending.request_id, None)
+            pending.result = result
+            pending.done.set()
+            self._attached.notify_all()
+
+    def fail(self, pending, error):
+        # Błąd nie trafia do completed — ponowienie klienta może spróbować jeszcze raz
+        with self._lock:
+            self._in_flight.pop(pending.request_id, None)
+            pending.error = error
+            pending.done.set()
+            self._attached.notify_all()
+
+    def wait(self, pending, timeout=None):
+        try:
+            if not pending.done.wait(timeout):
+                raise TimeoutError(f"Żądanie {pending.request_id} nadal w toku")
+        finally:
+            with self._lock:
+                pending.waiters -= 1
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def cancel(self, request_id):
+        """Ustawia flagę przerwania trwającej generacji. Zwraca False, jeśli nic nie trwa."""
+        with self._lock:
+            pending = self._in_flight.get(request_id)
+        if pending is None:
+            return False
+        pending.cancelled.set()
+        return True
+
+    def abandon(self, pending, grace=None):
+        """
+        Klient-właściciel się rozłączył: przerywamy, chyba że ktoś (np. retry) czeka na wynik.
+        Przez `grace` sekund (domyślnie abandon_grace) czekamy, aż retry zdąży dołączyć. Blokuje — z pętli
+        zdarzeń wołać przez pulę wątków.
+        """
+        grace = self.abandon_grace if grace is None else grace
+        if pending.request_id is None:
+            grace = 0  # bez requestId retry i tak nie dołączy
+        with self._attached:
+            if self._attached.wait_for(lambda: pending.waiters > 0 or pending.done.is_set(), timeout=grace):
+                return False
+        pending.cancelled.set()
+        return True
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._in_flight)
@@ -0,0 +1,204 @@
+import base64
+import hashlib
+import os
+import threading
+import time
+from bisect import bisect_right
+
+from flask import Blueprint, abort, jsonify, request, send_file
+
+from core.images import IMAGE_EXTENSIONS
+
+# Stałe rozmiary miniatur (dłuższy bok w px) — tylko te są generowane i cache'owane na dysku
+THUMB_SIZES = (128, 256, 512)
+
+
+class GalleryCollection:
+    """
+    Lista obrazów jednego katalogu, skanowana raz i odświeżana tylko przy zmianie mtime katalogu.
+    ETag listy liczony jest z nazw, rozmiarów i czasów modyfikacji plików.
+    """
+
+    def __init__(self, name, folder, url_prefix, refresh_interval=5.0):
+        self.name = name
+        self.folder = folder
+        self.url_prefix = url_prefix
+        self.refresh_interval = refresh_interval
+        self.files = []
+        self.names = set()
+        self.etag = ""
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return False
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.folder).st_mtime_ns
+            except OSError:
+                mtime = None
+            if not force and mtime == self._mtime:
+                return False
+            files, digest = [], hashlib.sha1()
+            if mtime is not None:
+                with os.scandir(self.folder) as entries:
+                    for entry in sorted(entries, key=lambda e: e.name):
+                        ext = entry.name.rpartition(".")[2].lower()
+                        if entry.is_file() and ext in IMAGE_EXTENSIONS:
+                            st = entry.stat()
+                            files.append(entry.name)
+                            digest.update(f"{entry.name}:{st.st_size}:{st.st_mtime_ns};".encode("utf-8"))
+            self.files = files
+            self.names = set(files)
+            self.etag = digest.hexdigest()
+            self._mtime = mtime
+            return True
+
+    def page(self, cursor=None, limit=50):
+        """Stronicowanie kursorem (ostatnia zwrócona nazwa) — stabilne przy dopisywaniu plików."""
+        files = self.files
+        start = bisect_right(files, decode_cursor(cursor)) if cursor else 0
+        chunk = files[start:start + limit]
+        next_cursor = encode_cursor(chunk[-1]) if start + limit < len(files) and chunk else None
+        return chunk, next_cursor
+
+
+def encode_cursor(name):
+    return base64.urlsafe_b64encode(name.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except ValueError:
+        return ""
+
+
+class ThumbnailCache:
+    """
+    Miniatury generowane raz (Pillow) i trzymane na dysku: <cache_dir>/<rozmiar>/<kolekcja>/<plik.ext>.webp
+    (pełna nazwa źródła, więc a.png i a.jpg mają osobne miniatury).
+    Bez Pillow albo gdy Pillow nie odczyta pliku zwracamy oryginał — galeria działa, tylko bez oszczędności transferu.
+    """
+
+    def __init__(self, cache_dir="static/thumbs"):
+        self.cache_dir = cache_dir
+        try:
+            from PIL import Image  # noqa: F401
+            self.available = True
+        except ImportError:
+            self.available = False
+
+    def path_for(self, collection, name, size):
+        return os.path.join(self.cache_dir, str(size), collection.name, name + ".webp")
+
+    def get(self, collection, name, size):
+        source = os.path.join(collection.folder, name)
+        if not self.available:
+            return source
+        target = self.path_for(collection, name, size)
+        try:
+            if os.path.getmtime(target) >= os.path.getmtime(source):
+                return target
+        except OSError:
+            pass
+        try:
+            return self._render(source, target, size)
+        except (OSError, ValueError) as e:
+            # UnidentifiedImageError (uszkodzony / nieobsługiwany plik) to też OSError
+            print(f"⚠️ Miniatura {source}: {e} — wysyłam oryginał")
+            return source
+
+    def _render(self, source, target, size):
+        from PIL import Image
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with Image.open(source) as img:
+            img.thumbnail((size, size))
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                img.save(tmp, "WEBP", quality=80, method=4)
+            except (OSError, ValueError):
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        os.replace(tmp, target)
+        return target
+
+    def pregenerate(self, collection):
+        """Generuje brakujące miniatury w tle (po skanie katalogu), żeby pierwsze wejście nie czekało."""
+        if not self.available:
+            return
+
+        def run():
+            for name in list(collection.files):
+                for size in THUMB_SIZES:
+                    try:
+                        self.get(collection, name, size)
+                    except OSError:
+                        pass
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+def create_gallery_blueprint(collections, thumbnails, max_limit=200):
+    """
+    GET /api/gallery?collection=&cursor=&limit=&thumb=
+        → { images: [url], items: [{url, thumb}], nextCursor } z ETag (304 przy If-None-Match)
+    GET /gallery/thumbs/<rozmiar>/<kolekcja>/<plik>
+        → miniatura z cache na dysku, z długim Cache-Control
+    """
+    bp = Blueprint("gallery", __name__)
+    by_name = {c.name: c for c in collections}
+
+    for c in collections:
+        c.refresh(force=True)
+        thumbnails.pregenerate(c)
+
+    @bp.route("/api/gallery", methods=["GET"])
+    def gallery_list():
+        collection = by_name.get(request.args.get("collection", collections[0].name))
+        if collection is None:
+            abort(404)
+        if collection.refresh():
+            thumbnails.pregenerate(collection)
+
+        cursor = request.args.get("cursor") or None
+        limit = max(1, min(request.args.get("limit", 50, type=int), max_limit))
+        thumb = request.args.get("thumb", THUMB_SIZES[1], type=int)
+        if thumb not in THUMB_SIZES:
+            thumb = THUMB_SIZES[1]
+
+        names, next_cursor = collection.page(cursor, limit)
+        items = [
+            {
+                "url": collection.url_prefix + name,
+                "thumb": f"/gallery/thumbs/{thumb}/{collection.name}/{name}",
+            }
+            for name in names
+        ]
+        resp = jsonify({
+            "images": [i["url"] for i in items],
+            "items": items,
+            "nextCursor": next_cursor,
+            "total": len(collection.files),
+        })
+        resp.set_etag(f"{collection.etag}-{cursor or ''}-{limit}-{thumb}")
+        resp.cache_control.no_cache = True  # zawsze rewalidacja, ale tania (304)
+        return resp.make_conditional(request)
+
+    @bp.route("/gallery/thumbs/<int:size>/<collection_name>/<path:name>", methods=["GET"])
+    def gallery_thumb(size, collection_name, name):
+        collection = by_name.get(collection_name)
+        if collection is None or size not in THUMB_SIZES or name not in collection.names:
+            abort(404)
+        path = thumbnails.get(collection, name, size)
+        return send_file(os.path.abspath(path), conditional=True, max_age=7 * 24 * 3600)
+
+    return bp
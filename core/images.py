@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from itertools import combinations
+
+IMAGE_EXTENSIONS = ["jpg", "jpeg", "png", "gif", "webp"]
+
+
+def _permutations(items):
+    """Permutacje w tej samej kolejności co ImageResolver._permutations (zamiana elementów, rekurencja)."""
+    res = []
+    a = list(items)
+
+    def perm(l):
+        if l >= len(a) - 1:
+            res.append(tuple(a))
+            return
+        for i in range(l, len(a)):
+            a[l], a[i] = a[i], a[l]
+            perm(l + 1)
+            a[l], a[i] = a[i], a[l]
+
+    perm(0)
+    return res
+
+
+class ImageIndex:
+    """
+    Indeks obrazów narracyjnych w pamięci: pełna nazwa pliku bez rozszerzenia → rozszerzenia.
+    Nazwy nie są dzielone po "_" ani zmieniane na małe litery — kandydat to dokładnie ten adres, o który
+    ImageResolver pytałby żądaniem HEAD („_”.join permutacji tagów + rozszerzenie z listy), więc tag z „_”
+    w środku też się odnajduje, a wielkość liter musi się zgadzać tak samo jak na serwerze statycznym.
+    Zamiast serii żądań HEAD każdy kandydat to jedno wyszukanie w słowniku.
+    Indeks przebudowuje się sam, gdy zmieni się mtime katalogu (dodanie/usunięcie pliku).
+    """
+
+    def __init__(self, folder="static/NarrativeIMG", url_prefix="/static/NarrativeIMG/", refresh_interval=2.0):
+        self.folder = folder
+        self.url_prefix = url_prefix
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._by_stem = {}
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return None
+
+    def _rebuild(self, mtime):
+        by_stem = {}
+        if mtime is not None:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    stem, _, ext = entry.name.rpartition(".")
+                    # ImageResolver sprawdza tylko rozszerzenia z listy, małymi literami
+                    if stem and ext in IMAGE_EXTENSIONS:
+                        by_stem.setdefault(stem, set()).add(ext)
+        self._by_stem = by_stem
+        self._mtime = mtime
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            mtime = self._dir_mtime()
+            if force or mtime != self._mtime:
+                self._rebuild(mtime)
+
+    def resolve(self, tags, max_results=4):
+        """
+        Ta sama kolejność priorytetów co ImageResolver.resolve po stronie frontu:
+        pełny zestaw tagów, potem podzbiory od największych, w każdym permutacje, w każdej rozszerzenia.
+        """
+        tags = [t for t in tags if t]
+        if not tags:
+            return []
+        self.refresh()
+        by_stem = self._by_stem
+
+        results = []
+        seen = set()
+        for k in range(len(tags), 0, -1):
+            for subset in combinations(tags, k):
+                for perm in _permutations(subset):
+                    stem = "_".join(perm)
+                    exts = by_stem.get(stem)
+                    if not exts or stem in seen:
+                        continue
+                    seen.add(stem)  # powtórzony tag daje tę samą nazwę kilka razy
+                    for ext in IMAGE_EXTENSIONS:
+                        if ext in exts:
+                            results.append(f"{self.url_prefix}{stem}.{ext}")
+                            if len(results) >= max_results:
+                                return results
+        return results
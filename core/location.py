@@ -1,11 +1,16 @@
 import json
+import os
+
+from core.prompt_template import get_template
 
 class Location:
-    def __init__(self, name, description, atmosphere="", weather=""):
+    def __init__(self, name, description, atmosphere="", weather="", key=None):
         self.name = name
         self.description = description
         self.atmosphere = atmosphere
         self.weather = weather
+        # identyfikator lokacji (nazwa pliku bez .json) — klucz tagów lokacji w core/tags.json i w /location
+        self.key = key or name
 
     def get_context(self):
         return (
@@ -23,5 +28,70 @@ class Location:
             name=data["name"],
             description=data["description"],
             atmosphere=data.get("atmosphere", ""),
-            weather=data.get("weather", "")
+            weather=data.get("weather", ""),
+            key=os.path.splitext(os.path.basename(path))[0]
         )
+
+
+class SceneCatalog:
+    """
+    Wszystkie lokacje świata z gotowym blokiem sceny (get_context przez szablon promptu).
+    Blok renderowany jest raz na lokację (compile), więc zmiana sceny w trakcie rozmowy to podmiana klucza
+    — bez ponownego renderowania opisu lokacji. Stan KV prefiksu (persona + scena) trzyma backend (PrefixCache).
+    """
+
+    def __init__(self, locations=(), template=None):
+        self.locations = {}
+        self._aliases = {}
+        self.template = template
+        self.blocks = {}
+        for location in locations:
+            self.add(location)
+
+    @staticmethod
+    def from_directories(directories):
+        catalog = SceneCatalog()
+        for directory in directories:
+            if not os.path.isdir(directory):
+                continue
+            for filename in sorted(os.listdir(directory)):
+                path = os.path.join(directory, filename)
+                if not filename.endswith(".json") or os.path.getsize(path) == 0:
+                    continue  # pusty plik = zarezerwowana, jeszcze nieopisana lokacja
+                try:
+                    catalog.add(Location.from_json(path))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"⚠️ Błąd wczytywania lokacji {filename}: {e}")
+        return catalog
+
+    def add(self, location):
+        self.locations[location.key] = location
+        self._aliases[location.key.lower()] = location.key
+        self._aliases[location.name.lower()] = location.key
+        self.blocks.pop(location.key, None)
+
+    def get(self, key_or_name):
+        """Lokacja po kluczu (nazwie pliku) albo nazwie wyświetlanej, bez względu na wielkość liter."""
+        key = self._aliases.get(str(key_or_name).strip().lower())
+        return self.locations.get(key) if key else None
+
+    def compile(self, template=None):
+        self.template = template or self.template or get_template()
+        self.blocks = {key: self.template.render_location(location) for key, location in self.locations.items()}
+        return self.blocks
+
+    def block(self, location) -> str:
+        text = self.blocks.get(location.key)
+        if text is None:
+            if location.key not in self.locations:
+                self.add(location)
+            if self.template is None:
+                self.template = get_template()
+            text = self.blocks[location.key] = self.template.render_location(location)
+        return text
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __iter__(self):
+        return iter(self.locations.values())
@@ -0,0 +1,205 @@
+import heapq
+import json
+import math
+import os
+import re
+
+# 📚 Indeks wiedzy o świecie (opt-in): karty postaci i lokacji pocięte na fragmenty, do promptu trafia tylko to,
+# co dotyczy bieżącej tury — w limicie tokenów, niezależnie od tego, ile wpisów ma świat.
+#   LORE_INDEX=1
+#   LORE_DIRS=characters,locations,narative_data
+#   LORE_BUDGET=200 (tokeny), LORE_TOP_K=6
+#   LORE_EMBEDDER=hashing | <model sentence-transformers> (opcjonalny indeks wektorowy, wymaga numpy)
+CHUNK_WORDS = 60
+WORD = re.compile(r"\w+", re.UNICODE)
+SENTENCE = re.compile(r"(?<=[.!?…])\s+")
+STEM_LENGTH = 5  # prymitywny stemming przez prefiks: „polana”/„polany”/„polanie” → „polan”
+STOPWORDS = frozenset((
+    "and", "the", "oraz", "jest", "się", "nie", "jak", "ale", "czy", "dla", "jej", "jego", "ich", "tak", "już",
+    "to", "ten", "ta", "tym", "przez", "który", "która", "które", "gdzie", "kiedy", "co", "od", "do", "na", "po",
+    "ze", "za", "jako", "też", "tylko", "było", "była", "był", "są", "mnie", "mi", "ci", "cię",
+))
+# BM25
+K1 = 1.2
+B = 0.75
+RRF_K = 60  # łączenie rankingów słów kluczowych i wektorów (reciprocal rank fusion)
+# Słowo obecne w więcej niż MAX_POSTINGS fragmentach (prawie słowo funkcyjne) nie przechodzi całej listy wystąpień:
+# dolicza swój wynik kandydatom znalezionym przez rzadsze słowa (słownik) i dokłada tylko swoje MAX_POSTINGS najlepszych.
+MAX_POSTINGS = 500
+MIN_SIMILARITY = 0.2  # fragment znaleziony tylko wektorowo musi być choć trochę podobny
+
+
+def terms(text):
+    """Słowa → znormalizowane rdzenie (małe litery, bez słów funkcyjnych, prefiks STEM_LENGTH znaków)."""
+    return [w[:STEM_LENGTH] for w in WORD.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS]
+
+
+def estimate_tokens(text):
+    """Przybliżenie bez tokenizera (~4 znaki na token) — dla backendów bez encode()."""
+    return len(text) // 4 + 1
+
+
+def flatten_fields(data, prefix=""):
+    """Pola karty JSON jako linie „klucz: wartość” (zagnieżdżone słowniki i listy rozwinięte)."""
+    lines = []
+    for key, value in data.items():
+        label = f"{prefix}{key}"
+        if isinstance(value, dict):
+            lines.extend(flatten_fields(value, ""))
+        elif isinstance(value, list):
+            items = ", ".join(str(v) for v in value if not isinstance(v, (dict, list)))
+            if items:
+                lines.append(f"{label}: {items}")
+            for v in value:
+                if isinstance(v, dict):
+                    lines.extend(flatten_fields(v, ""))
+        elif isinstance(value, str) and value.strip():
+            lines.append(f"{label}: {value.strip()}")
+    return lines
+
+
+def chunk_lines(lines, max_words=CHUNK_WORDS):
+    """Linie sklejane („; ”) we fragmenty do max_words słów; długie pola (historia postaci) dzielone po zdaniach."""
+    chunks, current, words = [], [], 0
+    for line in lines:
+        sentences = SENTENCE.split(line) if len(line.split()) > max_words else [line]
+        for j, sentence in enumerate(sentences):
+            n = len(sentence.split())
+            if current and words + n > max_words:
+                chunks.append("".join(current))
+                current, words = [], 0
+            if current:
+                current.append(" " if j else "; ")
+            current.append(sentence)
+            words += n
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+class LoreIndex:
+    """
+    Wpisy świata (postacie, lokacje, notatki fabularne) jako fragmenty z odwróconym indeksem słów kluczowych.
+
+    - add_entry(): karta → fragmenty (CHUNK_WORDS słów), każdy z tytułem wpisu i kosztem w tokenach liczonym raz,
+    - search(): BM25 po listach wystąpień słów z zapytania (wyniki policzone w build()); częste słowa tylko
+      uzupełniają wynik kandydatów rzadszych słów — koszt zależy od zapytania, nie od wielkości świata;
+      z embedderem (core.memory) dodatkowo kosinus po macierzy fragmentów i połączenie rankingów (RRF),
+    - select(): najlepsze fragmenty zachłannie do limitu tokenów, z pominięciem wpisów już obecnych w promptcie
+      (np. karta aktywnej postaci jest w nagłówku persony).
+    """
+
+    def __init__(self, embedder=None, token_counter=None):
+        self.embedder = embedder
+        self.token_counter = token_counter or estimate_tokens
+        self.chunks = []
+        self.postings = {}  # rdzeń → [(nr fragmentu, liczba wystąpień)]
+        self.lengths = []
+        self.impacts = {}  # rdzeń → [(nr fragmentu, wynik BM25)] (build); dla częstych słów tylko MAX_POSTINGS najlepszych
+        self.frequent = {}  # częste słowo → {nr fragmentu: wynik BM25}
+        self.vectors = None
+
+    def add_entry(self, title, data, source=""):
+        lines = flatten_fields({k: v for k, v in data.items() if k != "name"})
+        for text in chunk_lines(lines):
+            i = len(self.chunks)
+            self.chunks.append({
+                "title": title,
+                "source": source,
+                "text": text,
+                "tokens": self.token_counter(f"{title}: {text}"),
+            })
+            counts = {}
+            for term in terms(f"{title} {text}"):
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((i, tf))
+            self.lengths.append(sum(counts.values()))
+
+    def load_directories(self, directories):
+        """Wszystkie *.json z katalogów (rekurencyjnie); pusty albo uszkodzony plik to ostrzeżenie, nie błąd startu."""
+        for directory in directories:
+            for root, _, files in os.walk(directory):
+                for filename in sorted(files):
+                    if not filename.endswith(".json"):
+                        continue
+                    path = os.path.join(root, filename)
+                    if os.path.getsize(path) == 0:
+                        continue  # zarezerwowany, jeszcze niewypełniony wpis
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            data = json.load(f)
+                    except (OSError, ValueError) as e:
+                        print(f"⚠️ Lore: pomijam {path}: {e}")
+                        continue
+                    if isinstance(data, dict):
+                        self.add_entry(data.get("name") or os.path.splitext(filename)[0], data, source=path)
+        self.build()
+        return self
+
+    def build(self):
+        """Wyniki BM25 per (słowo, fragment) i opcjonalna macierz wektorów — raz, po wczytaniu wpisów."""
+        n = len(self.chunks)
+        avg = (sum(self.lengths) / n) if n else 1.0
+        lengths = self.lengths
+        self.impacts, self.frequent = {}, {}
+        for term, posting in self.postings.items():
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            scored = [(i, idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * lengths[i] / avg))) for i, tf in posting]
+            if len(scored) > MAX_POSTINGS:
+                self.frequent[term] = dict(scored)
+                scored = heapq.nlargest(MAX_POSTINGS, scored, key=lambda item: item[1])
+            self.impacts[term] = scored
+        if self.embedder is not None and n:
+            self.vectors = self.embedder.embed([f"{c['title']}: {c['text']}" for c in self.chunks])
+
+    def keyword_scores(self, query):
+        scores = {}
+        get = scores.get
+        # od najrzadszych słów: one wyznaczają kandydatów, częste tylko doliczają swój wynik
+        for term in sorted(set(terms(query)) & self.impacts.keys(), key=lambda t: len(self.postings[t])):
+            frequent = self.frequent.get(term)
+            if frequent is not None:
+                for i in scores:
+                    scores[i] += frequent.get(i, 0.0)
+                for i, impact in self.impacts[term]:
+                    scores.setdefault(i, impact)  # nowi kandydaci; istniejący mają już wynik z pętli wyżej
+                continue
+            for i, impact in self.impacts[term]:
+                scores[i] = get(i, 0.0) + impact
+        return scores
+
+    def search(self, query, k=6):
+        """[(nr fragmentu, wynik)] od najlepszego."""
+        scores = self.keyword_scores(query)
+        ranked = heapq.nlargest(k * 4, scores, key=scores.get)
+        if self.vectors is None:
+            return [(i, scores[i]) for i in ranked[:k]]
+        import numpy as np
+
+        similarity = self.vectors @ self.embedder.embed([query])[0]
+        dense = np.argpartition(-similarity, min(k * 4, len(similarity)) - 1)[:k * 4]
+        dense = dense[np.argsort(-similarity[dense])]
+        fused = {}
+        for rank, i in enumerate(ranked):
+            fused[i] = fused.get(i, 0.0) + 1 / (RRF_K + rank)
+        for rank, i in enumerate(dense.tolist()):
+            if similarity[i] >= MIN_SIMILARITY:
+                fused[i] = fused.get(i, 0.0) + 1 / (RRF_K + rank)
+        return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def select(self, query, budget=200, k=6, exclude_titles=()):
+        """Fragmenty do promptu: [{title, text, ...}] w kolejności trafności, łącznie najwyżej `budget` tokenów."""
+        selected, used = [], 0
+        for i, _ in self.search(query, k * 4):
+            chunk = self.chunks[i]
+            if chunk["title"] in exclude_titles or used + chunk["tokens"] > budget:
+                continue
+            selected.append(chunk)
+            used += chunk["tokens"]
+            if len(selected) >= k:
+                break
+        return selected
+
+    def __len__(self):
+        return len(self.chunks)
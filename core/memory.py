@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# 🧠 Pamięć długoterminowa sesji (opt-in): wiadomości osadzane w wektory, najtrafniejsze stare tury wracają do promptu.
+#   LONG_TERM_MEMORY=1
+#   MEMORY_EMBEDDER=hashing | <model sentence-transformers, np. sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2>
+#   MEMORY_DIR=memory, MEMORY_TOP_K=3, MEMORY_MIN_SCORE=0.35
+EMBEDDING_DIM = 384
+SEARCH_CHUNK = 16384  # wiersze float16 → float32 konwertowane porcjami (stała pamięć przy 100k+ wiadomości)
+# Powyżej tego rozmiaru: wstępny wybór kandydatów po rzucie losowym (float32 w RAM), dokładny kosinus tylko dla nich.
+# Konwersja float16 → float32 całej macierzy (nie mnożenie) dominuje czas: 100k × 384 ≈ 130 ms vs ≈ 8 ms dwuetapowo.
+EXACT_SEARCH_LIMIT = 20000
+PROJECTION_DIM = 128
+CANDIDATES = 512
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbedder:
+    """
+    Osadzenia bez modelu: trigramy znaków słów haszowane do EMBEDDING_DIM kubełków (ze znakiem), znormalizowane L2.
+    Łapie wspólne słowa i ich odmiany („zioła” ~ „ziół”), nie łapie synonimów — to zapas na brak sentence-transformers.
+    """
+    name = "hashing"
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in WORD.findall(text.lower()):
+                padded = f"<{word}>"
+                for i in range(max(1, len(padded) - 2)):
+                    h = zlib.crc32(padded[i:i + 3].encode("utf-8"))
+                    out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-6)
+
+
+class SentenceTransformerEmbedder:
+    """Mały model osadzeń na CPU (np. MiniLM, 384 wymiary). Wymaga: pip install sentence-transformers"""
+
+    def __init__(self, model_name, batch_size=32):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        return self.model.encode(
+            list(texts), batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+def create_embedder(name="hashing"):
+    if name == "hashing":
+        return HashingEmbedder()
+    try:
+        return SentenceTransformerEmbedder(name)
+    except ImportError:
+        print("⚠️ MEMORY_EMBEDDER wymaga pakietu sentence-transformers — używam osadzeń haszowanych")
+        return HashingEmbedder()
+
+
+class LongTermMemory:
+    """
+    Wiadomości jednej sesji jako macierz float16 (n × dim) w pliku <sesja>.f16 otwieranym przez np.memmap
+    oraz treści w <sesja>.jsonl (dopisywane). Po restarcie pamięć wraca z dysku bez ponownego osadzania.
+
+    - add(): wiadomość trafia do kolejki, osadzana jest partiami (flush przy batch_size albo przy wyszukiwaniu),
+    - search(): iloczyn macierz × wektor (kosinus, bo wektory są znormalizowane) + argpartition po top-k,
+      z pominięciem ostatnich wiadomości, które i tak są w promptcie; przy dużej sesji najpierw kandydaci
+      z rzutu losowego do PROJECTION_DIM wymiarów (trzymanego w RAM), potem dokładny wynik tylko dla nich.
+    Plik rośnie skokami (podwajanie pojemności), więc dopisywanie nie kopiuje całej macierzy.
+    """
+
+    def __init__(self, session_id, embedder, directory="memory", batch_size=32, initial_capacity=1024):
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.batch_size = batch_size
+        self.vectors_path = os.path.join(directory, f"{session_id}.f16")
+        self.texts_path = os.path.join(directory, f"{session_id}.jsonl")
+        self.meta_path = os.path.join(directory, f"{session_id}.json")
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.messages = []
+        self.pending = []
+        self.count = 0
+        self.matrix = None
+        # Stały (ziarno) rzut losowy — ten sam po restarcie, więc rzutowane wektory odtwarzamy z pliku
+        self.projection = (np.random.default_rng(0).standard_normal((self.dim, PROJECTION_DIM))
+                           / np.sqrt(PROJECTION_DIM)).astype(np.float32)
+        self.projected = np.empty((0, PROJECTION_DIM), dtype=np.float32)
+        self._load(initial_capacity)
+
+    def _load(self, initial_capacity):
+        meta = {}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        if meta.get("embedder") not in (None, self.embedder.name) or meta.get("dim", self.dim) != self.dim:
+            # Inny model osadzeń → stare wektory są bezużyteczne; treści zostają i zostaną osadzone ponownie
+            print(f"⚠️ Pamięć {self.vectors_path}: zmiana modelu osadzeń, przeliczam wektory")
+            meta = {"count": 0}
+        if os.path.exists(self.texts_path):
+            with open(self.texts_path, "r", encoding="utf-8") as f:
+                self.messages = [json.loads(line) for line in f if line.strip()]
+        self.count = min(meta.get("count", 0), len(self.messages))
+        capacity = max(initial_capacity, self.count)
+        if self.count and os.path.exists(self.vectors_path):
+            capacity = max(capacity, os.path.getsize(self.vectors_path) // (2 * self.dim))
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+        else:
+            self.count = 0
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float16, mode="w+", shape=(capacity, self.dim))
+        # wiadomości zapisane, ale jeszcze nieosadzone (np. przerwany proces) → do kolejki
+        self.pending = list(range(self.count, len(self.messages)))
+        self.projected = np.empty((capacity, PROJECTION_DIM), dtype=np.float32)
+        for start in range(0, self.count, SEARCH_CHUNK):
+            end = min(start + SEARCH_CHUNK, self.count)
+            self.projected[start:end] = self.matrix[start:end].astype(np.float32) @ self.projection
+
+    def _grow(self, needed):
+        capacity = self.matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.matrix.flush()
+        del self.matrix
+        with open(self.vectors_path, "r+b") as f:
+            f.truncate(capacity * self.dim * 2)
+        self.matrix = np.memmap(self.vectors_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+        projected = np.empty((capacity, PROJECTION_DIM), dtype=np.float32)
+        projected[:self.count] = self.projected[:self.count]
+        self.projected = projected
+
+    def add(self, sender, text):
+        if not text or not text.strip():
+            return
+        with self._lock:
+            message = {"sender": sender, "text": text}
+            self.messages.append(message)
+            with open(self.texts_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(message, ensure_ascii=False) + "\n")
+            self.pending.append(len(self.messages) - 1)
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        start = self.count
+        vectors = self.embedder.embed([self.messages[i]["text"] for i in self.pending])
+        self._grow(start + len(vectors))
+        self.matrix[start:start + len(vectors)] = vectors.astype(np.float16)
+        self.projected[start:start + len(vectors)] = vectors @ self.projection
+        self.count = start + len(vectors)
+        self.pending = []
+        self.matrix.flush()
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({"count": self.count, "dim": self.dim, "embedder": self.embedder.name}, f)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def search(self, query, k=3, exclude_recent=6, min_score=0.0):
+        """Top-k wcześniejszych wiadomości najbliższych zapytaniu: [{sender, text, score, index}] od najlepszej."""
+        with self._lock:
+            self._flush()
+            limit = self.count - exclude_recent
+            if limit <= 0 or k <= 0:
+                return []
+            q = self.embedder.embed([query])[0].astype(np.float32)
+            if limit > EXACT_SEARCH_LIMIT:
+                coarse = self.projected[:limit] @ (q @ self.projection)
+                rows = np.sort(np.argpartition(-coarse, CANDIDATES)[:CANDIDATES])
+                scores = self.matrix[rows].astype(np.float32) @ q
+            else:
+                rows = None
+                scores = np.empty(limit, dtype=np.float32)
+                for start in range(0, limit, SEARCH_CHUNK):
+                    end = min(start + SEARCH_CHUNK, limit)
+                    scores[start:end] = self.matrix[start:end].astype(np.float32) @ q
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = []
+            for j in top:
+                if scores[j] < min_score:
+                    break
+                i = int(rows[j]) if rows is not None else int(j)
+                results.append(dict(self.messages[i], score=round(float(scores[j]), 4), index=i))
+            return results
+
+    def __len__(self):
+        return len(self.messages)
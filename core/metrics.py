@@ -0,0 +1,195 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Przedziały histogramów (sekundy / tokeny na sekundę) — dobrane pod 7B: od ms tokenizacji po minuty kolejki
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+RATE_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 50, 75, 100, 200)
+
+log = logging.getLogger("chat.metrics")
+
+
+class Histogram:
+    """Histogram w formacie Prometheusa, opcjonalnie z jedną etykietą (np. phase)."""
+
+    def __init__(self, name, help_text, buckets, label=None):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label = label
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, label_value=None):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(label_value, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        for label_value, (counts, total, count) in sorted(snapshot.items(), key=lambda kv: str(kv[0])):
+            base = f'{self.label}="{label_value}",' if self.label else ""
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                lines.append(f'{self.name}_bucket{{{base}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base}le="+Inf"}} {count}')
+            suffix = f"{{{base.rstrip(',')}}}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {total:.6f}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return "\n".join(lines)
+
+
+class Counter:
+    def __init__(self, name, help_text, label=None):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value=None, amount=1):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda kv: str(kv[0]))
+        for label_value, value in items:
+            suffix = f'{{{self.label}="{label_value}"}}' if self.label else ""
+            lines.append(f"{self.name}{suffix} {value}")
+        return "\n".join(lines)
+
+
+class RequestTimer:
+    """
+    Pomiar jednego żądania w podziale na fazy.
+    Fazy mogą się powtarzać (np. dwa razy tokenize przy retry) — czasy się sumują.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.ttft = None
+        self.new_tokens = 0
+        self.quality = None
+        # P(EOS) na ostatnim kroku ostatniej generacji (backend) — cecha klasyfikatora jakości (core/quality.py)
+        self.eos_prob = None
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    # Fazy oczekiwania w kolejce: executor_wait — pula wątków trybu ASGI, slot_wait — semafor slotów generacji
+    QUEUE_PHASES = ("executor_wait", "slot_wait")
+
+    @property
+    def queue_wait(self):
+        """Łączny czas w kolejce przed generacją (suma faz QUEUE_PHASES) albo None, gdy żądanie nie czekało na model."""
+        waits = [self.phases[name] for name in self.QUEUE_PHASES if name in self.phases]
+        return sum(waits) if waits else None
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def tokens_per_second(self):
+        decode = self.phases.get("decode", 0.0) + self.phases.get("prefill", 0.0)
+        return self.new_tokens / decode if decode > 0 and self.new_tokens else None
+
+    def to_dict(self):
+        return {
+            "endpoint": self.endpoint,
+            "total_s": round(self.total, 4),
+            "phases_s": {k: round(v, 4) for k, v in self.phases.items()},
+            "ttft_s": round(self.ttft, 4) if self.ttft is not None else None,
+            "new_tokens": self.new_tokens,
+            "tokens_per_s": round(self.tokens_per_second, 2) if self.tokens_per_second else None,
+            "quality": self.quality,
+        }
+
+
+class TimingCriteria:
+    """
+    „Kryterium stopu”, które nigdy nie zatrzymuje — służy tylko jako zegar:
+    pierwsze wywołanie następuje po prefillu i pierwszym tokenie (TTFT),
+    każde kolejne po jednym kroku dekodowania.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.last_token_at = None
+        self.steps = 0
+
+    def __call__(self, input_ids, scores=None, **kwargs):
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self.last_token_at = now
+        self.steps += 1
+        if hasattr(input_ids, "shape") and hasattr(input_ids, "device"):
+            import torch
+            return torch.zeros((input_ids.shape[0],), dtype=torch.bool, device=input_ids.device)
+        return False
+
+    def report(self, timer, finished_at):
+        if self.first_token_at is None:
+            timer.add("prefill", finished_at - self.started)
+            return
+        timer.add("prefill", self.first_token_at - self.started)
+        timer.add("decode", finished_at - self.first_token_at)
+        if timer.ttft is None:
+            timer.ttft = self.first_token_at - self.started
+        timer.new_tokens += self.steps
+
+
+class Metrics:
+    def __init__(self, json_log=False):
+        self.json_log = json_log
+        self.requests = Counter("chat_requests_total", "Liczba obsłużonych żądań", label="endpoint")
+        self.quality = Counter("chat_responses_total", "Odpowiedzi wg jakości", label="quality")
+        self.request_seconds = Histogram("chat_request_seconds", "Czas całego żądania", LATENCY_BUCKETS, label="endpoint")
+        self.phase_seconds = Histogram("chat_phase_seconds", "Czas faz żądania", LATENCY_BUCKETS, label="phase")
+        self.ttft_seconds = Histogram("chat_ttft_seconds", "Czas do pierwszego tokenu", LATENCY_BUCKETS)
+        self.queue_wait_seconds = Histogram("chat_queue_wait_seconds", "Czas w kolejce przed generacją (pula ASGI + slot)", LATENCY_BUCKETS)
+        self.tokens_per_second = Histogram("chat_tokens_per_second", "Tokeny na sekundę generacji (prefill + dekodowanie)", RATE_BUCKETS)
+
+    def observe(self, timer: RequestTimer):
+        self.requests.inc(timer.endpoint)
+        self.request_seconds.observe(timer.total, timer.endpoint)
+        for name, seconds in timer.phases.items():
+            self.phase_seconds.observe(seconds, name)
+        if timer.queue_wait is not None:
+            self.queue_wait_seconds.observe(timer.queue_wait)
+        if timer.ttft is not None:
+            self.ttft_seconds.observe(timer.ttft)
+        if timer.tokens_per_second:
+            self.tokens_per_second.observe(timer.tokens_per_second)
+        if timer.quality:
+            self.quality.inc(timer.quality)
+        if self.json_log:
+            log.info(json.dumps(timer.to_dict(), ensure_ascii=False))
+
+    def render(self):
+        parts = [self.requests, self.quality, self.request_seconds, self.phase_seconds,
+                 self.ttft_seconds, self.queue_wait_seconds, self.tokens_per_second]
+        return "\n".join(p.render() for p in parts) + "\n"
@@ -1,10 +1,25 @@
 import random
 
+from core.location import SceneCatalog
+
 class NarrativeEngine:
-    def __init__(self, characters, location):
+    def __init__(self, characters, location, chat=None, memory=None, memory_options=None, lore=None, lore_options=None,
+                 scenes=None, tagger=None):
         self.characters = {char.name: char for char in characters}
+        # domyślna lokacja; bieżąca scena rozmowy jest w SessionMemory.location i przychodzi do build_prompt
         self.location = location
+        # SceneCatalog — bloki sceny skompilowane raz na lokację; TagEngine z kategorią "location" do wykrywania zmiany sceny
+        self.scenes = scenes or SceneCatalog([location])
+        self.tagger = tagger
         self.queue = []
+        # ChatPromptRenderer (PROMPT_MODE=chat) albo None — dotychczasowy format "### ODPOWIEDŹ\nPostać:"
+        self.chat = chat
+        # LongTermMemory + opcje wyszukiwania (k, exclude_recent, min_score) — None = bez wspomnień w promptcie
+        self.memory = memory
+        self.memory_options = memory_options or {}
+        # LoreIndex + opcje doboru (budget, k) — None = bez wiedzy o świecie w promptcie
+        self.lore = lore
+        self.lore_options = lore_options or {}
 
 
     def detect_target(self, user_input: str) -> str:
@@ -13,12 +28,74 @@ class NarrativeEngine:
                 return name
         return list(self.characters.keys())[0]
 
-    def build_prompt(self, user_input: str, summary: str, history: list) -> tuple:
+    def detect_location(self, user_input: str):
+        """Lokacja wspomniana w wejściu użytkownika (tagi kategorii "location") — tylko taka, którą znamy z katalogu."""
+        if self.tagger is None:
+            return None
+        key = self.tagger.detect(user_input, "location")
+        return self.scenes.get(key) if key else None
+
+    def prompt_prefix(self, character_name: str, location=None):
+        """
+        Stały początek promptu dla pary (postać, lokacja): nagłówek persony + blok sceny.
+        Backend może trzymać dla niego gotowy stan KV (PREFIX_CACHE_SIZE); w trybie czatu persona jest wewnątrz
+        szablonu tokenizera, więc prefiksu nie podajemy.
+        """
+        if self.chat is not None:
+            return None
+        character = self.characters[character_name]
+        if character.persona_header is None:
+            character.compile()
+        return character.persona_header + self.scenes.block(location or self.location)
+
+    def build_prompt(self, user_input: str, summary: str, history: list, location=None) -> tuple:
+        location = location or self.location
+        scene = self.scenes.block(location)
         target = self.detect_target(user_input)
         self.queue = [target] + random.sample(
             [n for n in self.characters if n != target], k=min(2, len(self.characters) - 1)
         )
         character = self.characters[target]
-        prompt = character.generate_prompt(user_input, "", history)
+        memories = self.recall(user_input, history)
+        lore = self.lookup(user_input, history, character.name, location.name)
+        if self.chat is not None:
+            prompt = self.chat.render(character.generate_messages(user_input, "", history, memories, lore, scene))
+        else:
+            prompt = character.generate_prompt(user_input, "", history, memories, lore, scene)
 
         return prompt, character.name
+
+    def recall(self, user_input: str, history: list) -> list:
+        """Najtrafniejsze starsze wiadomości z pamięci długoterminowej (bez tych, które już są w historii promptu)."""
+        if self.memory is None:
+            return []
+        recent = {msg["text"] for msg in history}
+        return [m for m in self.memory.search(user_input, **self.memory_options) if m["text"] not in recent]
+
+    def lookup(self, user_input: str, history: list, target: str, location_name: str = "") -> list:
+        """
+        Lore do tej tury: zapytanie = wejście użytkownika + ostatnia wiadomość (zaimki, „tam”, „ona” odnoszą się do niej).
+        Karta aktywnej postaci i bieżącej lokacji są już w promptcie (persona, scena), więc ich fragmenty pomijamy.
+        """
+        if self.lore is None:
+            return []
+        query = f"{history[-1]['text']} {user_input}" if history else user_input
+        return self.lore.select(query, exclude_titles=(target, location_name), **self.lore_options)
+
+    def generation_options(self) -> dict:
+        """
+        Opcje backend.generate zależne od formatu promptu: prompt z szablonu czatu ma już tokeny specjalne (BOS),
+        a z wyjścia bierzemy tylko nowe tokeny — bez cięcia pełnego tekstu po „Postać:”.
+        """
+        if self.chat is not None:
+            return {"return_prompt": False, "add_special_tokens": False}
+        return {}
+
+    def extract_response(self, raw_output: str, character_name: str) -> str:
+        if self.chat is not None:
+            response = raw_output.strip()
+            # model czasem sam zaczyna od „Imię:” — zdejmujemy tylko taki prefiks
+            if response.startswith(f"{character_name}:"):
+                response = response[len(character_name) + 1:].strip()
+            return response
+        return raw_output.split(f"{character_name}:")[-1].strip()
@@ -0,0 +1,198 @@
+import json
+import os
+import string
+import threading
+
+# Format promptu postaci — plik JSON per język/model (prompts/pl.json, ...), wybierany zmienną środowiskową:
+#   PROMPT_TEMPLATE=prompts/pl.json   (ścieżka)   albo   PROMPT_TEMPLATE=pl   (nazwa pliku w prompts/)
+# Zmiana formatu promptu = nowy plik szablonu, bez zmian w kodzie.
+PROMPT_TEMPLATE = os.environ.get("PROMPT_TEMPLATE", "pl")
+PROMPTS_DIR = "prompts"
+
+
+CONVERSIONS = {None: lambda value: value, "s": str, "r": repr, "a": ascii}
+
+
+def compile_fragment(text, params, name="fragment"):
+    """
+    Fragment w składni str.format → funkcja przyjmująca wartości pól `params` (pozycyjnie).
+    Szablon jest parsowany raz, przy wczytaniu, na listę (tekst, nr pola, format, konwersja); wywołanie tylko
+    skleja gotowe części. Pole spoza `params` to błąd szablonu, zgłaszany przy wczytaniu, a nie w trakcie rozmowy.
+    """
+    index = {param: i for i, param in enumerate(params)}
+    parts = []
+    for literal, field, spec, conversion in string.Formatter().parse(text):
+        if field is None:
+            parts.append((literal, None, "", None))
+            continue
+        if field not in index:
+            raise ValueError(f"Nieznane pole {{{field}}} we fragmencie '{name}' (dozwolone: {', '.join(params)})")
+        if "{" in (spec or ""):
+            raise ValueError(f"Nieobsługiwana specyfikacja pola {{{field}}} we fragmencie '{name}'")
+        parts.append((literal, index[field], spec or "", CONVERSIONS[conversion]))
+
+    def render(*values):
+        out = []
+        for literal, i, spec, convert in parts:
+            out.append(literal)
+            if i is not None:
+                out.append(format(convert(values[i]), spec))
+        return "".join(out)
+
+    return render
+
+
+class PromptTemplate:
+    """
+    Szablon promptu rozdzielony na trzy części:
+    - nagłówek persony (header + backstory + relationships) — zależy tylko od postaci,
+      więc Character kompiluje go raz i trzyma gotowy string,
+    - blok sceny (location) — zależy tylko od lokacji, kompilowany raz w SceneCatalog,
+    - ogon tury (summary + history + tail) — jedyna praca wykonywana przy każdym żądaniu.
+    Pola to zwykłe str.format; literalne klamry w szablonie zapisuje się jako {{ }}.
+    Każdy fragment jest parsowany raz, przy wczytaniu szablonu (compile_fragment).
+    """
+
+    # fragment → pola, których może używać (w tej kolejności przekazywane są do skompilowanej funkcji)
+    FRAGMENTS = {
+        "header": ("name", "race", "role", "style", "tone", "emotions"),
+        "backstory": ("backstory",),
+        "relationships": ("relationships",),
+        "relationship": ("name", "relation"),
+        "summary": ("summary",),
+        "history": ("sender", "text"),
+        "tail": ("user_input", "name"),
+        "memories": ("memories",),
+        "memory": ("sender", "text"),
+        "lore": ("lore",),
+        "lore_entry": ("title", "text"),
+        "location": ("name", "context"),
+    }
+    # Fragmenty dodane później — starsze pliki szablonów działają bez nich
+    DEFAULTS = {
+        "memories": "\n### WSPOMNIENIA\n{memories}\n",
+        "memory": "- {sender}: {text}",
+        "lore": "\n### ŚWIAT\n{lore}\n",
+        "lore_entry": "- {title}: {text}",
+        "location": "\n### SCENA\n{context}\n",
+    }
+
+    def __init__(self, parts, name="pl"):
+        parts = dict(self.DEFAULTS, **parts)
+        missing = [key for key in self.FRAGMENTS if key not in parts]
+        if missing:
+            raise ValueError(f"Szablon promptu '{name}' nie ma pól: {', '.join(missing)}")
+        self.name = name
+        self.parts = parts
+        self.render = {key: compile_fragment(parts[key], params, f"{name}.{key}") for key, params in self.FRAGMENTS.items()}
+        self.user_sender = parts.get("user_sender", "Użytkownik")
+        self.relationship_separator = parts.get("relationship_separator", "\n")
+        self.emotion_separator = parts.get("emotion_separator", ", ")
+        self.history_window = int(parts.get("history_window", 6))
+
+    @staticmethod
+    def from_file(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return PromptTemplate(json.load(f), name=os.path.splitext(os.path.basename(path))[0])
+
+    def render_header(self, character) -> str:
+        r = self.render
+        pieces = [r["header"](
+            character.name,
+            character.race,
+            character.role,
+            character.style,
+            character.tone,
+            self.emotion_separator.join(character.emotions),
+        )]
+        if character.backstory:
+            pieces.append(r["backstory"](character.backstory))
+        if character.relationships:
+            relationship = r["relationship"]
+            rels = self.relationship_separator.join(relationship(k, v) for k, v in character.relationships.items())
+            pieces.append(r["relationships"](rels))
+        return "".join(pieces)
+
+    def render_location(self, location) -> str:
+        return self.render["location"](location.name, location.get_context())
+
+    def render_memories(self, memories) -> str:
+        memory = self.render["memory"]
+        return self.render["memories"]("\n".join(memory(m["sender"], m["text"]) for m in memories))
+
+    def render_lore(self, lore) -> str:
+        entry = self.render["lore_entry"]
+        return self.render["lore"]("\n".join(entry(chunk["title"], chunk["text"]) for chunk in lore))
+
+    def render_turn(self, name, user_input, summary="", history=(), memories=(), lore=()) -> str:
+        r = self.render
+        pieces = [r["summary"](summary)] if summary else []
+        if lore:
+            # wiedza o świecie dobrana do tej tury (core.lore) — tylko fragmenty w limicie tokenów
+            pieces.append(self.render_lore(lore))
+        if memories:
+            # wspomnienia (pamięć długoterminowa) przed bieżącą historią — starszy kontekst, potem ostatnie tury
+            pieces.append(self.render_memories(memories))
+        line = r["history"]
+        seen = set()
+        for msg in history[-self.history_window:]:
+            text = msg["text"]
+            if text not in seen:
+                pieces.append(line(msg["sender"], text))
+                seen.add(text)
+        pieces.append(r["tail"](user_input, name))
+        return "".join(pieces)
+
+    def render_messages(self, name, header, user_input, summary="", history=(), memories=(), lore=(), scene="") -> list:
+        """
+        Ta sama treść co render_turn, ale jako wiadomości czatu (tryb PROMPT_MODE=chat):
+        system = nagłówek persony + scena + streszczenie, wypowiedzi postaci → assistant,
+        użytkownik → user, inne postacie → user z prefiksem „Imię: ”.
+        """
+        system = header.rstrip("\n") + scene.rstrip("\n")
+        if summary:
+            system += self.render["summary"](summary).rstrip("\n")
+        if lore:
+            system += self.render_lore(lore).rstrip("\n")
+        if memories:
+            system += self.render_memories(memories).rstrip("\n")
+        messages = [{"role": "system", "content": system}]
+        seen = set()
+        for msg in history[-self.history_window:]:
+            text = msg["text"]
+            if text in seen:
+                continue
+            seen.add(text)
+            sender = msg["sender"]
+            if sender == name:
+                # szablony czatu zaczynają rozmowę od użytkownika — wcześniejszą wypowiedź postaci podajemy jako kontekst
+                role, content = ("assistant", text) if len(messages) > 1 else ("user", f"{sender}: {text}")
+            elif sender == self.user_sender:
+                role, content = "user", text
+            else:
+                role, content = "user", f"{sender}: {text}"
+            messages.append({"role": role, "content": content})
+        messages.append({"role": "user", "content": user_input})
+        return messages
+
+
+def resolve_template_path(name_or_path):
+    if os.path.isfile(name_or_path):
+        return name_or_path
+    return os.path.join(PROMPTS_DIR, f"{name_or_path}.json")
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_template(name_or_path=None) -> PromptTemplate:
+    """Szablon wczytany raz na proces (per ścieżka)."""
+    path = resolve_template_path(name_or_path or PROMPT_TEMPLATE)
+    template = _templates.get(path)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(path)
+            if template is None:
+                template = _templates[path] = PromptTemplate.from_file(path)
+    return template
@@ -0,0 +1,257 @@
+import json
+import math
+import os
+import random
+import re
+
+import numpy as np
+
+# 🩺 Ocena jakości odpowiedzi: czy odpowiedź jest urwana (→ retry_if_empty), z pewnością wyniku.
+# Zamiast kilku sztywnych reguł (detect_incomplete_response) — cechy tekstu + prawdopodobieństwo EOS z modelu
+# i mała regresja logistyczna (CPU, numpy), trenowana na ratings/ uzupełnionych syntetycznymi przykładami.
+#   QUALITY_CLASSIFIER=1 (opt-in), QUALITY_MODEL=<plik JSON z wagami>, QUALITY_THRESHOLD=0.5
+WORD = re.compile(r"\w+", re.UNICODE)
+TERMINAL = (".", "!", "?", "…", "*", '"', "”", "»", ")", "~")
+CONTINUATION = (",", ":", ";", "-", "–", "—", "(", "„", "«")
+# Słowa, na których polskie zdanie nie kończy się bez kropki — koniec odpowiedzi na nich to niemal zawsze cięcie
+DANGLING = frozenset((
+    "i", "a", "w", "z", "ze", "we", "na", "do", "od", "po", "o", "u", "za", "przy", "pod", "nad", "przez", "dla",
+    "bez", "ku", "że", "żeby", "aby", "by", "bo", "ale", "oraz", "lub", "albo", "czy", "gdy", "kiedy", "jak", "jakby",
+    "który", "która", "które", "którego", "której", "jej", "jego", "ich", "swoje", "swoją", "ten", "ta", "tę",
+    "się", "nie", "jest", "był", "była", "jeszcze", "bardzo", "tak", "to",
+))
+FEATURES = (
+    "empty", "words_log", "short", "ends_terminal", "ends_ellipsis", "ends_continuation", "ends_alnum",
+    "dangling", "odd_asterisks", "open_quote", "tail_fraction", "distinct_ratio", "eos_prob", "has_eos",
+)
+SEED = 1234
+
+
+def response_features(text, eos_prob=None):
+    """Jeden wiersz cech (kolejność jak FEATURES) — tylko operacje na końcówce i jeden przebieg po słowach."""
+    stripped = text.strip()
+    words = WORD.findall(stripped.lower())
+    n = len(words)
+    ends_terminal = stripped.endswith(TERMINAL)
+    last_terminal = max(stripped.rfind(ch) for ch in ".!?…")
+    return (
+        float(not stripped),
+        math.log1p(n),
+        float(n < 5),
+        float(ends_terminal),
+        float(stripped.endswith(("...", "…"))),
+        float(stripped.endswith(CONTINUATION)),
+        float(bool(stripped) and stripped[-1].isalnum()),
+        float(not ends_terminal and n > 0 and words[-1] in DANGLING),
+        float(stripped.count("*") % 2 == 1),
+        float(stripped.count("„") > stripped.count("”") or stripped.count('"') % 2 == 1),
+        0.0 if ends_terminal or not stripped else (len(stripped) - last_terminal - 1) / len(stripped),
+        len(set(words)) / n if n else 1.0,
+        eos_prob if eos_prob is not None else 0.0,
+        float(eos_prob is not None),
+    )
+
+
+def feature_matrix(texts, eos_probs=None):
+    if eos_probs is None:
+        eos_probs = [None] * len(texts)
+    return np.array([response_features(t, p) for t, p in zip(texts, eos_probs)], dtype=np.float64).reshape(-1, len(FEATURES))
+
+
+class QualityModel:
+    """
+    Regresja logistyczna P(odpowiedź urwana | cechy) na standaryzowanych cechach.
+    Trening: Newton (IRLS) z regularyzacją L2 — przy kilkunastu cechach to kilka mnożeń macierzy 14×14.
+    """
+
+    def __init__(self, weights=None, bias=0.0, means=None, scales=None):
+        dim = len(FEATURES)
+        self.weights = np.zeros(dim) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.means = np.zeros(dim) if means is None else np.asarray(means, dtype=np.float64)
+        self.scales = np.ones(dim) if scales is None else np.asarray(scales, dtype=np.float64)
+
+    def fit(self, X, y, l2=1.0, iterations=25):
+        self.means = X.mean(axis=0)
+        self.scales = np.where(X.std(axis=0) > 1e-9, X.std(axis=0), 1.0)
+        Z = np.hstack([np.ones((len(X), 1)), (X - self.means) / self.scales])
+        theta = np.zeros(Z.shape[1])
+        penalty = np.eye(Z.shape[1]) * l2
+        penalty[0, 0] = 0.0  # bez kary dla wyrazu wolnego
+        for _ in range(iterations):
+            p = 1.0 / (1.0 + np.exp(-np.clip(Z @ theta, -30, 30)))
+            gradient = Z.T @ (p - y) + penalty @ theta
+            hessian = (Z * (p * (1 - p))[:, None]).T @ Z + penalty
+            step = np.linalg.solve(hessian, gradient)
+            theta -= step
+            if np.abs(step).max() < 1e-6:
+                break
+        self.bias, self.weights = float(theta[0]), theta[1:]
+        return self
+
+    def predict_proba(self, X):
+        logits = ((X - self.means) / self.scales) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-np.clip(logits, -30, 30)))
+
+    def to_dict(self):
+        return {
+            "features": list(FEATURES),
+            "weights": self.weights.round(6).tolist(),
+            "bias": round(self.bias, 6),
+            "means": self.means.round(6).tolist(),
+            "scales": self.scales.round(6).tolist(),
+        }
+
+    @staticmethod
+    def from_dict(data):
+        if list(data.get("features", [])) != list(FEATURES):
+            raise ValueError("Model jakości ma inny zestaw cech — trzeba go wytrenować ponownie")
+        return QualityModel(data["weights"], data["bias"], data["means"], data["scales"])
+
+
+# Syntetyczne odpowiedzi RP (pełne i urwane) — start klasyfikatora, zanim ratings/ urośnie
+VOCABULARY = (
+    "las", "szumi", "cicho", "ścieżka", "prowadzi", "dalej", "mrok", "uśmiecha", "wskazuje", "drogę", "polany",
+    "elfka", "zioła", "rana", "ogień", "noc", "gwiazdy", "strażnik", "spogląda", "delikatnie", "dotyka", "dłoni",
+    "szepcze", "rzeka", "zamek", "mgła", "wiatr", "Lytha", "Hestia", "opatruje", "uważnie", "serce", "spokojnie",
+)
+OPENERS = ("", "Lytha ", "Elfka ", "Hestia ", "Ona ")
+
+
+def synthetic_sentence(rng):
+    body = rng.choice(OPENERS) + " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(3, 14)))
+    body = body[0].upper() + body[1:]
+    style = rng.random()
+    if style < 0.15:
+        return f"*{body.lower()}*"
+    if style < 0.3:
+        return f"„{body}{rng.choice(('.', '!', '?', ''))}”"
+    if style < 0.35:
+        # myślnik i wielokropek w środku wypowiedzi są poprawne, tylko na końcu bywają cięciem
+        return f"{body} — {rng.choice(VOCABULARY)}... {rng.choice(VOCABULARY)}."
+    if style < 0.45:
+        body += f", {rng.choice(sorted(DANGLING))} {rng.choice(VOCABULARY)} {rng.choice(VOCABULARY)}"
+    return body + rng.choice((".", ".", ".", "!", "?", "...", "…"))
+
+
+def synthetic_response(rng):
+    if rng.random() < 0.12:
+        # krótkie, ale pełne odpowiedzi („Tak.”, „Chodźmy!”) — tu stara heurystyka (< 5 słów) się myli
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(1, 4))]
+        return " ".join(words).capitalize() + rng.choice((".", "!", "?", "…"))
+    return " ".join(synthetic_sentence(rng) for _ in range(rng.randint(1, 4)))
+
+
+def truncate(text, rng):
+    """Odpowiedź urwana w losowym miejscu (jak po max_new_tokens), czasem tuż po przecinku albo spójniku."""
+    words = text.split()
+    if len(words) < 3:
+        return text.rstrip(".!?…*”") + rng.choice(("", ",", " i"))
+    cut = " ".join(words[:rng.randint(1, len(words) - 1)])
+    if rng.random() < 0.3:
+        cut += " " + rng.choice(sorted(DANGLING))
+    return cut.rstrip(".!?…*") if cut.endswith(TERMINAL) and rng.random() < 0.8 else cut
+
+
+def synthetic_examples(n, rng, eos_rate=0.5):
+    """(teksty, P(EOS) albo None, etykiety 1 = urwana). P(EOS) symulowane: pełna ~Beta(8,2), urwana ~Beta(2,8)."""
+    texts, eos, labels = [], [], []
+    for _ in range(n):
+        complete = synthetic_response(rng)
+        cut = rng.random() < 0.4
+        texts.append(truncate(complete, rng) if cut else complete)
+        labels.append(int(cut))
+        if rng.random() < eos_rate:
+            eos.append(rng.betavariate(2, 8) if cut else rng.betavariate(8, 2))
+        else:
+            eos.append(None)
+    return texts, eos, labels
+
+
+def load_ratings(directory):
+    """
+    Przykłady z ratings/ (zapisy /rate i /edit):
+    - edycja, która dopisuje ciąg dalszy do oryginału → oryginał urwany (1), wersja po edycji pełna (0),
+    - inna edycja → tylko wersja po edycji (0),
+    - ocena bez edycji ze średnią ≥ 4 → pełna (0). Niskie oceny dotyczą stylu, nie urwania — pomijamy.
+    """
+    texts, labels = [], []
+    if not os.path.isdir(directory):
+        return texts, labels
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        response = (data.get("response") or "").strip()
+        original = (data.get("original") or "").strip()
+        ratings = [v for v in (data.get("ratings") or {}).values() if isinstance(v, (int, float))]
+        if original:
+            if response:
+                texts.append(response)
+                labels.append(0)
+            if response != original and response.startswith(original.rstrip(".…")):
+                texts.append(original)
+                labels.append(1)
+        elif response and ratings and sum(ratings) / len(ratings) >= 4:
+            texts.append(response)
+            labels.append(0)
+    return texts, labels
+
+
+class QualityClassifier:
+    """
+    Urwana / pełna / pusta odpowiedź z pewnością wyniku.
+    - score(): wiele odpowiedzi naraz — macierz cech × wagi (numpy), jedno wywołanie dla całej partii,
+    - assess(): jedna odpowiedź → {"quality": ok|cut|empty, "p_incomplete", "confidence"},
+    - is_incomplete(): zamiennik detect_incomplete_response dla retry_if_empty.
+    eos_prob (P(EOS) na ostatnim kroku generacji, RequestTimer.eos_prob) jest opcjonalne — bez niego model
+    ocenia sam tekst.
+    """
+
+    def __init__(self, model=None, threshold=0.5):
+        self.model = model
+        self.threshold = threshold
+
+    @staticmethod
+    def train(ratings_dir="ratings", synthetic=4000, seed=SEED, l2=1.0):
+        rng = random.Random(seed)
+        texts, eos, labels = synthetic_examples(synthetic, rng)
+        rated_texts, rated_labels = load_ratings(ratings_dir)
+        # przykłady z ocen ważą więcej niż syntetyczne — powielamy je (prościej niż wagi w IRLS)
+        repeat = max(1, synthetic // max(1, 4 * len(rated_texts))) if rated_texts else 0
+        texts += rated_texts * repeat
+        eos += [None] * (len(rated_texts) * repeat)
+        labels += rated_labels * repeat
+        model = QualityModel().fit(feature_matrix(texts, eos), np.array(labels, dtype=np.float64), l2=l2)
+        return QualityClassifier(model), len(rated_texts)
+
+    @staticmethod
+    def load(path, threshold=0.5):
+        with open(path, "r", encoding="utf-8") as f:
+            return QualityClassifier(QualityModel.from_dict(json.load(f)), threshold)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.model.to_dict(), f, indent=2)
+
+    def score(self, texts, eos_probs=None):
+        """P(urwana) dla każdej odpowiedzi (np.ndarray)."""
+        return self.model.predict_proba(feature_matrix(texts, eos_probs))
+
+    def assess(self, text, eos_prob=None):
+        if not text.strip():
+            return {"quality": "empty", "p_incomplete": 1.0, "confidence": 1.0}
+        p = float(self.score([text], [eos_prob])[0])
+        return {
+            "quality": "cut" if p >= self.threshold else "ok",
+            "p_incomplete": round(p, 4),
+            "confidence": round(max(p, 1.0 - p), 4),
+        }
+
+    def is_incomplete(self, text, eos_prob=None):
+        return not text.strip() or float(self.score([text], [eos_prob])[0]) >= self.threshold
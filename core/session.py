@@ -1,7 +1,11 @@
 class SessionMemory:
-    def __init__(self):
+    def __init__(self, long_term=None):
         self.history = []
         self.summary = ""
+        # core.memory.LongTermMemory (LONG_TERM_MEMORY=1) — każda wiadomość trafia też do pamięci wektorowej
+        self.long_term = long_term
+        # bieżąca scena rozmowy (core.location.Location); None = domyślna lokacja silnika narracyjnego
+        self.location = None
 
     def add_message(self, sender, text, quality="ok", ratings=None):
         self.history.append({
@@ -10,6 +14,8 @@ class SessionMemory:
             "quality": quality,
             "ratings": ratings or {}
         })
+        if self.long_term is not None and quality != "cancelled":
+            self.long_term.add(sender, text)
 
     def get_recent(self, n=4):
         return self.history[-n:]
@@ -25,7 +31,7 @@ class SessionMemory:
                 cleaned.append(msg)
                 seen.add(msg["text"])
         return cleaned[-3:]
-def summarize_chat(history, tokenizer, model):
+def summarize_chat(history, backend, cancel_event=None):
     recent = [f"{msg['sender']}: {msg['text']}" for msg in history[-6:]]
     prompt = (
         "Streść rozmowę między użytkownikiem a postacią lub postaciami RP w maksymalnie 3 zdaniach. "
@@ -34,22 +40,14 @@ def summarize_chat(history, tokenizer, model):
         + "\n\nStreszczenie:"
     )
 
-
-
-    inputs = tokenizer(prompt, return_tensors="pt", padding=True).to("cuda")
-    outputs = model.generate(
-        **inputs,
+    # Deterministycznie (greedy): streszczenie ma wiernie oddać historię, a ta sama historia → ten sam wynik,
+    # więc RESPONSE_CACHE może je zapamiętać
+    summary = backend.generate(
+        prompt,
+        cancel_event=cancel_event,
         max_new_tokens=100,
-        temperature=0.7,
-        top_p=0.9,
         repetition_penalty=1.2,
         no_repeat_ngram_size=3,
-        do_sample=True,
-        eos_token_id=tokenizer.eos_token_id,
-        pad_token_id=tokenizer.pad_token_id
-    )
-
-    summary = tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
+        do_sample=False
+    ).strip()
     return summary
-
-
@@ -1,12 +1,36 @@
 import json
 import os
+import re
 
 class TagEngine:
+    """
+    Reguły tagów: płaskie {"tag": [rdzenie]} albo z kategoriami {"kategoria": {"tag": [rdzenie]}} (core/tags.json).
+    extract_tags zwraca wszystkie pasujące tagi; detect(text, kategoria) — jeden tag z kategorii,
+    np. lokację wspomnianą przez użytkownika. Rdzenie kategorii są łączone w jedno wyrażenie regularne przy wczytaniu,
+    więc wykrycie to jedno przejście po tekście, niezależnie od liczby reguł. W detect rdzeń musi zaczynać słowo
+    („las” nie pasuje do „klasyczny”, „mur” do „Pomurnik”).
+    """
+
     def __init__(self, tag_file="tags.json"):
         self.rules = {}
+        self.categories = {}
         if os.path.exists(tag_file):
             with open(tag_file, "r", encoding="utf-8") as f:
-                self.rules = json.load(f)
+                self.load_rules(json.load(f))
+
+    def load_rules(self, data):
+        for key, value in data.items():
+            if isinstance(value, dict):
+                self.categories[key] = value
+                self.rules.update(value)
+            else:
+                self.rules[key] = value
+        self._patterns = {}
+        for category, rules in self.categories.items():
+            stems = {stem.lower(): tag for tag, tag_stems in rules.items() for stem in tag_stems}
+            # dłuższe rdzenie najpierw — przy wspólnym początku wygrywa bardziej szczegółowy
+            alternatives = "|".join(re.escape(stem) for stem in sorted(stems, key=len, reverse=True))
+            self._patterns[category] = (re.compile(rf"\b(?:{alternatives})"), stems) if stems else None
 
     def extract_tags(self, text: str) -> list:
         text = text.lower()
@@ -17,3 +41,12 @@ class TagEngine:
                     tags.add(tag)
                     break
         return list(tags)
+
+    def detect(self, text: str, category: str):
+        """Pierwszy (najwcześniej w tekście) tag z kategorii albo None."""
+        compiled = self._patterns.get(category) if self.categories else None
+        if compiled is None:
+            return None
+        pattern, stems = compiled
+        match = pattern.search(text.lower())
+        return stems[match.group()] if match else None
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class TraceRecorder:
+    """
+    Zapis zanonimizowanego śladu ruchu (opt-in): jedna linia JSON na żądanie, bez treści wiadomości.
+
+    - t: sekundy od przyjścia pierwszego nagranego żądania (przy współbieżności bywa lekko ujemne),
+    - conv: skrót identyfikatora klienta (nagłówek X-Conversation-Id albo adres IP) z losową solą procesu
+      — ten sam klient = ta sama rozmowa, ale identyfikatora nie da się odtworzyć,
+    - endpoint, status, długości (prompt_chars, prompt_tokens, edited_chars), @wzmianka,
+    - z RequestTimer: total_s, queue_wait_s, ttft_s, new_tokens, quality i czy było streszczenie.
+
+    Format jest nadzbiorem śladów benchmarks/loadgen.py, więc nagranie odtwarza się wprost:
+        python benchmarks/loadgen.py --trace traces/trace.jsonl --speeds 1 2 4
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.enabled = bool(path)
+        self.started = None
+        self._salt = os.urandom(16)
+        self._lock = threading.Lock()
+        self._file = None
+        if self.enabled:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def conversation_id(self, client):
+        return hashlib.sha1(self._salt + str(client).encode("utf-8")).hexdigest()[:10]
+
+    def record(self, endpoint, client, timer=None, status=200, **fields):
+        if not self.enabled:
+            return
+        # t = chwila przyjścia żądania (start RequestTimer), nie zakończenia — tak odtwarza je loadgen
+        now = timer.started if timer is not None else time.perf_counter()
+        with self._lock:
+            if self.started is None:
+                self.started = now
+        event = {"t": round(now - self.started, 3), "conv": self.conversation_id(client),
+                 "endpoint": endpoint, "status": status}
+        event.update({k: v for k, v in fields.items() if v is not None})
+        if timer is not None:
+            event["total_s"] = round(timer.total, 4)
+            if timer.queue_wait is not None:
+                event["queue_wait_s"] = round(timer.queue_wait, 4)
+            if timer.ttft is not None:
+                event["ttft_s"] = round(timer.ttft, 4)
+            if timer.new_tokens:
+                event["new_tokens"] = timer.new_tokens
+            if timer.quality:
+                event["quality"] = timer.quality
+            if "summarize" in timer.phases:
+                event["summary"] = True
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.close()
+                self._file = None
+            self.enabled = False
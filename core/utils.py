@@ -2,6 +2,9 @@ import os, json, uuid
 from datetime import datetime
 from core.tagger import TagEngine
 
+# Katalog ocen/edycji (dane do treningu); benchmarki kierują go do katalogu tymczasowego
+RATINGS_DIR = os.environ.get("RATINGS_DIR", "ratings")
+
 def detect_incomplete_response(response: str) -> bool:
     if not response.strip():
         return True
@@ -13,28 +16,33 @@ def detect_incomplete_response(response: str) -> bool:
         return True
     return False
 
-def retry_if_empty(response: str, prompt: str, tokenizer, model) -> str:
-    if detect_incomplete_response(response):
-        inputs = tokenizer(prompt, return_tensors="pt", padding=True).to("cuda")
-        outputs = model.generate(
-            **inputs,
+def retry_if_empty(response: str, prompt: str, backend, is_incomplete=detect_incomplete_response, extract=None,
+                   cancel_event=None, **prompt_options) -> str:
+    # prompt_options: opcje formatu promptu (NarrativeEngine.generation_options), np. tryb czatu
+    # is_incomplete: ocena odpowiedzi — heurystyka albo QualityClassifier.is_incomplete (core/quality.py)
+    # extract: wyjście modelu → sama odpowiedź (NarrativeEngine.extract_response); backend w trybie szablonu
+    #          zwraca prompt + odpowiedź, więc bez tego do historii trafiłby cały prompt
+    # cancel_event: flaga przerwania żądania — /cancel albo rozłączenie zatrzymuje też ponowną generację
+    if is_incomplete(response):
+        output = backend.generate(
+            prompt,
+            cancel_event=cancel_event,
+            **prompt_options,
             max_new_tokens=250,
             temperature=0.7,
             top_p=0.9,
             repetition_penalty=1.3,
             no_repeat_ngram_size=3,
             do_sample=True,
-            early_stopping=True,
-            eos_token_id=tokenizer.eos_token_id,
-            pad_token_id=tokenizer.pad_token_id
+            early_stopping=True
         )
-        return tokenizer.decode(outputs[0], skip_special_tokens=True, clean_up_tokenization_spaces=True).strip()
+        return extract(output) if extract is not None else output.strip()
     return response
 
 
 
-def save_rating_to_json(prompt, response, ratings, character_name, location_name, tags=None):
-    os.makedirs("ratings", exist_ok=True)
+def save_rating_to_json(prompt, response, ratings, character_name, location_name, tags=None, original=None):
+    os.makedirs(RATINGS_DIR, exist_ok=True)
 
     prompt = prompt.replace("Użytkownik", "{{user}}")
     response = response.replace("Użytkownik", "{{user}}")
@@ -53,7 +61,10 @@ def save_rating_to_json(prompt, response, ratings, character_name, location_name
         "ratings": ratings,
         "meta": meta
     }
+    if original is not None:
+        # odpowiedź modelu sprzed edycji — para (oryginał, poprawka) to przykład treningowy dla core/quality.py
+        data["original"] = original.replace("Użytkownik", "{{user}}")
 
-    filename = f"ratings/{uuid.uuid4().hex}.json"
+    filename = os.path.join(RATINGS_DIR, f"{uuid.uuid4().hex}.json")
     with open(filename, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
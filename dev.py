@@ -4,7 +4,21 @@ import json
 import os
 import random
 
+from core.images import ImageIndex
+from core.gallery import GalleryCollection, ThumbnailCache, create_gallery_blueprint
+from core.assets import AssetManifest, register_assets, register_precompressed
+
 app = Flask(__name__, template_folder="templates")
+register_assets(app, AssetManifest("static/data/manifest.json", "/static/data/"))
+register_precompressed(app)
+
+image_index = ImageIndex("static/NarrativeIMG", "/static/NarrativeIMG/")
+
+GALLERY_COLLECTIONS = [
+    GalleryCollection("resources", "static/resources", "/static/resources/"),
+    GalleryCollection("avatars", "static/NarrativeIMG/Avatars", "/static/NarrativeIMG/Avatars/"),
+]
+app.register_blueprint(create_gallery_blueprint(GALLERY_COLLECTIONS, ThumbnailCache("static/thumbs")))
 
 @app.route("/")
 def index():
@@ -115,5 +129,12 @@ def get_tags():
         return jsonify({ "error": "Nie można załadować tagów." }), 500
 
 
+@app.route("/images/resolve", methods=["GET"])
+def resolve_images():
+    tags = [t.strip() for t in request.args.get("tags", "").split(",") if t.strip()]
+    max_results = min(request.args.get("max", 4, type=int), 50)
+    return jsonify({"urls": image_index.resolve(tags, max_results)})
+
+
 if __name__ == "__main__":
     app.run(host="192.168.0.87", port=5000, debug=True)
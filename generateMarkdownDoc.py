@@ -1,19 +1,48 @@
 import os
+import json
+import hashlib
 
-TMP_DIR = "static/data/tmp/"
+# Fragmenty = strony generowane przez builderJS_New.py (zapisywane tylko po zmianie treści klasy)
+PAGES_DIR = "documentation/Pages/"
+SKIP_PAGES = {"_index.md", "copilot_navigate.md"}
 OUTPUT_FILE = "project-doc.md"
+# Stan poprzedniego scalenia: stat fragmentów → bez zmian nic nie czytamy ani nie zapisujemy
+STATE_FILE = ".build_cache/project_doc.json"
+
+# Dodatki na końcu dokumentu (opcjonalne — pomijane, jeśli pliku nie ma)
+DEVELOPMENT_FILE = "rozwój.md"
+PRE_REFACTOR_FILE = "./static/data/script_pre_refactor.js"
+
+def list_fragments():
+    fragments = []
+    for filename in sorted(os.listdir(PAGES_DIR)):
+        if filename.endswith(".md") and filename not in SKIP_PAGES:
+            st = os.stat(os.path.join(PAGES_DIR, filename))
+            fragments.append((filename, st.st_mtime_ns, st.st_size))
+    return fragments
+
+def fragments_signature(fragments):
+    extras = []
+    for path in (DEVELOPMENT_FILE, PRE_REFACTOR_FILE):
+        if os.path.exists(path):
+            st = os.stat(path)
+            extras.append((path, st.st_mtime_ns, st.st_size))
+    return hashlib.sha1(json.dumps([fragments, extras]).encode("utf-8")).hexdigest()
+
+def read_state():
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def generate_project_doc(force=False):
+    fragments = list_fragments()
+    signature = fragments_signature(fragments)
+    if not force and read_state().get("signature") == signature and os.path.exists(OUTPUT_FILE):
+        print(f"⏭️ Dokumentacja projektu bez zmian ({len(fragments)} fragmentów)")
+        return False
 
-def collect_markdown_files():
-    files = []
-    for filename in sorted(os.listdir(TMP_DIR)):
-        if filename.endswith(".md"):
-            path = os.path.join(TMP_DIR, filename)
-            with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
-                files.append((filename.replace(".md", ""), content))
-    return files
-
-def generate_project_doc():
     print("🧩 Generuję dokumentację projektu...")
 
     sections = []
@@ -21,24 +50,40 @@ def generate_project_doc():
     sections.append("Ten plik zawiera pełną dokumentację klas JavaScript wygenerowaną automatycznie na podstawie kodu źródłowego.\n")
     sections.append("Zadawaj mi pytania dotyczące projektu. Jak np.: `Czy możesz mi podać kod klasy/metody xyz?` Tak aby refaktoryzacja była łatwiejsza i lepsza.\n\n---\n")
 
-    for class_name, content in collect_markdown_files():
-        sections.append(f"## 📦 {class_name}\n")
+    for filename, _, _ in fragments:
+        with open(os.path.join(PAGES_DIR, filename), "r", encoding="utf-8") as f:
+            content = f.read()
+        sections.append(f"## 📦 {filename.replace('.md', '')}\n")
         sections.append(content)
         sections.append("\n---\n")
 
-    with open("rozwój.md", "r", encoding="utf-8") as roz_file:
-        sections.append(roz_file.read())
+    if os.path.exists(DEVELOPMENT_FILE):
+        with open(DEVELOPMENT_FILE, "r", encoding="utf-8") as roz_file:
+            sections.append(roz_file.read())
 
-    with open("./static/data/script_pre_refactor.js", "r", encoding="utf-8") as pre_refactor_file:
-        sections.append("## 🛠️ Kod przed refaktoryzacją\n")
-        sections.append("```js")
-        sections.append(pre_refactor_file.read())
-        sections.append("```\n")
+    if os.path.exists(PRE_REFACTOR_FILE):
+        with open(PRE_REFACTOR_FILE, "r", encoding="utf-8") as pre_refactor_file:
+            sections.append("## 🛠️ Kod przed refaktoryzacją\n")
+            sections.append("```js")
+            sections.append(pre_refactor_file.read())
+            sections.append("```\n")
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        f.write("\n".join(sections))
+    doc = "\n".join(sections)
+    current = None
+    if os.path.exists(OUTPUT_FILE):
+        with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
+            current = f.read()
+    if doc != current:
+        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+            f.write(doc)
+        print(f"✅ Zapisano dokumentację do: {OUTPUT_FILE}")
+    else:
+        print(f"⏭️ {OUTPUT_FILE} bez zmian")
 
-    print(f"✅ Zapisano dokumentację do: {OUTPUT_FILE}")
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"signature": signature}, f)
+    return doc != current
 
 if __name__ == "__main__":
     generate_project_doc()
@@ -163,13 +163,36 @@ class BackendAPI {
 
   // ── Publiczne metody API ───────────────────────────────────────────────────
 
+  /**
+   * Generuje identyfikator żądania dla deduplikacji po stronie backendu.
+   * @returns {string} Unikalny identyfikator.
+   */
+  static newRequestId() {
+    if (globalThis.crypto && typeof globalThis.crypto.randomUUID === "function") {
+      return globalThis.crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 11)}`;
+  }
+
   /**
    * Wysyła prompt użytkownika do backendu.
+   * `requestId` jest stały dla wszystkich ponowień tego samego wywołania,
+   * więc retry po timeoucie dołącza do trwającej generacji zamiast zaczynać nową.
    * @param {string} prompt - Treść promptu.
+   * @param {string} [requestId] - Identyfikator żądania (domyślnie nowy).
+   * @returns {Promise<any>} Odpowiedź z backendu.
+   */
+  static async generate(prompt, requestId = BackendAPI.newRequestId()) {
+    return this._postJson("/generate", { prompt, requestId });
+  }
+
+  /**
+   * Przerywa trwającą generację po stronie backendu.
+   * @param {string} requestId - Identyfikator żądania przekazany do generate().
    * @returns {Promise<any>} Odpowiedź z backendu.
    */
-  static async generate(prompt) {
-    return this._postJson("/generate", { prompt });
+  static async cancel(requestId) {
+    return this._postJson("/cancel", { requestId });
   }
 
   /**
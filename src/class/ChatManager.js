@@ -37,10 +37,15 @@ class ChatManager {
 
     this.editView = new ChatEditView(dom);
 
+    // Identyfikator trwającego żądania /generate (do abortPrompt)
+    this.pendingRequestId = null;
+
     this.chatView.onEditRequested = (msgEl, text, id, ts, sessionId) =>
       this.editView.enableEdit(msgEl, text, id, ts, sessionId);
 
     this.chatView.onRatingSubmit = (msgEl) => this.ratingView.open(msgEl);
+
+    this.chatView.onAbortRequested = () => this.abortPrompt();
   }
 
   /**
@@ -152,8 +157,10 @@ class ChatManager {
   async sendPrompt(prompt) {
     this.chatView.addUserMessage(prompt);
     const { msgEl, timer } = this.chatView.addLoadingMessage();
+    const requestId = BackendAPI.newRequestId();
+    this.pendingRequestId = requestId;
     try {
-      const data = await BackendAPI.generate(prompt);
+      const data = await BackendAPI.generate(prompt, requestId);
 
       // Rozwiąż URL ilustracji
       const urls = await ImageResolver.resolve(data.tags);
@@ -166,6 +173,21 @@ class ChatManager {
       LoggerService.record("error", "[ChatManager] sendPrompt", err);
     } finally {
       clearInterval(timer);
+      if (this.pendingRequestId === requestId) this.pendingRequestId = null;
+    }
+  }
+
+  /**
+   * Przerywa trwające generowanie odpowiedzi (backend zapisze częściową odpowiedź).
+   * @returns {Promise<void>}
+   */
+  async abortPrompt() {
+    const requestId = this.pendingRequestId;
+    if (!requestId) return;
+    try {
+      await BackendAPI.cancel(requestId);
+    } catch (err) {
+      LoggerService.record("warn", "[ChatManager] abortPrompt", err);
     }
   }
 
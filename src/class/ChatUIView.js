@@ -39,6 +39,9 @@ class ChatUIView {
 
     /** @type {(payload: object)=>void} */
     this.onRatingSubmit = null;
+
+    /** @type {()=>void} */
+    this.onAbortRequested = null;
   }
 
   /**
@@ -97,6 +100,14 @@ class ChatUIView {
       </div>
     `.trim();
 
+    // Przerwanie generowania — backend (/cancel) zatrzymuje model i zapisuje to, co zdążyło powstać
+    const stopBtn = Utils.createButton("⏹ Zatrzymaj", () => {
+      stopBtn.disabled = true;
+      this.onAbortRequested?.();
+    });
+    stopBtn.classList.add("button-base", "msg-stop");
+    msgEl.querySelector(".msg-ai-loading").appendChild(stopBtn);
+
     this.container.appendChild(msgEl);
     this.scrollToBottom();
 
@@ -557,6 +557,26 @@ document.addEventListener("DOMContentLoaded", () => {
       Diagnostics.expect(urls.every((u) => typeof u === "string")).toBeTruthy();
     });
 
+    Diagnostics.it("resolve() korzysta z indeksu backendu jednym żądaniem", async () => {
+      const originalFetch = window.fetch;
+      const originalAvailable = ImageResolver.indexAvailable;
+      const calls = [];
+      try {
+        ImageResolver.indexAvailable = null;
+        window.fetch = async (url, init) => {
+          calls.push({ url, init });
+          return { ok: true, json: async () => ({ urls: ["/static/NarrativeIMG/night_forest.png"] }) };
+        };
+        const urls = await ImageResolver.resolve(["forest", "night"]);
+        Diagnostics.expect(calls.length).toBe(1);
+        Diagnostics.expect(calls[0].url.startsWith(ImageResolver.indexEndpoint)).toBeTruthy();
+        Diagnostics.expect(urls[0]).toBe("/static/NarrativeIMG/night_forest.png");
+      } finally {
+        window.fetch = originalFetch;
+        ImageResolver.indexAvailable = originalAvailable;
+      }
+    });
+
     Diagnostics.it(
       "resolveBest() zwraca pojedynczy URL lub pusty string",
       async () => {
@@ -696,6 +716,32 @@ document.addEventListener("DOMContentLoaded", () => {
       }
     });
 
+    Diagnostics.it("loadFromAPI() wyświetla miniatury i zapamiętuje kursor", async () => {
+      const originalFetch = window.fetch;
+      try {
+        const gallery = document.createElement("div");
+        gallery.id = "image-gallery";
+        const loader = new GalleryLoader(gallery);
+
+        window.fetch = async () => ({
+          ok: true,
+          json: async () => ({
+            items: [{ url: "/full/a.png", thumb: "/gallery/thumbs/256/resources/a.png" }],
+            nextCursor: "YS5wbmc",
+          }),
+        });
+
+        await loader.loadFromAPI("/api/gallery");
+        const img = gallery.querySelector("img");
+        const radio = gallery.querySelector('input[type="radio"]');
+        Diagnostics.expect(img.src.endsWith("/gallery/thumbs/256/resources/a.png")).toBeTruthy();
+        Diagnostics.expect(radio.value).toBe("/full/a.png");
+        Diagnostics.expect(loader.nextCursor).toBe("YS5wbmc");
+      } finally {
+        window.fetch = originalFetch;
+      }
+    });
+
     Diagnostics.it("_highlight() zaznacza wybrany obraz", () => {
       const gallery = document.createElement("div");
       gallery.id = "image-gallery";
@@ -1924,6 +1970,24 @@ document.addEventListener("DOMContentLoaded", () => {
       }
     );
 
+    Diagnostics.it(
+      "addLoadingMessage() — przycisk Zatrzymaj woła onAbortRequested raz",
+      () => {
+        const container = document.createElement("div");
+        const view = new ChatUIView(container, null, null);
+        let aborted = 0;
+        view.onAbortRequested = () => aborted++;
+
+        const { msgEl, timer } = view.addLoadingMessage();
+        const stopBtn = msgEl.querySelector("button.msg-stop");
+        Diagnostics.expect(stopBtn).toBeTruthy();
+        stopBtn.click();
+        stopBtn.click();
+        Diagnostics.expect(aborted).toBe(1);
+        clearInterval(timer);
+      }
+    );
+
     Diagnostics.it(
       "hydrateAIMessage() ustawia dataset i renderuje treść",
       () => {
@@ -27,6 +27,8 @@ class GalleryLoader {
     this.container = null;
     /** @type {HTMLElement|null} */
     this.gallery = null;
+    /** @type {string|null} */
+    this.nextCursor = null;
     if (root) this.setContainer(root.galleryContainer || root);
   }
 
@@ -75,13 +77,20 @@ class GalleryLoader {
   /**
    * Renderuje obrazy jako label z ukrytym input[type=radio] name="gallery-choice".
    * Dzięki temu EditManager może odczytać wybór.
+   * Element może być obiektem `{ url, thumb }` — wtedy wyświetlana jest miniatura,
+   * a wybór nadal wskazuje pełny obraz.
    *
-   * @param {string[]} urls - Lista URL-i obrazów
+   * @param {Array<string|{url:string, thumb?:string}>} urls - Lista URL-i obrazów
+   * @param {boolean} [append=false] - Dopisz do istniejących zamiast czyścić
    */
-  renderImages(urls) {
+  renderImages(urls, append = false) {
     if (!this.gallery) return;
-    this.clearGallery();
-    urls.forEach((url, idx) => {
+    if (!append) this.clearGallery();
+    const offset = this.gallery.querySelectorAll(".image-option").length;
+    urls.forEach((entry, i) => {
+      const idx = offset + i;
+      const url = typeof entry === "string" ? entry : entry.url;
+      const thumb = typeof entry === "string" ? entry : entry.thumb || entry.url;
       const label = document.createElement("label");
       label.className = "image-option";
 
@@ -92,7 +101,7 @@ class GalleryLoader {
       input.style.display = "none";
 
       const img = document.createElement("img");
-      img.src = url;
+      img.src = thumb;
       img.alt = `Obraz ${idx + 1}`;
       img.loading = "lazy";
 
@@ -147,27 +156,29 @@ class GalleryLoader {
     if (!target) return;
     const items = this.gallery.querySelectorAll(".image-option");
     items.forEach((label) => {
+      const radio = label.querySelector('input[type="radio"]');
       const img = label.querySelector("img");
-      const match =
-        img && (img.src.endsWith(target) || img.src.includes(target));
+      const src = radio?.value || img?.src || "";
+      const match = src && (src.endsWith(target) || src.includes(target));
       label.classList.toggle("selected", !!match);
-      const radio = label.querySelector('input[type="radio"]');
       if (radio) radio.checked = !!match;
     });
   }
 
   /**
    * Ładuje obrazy z API i renderuje listę URL-i.
-   * Endpoint może zwrócić: string[] lub { images: string[] }.
+   * Endpoint może zwrócić: string[], { images: string[] }
+   * lub { items: {url, thumb}[], nextCursor } (stronicowane API galerii).
    *
    * @param {string} endpoint - URL endpointu API
    * @param {Record<string,string>} [params] - Parametry zapytania
+   * @param {boolean} [append=false] - Dopisz kolejną stronę zamiast czyścić galerię
    * @returns {Promise<void>}
    */
-  async loadFromAPI(endpoint, params = {}) {
+  async loadFromAPI(endpoint, params = {}, append = false) {
     if (!this.gallery) return;
     try {
-      this.showMessage("Ładowanie...");
+      if (!append) this.showMessage("Ładowanie...");
       const url = new URL(endpoint, window.location.origin);
       Object.entries(params).forEach(
         ([k, v]) => v && url.searchParams.append(k, v)
@@ -177,11 +188,14 @@ class GalleryLoader {
       const data = await res.json();
       const images = Array.isArray(data)
         ? data
+        : Array.isArray(data.items)
+        ? data.items
         : Array.isArray(data.images)
         ? data.images
         : [];
-      if (!images.length) return this.showMessage("Brak wyników.");
-      this.renderImages(images);
+      this.nextCursor = (!Array.isArray(data) && data.nextCursor) || null;
+      if (!images.length && !append) return this.showMessage("Brak wyników.");
+      this.renderImages(images, append);
     } catch (err) {
       LoggerService.record(
         "error",
@@ -192,6 +206,19 @@ class GalleryLoader {
     }
   }
 
+  /**
+   * Dociąga kolejną stronę galerii (jeśli API zwróciło nextCursor).
+   *
+   * @param {string} endpoint - URL endpointu API
+   * @param {Record<string,string>} [params] - Parametry zapytania
+   * @returns {Promise<boolean>} true, jeśli była kolejna strona
+   */
+  async loadMore(endpoint, params = {}) {
+    if (!this.nextCursor) return false;
+    await this.loadFromAPI(endpoint, { ...params, cursor: this.nextCursor }, true);
+    return true;
+  }
+
   /**
    * Zaznacza wybraną opcję i odznacza pozostałe.
    *
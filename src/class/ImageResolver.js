@@ -42,11 +42,24 @@ class ImageResolver {
    */
   static negativeCacheTTL = 60 * 60 * 1000; // 1h
 
+  /**
+   * Endpoint indeksu obrazów po stronie backendu (jedno żądanie zamiast serii HEAD).
+   * @type {string}
+   */
+  static indexEndpoint = "/images/resolve";
+
+  /**
+   * Czy backend udostępnia indeks: null = nie sprawdzono, false = brak (np. statyczny hosting).
+   * @type {boolean|null}
+   */
+  static indexAvailable = null;
+
   /**
    * Zwraca listę istniejących URL-i obrazów pasujących do tagów, w kolejności priorytetu:
    * - pełna lista tagów (exact),
    * - wszystkie podzbiory (od największych do najmniejszych) i ich permutacje,
    * - maksymalnie `maxResults` wyników.
+   * Najpierw pyta indeks backendu; gdy go brak — sprawdza kandydatów żądaniami HEAD.
    *
    * @param {string[]} tags - Lista tagów (1–5)
    * @param {{ maxResults?: number }} [opts]
@@ -55,6 +68,9 @@ class ImageResolver {
   static async resolve(tags, { maxResults = 4 } = {}) {
     if (!Array.isArray(tags) || tags.length === 0) return [];
 
+    const indexed = await this._resolveFromIndex(tags, maxResults);
+    if (indexed) return indexed;
+
     const candidates = [];
     const exact = tags.join("_");
 
@@ -92,6 +108,32 @@ class ImageResolver {
     return results;
   }
 
+  /**
+   * Pyta indeks obrazów backendu. Zwraca null, gdy indeks jest niedostępny.
+   * @param {string[]} tags
+   * @param {number} maxResults
+   * @returns {Promise<string[]|null>}
+   * @private
+   */
+  static async _resolveFromIndex(tags, maxResults) {
+    if (this.indexAvailable === false) return null;
+    const query = encodeURIComponent(tags.join(","));
+    try {
+      const res = await fetch(`${this.indexEndpoint}?tags=${query}&max=${maxResults}`);
+      if (!res.ok) {
+        this.indexAvailable = false;
+        return null;
+      }
+      const data = await res.json();
+      this.indexAvailable = true;
+      return Array.isArray(data.urls) ? data.urls : [];
+    } catch (err) {
+      this.indexAvailable = false;
+      LoggerService.record("warn", "[ImageResolver] Indeks obrazów niedostępny", err);
+      return null;
+    }
+  }
+
   /**
    * Zwraca pierwszy istniejący URL według tej samej polityki co resolve().
    * @param {string[]} tags
@@ -431,1540 +431,254 @@ class Diagnostics {
 
 /**
  *
- * Widok edycji wiadomości AI w czacie.
- * Odpowiada za:
- *  - Wyświetlenie formularza edycji (textarea + panel tagów + galeria obrazów)
- *  - Walidację treści i tagów
- *  - Obsługę zapisu i anulowania edycji
+ * Główny koordynator cyklu życia aplikacji. Odpowiada za uruchamianie przekazanych modułów
+ * w ustalonej kolejności. Sam nie tworzy modułów – dostaje je z warstwy inicjalizacyjnej
+ * (np. init_chat.js) jako listę obiektów implementujących metodę `init(ctx)`.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Renderowanie UI edycji w miejscu wiadomości
- *   - Integracja z TagsPanel i GalleryLoader
- *   - Walidacja danych przed wysłaniem
- *   - Wywołanie callbacków `onEditSubmit` i `onEditCancel`
+ *   - Sekwencyjne uruchamianie modułów
+ *   - Przekazywanie kontekstu (`Context`) do modułów
+ *   - Obsługa modułów synchronicznych i asynchronicznych
  *
  * - ❌ Niedozwolone:
- *   - Bezpośrednia komunikacja z backendem (poza pobraniem listy tagów)
- *   - Mutowanie innych elementów UI poza edytowaną wiadomością
+ *   - Tworzenie instancji modułów na sztywno
+ *   - Logika biznesowa lub UI
+ *   - Bezpośrednia manipulacja DOM
  */
-class ChatEditView {
+class App {
   /**
-   * @param {object} dom - Obiekt z referencjami do elementów DOM aplikacji
+   * Tworzy instancję aplikacji.
+   * @param {Context} context - kontener zależności
+   * @param {Array<{ init: (ctx: Context) => void | Promise<void> }>} modules - lista modułów do uruchomienia
    */
-  constructor(dom) {
-    this.dom = dom;
-    /** @type {function(HTMLElement,string,string[],string,string):void|null} */
-    this.onEditSubmit = null;
-    /** @type {function(HTMLElement,object):void|null} */
-    this.onEditCancel = null;
+  constructor(context, modules = []) {
+    this.ctx = context;
+    this.modules = modules;
   }
 
   /**
-   * Uruchamia tryb edycji dla wiadomości AI.
-   * @param {HTMLElement} msgElement - Element wiadomości do edycji
-   * @param {string} originalText - Oryginalny tekst wiadomości
-   * @param {string} messageId - ID wiadomości
-   * @param {string} [sessionId] - ID sesji
+   * Uruchamia wszystkie moduły w kolejności, przekazując im kontekst.
+   * Obsługuje moduły synchroniczne i asynchroniczne.
+   * @returns {Promise<void>}
    */
-  async enableEdit(msgElement, originalText, messageId, sessionId) {
-    // Zachowaj oryginalny HTML
-    msgElement.dataset.originalHTML = msgElement.innerHTML;
-    if (sessionId) {
-      msgElement.dataset.sessionId = sessionId;
-    }
-
-    // Wyczyść zawartość i dodaj textarea
-    msgElement.innerHTML = "";
-    const textarea = document.createElement("textarea");
-    textarea.value = originalText;
-    textarea.rows = 6;
-    textarea.className = "form-element textarea-base w-full mt-4";
-
-    const tagPanel = document.createElement("div");
-    tagPanel.className = "tag-panel";
-    msgElement.append(textarea, tagPanel);
-
-    // Panel tagów + galeria
-    const tagsPanel = new TagsPanel(tagPanel);
-    const galleryLoader = new GalleryLoader(tagPanel);
-
-    const rawTags = msgElement.dataset.tags || "";
-    const tagOptions = await BackendAPI.getTags();
-
-    tagsPanel.setTagOptions(tagOptions);
-    tagsPanel.applyDefaultsFromDataTags(rawTags, tagOptions);
-
-    let boot = true;
-    tagsPanel.init(() => {
-      if (!boot) galleryLoader.renderFromTags(tagsPanel.getTagList());
-    });
-    galleryLoader.renderFromTags(tagsPanel.getTagList());
-    boot = false;
-
-    // Przycisk zapisu
-    const saveBtn = Utils.createButton("💾 Zapisz", async () => {
-      const editedText = textarea.value.trim();
-      const tags = tagsPanel.getTagList();
-
-      const { valid, errors } = EditValidator.validate(editedText, tags);
-      if (!valid) {
-        LoggerService.record("warn", "[EditView] Błąd walidacji", errors);
-        return;
-      }
-
-      // Preferuj wybór z galerii; fallback do resolvera
-      let imageUrl = "";
-      const chosen = tagPanel.querySelector(
-        'input[name="gallery-choice"]:checked'
-      );
-      if (chosen && chosen.value) {
-        imageUrl = chosen.value;
-      } else {
-        const urls = await ImageResolver.resolve(tags, { maxResults: 1 });
-        imageUrl = urls[0] || "";
+  async init() {
+    LoggerService.record("log", "[App] Inicjalizacja aplikacji...");
+    for (const m of this.modules) {
+      if (m && typeof m.init === "function") {
+        await m.init(this.ctx);
       }
-
-      this.onEditSubmit?.(
-        msgElement,
-        editedText,
-        tags,
-        imageUrl,
-        msgElement.dataset.sessionId
-      );
-    });
-    saveBtn.classList.add("button-base");
-
-    // Przycisk anulowania
-    const cancelBtn = Utils.createButton("❌ Anuluj", () => {
-      const data = {
-        id: msgElement.dataset.msgId,
-        sessionId: msgElement.dataset.sessionId || "sess-unknown",
-        tags: (msgElement.dataset.tags || "").split("_").filter(Boolean),
-        timestamp: msgElement.dataset.timestamp,
-        originalText: msgElement.dataset.originalText,
-        text: msgElement.dataset.originalText,
-        sender: msgElement.dataset.sender || "AI",
-        avatarUrl:
-          msgElement.dataset.avatarUrl || "/static/NarrativeIMG/Avatars/AI.png",
-        generation_time: parseFloat(msgElement.dataset.generation_time) || 0,
-        imageUrl: msgElement.dataset.imageUrl || "",
-      };
-
-      this.onEditCancel?.(msgElement, data);
-    });
-    cancelBtn.classList.add("button-base");
-
-    msgElement.append(saveBtn, cancelBtn);
+    }
+    LoggerService.record("log", "[App] Aplikacja gotowa.");
   }
 }
 
 /**
  *
- * Komponent odpowiedzialny za renderowanie galerii obrazów w przekazanym kontenerze.
- * Współpracuje z ImageResolver w celu wyszukiwania obrazów na podstawie tagów.
- * Umożliwia wybór obrazu przez użytkownika (radio name="gallery-choice").
+ * Uniwersalny mediator przechowywania danych z automatycznym fallbackiem
+ * z `localStorage` do `cookie` w przypadku braku dostępu lub błędu.
+ * Obsługuje TTL w sekundach, czyszczenie wpisów z prefiksem,
+ * oraz mechanizmy obronne przy przekroczeniu limitu pamięci (`QuotaExceededError`).
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Renderowanie obrazów w kontenerze
- *   - Współpraca z ImageResolver
- *   - Obsługa wyboru obrazu przez użytkownika
- *   - Pobieranie obrazów z API (GET)
+ *   - Zapisywanie, odczytywanie i usuwanie danych w `localStorage` lub `cookie`
+ *   - Obsługa TTL i czyszczenie danych tymczasowych
+ *   - Reakcja na błędy pamięci i komunikacja z użytkownikiem
  *
  * - ❌ Niedozwolone:
- *   - Logika promptów, edycji, ocen
- *   - Połączenia z BackendAPI poza prostym GET
- *   - Mutacje globalnego stanu
- *
+ *   - Wymuszanie prefiksów
+ *   - Logika aplikacyjna (np. interpretacja danych)
  */
-class GalleryLoader {
-  /**
-   * @param {HTMLElement|{galleryContainer?:HTMLElement}} [root] - Kontener lub obiekt z polem galleryContainer.
-   */
-  constructor(root) {
-    /** @type {HTMLElement|null} */
-    this.container = null;
-    /** @type {HTMLElement|null} */
-    this.gallery = null;
-    if (root) this.setContainer(root.galleryContainer || root);
-  }
-
+class AppStorageManager {
   /**
-   * Ustawia kontener galerii. Obsługuje:
-   * - <div id="image-gallery"> jako bezpośrednią galerię,
-   * - dowolny <div> (galeria = ten div),
-   * - wrapper zawierający element #image-gallery.
-   *
-   * @param {HTMLElement} el - Element kontenera
+   * Sprawdza, czy `localStorage` jest dostępny i funkcjonalny.
+   * Wykonuje testowy zapis i usunięcie wpisu.
+   * @returns {boolean} True, jeśli można bezpiecznie używać `localStorage`.
    */
-  setContainer(el) {
-    if (!(el instanceof HTMLElement)) {
-      LoggerService.record(
-        "error",
-        "[GalleryLoader] setContainer: brak HTMLElement",
-        el
-      );
-      return;
+  static _hasLocalStorage() {
+    try {
+      const testKey = "__storage_test__";
+      localStorage.setItem(testKey, "1");
+      localStorage.removeItem(testKey);
+      return true;
+    } catch {
+      return false;
     }
-    this.container = el;
-    this.gallery = el.querySelector?.("#image-gallery") || el;
   }
 
   /**
-   * Czyści zawartość galerii.
+   * Zwraca typ aktualnie używanego magazynu.
+   * @returns {"localStorage"|"cookie"} Typ aktywnego backendu.
    */
-  clearGallery() {
-    if (this.gallery) this.gallery.innerHTML = "";
+  static type() {
+    return this._hasLocalStorage() ? "localStorage" : "cookie";
   }
 
   /**
-   * Pokazuje komunikat w galerii, czyszcząc poprzednią zawartość.
+   * Zapisuje wartość pod wskazanym kluczem z opcjonalnym TTL.
+   * TTL wyrażony w sekundach. Domyślnie 30 dni (2592000 sekund).
+   * Wartość jest serializowana do JSON.
    *
-   * @param {string} message - Treść komunikatu
+   * @param {string} key - Klucz pod którym zapisywana jest wartość.
+   * @param {any} value - Dowolna wartość do zapisania.
+   * @param {number} [ttl=2592000] - Czas życia w sekundach.
    */
-  showMessage(message) {
-    if (!this.gallery) return;
-    this.clearGallery();
-    const msg = document.createElement("div");
-    msg.classList.add("gallery-message");
-    msg.textContent = message;
-    this.gallery.appendChild(msg);
-  }
+  static set(key, value, ttl = 2592000) {
+    const now = Date.now();
+    const payload = ttl ? { value, ts: now, ttl: ttl * 1000 } : value;
 
-  /**
-   * Renderuje obrazy jako label z ukrytym input[type=radio] name="gallery-choice".
-   * Dzięki temu EditManager może odczytać wybór.
-   *
-   * @param {string[]} urls - Lista URL-i obrazów
-   */
-  renderImages(urls) {
-    if (!this.gallery) return;
-    this.clearGallery();
-    urls.forEach((url, idx) => {
-      const label = document.createElement("label");
-      label.className = "image-option";
+    const serialized = JSON.stringify(payload);
 
-      const input = document.createElement("input");
-      input.type = "radio";
-      input.name = "gallery-choice";
-      input.value = url;
-      input.style.display = "none";
-
-      const img = document.createElement("img");
-      img.src = url;
-      img.alt = `Obraz ${idx + 1}`;
-      img.loading = "lazy";
-
-      label.append(input, img);
-      this.gallery.appendChild(label);
-      label.addEventListener("click", () => this._highlight(label));
-    });
+    if (this._hasLocalStorage()) {
+      try {
+        localStorage.setItem(key, serialized);
+      } catch (err) {
+        if (err.name === "QuotaExceededError") {
+          this.purgeByPrefix("img-exists:");
+          try {
+            localStorage.setItem(key, serialized);
+          } catch (e) {
+            this._handleStorageFailure("localStorage", key, e);
+          }
+        } else {
+          this._handleStorageFailure("localStorage", key, err);
+        }
+      }
+    } else {
+      let cookie = `${encodeURIComponent(key)}=${encodeURIComponent(
+        serialized
+      )}; path=/`;
+      if (ttl) {
+        cookie += `; max-age=${ttl}`;
+      }
+      document.cookie = cookie;
+
+      // Sprawdzenie skuteczności zapisu
+      if (!document.cookie.includes(`${encodeURIComponent(key)}=`)) {
+        this._handleStorageFailure("cookie", key);
+      }
+    }
   }
 
   /**
-   * Renderuje obrazy na podstawie tagów, używając ImageResolver.resolve().
-   *
-   * @param {string[]} tags - Lista tagów
-   * @returns {Promise<void>}
+   * Odczytuje wartość spod wskazanego klucza.
+   * Deserializuje JSON, jeśli to możliwe.
+   * @param {string} key - Klucz do odczytu.
+   * @returns {any|null} Wartość lub null, jeśli brak.
    */
-  async renderFromTags(tags) {
-    if (!this.gallery) {
-      LoggerService.record(
-        "error",
-        "[GalleryLoader] Brak container w renderFromTags"
+  static get(key) {
+    let raw = null;
+    if (this._hasLocalStorage()) {
+      raw = localStorage.getItem(key);
+    } else {
+      const match = document.cookie.match(
+        new RegExp(`(?:^|; )${encodeURIComponent(key)}=([^;]*)`)
       );
-      return;
+      raw = match ? decodeURIComponent(match[1]) : null;
     }
     try {
-      const urls = await ImageResolver.resolve(tags, { maxResults: 6 });
-      if (urls.length === 0) {
-        this.showMessage("❌ Brak obrazu dla tych tagów");
-        return;
-      }
-      this.renderImages(urls);
-      await this.highlightSelected(tags);
-    } catch (err) {
-      LoggerService.record(
-        "error",
-        "[GalleryLoader] renderFromTags error",
-        err
-      );
-      this.showMessage("❌ Błąd renderowania galerii.");
+      return raw ? JSON.parse(raw) : null;
+    } catch {
+      return raw;
     }
   }
 
   /**
-   * Podświetla obraz dopasowany do aktualnych tagów (pierwszy pasujący).
-   * Ustawia również stan zaznaczenia radio.
-   *
-   * @param {string[]} tags - Lista tagów
-   * @returns {Promise<void>}
+   * Odczytuje wartość z TTL. Jeśli wygasła — usuwa i zwraca null.
+   * @param {string} key - Klucz do odczytu.
+   * @returns {any|null} Wartość lub null, jeśli wygasła lub nie istnieje.
    */
-  async highlightSelected(tags) {
-    if (!this.gallery) return;
-    const target = await ImageResolver.resolveBest(tags);
-    if (!target) return;
-    const items = this.gallery.querySelectorAll(".image-option");
-    items.forEach((label) => {
-      const img = label.querySelector("img");
-      const match =
-        img && (img.src.endsWith(target) || img.src.includes(target));
-      label.classList.toggle("selected", !!match);
-      const radio = label.querySelector('input[type="radio"]');
-      if (radio) radio.checked = !!match;
-    });
-  }
+  static getWithTTL(key) {
+    const raw = this.get(key);
+    if (!raw || typeof raw !== "object") return raw;
 
-  /**
-   * Ładuje obrazy z API i renderuje listę URL-i.
-   * Endpoint może zwrócić: string[] lub { images: string[] }.
-   *
-   * @param {string} endpoint - URL endpointu API
-   * @param {Record<string,string>} [params] - Parametry zapytania
-   * @returns {Promise<void>}
-   */
-  async loadFromAPI(endpoint, params = {}) {
-    if (!this.gallery) return;
-    try {
-      this.showMessage("Ładowanie...");
-      const url = new URL(endpoint, window.location.origin);
-      Object.entries(params).forEach(
-        ([k, v]) => v && url.searchParams.append(k, v)
-      );
-      const res = await fetch(url);
-      if (!res.ok) throw new Error(`HTTP ${res.status}`);
-      const data = await res.json();
-      const images = Array.isArray(data)
-        ? data
-        : Array.isArray(data.images)
-        ? data.images
-        : [];
-      if (!images.length) return this.showMessage("Brak wyników.");
-      this.renderImages(images);
-    } catch (err) {
-      LoggerService.record(
-        "error",
-        "[GalleryLoader] Błąd ładowania obrazów",
-        err
-      );
-      this.showMessage("❌ Błąd ładowania obrazów.");
+    if (raw.ttl && raw.ts && Date.now() - raw.ts > raw.ttl) {
+      this.remove(key);
+      return null;
     }
+    return raw.value ?? raw;
   }
 
   /**
-   * Zaznacza wybraną opcję i odznacza pozostałe.
-   *
-   * @param {HTMLElement} selected - Element label z klasą .image-option
-   * @private
+   * Usuwa wartość spod wskazanego klucza.
+   * @param {string} key - Klucz do usunięcia.
    */
-  _highlight(selected) {
-    if (!this.gallery) return;
-    this.gallery
-      .querySelectorAll(".image-option")
-      .forEach((el) => el.classList.remove("selected"));
-    selected.classList.add("selected");
-    const radio = selected.querySelector('input[type="radio"]');
-    if (radio) radio.checked = true;
+  static remove(key) {
+    if (this._hasLocalStorage()) {
+      localStorage.removeItem(key);
+    } else {
+      document.cookie = `${encodeURIComponent(key)}=; max-age=0; path=/`;
+    }
   }
-}
 
-/**
- *
- * Kontener zależności aplikacji. Przechowuje i udostępnia instancje usług oraz
- * zapewnia wygodne gettery do najczęściej używanych komponentów.
- *
- * - ✅ Dozwolone:
- *   - Rejestracja instancji usług i komponentów (np. Dom, Utils, UserManager)
- *   - Pobieranie zależności po nazwie lub przez getter
- *   - Dynamiczne dodawanie nowych zależności w trakcie działania
- *
- * - ❌ Niedozwolone:
- *   - Tworzenie instancji usług na sztywno (to robi warstwa inicjalizacyjna)
- *   - Logika biznesowa lub UI
- *   - Operacje sieciowe
- */
-class Context {
   /**
-   * Tworzy nowy kontekst z początkowym zestawem usług.
-   * @param {Record<string, any>} services - mapa nazw → instancji
+   * Zwraca listę wszystkich kluczy z aktualnego backendu.
+   * @returns {string[]} Tablica kluczy.
    */
-  constructor(services = {}) {
-    /** @private @type {Map<string, any>} */
-    this._registry = new Map(Object.entries(services));
+  static keys() {
+    if (this._hasLocalStorage()) {
+      return Object.keys(localStorage);
+    } else {
+      return document.cookie
+        .split(";")
+        .map((c) => decodeURIComponent(c.split("=")[0].trim()))
+        .filter((k) => k.length > 0);
+    }
   }
 
   /**
-   * Rejestruje nową lub nadpisuje istniejącą zależność.
-   * @param {string} name - unikalna nazwa zależności
-   * @param {any} instance - instancja lub obiekt usługi
+   * Usuwa wszystkie wpisy z danym prefiksem.
+   * @param {string} prefix - Prefiks kluczy do usunięcia.
    */
-  register(name, instance) {
-    this._registry.set(name, instance);
+  static purgeByPrefix(prefix) {
+    this.keys()
+      .filter((k) => k.startsWith(prefix))
+      .forEach((k) => this.remove(k));
   }
 
   /**
-   * Pobiera zarejestrowaną zależność po nazwie.
-   * @param {string} name - nazwa zależności
-   * @returns {any} - instancja lub undefined
+   * Obsługuje błędy zapisu do pamięci (`QuotaExceededError` lub inne).
+   * Informuje użytkownika i oferuje czyszczenie pamięci.
+   * @param {"localStorage"|"cookie"} type - Typ pamięci.
+   * @param {string} key - Klucz, który nie został zapisany.
+   * @param {Error} [error] - Opcjonalny obiekt błędu.
    */
-  get(name) {
-    return this._registry.get(name);
-  }
+  static _handleStorageFailure(type, key, error) {
+    LoggerService?.record(
+      "warn",
+      `[AppStorageManager] ${type} niedostępny lub pełny przy zapisie ${key}`,
+      error
+    );
 
-  // Wygodne gettery (opcjonalne)
-  get dom() {
-    return this.get("dom");
-  }
-  get utils() {
-    return this.get("utils");
-  }
-  get userManager() {
-    return this.get("userManager");
-  }
-  get diagnostics() {
-    return this.get("diagnostics");
-  }
-  get backendAPI() {
-    return this.get("backendAPI");
-  }
-}
-
-/**
- * Warstwa odpornościowa dla zapytań HTTP z kontrolą retry i backoffem.
- * Zapewnia ponawianie zapytań w przypadku błędów sieciowych lub odpowiedzi serwera,
- * które kwalifikują się do ponowienia (retryable), z kontrolą liczby prób, odstępów
- * i maksymalnego czasu trwania operacji.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Wielokrotne próby `fetch` z kontrolą limitu, odstępu i łącznego czasu.
- *   - Decyzja, czy błąd/odpowiedź jest retryowalna.
- *   - Wywołanie zdarzenia `onRetry` (np. do telemetrii lub logowania).
- *   - Parametryzacja backoffu (bazowe opóźnienie, mnożnik, jitter).
- *
- * - ❌ Niedozwolone:
- *   - Logika UI lub domenowa.
- *   - Transformacje payloadu/JSON (to rola warstwy BackendAPI).
- *   - Obsługa specyficznych formatów odpowiedzi.
- */
-class RequestRetryManager {
-  /**
-   * Sprawdza, czy błąd lub odpowiedź nadaje się do ponowienia.
-   *
-   * ## Zasady:
-   *  - Retry przy błędach sieciowych (`TypeError` z `fetch`)
-   *  - Retry przy kodach HTTP 5xx i 429
-   *  - Brak retry przy kodach 4xx (poza 429) i odpowiedziach `ok === true`
-   *
-   * @param {any} errOrRes - Obiekt błędu lub odpowiedzi `Response`
-   * @returns {boolean} - true, jeśli można ponowić
-   */
-  static isRetryable(errOrRes) {
-    // Response
-    if (errOrRes && typeof errOrRes === "object" && "ok" in errOrRes) {
-      const res = /** @type {Response} */ (errOrRes);
-      if (res.ok) return false;
-      const s = res.status;
-      return s === 429 || (s >= 500 && s <= 599);
-    }
-    // Error
-    if (errOrRes instanceof Error) {
-      // Fetch w razie problemów sieciowych rzuca zwykle TypeError
-      return errOrRes.name === "TypeError";
-    }
-    return false;
-  }
-
-  /**
-   * Wykonuje `fetch` z mechanizmem retry i backoffem z jitterem.
-   *
-   * @param {string|Request} input - URL lub obiekt `Request`
-   * @param {RequestInit} [init={}] - Opcje `fetch` (method, headers, body itd.)
-   * @param {number} [retries=3] - Maksymalna liczba ponowień (bez pierwszej próby)
-   * @param {number} [baseDelay=800] - Bazowe opóźnienie (ms) dla backoffu
-   * @param {{
-   *   silent?: boolean,
-   *   maxTotalTime?: number,     // twardy limit łącznego czasu (ms)
-   *   onRetry?: (info:{
-   *     attempt:number,
-   *     retries:number,
-   *     delay:number,
-   *     reason:any,
-   *     input:string|Request
-   *   })=>void,
-   *   factor?: number,           // mnożnik backoffu, domyślnie 2
-   *   jitter?: number            // [0..1], odchylenie losowe, domyślnie 0.2
-   * } } [options={}] - Parametry dodatkowe
-   * @returns {Promise<Response>} - Odpowiedź `fetch`
-   *
-   * Przebieg:
-   *  1. Wykonuje pierwsze żądanie `fetch`.
-   *  2. Jeśli odpowiedź jest OK → zwraca ją.
-   *  3. Jeśli odpowiedź/błąd jest retryowalny → ponawia do `retries` razy.
-   *  4. Każde ponowienie ma opóźnienie wyliczone z backoffu + jitter.
-   *  5. Jeśli przekroczono `maxTotalTime` → rzuca błąd.
-   *  6. Wywołuje `onRetry` (jeśli podany) przy każdej próbie ponowienia.
-   */
-  static async fetchWithRetry(
-    input,
-    init = {},
-    retries = 3,
-    baseDelay = 800,
-    {
-      silent = false,
-      maxTotalTime = 15_000,
-      onRetry = null,
-      factor = 2,
-      jitter = 0.2,
-    } = {}
-  ) {
-    const start = Date.now();
-    let attempt = 0;
-
-    while (true) {
-      try {
-        const res = await fetch(input, init);
-        if (!res.ok) {
-          if (!this.isRetryable(res)) return res; // oddaj nie-OK bez retry — nie jest retryowalne
-          throw res; // wymuś retry
-        }
-        return res;
-      } catch (err) {
-        if (!this.isRetryable(err)) {
-          // Błąd nieretryowalny — rzucamy od razu
-          LoggerService.record(
-            "error",
-            "[RequestRetryManager] Non-retryable error",
-            err
-          );
-          throw err;
-        }
-
-        if (attempt >= retries) {
-          LoggerService.record(
-            "error",
-            `[RequestRetryManager] Wyczerpane retry dla: ${
-              typeof input === "string" ? input : input.url
-            }`,
-            err
-          );
-          throw err;
-        }
-
-        // Kolejna próba
-        attempt += 1;
-
-        // Exponential backoff + jitter
-        const exp = baseDelay * Math.pow(factor, attempt - 1);
-        const delta = exp * jitter;
-        const delay = Math.max(0, exp + (Math.random() * 2 - 1) * delta);
-
-        if (Date.now() + delay - start > maxTotalTime) {
-          LoggerService.record(
-            "error",
-            "[RequestRetryManager] Przekroczono maxTotalTime",
-            { maxTotalTime }
-          );
-          throw err;
-        }
-
-        const level = silent ? "log" : "warn";
-        LoggerService.record(
-          level,
-          `[RequestRetryManager] Retry ${attempt}/${retries} za ${Math.round(
-            delay
-          )}ms`,
-          err
-        );
-
-        if (typeof onRetry === "function") {
-          try {
-            onRetry({ attempt, retries, delay, reason: err, input });
-          } catch {
-            // Ignorujemy błędy w callbacku onRetry
-          }
-        }
-
-        // Odczekaj wyliczony czas przed kolejną próbą
-        await new Promise((r) => setTimeout(r, delay));
-      }
-    }
-  }
-}
-
-/**
- *
- * Buforowany logger do środowiska przeglądarkowego z ograniczeniem wieku wpisów.
- * Obsługuje poziomy logowania: 'log', 'warn', 'error'.
- * Wpisy są przechowywane w pamięci i mogą być filtrowane, czyszczone lub eksportowane.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - record(level, msg, ...args)
- *   - cleanup()
- *   - getHistory({clone})
- *   - clearHistory()
- *   - setMaxAge(ms)
- *   - filterByLevel(level)
- *   - recordOnce(level, msg, ...args)
- *
- * - ❌ Niedozwolone:
- *   - logika aplikacji (business logic)
- *   - operacje sieciowe, DOM, storage
- *
- */
-class LoggerService {
-  /**
-   * Bufor wpisów logowania.
-   * Każdy wpis zawiera znacznik czasu, poziom, wiadomość i dodatkowe argumenty.
-   * @type {Array<{timestamp: number, level: 'log'|'warn'|'error', msg: string, args: any[]}>}
-   */
-  static buffer = [];
-
-  /**
-   * Maksymalny wiek wpisów w milisekundach.
-   * Wpisy starsze niż ta wartość są usuwane przy każdym logowaniu i odczycie.
-   * @type {number}
-   */
-  static maxAgeMs = 5 * 60 * 1000; // 5 minut
-
-  /**
-   * Ustawia nowy limit wieku wpisów i natychmiast czyści stare.
-   * @param {number} ms - nowy limit wieku w milisekundach
-   */
-  static setMaxAge(ms) {
-    this.maxAgeMs = ms;
-    this.cleanup();
-  }
-
-  /**
-   * Dodaje wpis do bufora i wypisuje go w konsoli z odpowiednim stylem.
-   * @param {'log'|'warn'|'error'} level - poziom logowania
-   * @param {string} msg - wiadomość do wyświetlenia
-   * @param {...any} args - dodatkowe dane (np. obiekty, błędy)
-   */
-  static record(level, msg, ...args) {
-    const emojiLevels = { log: "🌍", warn: "⚠️", error: "‼️" };
-    const timestamp = Date.now();
-
-    this.buffer.push({ timestamp, level, msg, args });
-    this.cleanup();
-
-    const styleMap = {
-      log: "color: #444",
-      warn: "color: orange",
-      error: "color: red; font-weight: bold",
-    };
-
-    const style = styleMap[level] || "";
-    const displayMsg = `${emojiLevels[level] || ""} ${msg}`;
-    console[level](
-      `%c[${new Date(timestamp).toLocaleTimeString()}] ${displayMsg}`,
-      style,
-      ...args
-    );
-  }
-
-  /**
-   * Usuwa wpisy starsze niż maxAgeMs.
-   * Jeśli maxAgeMs <= 0, czyści cały bufor.
-   */
-  static cleanup() {
-    if (this.maxAgeMs <= 0) {
-      this.buffer = [];
-      return;
-    }
-    const cutoff = Date.now() - this.maxAgeMs;
-    this.buffer = this.buffer.filter((e) => e.timestamp >= cutoff);
-  }
-
-  /**
-   * Zwraca wpisy danego poziomu logowania.
-   * @param {'log'|'warn'|'error'} level - poziom do filtrowania
-   * @returns {Array<{timestamp: number, msg: string, args: any[]}>}
-   */
-  static filterByLevel(level) {
-    this.cleanup();
-    return this.buffer
-      .filter((e) => e.level === level)
-      .map(({ timestamp, msg, args }) => ({ timestamp, msg, args }));
-  }
-
-  /**
-   * Zwraca całą historię wpisów.
-   * Jeśli clone = true, zwraca głęboką kopię wpisów.
-   * @param {boolean} [clone=false] - czy zwrócić kopię wpisów
-   * @returns {Array<{timestamp: number, level: string, msg: string, args: any[]}>}
-   */
-  static getHistory(clone = false) {
-    this.cleanup();
-    if (!clone) return [...this.buffer];
-    return this.buffer.map((entry) => structuredClone(entry));
-  }
-
-  /**
-   * Czyści cały bufor logów bez względu na wiek wpisów.
-   */
-  static clearHistory() {
-    this.buffer = [];
-  }
-
-  /**
-   * Dodaje wpis tylko jeśli nie istnieje już wpis o tym samym poziomie i wiadomości.
-   * @param {'log'|'warn'|'error'} level - poziom logowania
-   * @param {string} msg - wiadomość
-   * @param {...any} args - dodatkowe dane
-   */
-  static recordOnce(level, msg, ...args) {
-    if (!this.buffer.some((e) => e.level === level && e.msg === msg)) {
-      this.record(level, msg, ...args);
-    }
-  }
-}
-
-/**
- *
- * Fabryka elementów UI do wyboru tagów.
- * Tworzy pola wyboru w dwóch wariantach w zależności od środowiska:
- *  - Mobile → <select> z listą opcji
- *  - Desktop → <input> z przypisanym <datalist>
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Generowanie elementów formularza dla tagów
- *   - Nadawanie etykiet polom na podstawie słownika
- *   - Obsługa wariantu mobilnego i desktopowego
- *
- * - ❌ Niedozwolone:
- *   - Walidacja wybranych tagów
- *   - Operacje sieciowe
- *   - Bezpośrednia integracja z backendem
- */
-class TagSelectorFactory {
-  /**
-   * Słownik etykiet dla pól tagów.
-   * Klucze odpowiadają nazwom pól, wartości to etykiety wyświetlane w UI.
-   * @type {Record<string,string>}
-   */
-  static labels = {
-    location: "Lokalizacja",
-    character: "Postać",
-    action: "Czynność",
-    nsfw: "NSFW",
-    emotion: "Emocja",
-  };
-
-  /**
-   * Tworzy prosty element wyboru tagów (bez dodatkowych klas/stylów).
-   * Używany do generowania pojedynczych selektorów w UI.
-   *
-   * @param {string} type - Typ pola (np. 'location', 'character').
-   * @param {string[]} [options=[]] - Lista dostępnych opcji.
-   * @returns {HTMLLabelElement} - Element <label> zawierający kontrolkę wyboru.
-   */
-  static create(type, options = []) {
-    const labelEl = document.createElement("label");
-    labelEl.textContent = this.labels[type] || type;
-
-    if (Utils.isMobile()) {
-      // Mobile: <select> z opcjami
-      const select = document.createElement("select");
-      options.forEach((opt) => {
-        const optionEl = document.createElement("option");
-        optionEl.value = opt;
-        optionEl.textContent = opt;
-        select.appendChild(optionEl);
-      });
-      labelEl.appendChild(select);
-    } else {
-      // Desktop: <input> + <datalist>
-      const input = document.createElement("input");
-      input.setAttribute("list", `${type}-list`);
-      const datalist = document.createElement("datalist");
-      datalist.id = `${type}-list`;
-      options.forEach((opt) => {
-        const optionEl = document.createElement("option");
-        optionEl.value = opt;
-        datalist.appendChild(optionEl);
-      });
-      labelEl.append(input, datalist);
-    }
-
-    return labelEl;
-  }
-
-  /**
-   * Tworzy kompletny element pola tagu z etykietą i kontrolką wyboru.
-   * Używany w panelach tagów (np. TagsPanel) do renderowania pól kategorii.
-   *
-   * @param {string} name - Nazwa pola (np. "location", "character").
-   * @param {string[]} [options=[]] - Lista opcji do wyboru.
-   * @returns {HTMLLabelElement} - Gotowy element <label> z kontrolką.
-   */
-  static createTagField(name, options = []) {
-    const labelEl = document.createElement("label");
-    labelEl.className = "tag-field";
-    labelEl.textContent = this.labels?.[name] || name;
-
-    if (Utils.isMobile()) {
-      // Mobile: <select> z pustą opcją na start
-      const select = document.createElement("select");
-      select.id = `tag-${name}`;
-      select.name = name;
-
-      const emptyOpt = document.createElement("option");
-      emptyOpt.value = "";
-      emptyOpt.textContent = "-- wybierz --";
-      select.appendChild(emptyOpt);
-
-      options.forEach((opt) => {
-        const optionEl = document.createElement("option");
-        optionEl.value = opt;
-        optionEl.textContent = opt;
-        select.appendChild(optionEl);
-      });
-
-      labelEl.appendChild(select);
-    } else {
-      // Desktop: <input> + <datalist>
-      const input = document.createElement("input");
-      input.id = `tag-${name}`;
-      input.name = name;
-      input.setAttribute("list", `${name}-list`);
-
-      const datalist = document.createElement("datalist");
-      datalist.id = `${name}-list`;
-
-      options.forEach((opt) => {
-        const optionEl = document.createElement("option");
-        optionEl.value = opt;
-        datalist.appendChild(optionEl);
-      });
-
-      labelEl.append(input, datalist);
-    }
-
-    return labelEl;
-  }
-}
-
-/**
- *
- * Centralny punkt dostępu do elementów DOM aplikacji.
- * Wymusza strukturę opartą na <main id="app"> jako kontenerze bazowym.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Przechowywanie i udostępnianie referencji do elementów
- *   - Wyszukiwanie elementów tylko wewnątrz <main id="app">
- *
- * - ❌ Niedozwolone:
- *   - Operacje poza <main id="app">
- *   - Modyfikowanie struktury DOM globalnie
- *
- */
-class Dom {
-  /**
-   * Inicjalizuje klasę Dom z wymuszeniem kontenera <main id="app">
-   * @param {string|HTMLElement} rootSelector - domyślnie "#app"
-   */
-  constructor(rootSelector = "#app") {
-    this.rootSelector = rootSelector;
-    this.root = null;
-    this.refs = {};
-  }
-
-  /**
-   * Inicjalizuje referencje do elementów wewnątrz <main id="app">
-   * @param {Record<string, string>} refMap - mapa nazw do selektorów
-   */
-  init(refMap) {
-    const rootCandidate =
-      typeof this.rootSelector === "string"
-        ? document.querySelector(this.rootSelector)
-        : this.rootSelector;
-
-    if (!(rootCandidate instanceof HTMLElement)) {
-      LoggerService.record(
-        "error",
-        '[Dom] Nie znaleziono <main id="app">. Wymagana struktura HTML.'
-      );
-      return;
-    }
-
-    if (rootCandidate.tagName !== "MAIN" || rootCandidate.id !== "app") {
-      LoggerService.record(
-        "error",
-        '[Dom] Kontener bazowy musi być <main id="app">. Otrzymano:',
-        rootCandidate
-      );
-      return;
-    }
-
-    this.root = rootCandidate;
-
-    Object.entries(refMap).forEach(([name, selector]) => {
-      const el =
-        selector === this.rootSelector
-          ? this.root
-          : this.root.querySelector(selector);
-
-      if (!el) {
-        LoggerService.record("warn", `[Dom] Brak elementu: ${selector}`);
-      }
-
-      this.refs[name] = el || null;
-      this[name] = el || null;
-    });
-  }
-
-  /**
-   * Wyszukuje element w obrębie <main id="app">
-   * @param {string} selector
-   * @returns {HTMLElement|null}
-   */
-  q(selector) {
-    return this.root?.querySelector(selector) || null;
-  }
-
-  /**
-   * Wyszukuje wszystkie elementy pasujące do selektora w obrębie <main id="app">
-   * @param {string} selector
-   * @returns {NodeListOf<HTMLElement>}
-   */
-  qa(selector) {
-    return this.root?.querySelectorAll(selector) || [];
-  }
-}
-
-/**
- *
- * Widok głównego interfejsu czatu.
- * Odpowiada za:
- *  - Obsługę formularza promptu (wysyłanie wiadomości użytkownika)
- *  - Renderowanie wiadomości użytkownika i AI
- *  - Wyświetlanie stanu ładowania odpowiedzi AI
- *  - Hydratację wiadomości AI danymi z backendu
- *  - Obsługę przycisku edycji i panelu ocen
- *  - Aktualizację treści wiadomości po edycji
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Manipulacja DOM w obrębie kontenera czatu
- *   - Obsługa zdarzeń UI (submit, ctrl+enter, kliknięcia)
- *   - Integracja z `UserManager`, `SenderRegistry`, `ChatRatingView`
- *
- * - ❌ Niedozwolone:
- *   - Logika backendowa (wysyłanie żądań HTTP)
- *   - Walidacja treści (poza prostym sprawdzeniem pustego promptu)
- */
-class ChatUIView {
-  /**
-   * @param {HTMLElement} container - Kontener wiadomości czatu
-   * @param {HTMLFormElement} promptForm - Formularz promptu
-   * @param {HTMLInputElement|HTMLTextAreaElement} promptInput - Pole wprowadzania promptu
-   */
-  constructor(container, promptForm, promptInput) {
-    this.container = container;
-    this.promptForm = promptForm;
-    this.promptInput = promptInput;
-
-    /** @type {(prompt: string)=>void} */
-    this.onPromptSubmit = null;
-
-    /** @type {(msgEl: HTMLElement, originalText: string, id: number, timestamp: string, sessionId: string)=>void} */
-    this.onEditRequested = null;
-
-    /** @type {(payload: object)=>void} */
-    this.onRatingSubmit = null;
-  }
-
-  /**
-   * Podpina obsługę formularza i skrótu Ctrl+Enter.
-   */
-  init() {
-    this.promptForm.addEventListener("submit", async (e) => {
-      e.preventDefault();
-      const t = this.promptInput.value.trim();
-      if (!t) return;
-      const accepted = await this.onPromptSubmit?.(t);
-      if (accepted) {
-        this.promptInput.value = "";
-      }
-    });
-
-    this.promptInput.addEventListener("keydown", async (e) => {
-      if (e.ctrlKey && e.key === "Enter") {
-        e.preventDefault();
-        const t = this.promptInput.value.trim();
-        if (!t) return;
-        const accepted = await this.onPromptSubmit?.(t);
-        if (accepted) {
-          this.promptInput.value = "";
-        }
-      }
-    });
-  }
-
-  /**
-   * Dodaje wiadomość użytkownika do czatu.
-   * @param {string} text - Treść wiadomości
-   */
-  addUserMessage(text) {
-    const el = document.createElement("div");
-    el.className = "message user";
-    el.innerHTML = `<span class="message-text">${UserManager.replacePlaceholders(
-      text
-    )}</span>`;
-    this.container.appendChild(el);
-    this.scrollToBottom();
-  }
-
-  /**
-   * Dodaje placeholder ładowania odpowiedzi AI.
-   * @returns {{msgEl: HTMLElement, timer: number}} - Element wiadomości i ID timera
-   */
-  addLoadingMessage() {
-    const msgEl = document.createElement("article");
-    msgEl.className = "message ai";
-    msgEl.setAttribute("role", "article");
-
-    msgEl.innerHTML = `
-      <div class="msg-content msg-ai-loading">
-        <div class="msg-text"><p>⏳ Generowanie odpowiedzi... (0s)</p></div>
-      </div>
-    `.trim();
-
-    this.container.appendChild(msgEl);
-    this.scrollToBottom();
-
-    const timerP = msgEl.querySelector(".msg-ai-loading p");
-    let seconds = 0;
-    const timer = setInterval(() => {
-      if (timerP) {
-        timerP.textContent = `⏳ Generowanie odpowiedzi... (${++seconds}s)`;
-      }
-    }, 1000);
-
-    return { msgEl, timer };
-  }
-
-  /**
-   * Renderuje wiadomość AI z danymi.
-   * @param {HTMLElement} msgEl - Element wiadomości
-   * @param {object} data - Dane wiadomości
-   * @param {boolean} [isEdited=false] - Czy wiadomość jest edytowana
-   */
-  hydrateAIMessage(msgEl, data, isEdited = false) {
-    msgEl.classList.add("msg-fading-out");
-
-    const sessionId = data.sessionId || "sess-unknown";
-    const senderId = data.senderId || data.sender || "sender-unknown";
-
-    if (data.id) {
-      msgEl.dataset.msgId = data.id;
-    } else {
-      const messageNum = data.messageNumber || Date.now();
-      msgEl.dataset.msgId = `${sessionId}_${senderId}_${messageNum}`;
-    }
-
-    msgEl.dataset.sessionId = sessionId;
-    msgEl.dataset.tags = Array.isArray(data.tags)
-      ? data.tags.join("_")
-      : data.tags || "";
-    msgEl.dataset.timestamp = data.timestamp || "";
-    msgEl.dataset.originalText = data.originalText ?? data.text;
-    msgEl.dataset.sender = data.sender || "AI";
-    msgEl.dataset.avatarUrl =
-      data.avatarUrl || "/static/NarrativeIMG/Avatars/AI.png";
-    msgEl.dataset.generation_time = String(
-      Number.isFinite(data.generation_time) ? data.generation_time : 0
-    );
-    msgEl.dataset.imageUrl = data.imageUrl || "";
-
-    const renderedText = UserManager.replacePlaceholders(data.text);
-    const tagList = Array.isArray(data.tags)
-      ? data.tags
-      : (data.tags || "").split("_").filter(Boolean);
-
-    msgEl.innerHTML = `
-      <header class="msg-header ${SenderRegistry.getClass(
-        msgEl.dataset.sender
-      )}">
-        <div class="avatar-sender">
-          <img src="${msgEl.dataset.avatarUrl}" alt="${
-      msgEl.dataset.sender
-    } Avatar">
-          <strong>${msgEl.dataset.sender}</strong>
-        </div>
-      </header>
-      <section class="msg-content">
-        <div class="msg-text">
-          <p ${isEdited ? 'class="edited"' : ""}>${renderedText}</p>
-          ${
-            msgEl.dataset.imageUrl
-              ? `<img src="${msgEl.dataset.imageUrl}" alt="${tagList.join(
-                  " "
-                )}">`
-              : ""
-          }
-        </div>
-      </section>
-      <footer class="msg-footer">
-        <time class="ai-msg-time" datetime="${msgEl.dataset.timestamp}">
-          ⏱️ ${msgEl.dataset.generation_time}s | 🗓️ ${msgEl.dataset.timestamp}
-        </time>
-      </footer>
-    `.trim();
-
-    if (AppStorageManager.getWithTTL("editingMode") === "1") {
-      const btn = document.createElement("button");
-      btn.type = "button";
-      btn.className = "form-element button-base msg-edit-btn";
-      btn.textContent = "✏️ Edytuj";
-      btn.addEventListener("click", () =>
-        this.onEditRequested?.(
-          msgEl,
-          msgEl.dataset.originalText,
-          msgEl.dataset.msgId,
-          msgEl.dataset.timestamp,
-          msgEl.dataset.sessionId
-        )
-      );
-      msgEl.querySelector(".msg-footer").appendChild(btn);
-    }
-
-    if (AppStorageManager.getWithTTL("ratingMode") === "1") {
-      new ChatRatingView(msgEl, (payload) => this.onRatingSubmit?.(payload));
-    }
-
-    msgEl.classList.remove("msg-fading-out");
-    msgEl.classList.add("msg-fading-in");
-    this.scrollToBottom();
-  }
-
-  /**
-   * Pokazuje komunikat błędu w wiadomości AI.
-   * @param {HTMLElement} msgEl - Element wiadomości
-   */
-  showError(msgEl) {
-    msgEl.innerHTML = `<span class="message-text">❌ Błąd generowania odpowiedzi.</span>`;
-    this.scrollToBottom();
-  }
-
-  /**
-   * Przewija czat na dół.
-   */
-  scrollToBottom() {
-    this.container.scrollTop = this.container.scrollHeight;
-  }
-
-  /**
-   * Aktualizuje treść wiadomości po edycji.
-   * @param {HTMLElement} msgEl - Element wiadomości do zaktualizowania
-   * @param {string} editedText - Nowa treść wiadomości
-   * @param {string[]} [tags=[]] - Lista tagów powiązanych z wiadomością
-   * @param {string} [imageUrl=""] - URL ilustracji powiązanej z wiadomością
-   */
-  updateMessage(msgEl, editedText, tags = [], imageUrl = "") {
-    // Zaktualizuj tekst w elemencie <p>
-    const p = msgEl.querySelector("section.msg-content .msg-text p");
-    if (p) p.textContent = UserManager.replacePlaceholders(editedText);
-
-    // Zaktualizuj dataset
-    msgEl.dataset.tags = tags.join("_");
-    msgEl.dataset.imageUrl = imageUrl;
-
-    // Znajdź kontener tekstu
-    const textDiv = msgEl.querySelector("section.msg-content .msg-text");
-    if (!textDiv) return;
-
-    // Obsługa obrazka
-    let img = textDiv.querySelector("img");
-
-    if (imageUrl) {
-      if (!img) {
-        img = document.createElement("img");
-        textDiv.appendChild(img);
-      }
-      img.src = imageUrl;
-      img.alt = tags.join(" ");
-    } else if (img) {
-      img.remove();
-    }
-  }
-}
-
-/**
- *
- * Komponent odpowiedzialny za renderowanie i obsługę pól tagów oraz synchronizację z galerią.
- * Integruje się z TagSelectorFactory i GalleryLoader, umożliwiając wybór tagów i podgląd obrazów.
- *
- * - ✅ Dozwolone:
- *   - Tworzenie i aktualizacja pól tagów
- *   - Synchronizacja z galerią
- *   - Emisja zmian tagów do świata zewnętrznego
- *   - Obsługa wartości domyślnych z data-tags
- *
- * - ❌ Niedozwolone:
- *   - Walidacja promptów/tekstu
- *   - Operacje sieciowe (np. pobieranie tagów z backendu)
- *   - Logika edycji, ocen, renderowania wiadomości
- */
-class TagsPanel {
-  /**
-   * Tworzy instancję panelu tagów.
-   * @param {HTMLElement} container - Kontener DOM z miejscem na pola tagów i galerię.
-   * @throws {Error} Gdy container nie jest HTMLElement.
-   */
-  constructor(container) {
-    if (!(container instanceof HTMLElement)) {
-      const actualType =
-        container === null
-          ? "null"
-          : Array.isArray(container)
-          ? "Array"
-          : container?.constructor?.name || typeof container;
-
-      throw new Error(
-        `[TagsPanel] Przekazany kontener nie jest elementem DOM. Otrzymano: ${actualType} → ${String(
-          container
-        )}`
-      );
-    }
-
-    this.container = container;
-
-    this.onTagsChanged = null;
-
-    this.fields = {};
-
-    this.buildTagFields();
-
-    const gallery = document.createElement("div");
-    gallery.id = "image-gallery";
-    gallery.className = "gallery-grid mt-10";
-    this.container.appendChild(gallery);
-
-    this.gallery = gallery;
-
-    this.galleryLoader = new GalleryLoader({ galleryContainer: gallery });
-    this.galleryLoader.setContainer(gallery);
-
-    this.notifyTagsChanged();
-  }
-
-  /**
-   * Skrót do querySelector w obrębie panelu.
-   * @param {string} selector - CSS selektor
-   * @returns {HTMLElement|null}
-   */
-  q(selector) {
-    const el = this.container.querySelector(selector);
-    if (!el) {
-      LoggerService.record(
-        "warn",
-        `[TagsPanel] Nie znaleziono elementu: ${selector}`,
-        this.container
-      );
-    }
-    return el;
-  }
-
-  /**
-   * Domyślna konstrukcja pól tagów (fallback, gdy nie użyjesz setTagOptions()).
-   * W realu zwykle używasz setTagOptions(daneZBackendu).
-   */
-  buildTagFields() {
-    const tagNames = ["location", "character", "action", "nsfw", "emotion"];
-    const tagOptions = {
-      location: ["forest", "castle", "cave", "village"],
-      character: ["Lytha", "Aredia", "Xavier"],
-      action: ["healing", "combat", "ritual"],
-      nsfw: ["intimacy", "touch", "kiss"],
-      emotion: ["joy", "sadness", "fear", "love"],
-    };
-
-    tagNames.forEach((name) => {
-      const fieldWrapper = TagSelectorFactory.createTagField(
-        name,
-        tagOptions[name] || []
-      );
-      this.container.appendChild(fieldWrapper);
-      const field =
-        fieldWrapper.querySelector(`#tag-${name}`) ||
-        fieldWrapper.querySelector("input, select");
-
-      this.fields[name] = field;
-    });
-  }
-
-  /**
-   * Inicjalizuje nasłuchiwanie zmian w polach tagów.
-   * @param {(tagsObj:Record<string,string>)=>void} onChange - Callback wywoływany przy zmianie
-   */
-  init(onChange) {
-    const debouncedRefresh = Utils.debounce(
-      () => this.notifyTagsChanged(),
-      300
-    );
-
-    Object.values(this.fields).forEach((field) => {
-      if (!field) return;
-      const eventType = field.tagName === "SELECT" ? "change" : "input";
-      field.addEventListener(eventType, () => {
-        if (typeof onChange === "function")
-          onChange(this.getSelectedTagsObject());
-        debouncedRefresh();
-      });
-    });
-  }
-
-  /**
-   * Zwraca aktualne tagi jako obiekt {nazwaKategorii: wartość}.
-   * @returns {Record<string,string>}
-   */
-  getSelectedTagsObject() {
-    return Object.fromEntries(
-      Object.entries(this.fields).map(([k, el]) => [k, el?.value || ""])
-    );
-  }
-
-  /**
-   * Zwraca aktualne tagi jako lista stringów (bez pustych).
-   * @returns {string[]}
-   */
-  getTagList() {
-    return Object.values(this.getSelectedTagsObject()).filter(Boolean);
-  }
-
-  /**
-   * Emisja zmiany tagów i synchronizacja galerii.
-   */
-  notifyTagsChanged() {
-    const list = this.getTagList();
-    if (typeof this.onTagsChanged === "function") {
-      this.onTagsChanged(list);
-    }
-    this.galleryLoader?.renderFromTags(list);
-  }
-
-  /**
-   * Czyści wszystkie pola tagów i odświeża galerię.
-   */
-  clearTags() {
-    Object.values(this.fields).forEach((field) => {
-      if (field) field.value = "";
-    });
-    this.notifyTagsChanged();
-  }
-
-  /**
-   * Zastępuje opcje tagów i przebudowuje pola na podstawie słownika z backendu.
-   * Oczekuje kluczy w postaci "tag-location", "tag-character", ... (tak jak w tags.json).
-   * Zachowuje this.gallery — pola idą przed galerią.
-   *
-   * @param {Record<string,string[]>} tagOptionsFromBackend
-   */
-  setTagOptions(tagOptionsFromBackend) {
-    const toFieldName = (k) => (k.startsWith("tag-") ? k.slice(4) : k);
-
-    Array.from(this.container.children).forEach((child) => {
-      if (child !== this.gallery) this.container.removeChild(child);
-    });
-
-    this.fields = {};
-    Object.entries(tagOptionsFromBackend).forEach(([backendKey, options]) => {
-      const name = toFieldName(backendKey);
-      const fieldWrapper = TagSelectorFactory.createTagField(
-        name,
-        options || []
-      );
-      if (this.gallery && this.gallery.parentElement === this.container) {
-        this.container.insertBefore(fieldWrapper, this.gallery);
-      } else {
-        this.container.appendChild(fieldWrapper);
-      }
-      const field =
-        fieldWrapper.querySelector(`#tag-${name}`) ||
-        fieldWrapper.querySelector("input, select");
-
-      this.fields[name] = field;
-    });
-  }
-
-  /**
-   * Ustawia wartości domyślne na podstawie data-tags (np. "cave_kissing")
-   * i słownika tagów z backendu. Pomija tokeny, których nie ma w żadnej kategorii.
-   *
-   * @param {string} dataTags - np. "cave_kissing"
-   * @param {Record<string,string[]>} tagOptionsFromBackend
-   */
-  applyDefaultsFromDataTags(dataTags, tagOptionsFromBackend) {
-    if (!dataTags) return;
-
-    const tokens = dataTags.split("_").filter(Boolean);
-    const mapBackendKeyToField = (k) => (k.startsWith("tag-") ? k.slice(4) : k);
-
-    for (const token of tokens) {
-      for (const [backendKey, options] of Object.entries(
-        tagOptionsFromBackend
-      )) {
-        if (Array.isArray(options) && options.includes(token)) {
-          const fieldName = mapBackendKeyToField(backendKey);
-          const field = this.fields[fieldName];
-          if (field) field.value = token;
-          break;
-        }
-      }
-    }
-  }
-}
-
-/**
- *
- * Menedżer widoczności paneli bocznych w aplikacji.
- * Zapewnia kontrolę nad otwieraniem, zamykaniem i przełączaniem paneli w interfejsie użytkownika.
- * Obsługuje tryb mobilny (wyłączność paneli) oraz desktopowy (współistnienie).
- * Utrzymuje stan wybranych paneli w cookie — tylko na desktopie.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Rejestracja paneli i ich przycisków
- *   - Obsługa zdarzeń kliknięcia
- *   - Przełączanie widoczności paneli
- *   - Zapisywanie stanu paneli w cookie (desktop only)
- *
- * - ❌ Niedozwolone:
- *   - Deklaracja paneli statycznie
- *   - Modyfikacja zawartości paneli
- *   - Logika niezwiązana z UI paneli
- *
- */
-class PanelsController {
-  /**
-   * @param {Dom} dom - Instancja klasy Dom
-   * @param {Array<{button: HTMLElement, panel: HTMLElement, id: string}>} panels - lista paneli
-   * @param {string[]} persistentPanels - identyfikatory paneli, które mają być zapamiętywane (desktop only)
-   */
-  constructor(dom, panels = [], persistentPanels = []) {
-    this.dom = dom;
-    this.panels = panels;
-    this.cookiePanels = new Set(persistentPanels);
-    this._unbinders = new Map();
-  }
-
-  /**
-   * Inicjalizuje nasłuchiwacze kliknięć i przywraca stan z cookie (desktop only).
-   */
-  init() {
-    this.panels.forEach(({ button, panel, id }) => {
-      if (!button || !panel) return;
-
-      if (!Utils.isMobile() && this.cookiePanels.has(id)) {
-        const saved = AppStorageManager.getWithTTL(`panel:${id}`);
-        if (saved === true) panel.classList.add("open");
-      }
-
-      const handler = () => this.togglePanel(panel);
-      button.addEventListener("click", handler);
-      this._unbinders.set(button, () =>
-        button.removeEventListener("click", handler)
-      );
-    });
-  }
-
-  /**
-   * Otwiera panel. Na mobile zamyka inne.
-   * @param {HTMLElement} panel
-   */
-  openPanel(panel) {
-    if (Utils.isMobile()) {
-      this.closeAllPanels();
-    }
-    panel.classList.add("open");
-
-    if (!Utils.isMobile() && this.cookiePanels.has(panel.id)) {
-      AppStorageManager.set(`panel:${panel.id}`, true);
-    }
-  }
-
-  /**
-   * Zamyka panel.
-   * @param {HTMLElement} panel
-   */
-  closePanel(panel) {
-    panel.classList.remove("open");
-
-    if (!Utils.isMobile() && this.cookiePanels.has(panel.id)) {
-      AppStorageManager.set(`panel:${panel.id}`, false);
-    }
-  }
-
-  /**
-   * Przełącza widoczność panelu.
-   * @param {HTMLElement} panel
-   */
-  togglePanel(panel) {
-    if (!panel) return;
-    const isOpen = panel.classList.contains("open");
-    if (isOpen) {
-      this.closePanel(panel);
-    } else {
-      this.openPanel(panel);
-    }
-  }
-
-  /** Zamyka wszystkie panele. */
-  closeAllPanels() {
-    this.panels.forEach(({ panel }) => panel?.classList.remove("open"));
-  }
-
-  /**
-   * Sprawdza, czy panel jest otwarty.
-   * @param {HTMLElement} panel
-   * @returns {boolean}
-   */
-  isPanelOpen(panel) {
-    return !!panel?.classList.contains("open");
-  }
-
-  /**
-   * Zwraca pierwszy otwarty panel.
-   * @returns {HTMLElement|null}
-   */
-  getOpenPanel() {
-    const item = this.panels.find(({ panel }) =>
-      panel?.classList.contains("open")
+    const confirmed = window.confirm(
+      `Pamięć ${type} jest pełna lub niedostępna. Czy chcesz ją wyczyścić, aby kontynuować?`
     );
-    return item?.panel || null;
-  }
-
-  /**
-   * Zwraca wszystkie otwarte panele.
-   * @returns {HTMLElement[]}
-   */
-  getOpenPanels() {
-    return this.panels
-      .map(({ panel }) => panel)
-      .filter((p) => p && p.classList.contains("open"));
-  }
 
-  /**
-   * Usuwa nasłuchiwacze i czyści zasoby.
-   */
-  destroy() {
-    this._unbinders.forEach((off) => off?.());
-    this._unbinders.clear();
+    if (confirmed) {
+      if (type === "localStorage") localStorage.clear();
+      if (type === "cookie") {
+        document.cookie.split(";").forEach((c) => {
+          document.cookie = c
+            .replace(/^ +/, "")
+            .replace(
+              /=.*/,
+              "=;expires=" + new Date().toUTCString() + ";path=/"
+            );
+        });
+      }
+      LoggerService?.record(
+        "info",
+        `[AppStorageManager] ${type} wyczyszczony przez użytkownika.`
+      );
+    } else {
+      LoggerService?.record(
+        "info",
+        `[AppStorageManager] Użytkownik odmówił czyszczenia ${type}.`
+      );
+    }
   }
 }
 
@@ -2133,13 +847,36 @@ class BackendAPI {
 
   // ── Publiczne metody API ───────────────────────────────────────────────────
 
+  /**
+   * Generuje identyfikator żądania dla deduplikacji po stronie backendu.
+   * @returns {string} Unikalny identyfikator.
+   */
+  static newRequestId() {
+    if (globalThis.crypto && typeof globalThis.crypto.randomUUID === "function") {
+      return globalThis.crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 11)}`;
+  }
+
   /**
    * Wysyła prompt użytkownika do backendu.
+   * `requestId` jest stały dla wszystkich ponowień tego samego wywołania,
+   * więc retry po timeoucie dołącza do trwającej generacji zamiast zaczynać nową.
    * @param {string} prompt - Treść promptu.
+   * @param {string} [requestId] - Identyfikator żądania (domyślnie nowy).
+   * @returns {Promise<any>} Odpowiedź z backendu.
+   */
+  static async generate(prompt, requestId = BackendAPI.newRequestId()) {
+    return this._postJson("/generate", { prompt, requestId });
+  }
+
+  /**
+   * Przerywa trwającą generację po stronie backendu.
+   * @param {string} requestId - Identyfikator żądania przekazany do generate().
    * @returns {Promise<any>} Odpowiedź z backendu.
    */
-  static async generate(prompt) {
-    return this._postJson("/generate", { prompt });
+  static async cancel(requestId) {
+    return this._postJson("/cancel", { requestId });
   }
 
   /**
@@ -2183,1038 +920,682 @@ class BackendAPI {
 
 /**
  *
- * Statyczna klasa do zarządzania nazwą użytkownika w aplikacji.
- * Umożliwia zapis, odczyt i czyszczenie imienia użytkownika oraz dynamiczną podmianę placeholderów w tekstach.
- * Integruje się z polem input `#user_name`, umożliwiając automatyczny zapis zmian.
- *
- * ## Zasady:
+ * Kontener zależności aplikacji. Przechowuje i udostępnia instancje usług oraz
+ * zapewnia wygodne gettery do najczęściej używanych komponentów.
  *
  * - ✅ Dozwolone:
- *   - Przechowywanie i odczytywanie imienia użytkownika z AppStorageManager
- *   - Obsługa pola input `#user_name` (wypełnianie i nasłuchiwanie zmian)
- *   - Podmiana placeholderów w tekstach (np. `{{user}}`)
+ *   - Rejestracja instancji usług i komponentów (np. Dom, Utils, UserManager)
+ *   - Pobieranie zależności po nazwie lub przez getter
+ *   - Dynamiczne dodawanie nowych zależności w trakcie działania
  *
  * - ❌ Niedozwolone:
- *   - Przechowywanie innych danych użytkownika niż imię
- *   - Logika niezwiązana z nazwą użytkownika
- *   - Modyfikacja innych pól formularza
+ *   - Tworzenie instancji usług na sztywno (to robi warstwa inicjalizacyjna)
+ *   - Logika biznesowa lub UI
+ *   - Operacje sieciowe
  */
-class UserManager {
-  /**
-   * @type {string} Klucz używany w AppStorageManager
-   */
-  static storageKey = "user_name";
-
-  /**
-   * Zapisuje imię użytkownika w AppStorageManager.
-   * @param {string} name - Imię użytkownika.
-   */
-  static setName(name) {
-    AppStorageManager.set(this.storageKey, name.trim());
-  }
-
-  /**
-   * Odczytuje imię użytkownika z AppStorageManager.
-   * @returns {string} Imię użytkownika lub pusty string.
-   */
-  static getName() {
-    const raw = AppStorageManager.getWithTTL(this.storageKey);
-    return typeof raw === "string" ? raw : raw ?? "";
-  }
-
-  /**
-   * Sprawdza, czy imię użytkownika jest ustawione.
-   * @returns {boolean} True, jeśli imię istnieje i nie jest puste.
-   */
-  static hasName() {
-    return !!this.getName().trim();
-  }
-
+class Context {
   /**
-   * Usuwa zapisane imię użytkownika.
+   * Tworzy nowy kontekst z początkowym zestawem usług.
+   * @param {Record<string, any>} services - mapa nazw → instancji
    */
-  static clearName() {
-    AppStorageManager.remove(this.storageKey);
+  constructor(services = {}) {
+    /** @private @type {Map<string, any>} */
+    this._registry = new Map(Object.entries(services));
   }
 
   /**
-   * Zwraca typ pamięci, w której aktualnie przechowywane jest imię.
-   * @returns {"localStorage"|"cookie"}
+   * Rejestruje nową lub nadpisuje istniejącą zależność.
+   * @param {string} name - unikalna nazwa zależności
+   * @param {any} instance - instancja lub obiekt usługi
    */
-  static getStorageType() {
-    return AppStorageManager.type();
+  register(name, instance) {
+    this._registry.set(name, instance);
   }
 
   /**
-   * Podłącza pole input #user_name:
-   * - wypełnia istniejącą wartością,
-   * - zapisuje każdą zmianę.
-   * @param {Dom} dom - Instancja klasy Dom z metodą `q()`.
+   * Pobiera zarejestrowaną zależność po nazwie.
+   * @param {string} name - nazwa zależności
+   * @returns {any} - instancja lub undefined
    */
-  static init(dom) {
-    const input = dom.q("#user_name");
-    if (!input) return;
-    input.value = this.getName();
-    input.addEventListener("input", () => {
-      this.setName(input.value);
-    });
+  get(name) {
+    return this._registry.get(name);
   }
 
-  /**
-   * Podmienia placeholdery w tekście na aktualne imię użytkownika.
-   * @param {string} text - Tekst zawierający placeholdery (np. {{user}}).
-   * @param {Object<string,string>} [map] - Opcjonalna mapa dodatkowych placeholderów do podmiany.
-   * @returns {string} Tekst z podmienionymi wartościami.
-   */
-  static replacePlaceholders(text, map = {}) {
-    const name = this.getName() || "Użytkowniku";
-    let result = text.replace(/{{\s*user\s*}}/gi, name);
-    for (const [key, value] of Object.entries(map)) {
-      const regex = new RegExp(`{{\\s*${key}\\s*}}`, "gi");
-      result = result.replace(regex, value);
-    }
-    return result;
+  // Wygodne gettery (opcjonalne)
+  get dom() {
+    return this.get("dom");
   }
-}
-
-/**
- *
- * Uniwersalny mediator przechowywania danych z automatycznym fallbackiem
- * z `localStorage` do `cookie` w przypadku braku dostępu lub błędu.
- * Obsługuje TTL w sekundach, czyszczenie wpisów z prefiksem,
- * oraz mechanizmy obronne przy przekroczeniu limitu pamięci (`QuotaExceededError`).
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Zapisywanie, odczytywanie i usuwanie danych w `localStorage` lub `cookie`
- *   - Obsługa TTL i czyszczenie danych tymczasowych
- *   - Reakcja na błędy pamięci i komunikacja z użytkownikiem
- *
- * - ❌ Niedozwolone:
- *   - Wymuszanie prefiksów
- *   - Logika aplikacyjna (np. interpretacja danych)
- */
-class AppStorageManager {
-  /**
-   * Sprawdza, czy `localStorage` jest dostępny i funkcjonalny.
-   * Wykonuje testowy zapis i usunięcie wpisu.
-   * @returns {boolean} True, jeśli można bezpiecznie używać `localStorage`.
-   */
-  static _hasLocalStorage() {
-    try {
-      const testKey = "__storage_test__";
-      localStorage.setItem(testKey, "1");
-      localStorage.removeItem(testKey);
-      return true;
-    } catch {
-      return false;
-    }
+  get utils() {
+    return this.get("utils");
   }
-
-  /**
-   * Zwraca typ aktualnie używanego magazynu.
-   * @returns {"localStorage"|"cookie"} Typ aktywnego backendu.
-   */
-  static type() {
-    return this._hasLocalStorage() ? "localStorage" : "cookie";
+  get userManager() {
+    return this.get("userManager");
   }
-
-  /**
-   * Zapisuje wartość pod wskazanym kluczem z opcjonalnym TTL.
-   * TTL wyrażony w sekundach. Domyślnie 30 dni (2592000 sekund).
-   * Wartość jest serializowana do JSON.
-   *
-   * @param {string} key - Klucz pod którym zapisywana jest wartość.
-   * @param {any} value - Dowolna wartość do zapisania.
-   * @param {number} [ttl=2592000] - Czas życia w sekundach.
-   */
-  static set(key, value, ttl = 2592000) {
-    const now = Date.now();
-    const payload = ttl ? { value, ts: now, ttl: ttl * 1000 } : value;
-
-    const serialized = JSON.stringify(payload);
-
-    if (this._hasLocalStorage()) {
-      try {
-        localStorage.setItem(key, serialized);
-      } catch (err) {
-        if (err.name === "QuotaExceededError") {
-          this.purgeByPrefix("img-exists:");
-          try {
-            localStorage.setItem(key, serialized);
-          } catch (e) {
-            this._handleStorageFailure("localStorage", key, e);
-          }
-        } else {
-          this._handleStorageFailure("localStorage", key, err);
-        }
-      }
-    } else {
-      let cookie = `${encodeURIComponent(key)}=${encodeURIComponent(
-        serialized
-      )}; path=/`;
-      if (ttl) {
-        cookie += `; max-age=${ttl}`;
-      }
-      document.cookie = cookie;
-
-      // Sprawdzenie skuteczności zapisu
-      if (!document.cookie.includes(`${encodeURIComponent(key)}=`)) {
-        this._handleStorageFailure("cookie", key);
-      }
-    }
+  get diagnostics() {
+    return this.get("diagnostics");
   }
-
-  /**
-   * Odczytuje wartość spod wskazanego klucza.
-   * Deserializuje JSON, jeśli to możliwe.
-   * @param {string} key - Klucz do odczytu.
-   * @returns {any|null} Wartość lub null, jeśli brak.
-   */
-  static get(key) {
-    let raw = null;
-    if (this._hasLocalStorage()) {
-      raw = localStorage.getItem(key);
-    } else {
-      const match = document.cookie.match(
-        new RegExp(`(?:^|; )${encodeURIComponent(key)}=([^;]*)`)
-      );
-      raw = match ? decodeURIComponent(match[1]) : null;
-    }
-    try {
-      return raw ? JSON.parse(raw) : null;
-    } catch {
-      return raw;
-    }
+  get backendAPI() {
+    return this.get("backendAPI");
   }
+}
 
+/**
+ *
+ * Centralny punkt dostępu do elementów DOM aplikacji.
+ * Wymusza strukturę opartą na <main id="app"> jako kontenerze bazowym.
+ *
+ * ## Zasady:
+ *
+ * - ✅ Dozwolone:
+ *   - Przechowywanie i udostępnianie referencji do elementów
+ *   - Wyszukiwanie elementów tylko wewnątrz <main id="app">
+ *
+ * - ❌ Niedozwolone:
+ *   - Operacje poza <main id="app">
+ *   - Modyfikowanie struktury DOM globalnie
+ *
+ */
+class Dom {
   /**
-   * Odczytuje wartość z TTL. Jeśli wygasła — usuwa i zwraca null.
-   * @param {string} key - Klucz do odczytu.
-   * @returns {any|null} Wartość lub null, jeśli wygasła lub nie istnieje.
+   * Inicjalizuje klasę Dom z wymuszeniem kontenera <main id="app">
+   * @param {string|HTMLElement} rootSelector - domyślnie "#app"
    */
-  static getWithTTL(key) {
-    const raw = this.get(key);
-    if (!raw || typeof raw !== "object") return raw;
-
-    if (raw.ttl && raw.ts && Date.now() - raw.ts > raw.ttl) {
-      this.remove(key);
-      return null;
-    }
-    return raw.value ?? raw;
+  constructor(rootSelector = "#app") {
+    this.rootSelector = rootSelector;
+    this.root = null;
+    this.refs = {};
   }
 
   /**
-   * Usuwa wartość spod wskazanego klucza.
-   * @param {string} key - Klucz do usunięcia.
+   * Inicjalizuje referencje do elementów wewnątrz <main id="app">
+   * @param {Record<string, string>} refMap - mapa nazw do selektorów
    */
-  static remove(key) {
-    if (this._hasLocalStorage()) {
-      localStorage.removeItem(key);
-    } else {
-      document.cookie = `${encodeURIComponent(key)}=; max-age=0; path=/`;
+  init(refMap) {
+    const rootCandidate =
+      typeof this.rootSelector === "string"
+        ? document.querySelector(this.rootSelector)
+        : this.rootSelector;
+
+    if (!(rootCandidate instanceof HTMLElement)) {
+      LoggerService.record(
+        "error",
+        '[Dom] Nie znaleziono <main id="app">. Wymagana struktura HTML.'
+      );
+      return;
     }
-  }
 
-  /**
-   * Zwraca listę wszystkich kluczy z aktualnego backendu.
-   * @returns {string[]} Tablica kluczy.
-   */
-  static keys() {
-    if (this._hasLocalStorage()) {
-      return Object.keys(localStorage);
-    } else {
-      return document.cookie
-        .split(";")
-        .map((c) => decodeURIComponent(c.split("=")[0].trim()))
-        .filter((k) => k.length > 0);
+    if (rootCandidate.tagName !== "MAIN" || rootCandidate.id !== "app") {
+      LoggerService.record(
+        "error",
+        '[Dom] Kontener bazowy musi być <main id="app">. Otrzymano:',
+        rootCandidate
+      );
+      return;
     }
+
+    this.root = rootCandidate;
+
+    Object.entries(refMap).forEach(([name, selector]) => {
+      const el =
+        selector === this.rootSelector
+          ? this.root
+          : this.root.querySelector(selector);
+
+      if (!el) {
+        LoggerService.record("warn", `[Dom] Brak elementu: ${selector}`);
+      }
+
+      this.refs[name] = el || null;
+      this[name] = el || null;
+    });
   }
 
   /**
-   * Usuwa wszystkie wpisy z danym prefiksem.
-   * @param {string} prefix - Prefiks kluczy do usunięcia.
+   * Wyszukuje element w obrębie <main id="app">
+   * @param {string} selector
+   * @returns {HTMLElement|null}
    */
-  static purgeByPrefix(prefix) {
-    this.keys()
-      .filter((k) => k.startsWith(prefix))
-      .forEach((k) => this.remove(k));
+  q(selector) {
+    return this.root?.querySelector(selector) || null;
   }
 
   /**
-   * Obsługuje błędy zapisu do pamięci (`QuotaExceededError` lub inne).
-   * Informuje użytkownika i oferuje czyszczenie pamięci.
-   * @param {"localStorage"|"cookie"} type - Typ pamięci.
-   * @param {string} key - Klucz, który nie został zapisany.
-   * @param {Error} [error] - Opcjonalny obiekt błędu.
+   * Wyszukuje wszystkie elementy pasujące do selektora w obrębie <main id="app">
+   * @param {string} selector
+   * @returns {NodeListOf<HTMLElement>}
    */
-  static _handleStorageFailure(type, key, error) {
-    LoggerService?.record(
-      "warn",
-      `[AppStorageManager] ${type} niedostępny lub pełny przy zapisie ${key}`,
-      error
-    );
-
-    const confirmed = window.confirm(
-      `Pamięć ${type} jest pełna lub niedostępna. Czy chcesz ją wyczyścić, aby kontynuować?`
-    );
-
-    if (confirmed) {
-      if (type === "localStorage") localStorage.clear();
-      if (type === "cookie") {
-        document.cookie.split(";").forEach((c) => {
-          document.cookie = c
-            .replace(/^ +/, "")
-            .replace(
-              /=.*/,
-              "=;expires=" + new Date().toUTCString() + ";path=/"
-            );
-        });
-      }
-      LoggerService?.record(
-        "info",
-        `[AppStorageManager] ${type} wyczyszczony przez użytkownika.`
-      );
-    } else {
-      LoggerService?.record(
-        "info",
-        `[AppStorageManager] Użytkownik odmówił czyszczenia ${type}.`
-      );
-    }
+  qa(selector) {
+    return this.root?.querySelectorAll(selector) || [];
   }
 }
 
 /**
  *
- * Walidator tekstu edytowanego przez AI oraz przypisanych tagów.
- * Sprawdza długość tekstu i tagów oraz obecność treści.
+ * Buforowany logger do środowiska przeglądarkowego z ograniczeniem wieku wpisów.
+ * Obsługuje poziomy logowania: 'log', 'warn', 'error'.
+ * Wpisy są przechowywane w pamięci i mogą być filtrowane, czyszczone lub eksportowane.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Stałe limitów: maxTextLength, maxTagLength
- *   - Metoda: validate(text, tags)
+ *   - record(level, msg, ...args)
+ *   - cleanup()
+ *   - getHistory({clone})
+ *   - clearHistory()
+ *   - setMaxAge(ms)
+ *   - filterByLevel(level)
+ *   - recordOnce(level, msg, ...args)
  *
  * - ❌ Niedozwolone:
- *   - Operacje na DOM
- *   - Zlecenia sieciowe (fetch, localStorage)
- *   - Logika aplikacyjna (np. renderowanie, wysyłka)
- *   - Efekty uboczne (np. console.log, mutacje zewnętrznych obiektów)
+ *   - logika aplikacji (business logic)
+ *   - operacje sieciowe, DOM, storage
+ *
  */
-class EditValidator {
+class LoggerService {
   /**
-   * Maksymalna długość tekstu edycji.
-   * Tekst dłuższy niż ta wartość zostanie uznany za niepoprawny.
-   * @type {number}
+   * Bufor wpisów logowania.
+   * Każdy wpis zawiera znacznik czasu, poziom, wiadomość i dodatkowe argumenty.
+   * @type {Array<{timestamp: number, level: 'log'|'warn'|'error', msg: string, args: any[]}>}
    */
-  static maxTextLength = 5000;
+  static buffer = [];
 
   /**
-   * Maksymalna długość pojedynczego tagu.
-   * Tag dłuższy niż ta wartość zostanie uznany za niepoprawny.
+   * Maksymalny wiek wpisów w milisekundach.
+   * Wpisy starsze niż ta wartość są usuwane przy każdym logowaniu i odczycie.
    * @type {number}
    */
-  static maxTagLength = 300;
+  static maxAgeMs = 5 * 60 * 1000; // 5 minut
 
   /**
-   * Waliduje tekst i tagi pod kątem pustki i długości.
-   * - Tekst musi być niepusty po przycięciu.
-   * - Tekst nie może przekraczać maxTextLength.
-   * - Każdy tag musi być typu string i nie może przekraczać maxTagLength.
-   *
-   * @param {string} text - Edytowany tekst AI
-   * @param {string[]} tags - Lista tagów
-   * @returns {{ valid: boolean, errors: string[] }} - Obiekt z informacją o poprawności i listą błędów
+   * Ustawia nowy limit wieku wpisów i natychmiast czyści stare.
+   * @param {number} ms - nowy limit wieku w milisekundach
    */
-  static validate(text, tags) {
-    const errors = [];
-
-    // Przycięcie tekstu z obu stron
-    const trimmedText = text.trim();
-    const textLength = trimmedText.length;
-
-    // Walidacja tekstu
-    if (!textLength) {
-      errors.push("Tekst edycji nie może być pusty.");
-    } else if (textLength > this.maxTextLength) {
-      errors.push(
-        `Maksymalna długość tekstu to ${this.maxTextLength} znaków, otrzymano ${textLength}.`
-      );
+  static setMaxAge(ms) {
+    this.maxAgeMs = ms;
+    this.cleanup();
+  }
+
+  /**
+   * Dodaje wpis do bufora i wypisuje go w konsoli z odpowiednim stylem.
+   * @param {'log'|'warn'|'error'} level - poziom logowania
+   * @param {string} msg - wiadomość do wyświetlenia
+   * @param {...any} args - dodatkowe dane (np. obiekty, błędy)
+   */
+  static record(level, msg, ...args) {
+    const emojiLevels = { log: "🌍", warn: "⚠️", error: "‼️" };
+    const timestamp = Date.now();
+
+    this.buffer.push({ timestamp, level, msg, args });
+    this.cleanup();
+
+    const styleMap = {
+      log: "color: #444",
+      warn: "color: orange",
+      error: "color: red; font-weight: bold",
+    };
+
+    const style = styleMap[level] || "";
+    const displayMsg = `${emojiLevels[level] || ""} ${msg}`;
+    console[level](
+      `%c[${new Date(timestamp).toLocaleTimeString()}] ${displayMsg}`,
+      style,
+      ...args
+    );
+  }
+
+  /**
+   * Usuwa wpisy starsze niż maxAgeMs.
+   * Jeśli maxAgeMs <= 0, czyści cały bufor.
+   */
+  static cleanup() {
+    if (this.maxAgeMs <= 0) {
+      this.buffer = [];
+      return;
     }
+    const cutoff = Date.now() - this.maxAgeMs;
+    this.buffer = this.buffer.filter((e) => e.timestamp >= cutoff);
+  }
 
-    // Walidacja tagów
-    for (const tag of tags) {
-      if (typeof tag !== "string") continue; // ignoruj błędne typy
-      if (tag.length > this.maxTagLength) {
-        errors.push(
-          `Tag "${tag}" przekracza limit ${this.maxTagLength} znaków (ma ${tag.length}).`
-        );
-      }
+  /**
+   * Zwraca wpisy danego poziomu logowania.
+   * @param {'log'|'warn'|'error'} level - poziom do filtrowania
+   * @returns {Array<{timestamp: number, msg: string, args: any[]}>}
+   */
+  static filterByLevel(level) {
+    this.cleanup();
+    return this.buffer
+      .filter((e) => e.level === level)
+      .map(({ timestamp, msg, args }) => ({ timestamp, msg, args }));
+  }
+
+  /**
+   * Zwraca całą historię wpisów.
+   * Jeśli clone = true, zwraca głęboką kopię wpisów.
+   * @param {boolean} [clone=false] - czy zwrócić kopię wpisów
+   * @returns {Array<{timestamp: number, level: string, msg: string, args: any[]}>}
+   */
+  static getHistory(clone = false) {
+    this.cleanup();
+    if (!clone) return [...this.buffer];
+    return this.buffer.map((entry) => structuredClone(entry));
+  }
+
+  /**
+   * Czyści cały bufor logów bez względu na wiek wpisów.
+   */
+  static clearHistory() {
+    this.buffer = [];
+  }
+
+  /**
+   * Dodaje wpis tylko jeśli nie istnieje już wpis o tym samym poziomie i wiadomości.
+   * @param {'log'|'warn'|'error'} level - poziom logowania
+   * @param {string} msg - wiadomość
+   * @param {...any} args - dodatkowe dane
+   */
+  static recordOnce(level, msg, ...args) {
+    if (!this.buffer.some((e) => e.level === level && e.msg === msg)) {
+      this.record(level, msg, ...args);
     }
-
-    return {
-      valid: errors.length === 0,
-      errors,
-    };
   }
 }
 
 /**
  *
- * Główna warstwa logiki aplikacji — łączy widoki UI z backendem.
- * Odpowiada za obsługę promptów, edycji i oceniania wiadomości.
- * Integruje się z `ChatUIView`, `ChatEditView`, `BackendAPI`, `ImageResolver` i `LoggerService`.
+ * Menedżer widoczności paneli bocznych w aplikacji.
+ * Zapewnia kontrolę nad otwieraniem, zamykaniem i przełączaniem paneli w interfejsie użytkownika.
+ * Obsługuje tryb mobilny (wyłączność paneli) oraz desktopowy (współistnienie).
+ * Utrzymuje stan wybranych paneli w cookie — tylko na desktopie.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Obsługa promptów, edycji, oceniania
- *   - Przekazywanie danych między widokami a BackendAPI
- *   - Aktualizacja UI przez `ChatUIView` i `ChatEditView`
+ *   - Rejestracja paneli i ich przycisków
+ *   - Obsługa zdarzeń kliknięcia
+ *   - Przełączanie widoczności paneli
+ *   - Zapisywanie stanu paneli w cookie (desktop only)
  *
  * - ❌ Niedozwolone:
- *   - Renderowanie HTML bezpośrednio
- *   - Mutowanie danych poza `dataset`/`msgEl`
- *   - Logika domenowa (np. interpretacja tagów)
+ *   - Deklaracja paneli statycznie
+ *   - Modyfikacja zawartości paneli
+ *   - Logika niezwiązana z UI paneli
+ *
  */
-class ChatManager {
+class PanelsController {
   /**
-   * Inicjalizuje widoki UI i podpina zdarzenia.
-   * @param {{ dom: Dom }} context - Kontekst aplikacji z referencjami DOM.
+   * @param {Dom} dom - Instancja klasy Dom
+   * @param {Array<{button: HTMLElement, panel: HTMLElement, id: string}>} panels - lista paneli
+   * @param {string[]} persistentPanels - identyfikatory paneli, które mają być zapamiętywane (desktop only)
    */
-  constructor(context) {
-    const { dom } = context;
-    this.chatView = new ChatUIView(
-      dom.chatContainer,
-      dom.inputArea,
-      dom.prompt
-    );
-
-    this.promptVal = {
-      promptEl: dom.prompt,
-      errorEl: dom.promptError,
-      warningEl: dom.promptWarning,
-    };
-
-    this.editView = new ChatEditView(dom);
-
-    this.chatView.onEditRequested = (msgEl, text, id, ts, sessionId) =>
-      this.editView.enableEdit(msgEl, text, id, ts, sessionId);
-
-    this.chatView.onRatingSubmit = (msgEl) => this.ratingView.open(msgEl);
+  constructor(dom, panels = [], persistentPanels = []) {
+    this.dom = dom;
+    this.panels = panels;
+    this.cookiePanels = new Set(persistentPanels);
+    this._unbinders = new Map();
   }
 
   /**
-   * Inicjalizuje widoki i podpina zdarzenia walidacji promptu oraz edycji i oceny.
+   * Inicjalizuje nasłuchiwacze kliknięć i przywraca stan z cookie (desktop only).
    */
   init() {
-    const { promptEl, errorEl, warningEl } = this.promptVal;
-    let hadInput = false;
-
-    const syncUI = (text) => {
-      const raw = typeof text === "string" ? text : promptEl.value;
-      const trimmed = raw.trim();
-      const len = raw.length;
-
-      // licznik znaków
-      warningEl.textContent = `${len}/${PromptValidator.maxLength} znaków`;
-
-      // klasa długości
-      if (len > PromptValidator.maxLength) {
-        warningEl.classList.add("error-text-length");
-      } else {
-        warningEl.classList.remove("error-text-length");
-      }
-
-      // walidacja
-      const { valid, errors } = PromptValidator.validate(raw);
-
-      // filtr błędów
-      const isEmpty = trimmed.length === 0;
-      const filteredErrors = errors.filter((msg) => {
-        const isEmptyError = msg.startsWith("Prompt nie może być pusty");
-        if (isEmptyError) return hadInput && isEmpty;
-        return true;
-      });
-
-      errorEl.textContent = filteredErrors.join(" ");
-      return { valid, filteredErrors };
-    };
-
-    // startowa synchronizacja
-    const initialText = promptEl.value || "";
-    if (initialText.length > 0) hadInput = true;
-    syncUI(initialText);
-
-    // live feedback
-    promptEl.addEventListener("input", () => {
-      const len = promptEl.value.length;
-      if (len > 0) hadInput = true;
-
-      const { filteredErrors } = syncUI();
-      if (len > 0) {
-        const keep = filteredErrors.filter(
-          (e) => !e.startsWith("Prompt nie może być pusty")
-        );
-        errorEl.textContent = keep.join(" ");
-      }
-    });
-
-    // walidacja na submit – zwraca true/false
-    this.chatView.onPromptSubmit = (text) => {
-      const raw = text;
-      const trimmed = raw.trim();
-      const len = raw.length;
-      const { valid } = PromptValidator.validate(raw);
-      const { filteredErrors } = syncUI(raw);
-
-      if (!valid) {
-        const empty = trimmed.length === 0;
-        const onlyEmptyError =
-          filteredErrors.length === 1 &&
-          filteredErrors[0].startsWith("Prompt nie może być pusty");
-
-        if (empty && !hadInput) {
-          return false; // odrzucone – brak wcześniejszego inputu
-        }
+    this.panels.forEach(({ button, panel, id }) => {
+      if (!button || !panel) return;
 
-        errorEl.textContent = filteredErrors.join(" ");
-        if (len > PromptValidator.maxLength) {
-          warningEl.classList.add("error-text-length");
-        }
-        return false; // odrzucone – błędy walidacji
+      if (!Utils.isMobile() && this.cookiePanels.has(id)) {
+        const saved = AppStorageManager.getWithTTL(`panel:${id}`);
+        if (saved === true) panel.classList.add("open");
       }
 
-      warningEl.classList.remove("error-text-length");
-      errorEl.textContent = "";
-      this.sendPrompt(raw);
-      return true; // zaakceptowane – ChatUIView wyczyści pole
-    };
-
-    this.chatView.init();
-
-    this.editView.onEditSubmit = (msgEl, txt, tags, imageUrl) =>
-      this.sendEdit(msgEl, txt, tags, imageUrl);
-
-    this.editView.onEditCancel = (msgEl, data) => {
-      this.chatView.hydrateAIMessage(msgEl, data);
-    };
-
-    this.chatView.onRatingSubmit = (payload) => {
-      this.sendRating(payload);
-    };
+      const handler = () => this.togglePanel(panel);
+      button.addEventListener("click", handler);
+      this._unbinders.set(button, () =>
+        button.removeEventListener("click", handler)
+      );
+    });
   }
 
   /**
-   * Wysyła prompt użytkownika do backendu i renderuje odpowiedź.
-   * @param {string} prompt - Treść promptu.
-   * @returns {Promise<void>}
+   * Otwiera panel. Na mobile zamyka inne.
+   * @param {HTMLElement} panel
    */
-  async sendPrompt(prompt) {
-    this.chatView.addUserMessage(prompt);
-    const { msgEl, timer } = this.chatView.addLoadingMessage();
-    try {
-      const data = await BackendAPI.generate(prompt);
-
-      // Rozwiąż URL ilustracji
-      const urls = await ImageResolver.resolve(data.tags);
-      data.imageUrl = urls[0] || "";
-
-      // Renderuj odpowiedź AI
-      this.chatView.hydrateAIMessage(msgEl, data);
-    } catch (err) {
-      this.chatView.showError(msgEl);
-      LoggerService.record("error", "[ChatManager] sendPrompt", err);
-    } finally {
-      clearInterval(timer);
+  openPanel(panel) {
+    if (Utils.isMobile()) {
+      this.closeAllPanels();
+    }
+    panel.classList.add("open");
+
+    if (!Utils.isMobile() && this.cookiePanels.has(panel.id)) {
+      AppStorageManager.set(`panel:${panel.id}`, true);
     }
   }
 
   /**
-   * Przesyła edytowaną wiadomość do backendu i aktualizuje UI.
-   * @param {HTMLElement} msgEl - Element wiadomości.
-   * @param {string} editedText - Nowa treść.
-   * @param {Record<string, any>} tags - Tagowanie wiadomości.
-   * @param {string} imageUrl - URL ilustracji.
-   * @param {string} [sessionId] - ID sesji (opcjonalne).
-   * @returns {Promise<void>}
+   * Zamyka panel.
+   * @param {HTMLElement} panel
    */
-  async sendEdit(msgEl, editedText, tags, imageUrl, sessionId) {
-    this.chatView.hydrateAIMessage(
-      msgEl,
-      {
-        id: msgEl.dataset.msgId,
-        sessionId: sessionId || msgEl.dataset.sessionId,
-        tags,
-        timestamp: msgEl.dataset.timestamp,
-        originalText: editedText,
-        text: editedText,
-        sender: msgEl.dataset.sender,
-        avatarUrl: msgEl.dataset.avatarUrl,
-        generation_time: Number.isFinite(
-          parseFloat(msgEl.dataset.generation_time)
-        )
-          ? parseFloat(msgEl.dataset.generation_time)
-          : 0,
-
-        imageUrl,
-      },
-      true
-    );
+  closePanel(panel) {
+    panel.classList.remove("open");
 
-    try {
-      await BackendAPI.edit(editedText, tags, sessionId, msgEl.dataset.msgId);
-    } catch (err) {
-      LoggerService.record("error", "[ChatManager] sendEdit", err);
+    if (!Utils.isMobile() && this.cookiePanels.has(panel.id)) {
+      AppStorageManager.set(`panel:${panel.id}`, false);
     }
   }
 
   /**
-   * Przesyła ocenę wiadomości do backendu.
-   * @param {{ messageId: string, sessionId: string, ratings: Record<string, any> }} payload
-   * @returns {Promise<void>}
+   * Przełącza widoczność panelu.
+   * @param {HTMLElement} panel
    */
-  async sendRating({ messageId, sessionId, ratings }) {
-    try {
-      await BackendAPI.rate({ messageId, sessionId, ratings });
-    } catch (err) {
-      LoggerService.record("error", "[ChatManager] sendRating", err);
+  togglePanel(panel) {
+    if (!panel) return;
+    const isOpen = panel.classList.contains("open");
+    if (isOpen) {
+      this.closePanel(panel);
+    } else {
+      this.openPanel(panel);
     }
   }
-}
-
-/**
- * Walidator promptów użytkownika przed wysłaniem do AI.
- * Sprawdza typ, długość i obecność niedozwolonych znaków.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Stałe limitów: minLength, maxLength
- *   - Wzorzec niedozwolonych znaków: forbidden
- *   - Metoda: validate(prompt)
- *
- * - ❌ Niedozwolone:
- *   - Operacje na DOM
- *   - Zlecenia sieciowe (fetch, localStorage)
- *   - Logika aplikacyjna (np. renderowanie, wysyłka)
- *   - Efekty uboczne (np. console.log, mutacje zewnętrznych obiektów)
- */
-class PromptValidator {
-  /**
-   * Minimalna długość promptu po przycięciu.
-   * Prompt krótszy niż ta wartość zostanie uznany za niepoprawny.
-   * @type {number}
-   */
-  static minLength = 1;
 
-  /**
-   * Maksymalna długość promptu po przycięciu.
-   * Prompt dłuższy niż ta wartość zostanie uznany za niepoprawny.
-   * @type {number}
-   */
-  static maxLength = 300;
+  /** Zamyka wszystkie panele. */
+  closeAllPanels() {
+    this.panels.forEach(({ panel }) => panel?.classList.remove("open"));
+  }
 
   /**
-   * Wzorzec niedozwolonych znaków w promptach.
-   * Domyślnie: < oraz >
-   * @type {RegExp}
+   * Sprawdza, czy panel jest otwarty.
+   * @param {HTMLElement} panel
+   * @returns {boolean}
    */
-  static forbidden = /[<>]/;
+  isPanelOpen(panel) {
+    return !!panel?.classList.contains("open");
+  }
 
   /**
-   * Waliduje prompt użytkownika.
-   * Sprawdza:
-   * - czy jest typu string
-   * - czy nie jest pusty po przycięciu
-   * - czy mieści się w limicie długości
-   * - czy nie zawiera niedozwolonych znaków
-   *
-   * @param {string} prompt - Tekst promptu od użytkownika
-   * @returns {{ valid: boolean, errors: string[] }} - Obiekt z informacją o poprawności i listą błędów
+   * Zwraca pierwszy otwarty panel.
+   * @returns {HTMLElement|null}
    */
-  static validate(prompt) {
-    const errors = [];
-
-    // Typ musi być string
-    if (typeof prompt !== "string") {
-      errors.push("Prompt musi być typu string.");
-      return { valid: false, errors };
-    }
-
-    // Przycięcie spacji
-    const trimmed = prompt.trim();
-    const len = trimmed.length;
-
-    // Walidacja długości
-    if (len < this.minLength) {
-      errors.push("Prompt nie może być pusty.");
-    } else if (len > this.maxLength) {
-      errors.push(
-        `Maksymalna długość promptu to ${this.maxLength} znaków, otrzymano ${len}.`
-      );
-    }
-
-    // Walidacja znaków
-    if (this.forbidden.test(trimmed)) {
-      errors.push("Prompt zawiera niedozwolone znaki: < lub >.");
-    }
-
-    return {
-      valid: errors.length === 0,
-      errors,
-    };
+  getOpenPanel() {
+    const item = this.panels.find(({ panel }) =>
+      panel?.classList.contains("open")
+    );
+    return item?.panel || null;
   }
-}
 
-/**
- *
- * Główny koordynator cyklu życia aplikacji. Odpowiada za uruchamianie przekazanych modułów
- * w ustalonej kolejności. Sam nie tworzy modułów – dostaje je z warstwy inicjalizacyjnej
- * (np. init_chat.js) jako listę obiektów implementujących metodę `init(ctx)`.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Sekwencyjne uruchamianie modułów
- *   - Przekazywanie kontekstu (`Context`) do modułów
- *   - Obsługa modułów synchronicznych i asynchronicznych
- *
- * - ❌ Niedozwolone:
- *   - Tworzenie instancji modułów na sztywno
- *   - Logika biznesowa lub UI
- *   - Bezpośrednia manipulacja DOM
- */
-class App {
   /**
-   * Tworzy instancję aplikacji.
-   * @param {Context} context - kontener zależności
-   * @param {Array<{ init: (ctx: Context) => void | Promise<void> }>} modules - lista modułów do uruchomienia
+   * Zwraca wszystkie otwarte panele.
+   * @returns {HTMLElement[]}
    */
-  constructor(context, modules = []) {
-    this.ctx = context;
-    this.modules = modules;
+  getOpenPanels() {
+    return this.panels
+      .map(({ panel }) => panel)
+      .filter((p) => p && p.classList.contains("open"));
   }
 
   /**
-   * Uruchamia wszystkie moduły w kolejności, przekazując im kontekst.
-   * Obsługuje moduły synchroniczne i asynchroniczne.
-   * @returns {Promise<void>}
+   * Usuwa nasłuchiwacze i czyści zasoby.
    */
-  async init() {
-    LoggerService.record("log", "[App] Inicjalizacja aplikacji...");
-    for (const m of this.modules) {
-      if (m && typeof m.init === "function") {
-        await m.init(this.ctx);
-      }
-    }
-    LoggerService.record("log", "[App] Aplikacja gotowa.");
+  destroy() {
+    this._unbinders.forEach((off) => off?.());
+    this._unbinders.clear();
   }
 }
 
 /**
- *
- * Komponent UI odpowiedzialny za wyświetlanie i obsługę panelu ocen wiadomości AI.
- * Funkcje:
- *  - Renderuje panel ocen w formie <details> z listą kryteriów i suwakami (range input)
- *  - Obsługuje zmianę wartości suwaków (aktualizacja widocznej wartości)
- *  - Po kliknięciu "Wyślij ocenę" zbiera wszystkie wartości i przekazuje je w callbacku `onSubmit`
- *  - Zapobiega duplikowaniu panelu ocen w tej samej wiadomości
+ * Warstwa odpornościowa dla zapytań HTTP z kontrolą retry i backoffem.
+ * Zapewnia ponawianie zapytań w przypadku błędów sieciowych lub odpowiedzi serwera,
+ * które kwalifikują się do ponowienia (retryable), z kontrolą liczby prób, odstępów
+ * i maksymalnego czasu trwania operacji.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Tworzenie i osadzanie elementów DOM panelu ocen
- *   - Obsługa interakcji użytkownika (zmiana wartości, wysyłka oceny)
+ *   - Wielokrotne próby `fetch` z kontrolą limitu, odstępu i łącznego czasu.
+ *   - Decyzja, czy błąd/odpowiedź jest retryowalna.
+ *   - Wywołanie zdarzenia `onRetry` (np. do telemetrii lub logowania).
+ *   - Parametryzacja backoffu (bazowe opóźnienie, mnożnik, jitter).
  *
  * - ❌ Niedozwolone:
- *   - Samodzielne wysyłanie ocen do backendu (od tego jest logika wyżej)
- *   - Modyfikowanie innych elementów wiadomości poza panelem ocen
+ *   - Logika UI lub domenowa.
+ *   - Transformacje payloadu/JSON (to rola warstwy BackendAPI).
+ *   - Obsługa specyficznych formatów odpowiedzi.
  */
-class ChatRatingView {
+class RequestRetryManager {
   /**
-   * @param {HTMLElement} msgEl - Element wiadomości, do którego ma zostać dodany panel ocen
-   * @param {function(object):void} [onSubmit] - Callback wywoływany po wysłaniu oceny
+   * Sprawdza, czy błąd lub odpowiedź nadaje się do ponowienia.
+   *
+   * ## Zasady:
+   *  - Retry przy błędach sieciowych (`TypeError` z `fetch`)
+   *  - Retry przy kodach HTTP 5xx i 429
+   *  - Brak retry przy kodach 4xx (poza 429) i odpowiedziach `ok === true`
+   *
+   * @param {any} errOrRes - Obiekt błędu lub odpowiedzi `Response`
+   * @returns {boolean} - true, jeśli można ponowić
    */
-  constructor(msgEl, onSubmit) {
-    if (!(msgEl instanceof HTMLElement)) return;
-    this.onSubmit = onSubmit || null;
-
-    /**
-     * Lista kryteriów oceniania
-     * @type {{key: string, label: string}[]}
-     */
-    this.criteria = [
-      { key: "Narrative", label: "Narracja" },
-      { key: "Style", label: "Styl" },
-      { key: "Logic", label: "Logika" },
-      { key: "Quality", label: "Jakość" },
-      { key: "Emotions", label: "Emocje" },
-    ];
-
-    this.render(msgEl);
+  static isRetryable(errOrRes) {
+    // Response
+    if (errOrRes && typeof errOrRes === "object" && "ok" in errOrRes) {
+      const res = /** @type {Response} */ (errOrRes);
+      if (res.ok) return false;
+      const s = res.status;
+      return s === 429 || (s >= 500 && s <= 599);
+    }
+    // Error
+    if (errOrRes instanceof Error) {
+      // Fetch w razie problemów sieciowych rzuca zwykle TypeError
+      return errOrRes.name === "TypeError";
+    }
+    return false;
   }
 
   /**
-   * Renderuje panel ocen w wiadomości.
-   * @param {HTMLElement} msgEl - Element wiadomości
+   * Wykonuje `fetch` z mechanizmem retry i backoffem z jitterem.
+   *
+   * @param {string|Request} input - URL lub obiekt `Request`
+   * @param {RequestInit} [init={}] - Opcje `fetch` (method, headers, body itd.)
+   * @param {number} [retries=3] - Maksymalna liczba ponowień (bez pierwszej próby)
+   * @param {number} [baseDelay=800] - Bazowe opóźnienie (ms) dla backoffu
+   * @param {{
+   *   silent?: boolean,
+   *   maxTotalTime?: number,     // twardy limit łącznego czasu (ms)
+   *   onRetry?: (info:{
+   *     attempt:number,
+   *     retries:number,
+   *     delay:number,
+   *     reason:any,
+   *     input:string|Request
+   *   })=>void,
+   *   factor?: number,           // mnożnik backoffu, domyślnie 2
+   *   jitter?: number            // [0..1], odchylenie losowe, domyślnie 0.2
+   * } } [options={}] - Parametry dodatkowe
+   * @returns {Promise<Response>} - Odpowiedź `fetch`
+   *
+   * Przebieg:
+   *  1. Wykonuje pierwsze żądanie `fetch`.
+   *  2. Jeśli odpowiedź jest OK → zwraca ją.
+   *  3. Jeśli odpowiedź/błąd jest retryowalny → ponawia do `retries` razy.
+   *  4. Każde ponowienie ma opóźnienie wyliczone z backoffu + jitter.
+   *  5. Jeśli przekroczono `maxTotalTime` → rzuca błąd.
+   *  6. Wywołuje `onRetry` (jeśli podany) przy każdej próbie ponowienia.
    */
-  render(msgEl) {
-    // Unikamy duplikatów panelu ocen
-    if (msgEl.querySelector("details.rating-form")) return;
+  static async fetchWithRetry(
+    input,
+    init = {},
+    retries = 3,
+    baseDelay = 800,
+    {
+      silent = false,
+      maxTotalTime = 15_000,
+      onRetry = null,
+      factor = 2,
+      jitter = 0.2,
+    } = {}
+  ) {
+    const start = Date.now();
+    let attempt = 0;
 
-    const details = document.createElement("details");
-    details.className = "rating-form";
-    details.open = false;
+    while (true) {
+      try {
+        const res = await fetch(input, init);
+        if (!res.ok) {
+          if (!this.isRetryable(res)) return res; // oddaj nie-OK bez retry — nie jest retryowalne
+          throw res; // wymuś retry
+        }
+        return res;
+      } catch (err) {
+        if (!this.isRetryable(err)) {
+          // Błąd nieretryowalny — rzucamy od razu
+          LoggerService.record(
+            "error",
+            "[RequestRetryManager] Non-retryable error",
+            err
+          );
+          throw err;
+        }
 
-    const summary = document.createElement("summary");
-    summary.textContent = "Oceń odpowiedź ⭐";
-    details.appendChild(summary);
+        if (attempt >= retries) {
+          LoggerService.record(
+            "error",
+            `[RequestRetryManager] Wyczerpane retry dla: ${
+              typeof input === "string" ? input : input.url
+            }`,
+            err
+          );
+          throw err;
+        }
 
-    const header = document.createElement("h3");
-    header.textContent = "Twoja ocena:";
-    details.appendChild(header);
+        // Kolejna próba
+        attempt += 1;
 
-    // Tworzenie wierszy z suwakami dla każdego kryterium
-    this.criteria.forEach(({ key, label }) => {
-      const row = document.createElement("label");
-      row.className = "rating-row";
+        // Exponential backoff + jitter
+        const exp = baseDelay * Math.pow(factor, attempt - 1);
+        const delta = exp * jitter;
+        const delay = Math.max(0, exp + (Math.random() * 2 - 1) * delta);
 
-      const labelSpan = document.createElement("span");
-      labelSpan.textContent = `${label}: `;
-      row.appendChild(labelSpan);
+        if (Date.now() + delay - start > maxTotalTime) {
+          LoggerService.record(
+            "error",
+            "[RequestRetryManager] Przekroczono maxTotalTime",
+            { maxTotalTime }
+          );
+          throw err;
+        }
 
-      const input = document.createElement("input");
-      input.type = "range";
-      input.min = "1";
-      input.max = "5";
-      input.value = "3";
-      input.name = key;
-
-      const val = document.createElement("span");
-      val.textContent = input.value;
-      input.addEventListener("input", () => (val.textContent = input.value));
-
-      row.append(input, val);
-      details.appendChild(row);
-    });
+        const level = silent ? "log" : "warn";
+        LoggerService.record(
+          level,
+          `[RequestRetryManager] Retry ${attempt}/${retries} za ${Math.round(
+            delay
+          )}ms`,
+          err
+        );
 
-    // Przycisk wysyłki oceny
-    const btn = document.createElement("button");
-    btn.type = "button";
-    btn.textContent = "Wyślij ocenę";
-    btn.addEventListener("click", () => {
-      const ratings = {};
-      this.criteria.forEach(({ key }) => {
-        ratings[key] = Number(details.querySelector(`[name="${key}"]`).value);
-      });
-      const payload = {
-        messageId: msgEl.dataset.msgId,
-        sessionId: msgEl.dataset.sessionId,
-        ratings,
-      };
-      this.onSubmit?.(payload);
-    });
-    details.appendChild(btn);
+        if (typeof onRetry === "function") {
+          try {
+            onRetry({ attempt, retries, delay, reason: err, input });
+          } catch {
+            // Ignorujemy błędy w callbacku onRetry
+          }
+        }
 
-    // Panel trafia do stopki wiadomości lub bezpośrednio do elementu
-    const footer = msgEl.querySelector(".msg-footer") || msgEl;
-    footer.appendChild(details);
+        // Odczekaj wyliczony czas przed kolejną próbą
+        await new Promise((r) => setTimeout(r, delay));
+      }
+    }
   }
 }
 
 /**
  *
- * Narzędzie do wyszukiwania istniejących obrazów na podstawie tagów.
- * Obsługuje permutacje nazw plików, cache wyników oraz preload obrazów.
+ * Statyczna klasa do zarządzania nazwą użytkownika w aplikacji.
+ * Umożliwia zapis, odczyt i czyszczenie imienia użytkownika oraz dynamiczną podmianę placeholderów w tekstach.
+ * Integruje się z polem input `#user_name`, umożliwiając automatyczny zapis zmian.
  *
- * # Zasady:
+ * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - resolve(tags, opts?): Promise<string[]>
- *   - resolveBest(tags, opts?): Promise<string>
- *   - clearCache(): void
- *   - preload(url): void
+ *   - Przechowywanie i odczytywanie imienia użytkownika z AppStorageManager
+ *   - Obsługa pola input `#user_name` (wypełnianie i nasłuchiwanie zmian)
+ *   - Podmiana placeholderów w tekstach (np. `{{user}}`)
  *
  * - ❌ Niedozwolone:
- *   - Renderowanie DOM (poza preload <img>)
- *   - Logika UI lub biznesowa
- *   - Zależności od klas domenowych
+ *   - Przechowywanie innych danych użytkownika niż imię
+ *   - Logika niezwiązana z nazwą użytkownika
+ *   - Modyfikacja innych pól formularza
  */
-class ImageResolver {
-  /**
-   * Bazowa ścieżka do folderu z obrazami
-   * @type {string}
-   */
-  static basePath = "/static/NarrativeIMG/";
-
-  /**
-   * Lista rozszerzeń (bez kropki) do wyszukiwania obrazów w kolejności indeksu
-   * @type {string[]}
-   */
-  static extensions = ["jpg", "jpeg", "png", "gif", "webp"];
-
-  /**
-   * Prefiks klucza cache w AppStorageManager.
-   * Wartość: JSON.stringify({ exists: boolean, ts: number })
-   * @type {string}
-   */
-  static cachePrefix = "img-exists:";
-
+class UserManager {
   /**
-   * Czas ważności negatywnego cache (ms). Po upływie — ponowne sprawdzenie.
-   * @type {number}
+   * @type {string} Klucz używany w AppStorageManager
    */
-  static negativeCacheTTL = 60 * 60 * 1000; // 1h
+  static storageKey = "user_name";
 
   /**
-   * Zwraca listę istniejących URL-i obrazów pasujących do tagów, w kolejności priorytetu:
-   * - pełna lista tagów (exact),
-   * - wszystkie podzbiory (od największych do najmniejszych) i ich permutacje,
-   * - maksymalnie `maxResults` wyników.
-   *
-   * @param {string[]} tags - Lista tagów (1–5)
-   * @param {{ maxResults?: number }} [opts]
-   * @returns {Promise<string[]>}
+   * Zapisuje imię użytkownika w AppStorageManager.
+   * @param {string} name - Imię użytkownika.
    */
-  static async resolve(tags, { maxResults = 4 } = {}) {
-    if (!Array.isArray(tags) || tags.length === 0) return [];
-
-    const candidates = [];
-    const exact = tags.join("_");
-
-    // 1) exact match
-    for (const ext of this.extensions) {
-      candidates.push(`${this.basePath}${exact}.${ext}`);
-    }
-
-    // 2) kombinacje i permutacje
-    const uniq = new Set(candidates);
-    for (let k = tags.length; k >= 1; k--) {
-      for (const subset of this._combinations(tags, k)) {
-        for (const perm of this._permutations(subset)) {
-          const name = perm.join("_");
-          if (name === exact) continue;
-          for (const ext of this.extensions) {
-            const url = `${this.basePath}${name}.${ext}`;
-            if (!uniq.has(url)) {
-              candidates.push(url);
-              uniq.add(url);
-            }
-          }
-        }
-      }
-    }
-
-    // 3) HEAD + cache
-    const results = [];
-    for (const url of candidates) {
-      if (await this._checkExists(url)) {
-        results.push(url);
-        if (results.length >= maxResults) break;
-      }
-    }
-    return results;
+  static setName(name) {
+    AppStorageManager.set(this.storageKey, name.trim());
   }
 
   /**
-   * Zwraca pierwszy istniejący URL według tej samej polityki co resolve().
-   * @param {string[]} tags
-   * @param {{ maxResults?: number }} [opts]
-   * @returns {Promise<string>}
+   * Odczytuje imię użytkownika z AppStorageManager.
+   * @returns {string} Imię użytkownika lub pusty string.
    */
-  static async resolveBest(tags, opts = {}) {
-    const arr = await this.resolve(tags, { maxResults: 1, ...opts });
-    return arr[0] || "";
+  static getName() {
+    const raw = AppStorageManager.getWithTTL(this.storageKey);
+    return typeof raw === "string" ? raw : raw ?? "";
   }
 
   /**
-   * Sprawdza, czy dany URL istnieje — używając AppStorageManager (pozytywny/negatywny cache)
-   * oraz fetch HEAD. Negatywny cache wygasa po negativeCacheTTL.
-   *
-   * @param {string} url
-   * @returns {Promise<boolean>}
-   * @private
+   * Sprawdza, czy imię użytkownika jest ustawione.
+   * @returns {boolean} True, jeśli imię istnieje i nie jest puste.
    */
-  static async _checkExists(url) {
-    const key = this.cachePrefix + url;
-    const cached = AppStorageManager.getWithTTL(key);
-    if (cached === true) return true;
-    if (cached === false) return false;
-
-    try {
-      const res = await fetch(url, { method: "HEAD" });
-      const exists = res.ok;
-      AppStorageManager.set(key, exists, this.negativeCacheTTL / 1000);
-
-      if (exists) LoggerService.record("log", `[ImageResolver] HEAD ✓ ${url}`);
-      return exists;
-    } catch (err) {
-      AppStorageManager.set(key, false, this.negativeCacheTTL / 1000);
-      LoggerService.record("error", `[ImageResolver] HEAD error ${url}`, err);
-      return false;
-    }
+  static hasName() {
+    return !!this.getName().trim();
   }
 
   /**
-   * Preloaduje obraz w przeglądarce (niewidoczny <img>).
-   * @param {string} url
+   * Usuwa zapisane imię użytkownika.
    */
-  static preload(url) {
-    if (!url) return;
-    const img = new Image();
-    img.src = url;
-    img.style.display = "none";
-    document.body.appendChild(img);
+  static clearName() {
+    AppStorageManager.remove(this.storageKey);
   }
 
   /**
-   * Czyści wpisy cache (zarówno pozytywne, jak i negatywne).
+   * Zwraca typ pamięci, w której aktualnie przechowywane jest imię.
+   * @returns {"localStorage"|"cookie"}
    */
-  static clearCache() {
-    AppStorageManager.keys()
-      .filter((k) => k.startsWith(this.cachePrefix))
-      .forEach((k) => AppStorageManager.remove(k));
+  static getStorageType() {
+    return AppStorageManager.type();
   }
 
   /**
-   * Zwraca wszystkie kombinacje k-elementowe z tablicy.
-   * @param {string[]} arr
-   * @param {number} k
-   * @returns {string[][]}
-   * @private
+   * Podłącza pole input #user_name:
+   * - wypełnia istniejącą wartością,
+   * - zapisuje każdą zmianę.
+   * @param {Dom} dom - Instancja klasy Dom z metodą `q()`.
    */
-  static _combinations(arr, k) {
-    const res = [];
-    (function rec(start, comb) {
-      if (comb.length === k) return res.push(comb.slice());
-      for (let i = start; i < arr.length; i++) {
-        comb.push(arr[i]);
-        rec(i + 1, comb);
-        comb.pop();
-      }
-    })(0, []);
-    return res;
+  static init(dom) {
+    const input = dom.q("#user_name");
+    if (!input) return;
+    input.value = this.getName();
+    input.addEventListener("input", () => {
+      this.setName(input.value);
+    });
   }
 
   /**
-   * Zwraca wszystkie permutacje elementów tablicy.
-   * @param {string[]} arr
-   * @returns {string[][]}
-   * @private
+   * Podmienia placeholdery w tekście na aktualne imię użytkownika.
+   * @param {string} text - Tekst zawierający placeholdery (np. {{user}}).
+   * @param {Object<string,string>} [map] - Opcjonalna mapa dodatkowych placeholderów do podmiany.
+   * @returns {string} Tekst z podmienionymi wartościami.
    */
-  static _permutations(arr) {
-    const res = [];
-    (function perm(a, l = 0) {
-      if (l === a.length - 1) return res.push(a.slice());
-      for (let i = l; i < a.length; i++) {
-        [a[l], a[i]] = [a[i], a[l]];
-        perm(a, l + 1);
-        [a[l], a[i]] = [a[i], a[l]];
-      }
-    })(arr.slice(), 0);
-    return res;
+  static replacePlaceholders(text, map = {}) {
+    const name = this.getName() || "Użytkowniku";
+    let result = text.replace(/{{\s*user\s*}}/gi, name);
+    for (const [key, value] of Object.entries(map)) {
+      const regex = new RegExp(`{{\\s*${key}\\s*}}`, "gi");
+      result = result.replace(regex, value);
+    }
+    return result;
   }
 }
 
@@ -3341,125 +1722,6 @@ const Utils = {
   },
 };
 
-/**
- *
- * Rejestr przypisujący klasę CSS (kolor) każdemu nadawcy wiadomości.
- * Umożliwia rotacyjne przypisywanie kolorów z palety oraz zarządzanie rejestrem.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Mapowanie nadawca → indeks → klasa CSS
- *   - Rotacja indeksów po przekroczeniu długości palety
- *   - Przechowywanie stanu w Map
- *
- * - ❌ Niedozwolone:
- *   - Operacje na DOM
- *   - Logika aplikacyjna (np. renderowanie wiadomości)
- *   - Zlecenia sieciowe, localStorage, fetch
- */
-class SenderRegistry {
-  /**
-   * Lista dostępnych klas CSS dla nadawców.
-   * Kolory są przypisywane rotacyjnie na podstawie indeksu.
-   * @type {string[]}
-   */
-  static palette = [
-    "sender-color-1",
-    "sender-color-2",
-    "sender-color-3",
-    "sender-color-4",
-    "sender-color-5",
-    "sender-color-6",
-    "sender-color-7",
-    "sender-color-8",
-    "sender-color-9",
-    "sender-color-10",
-    "sender-color-11",
-    "sender-color-12",
-    "sender-color-13",
-    "sender-color-14",
-  ];
-
-  /**
-   * Rejestr przypisań nadawca → indeks palety.
-   * @type {Map<string, number>}
-   */
-  static registry = new Map();
-
-  /**
-   * Licznik rotacyjny dla kolejnych nadawców.
-   * Wykorzystywany do wyznaczania indeksu w palecie.
-   * @type {number}
-   */
-  static nextIndex = 0;
-
-  /**
-   * Zwraca klasę CSS dla danego nadawcy.
-   * Jeśli nadawca nie był wcześniej zarejestrowany, przypisuje mu nową klasę z palety.
-   * @param {string} sender - Nazwa nadawcy
-   * @returns {string} - Klasa CSS przypisana nadawcy
-   */
-  static getClass(sender) {
-    if (!sender || typeof sender !== "string") return "sender-color-default";
-
-    if (!this.registry.has(sender)) {
-      const index = this.nextIndex % this.palette.length;
-      this.registry.set(sender, index);
-      this.nextIndex++;
-    }
-
-    const idx = this.registry.get(sender);
-    return this.palette[idx];
-  }
-
-  /**
-   * Czyści rejestr nadawców i resetuje licznik.
-   * Używane np. przy resecie czatu.
-   */
-  static reset() {
-    this.registry.clear();
-    this.nextIndex = 0;
-  }
-
-  /**
-   * Sprawdza, czy nadawca jest już zarejestrowany.
-   * @param {string} sender - Nazwa nadawcy
-   * @returns {boolean} - Czy nadawca istnieje w rejestrze
-   */
-  static hasSender(sender) {
-    return this.registry.has(sender);
-  }
-
-  /**
-   * Zwraca indeks przypisany nadawcy w palecie.
-   * @param {string} sender - Nazwa nadawcy
-   * @returns {number | undefined} - Indeks w palecie lub undefined
-   */
-  static getSenderIndex(sender) {
-    return this.registry.get(sender);
-  }
-
-  /**
-   * Zwraca aktualną paletę kolorów.
-   * @returns {string[]} - Kopia tablicy z klasami CSS
-   */
-  static getPalette() {
-    return [...this.palette];
-  }
-
-  /**
-   * Ustawia nową paletę kolorów i resetuje rejestr.
-   * @param {string[]} newPalette - Nowa lista klas CSS
-   */
-  static setPalette(newPalette) {
-    if (Array.isArray(newPalette) && newPalette.length > 0) {
-      this.palette = newPalette;
-      this.reset();
-    }
-  }
-}
-
 // init_chat.js
 
 // 1) Konfiguracja selektorów DOM
@@ -4073,6 +2335,26 @@ document.addEventListener("DOMContentLoaded", () => {
       Diagnostics.expect(urls.every((u) => typeof u === "string")).toBeTruthy();
     });
 
+    Diagnostics.it("resolve() korzysta z indeksu backendu jednym żądaniem", async () => {
+      const originalFetch = window.fetch;
+      const originalAvailable = ImageResolver.indexAvailable;
+      const calls = [];
+      try {
+        ImageResolver.indexAvailable = null;
+        window.fetch = async (url, init) => {
+          calls.push({ url, init });
+          return { ok: true, json: async () => ({ urls: ["/static/NarrativeIMG/night_forest.png"] }) };
+        };
+        const urls = await ImageResolver.resolve(["forest", "night"]);
+        Diagnostics.expect(calls.length).toBe(1);
+        Diagnostics.expect(calls[0].url.startsWith(ImageResolver.indexEndpoint)).toBeTruthy();
+        Diagnostics.expect(urls[0]).toBe("/static/NarrativeIMG/night_forest.png");
+      } finally {
+        window.fetch = originalFetch;
+        ImageResolver.indexAvailable = originalAvailable;
+      }
+    });
+
     Diagnostics.it(
       "resolveBest() zwraca pojedynczy URL lub pusty string",
       async () => {
@@ -4212,6 +2494,32 @@ document.addEventListener("DOMContentLoaded", () => {
       }
     });
 
+    Diagnostics.it("loadFromAPI() wyświetla miniatury i zapamiętuje kursor", async () => {
+      const originalFetch = window.fetch;
+      try {
+        const gallery = document.createElement("div");
+        gallery.id = "image-gallery";
+        const loader = new GalleryLoader(gallery);
+
+        window.fetch = async () => ({
+          ok: true,
+          json: async () => ({
+            items: [{ url: "/full/a.png", thumb: "/gallery/thumbs/256/resources/a.png" }],
+            nextCursor: "YS5wbmc",
+          }),
+        });
+
+        await loader.loadFromAPI("/api/gallery");
+        const img = gallery.querySelector("img");
+        const radio = gallery.querySelector('input[type="radio"]');
+        Diagnostics.expect(img.src.endsWith("/gallery/thumbs/256/resources/a.png")).toBeTruthy();
+        Diagnostics.expect(radio.value).toBe("/full/a.png");
+        Diagnostics.expect(loader.nextCursor).toBe("YS5wbmc");
+      } finally {
+        window.fetch = originalFetch;
+      }
+    });
+
     Diagnostics.it("_highlight() zaznacza wybrany obraz", () => {
       const gallery = document.createElement("div");
       gallery.id = "image-gallery";
@@ -6125,3 +4433,4 @@ document.addEventListener("DOMContentLoaded", () => {
   });
 });
 
+//# sourceMappingURL=characters.js.map
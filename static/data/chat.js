@@ -431,916 +431,976 @@ class Diagnostics {
 
 /**
  *
- * Widok edycji wiadomości AI w czacie.
- * Odpowiada za:
- *  - Wyświetlenie formularza edycji (textarea + panel tagów + galeria obrazów)
- *  - Walidację treści i tagów
- *  - Obsługę zapisu i anulowania edycji
+ * Główny koordynator cyklu życia aplikacji. Odpowiada za uruchamianie przekazanych modułów
+ * w ustalonej kolejności. Sam nie tworzy modułów – dostaje je z warstwy inicjalizacyjnej
+ * (np. init_chat.js) jako listę obiektów implementujących metodę `init(ctx)`.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Renderowanie UI edycji w miejscu wiadomości
- *   - Integracja z TagsPanel i GalleryLoader
- *   - Walidacja danych przed wysłaniem
- *   - Wywołanie callbacków `onEditSubmit` i `onEditCancel`
+ *   - Sekwencyjne uruchamianie modułów
+ *   - Przekazywanie kontekstu (`Context`) do modułów
+ *   - Obsługa modułów synchronicznych i asynchronicznych
  *
  * - ❌ Niedozwolone:
- *   - Bezpośrednia komunikacja z backendem (poza pobraniem listy tagów)
- *   - Mutowanie innych elementów UI poza edytowaną wiadomością
+ *   - Tworzenie instancji modułów na sztywno
+ *   - Logika biznesowa lub UI
+ *   - Bezpośrednia manipulacja DOM
  */
-class ChatEditView {
+class App {
   /**
-   * @param {object} dom - Obiekt z referencjami do elementów DOM aplikacji
+   * Tworzy instancję aplikacji.
+   * @param {Context} context - kontener zależności
+   * @param {Array<{ init: (ctx: Context) => void | Promise<void> }>} modules - lista modułów do uruchomienia
    */
-  constructor(dom) {
-    this.dom = dom;
-    /** @type {function(HTMLElement,string,string[],string,string):void|null} */
-    this.onEditSubmit = null;
-    /** @type {function(HTMLElement,object):void|null} */
-    this.onEditCancel = null;
+  constructor(context, modules = []) {
+    this.ctx = context;
+    this.modules = modules;
   }
 
   /**
-   * Uruchamia tryb edycji dla wiadomości AI.
-   * @param {HTMLElement} msgElement - Element wiadomości do edycji
-   * @param {string} originalText - Oryginalny tekst wiadomości
-   * @param {string} messageId - ID wiadomości
-   * @param {string} [sessionId] - ID sesji
+   * Uruchamia wszystkie moduły w kolejności, przekazując im kontekst.
+   * Obsługuje moduły synchroniczne i asynchroniczne.
+   * @returns {Promise<void>}
    */
-  async enableEdit(msgElement, originalText, messageId, sessionId) {
-    // Zachowaj oryginalny HTML
-    msgElement.dataset.originalHTML = msgElement.innerHTML;
-    if (sessionId) {
-      msgElement.dataset.sessionId = sessionId;
-    }
-
-    // Wyczyść zawartość i dodaj textarea
-    msgElement.innerHTML = "";
-    const textarea = document.createElement("textarea");
-    textarea.value = originalText;
-    textarea.rows = 6;
-    textarea.className = "form-element textarea-base w-full mt-4";
-
-    const tagPanel = document.createElement("div");
-    tagPanel.className = "tag-panel";
-    msgElement.append(textarea, tagPanel);
-
-    // Panel tagów + galeria
-    const tagsPanel = new TagsPanel(tagPanel);
-    const galleryLoader = new GalleryLoader(tagPanel);
-
-    const rawTags = msgElement.dataset.tags || "";
-    const tagOptions = await BackendAPI.getTags();
-
-    tagsPanel.setTagOptions(tagOptions);
-    tagsPanel.applyDefaultsFromDataTags(rawTags, tagOptions);
-
-    let boot = true;
-    tagsPanel.init(() => {
-      if (!boot) galleryLoader.renderFromTags(tagsPanel.getTagList());
-    });
-    galleryLoader.renderFromTags(tagsPanel.getTagList());
-    boot = false;
-
-    // Przycisk zapisu
-    const saveBtn = Utils.createButton("💾 Zapisz", async () => {
-      const editedText = textarea.value.trim();
-      const tags = tagsPanel.getTagList();
-
-      const { valid, errors } = EditValidator.validate(editedText, tags);
-      if (!valid) {
-        LoggerService.record("warn", "[EditView] Błąd walidacji", errors);
-        return;
-      }
-
-      // Preferuj wybór z galerii; fallback do resolvera
-      let imageUrl = "";
-      const chosen = tagPanel.querySelector(
-        'input[name="gallery-choice"]:checked'
-      );
-      if (chosen && chosen.value) {
-        imageUrl = chosen.value;
-      } else {
-        const urls = await ImageResolver.resolve(tags, { maxResults: 1 });
-        imageUrl = urls[0] || "";
+  async init() {
+    LoggerService.record("log", "[App] Inicjalizacja aplikacji...");
+    for (const m of this.modules) {
+      if (m && typeof m.init === "function") {
+        await m.init(this.ctx);
       }
-
-      this.onEditSubmit?.(
-        msgElement,
-        editedText,
-        tags,
-        imageUrl,
-        msgElement.dataset.sessionId
-      );
-    });
-    saveBtn.classList.add("button-base");
-
-    // Przycisk anulowania
-    const cancelBtn = Utils.createButton("❌ Anuluj", () => {
-      const data = {
-        id: msgElement.dataset.msgId,
-        sessionId: msgElement.dataset.sessionId || "sess-unknown",
-        tags: (msgElement.dataset.tags || "").split("_").filter(Boolean),
-        timestamp: msgElement.dataset.timestamp,
-        originalText: msgElement.dataset.originalText,
-        text: msgElement.dataset.originalText,
-        sender: msgElement.dataset.sender || "AI",
-        avatarUrl:
-          msgElement.dataset.avatarUrl || "/static/NarrativeIMG/Avatars/AI.png",
-        generation_time: parseFloat(msgElement.dataset.generation_time) || 0,
-        imageUrl: msgElement.dataset.imageUrl || "",
-      };
-
-      this.onEditCancel?.(msgElement, data);
-    });
-    cancelBtn.classList.add("button-base");
-
-    msgElement.append(saveBtn, cancelBtn);
+    }
+    LoggerService.record("log", "[App] Aplikacja gotowa.");
   }
 }
 
 /**
  *
- * Komponent odpowiedzialny za renderowanie galerii obrazów w przekazanym kontenerze.
- * Współpracuje z ImageResolver w celu wyszukiwania obrazów na podstawie tagów.
- * Umożliwia wybór obrazu przez użytkownika (radio name="gallery-choice").
+ * Uniwersalny mediator przechowywania danych z automatycznym fallbackiem
+ * z `localStorage` do `cookie` w przypadku braku dostępu lub błędu.
+ * Obsługuje TTL w sekundach, czyszczenie wpisów z prefiksem,
+ * oraz mechanizmy obronne przy przekroczeniu limitu pamięci (`QuotaExceededError`).
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Renderowanie obrazów w kontenerze
- *   - Współpraca z ImageResolver
- *   - Obsługa wyboru obrazu przez użytkownika
- *   - Pobieranie obrazów z API (GET)
+ *   - Zapisywanie, odczytywanie i usuwanie danych w `localStorage` lub `cookie`
+ *   - Obsługa TTL i czyszczenie danych tymczasowych
+ *   - Reakcja na błędy pamięci i komunikacja z użytkownikiem
  *
  * - ❌ Niedozwolone:
- *   - Logika promptów, edycji, ocen
- *   - Połączenia z BackendAPI poza prostym GET
- *   - Mutacje globalnego stanu
- *
+ *   - Wymuszanie prefiksów
+ *   - Logika aplikacyjna (np. interpretacja danych)
  */
-class GalleryLoader {
-  /**
-   * @param {HTMLElement|{galleryContainer?:HTMLElement}} [root] - Kontener lub obiekt z polem galleryContainer.
-   */
-  constructor(root) {
-    /** @type {HTMLElement|null} */
-    this.container = null;
-    /** @type {HTMLElement|null} */
-    this.gallery = null;
-    if (root) this.setContainer(root.galleryContainer || root);
-  }
-
+class AppStorageManager {
   /**
-   * Ustawia kontener galerii. Obsługuje:
-   * - <div id="image-gallery"> jako bezpośrednią galerię,
-   * - dowolny <div> (galeria = ten div),
-   * - wrapper zawierający element #image-gallery.
-   *
-   * @param {HTMLElement} el - Element kontenera
+   * Sprawdza, czy `localStorage` jest dostępny i funkcjonalny.
+   * Wykonuje testowy zapis i usunięcie wpisu.
+   * @returns {boolean} True, jeśli można bezpiecznie używać `localStorage`.
    */
-  setContainer(el) {
-    if (!(el instanceof HTMLElement)) {
-      LoggerService.record(
-        "error",
-        "[GalleryLoader] setContainer: brak HTMLElement",
-        el
-      );
-      return;
+  static _hasLocalStorage() {
+    try {
+      const testKey = "__storage_test__";
+      localStorage.setItem(testKey, "1");
+      localStorage.removeItem(testKey);
+      return true;
+    } catch {
+      return false;
     }
-    this.container = el;
-    this.gallery = el.querySelector?.("#image-gallery") || el;
   }
 
   /**
-   * Czyści zawartość galerii.
+   * Zwraca typ aktualnie używanego magazynu.
+   * @returns {"localStorage"|"cookie"} Typ aktywnego backendu.
    */
-  clearGallery() {
-    if (this.gallery) this.gallery.innerHTML = "";
+  static type() {
+    return this._hasLocalStorage() ? "localStorage" : "cookie";
   }
 
   /**
-   * Pokazuje komunikat w galerii, czyszcząc poprzednią zawartość.
+   * Zapisuje wartość pod wskazanym kluczem z opcjonalnym TTL.
+   * TTL wyrażony w sekundach. Domyślnie 30 dni (2592000 sekund).
+   * Wartość jest serializowana do JSON.
    *
-   * @param {string} message - Treść komunikatu
+   * @param {string} key - Klucz pod którym zapisywana jest wartość.
+   * @param {any} value - Dowolna wartość do zapisania.
+   * @param {number} [ttl=2592000] - Czas życia w sekundach.
    */
-  showMessage(message) {
-    if (!this.gallery) return;
-    this.clearGallery();
-    const msg = document.createElement("div");
-    msg.classList.add("gallery-message");
-    msg.textContent = message;
-    this.gallery.appendChild(msg);
+  static set(key, value, ttl = 2592000) {
+    const now = Date.now();
+    const payload = ttl ? { value, ts: now, ttl: ttl * 1000 } : value;
+
+    const serialized = JSON.stringify(payload);
+
+    if (this._hasLocalStorage()) {
+      try {
+        localStorage.setItem(key, serialized);
+      } catch (err) {
+        if (err.name === "QuotaExceededError") {
+          this.purgeByPrefix("img-exists:");
+          try {
+            localStorage.setItem(key, serialized);
+          } catch (e) {
+            this._handleStorageFailure("localStorage", key, e);
+          }
+        } else {
+          this._handleStorageFailure("localStorage", key, err);
+        }
+      }
+    } else {
+      let cookie = `${encodeURIComponent(key)}=${encodeURIComponent(
+        serialized
+      )}; path=/`;
+      if (ttl) {
+        cookie += `; max-age=${ttl}`;
+      }
+      document.cookie = cookie;
+
+      // Sprawdzenie skuteczności zapisu
+      if (!document.cookie.includes(`${encodeURIComponent(key)}=`)) {
+        this._handleStorageFailure("cookie", key);
+      }
+    }
   }
 
   /**
-   * Renderuje obrazy jako label z ukrytym input[type=radio] name="gallery-choice".
-   * Dzięki temu EditManager może odczytać wybór.
-   *
-   * @param {string[]} urls - Lista URL-i obrazów
+   * Odczytuje wartość spod wskazanego klucza.
+   * Deserializuje JSON, jeśli to możliwe.
+   * @param {string} key - Klucz do odczytu.
+   * @returns {any|null} Wartość lub null, jeśli brak.
    */
-  renderImages(urls) {
-    if (!this.gallery) return;
-    this.clearGallery();
-    urls.forEach((url, idx) => {
-      const label = document.createElement("label");
-      label.className = "image-option";
-
-      const input = document.createElement("input");
-      input.type = "radio";
-      input.name = "gallery-choice";
-      input.value = url;
-      input.style.display = "none";
+  static get(key) {
+    let raw = null;
+    if (this._hasLocalStorage()) {
+      raw = localStorage.getItem(key);
+    } else {
+      const match = document.cookie.match(
+        new RegExp(`(?:^|; )${encodeURIComponent(key)}=([^;]*)`)
+      );
+      raw = match ? decodeURIComponent(match[1]) : null;
+    }
+    try {
+      return raw ? JSON.parse(raw) : null;
+    } catch {
+      return raw;
+    }
+  }
 
-      const img = document.createElement("img");
-      img.src = url;
-      img.alt = `Obraz ${idx + 1}`;
-      img.loading = "lazy";
+  /**
+   * Odczytuje wartość z TTL. Jeśli wygasła — usuwa i zwraca null.
+   * @param {string} key - Klucz do odczytu.
+   * @returns {any|null} Wartość lub null, jeśli wygasła lub nie istnieje.
+   */
+  static getWithTTL(key) {
+    const raw = this.get(key);
+    if (!raw || typeof raw !== "object") return raw;
 
-      label.append(input, img);
-      this.gallery.appendChild(label);
-      label.addEventListener("click", () => this._highlight(label));
-    });
+    if (raw.ttl && raw.ts && Date.now() - raw.ts > raw.ttl) {
+      this.remove(key);
+      return null;
+    }
+    return raw.value ?? raw;
   }
 
   /**
-   * Renderuje obrazy na podstawie tagów, używając ImageResolver.resolve().
-   *
-   * @param {string[]} tags - Lista tagów
-   * @returns {Promise<void>}
+   * Usuwa wartość spod wskazanego klucza.
+   * @param {string} key - Klucz do usunięcia.
    */
-  async renderFromTags(tags) {
-    if (!this.gallery) {
-      LoggerService.record(
-        "error",
-        "[GalleryLoader] Brak container w renderFromTags"
-      );
-      return;
-    }
-    try {
-      const urls = await ImageResolver.resolve(tags, { maxResults: 6 });
-      if (urls.length === 0) {
-        this.showMessage("❌ Brak obrazu dla tych tagów");
-        return;
-      }
-      this.renderImages(urls);
-      await this.highlightSelected(tags);
-    } catch (err) {
-      LoggerService.record(
-        "error",
-        "[GalleryLoader] renderFromTags error",
-        err
-      );
-      this.showMessage("❌ Błąd renderowania galerii.");
+  static remove(key) {
+    if (this._hasLocalStorage()) {
+      localStorage.removeItem(key);
+    } else {
+      document.cookie = `${encodeURIComponent(key)}=; max-age=0; path=/`;
     }
   }
 
   /**
-   * Podświetla obraz dopasowany do aktualnych tagów (pierwszy pasujący).
-   * Ustawia również stan zaznaczenia radio.
-   *
-   * @param {string[]} tags - Lista tagów
-   * @returns {Promise<void>}
+   * Zwraca listę wszystkich kluczy z aktualnego backendu.
+   * @returns {string[]} Tablica kluczy.
    */
-  async highlightSelected(tags) {
-    if (!this.gallery) return;
-    const target = await ImageResolver.resolveBest(tags);
-    if (!target) return;
-    const items = this.gallery.querySelectorAll(".image-option");
-    items.forEach((label) => {
-      const img = label.querySelector("img");
-      const match =
-        img && (img.src.endsWith(target) || img.src.includes(target));
-      label.classList.toggle("selected", !!match);
-      const radio = label.querySelector('input[type="radio"]');
-      if (radio) radio.checked = !!match;
-    });
+  static keys() {
+    if (this._hasLocalStorage()) {
+      return Object.keys(localStorage);
+    } else {
+      return document.cookie
+        .split(";")
+        .map((c) => decodeURIComponent(c.split("=")[0].trim()))
+        .filter((k) => k.length > 0);
+    }
   }
 
   /**
-   * Ładuje obrazy z API i renderuje listę URL-i.
-   * Endpoint może zwrócić: string[] lub { images: string[] }.
-   *
-   * @param {string} endpoint - URL endpointu API
-   * @param {Record<string,string>} [params] - Parametry zapytania
-   * @returns {Promise<void>}
+   * Usuwa wszystkie wpisy z danym prefiksem.
+   * @param {string} prefix - Prefiks kluczy do usunięcia.
    */
-  async loadFromAPI(endpoint, params = {}) {
-    if (!this.gallery) return;
-    try {
-      this.showMessage("Ładowanie...");
-      const url = new URL(endpoint, window.location.origin);
-      Object.entries(params).forEach(
-        ([k, v]) => v && url.searchParams.append(k, v)
-      );
-      const res = await fetch(url);
-      if (!res.ok) throw new Error(`HTTP ${res.status}`);
-      const data = await res.json();
-      const images = Array.isArray(data)
-        ? data
-        : Array.isArray(data.images)
-        ? data.images
-        : [];
-      if (!images.length) return this.showMessage("Brak wyników.");
-      this.renderImages(images);
-    } catch (err) {
-      LoggerService.record(
-        "error",
-        "[GalleryLoader] Błąd ładowania obrazów",
-        err
-      );
-      this.showMessage("❌ Błąd ładowania obrazów.");
-    }
+  static purgeByPrefix(prefix) {
+    this.keys()
+      .filter((k) => k.startsWith(prefix))
+      .forEach((k) => this.remove(k));
   }
 
   /**
-   * Zaznacza wybraną opcję i odznacza pozostałe.
-   *
-   * @param {HTMLElement} selected - Element label z klasą .image-option
-   * @private
+   * Obsługuje błędy zapisu do pamięci (`QuotaExceededError` lub inne).
+   * Informuje użytkownika i oferuje czyszczenie pamięci.
+   * @param {"localStorage"|"cookie"} type - Typ pamięci.
+   * @param {string} key - Klucz, który nie został zapisany.
+   * @param {Error} [error] - Opcjonalny obiekt błędu.
    */
-  _highlight(selected) {
-    if (!this.gallery) return;
-    this.gallery
-      .querySelectorAll(".image-option")
-      .forEach((el) => el.classList.remove("selected"));
-    selected.classList.add("selected");
-    const radio = selected.querySelector('input[type="radio"]');
-    if (radio) radio.checked = true;
+  static _handleStorageFailure(type, key, error) {
+    LoggerService?.record(
+      "warn",
+      `[AppStorageManager] ${type} niedostępny lub pełny przy zapisie ${key}`,
+      error
+    );
+
+    const confirmed = window.confirm(
+      `Pamięć ${type} jest pełna lub niedostępna. Czy chcesz ją wyczyścić, aby kontynuować?`
+    );
+
+    if (confirmed) {
+      if (type === "localStorage") localStorage.clear();
+      if (type === "cookie") {
+        document.cookie.split(";").forEach((c) => {
+          document.cookie = c
+            .replace(/^ +/, "")
+            .replace(
+              /=.*/,
+              "=;expires=" + new Date().toUTCString() + ";path=/"
+            );
+        });
+      }
+      LoggerService?.record(
+        "info",
+        `[AppStorageManager] ${type} wyczyszczony przez użytkownika.`
+      );
+    } else {
+      LoggerService?.record(
+        "info",
+        `[AppStorageManager] Użytkownik odmówił czyszczenia ${type}.`
+      );
+    }
   }
 }
 
 /**
  *
- * Kontener zależności aplikacji. Przechowuje i udostępnia instancje usług oraz
- * zapewnia wygodne gettery do najczęściej używanych komponentów.
+ * Warstwa komunikacji z backendem HTTP — odporna na błędy sieciowe, spójna i centralnie konfigurowalna.
+ * Umożliwia wysyłanie żądań POST/GET z automatycznym retry i backoffem.
+ * Integruje się z `RequestRetryManager` i zarządza tokenem autoryzacyjnym.
+ *
+ * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Rejestracja instancji usług i komponentów (np. Dom, Utils, UserManager)
- *   - Pobieranie zależności po nazwie lub przez getter
- *   - Dynamiczne dodawanie nowych zależności w trakcie działania
+ *   - Budowanie żądań HTTP (URL, headers, body)
+ *   - Dekodowanie odpowiedzi JSON
+ *   - Obsługa błędów sieciowych i retry
+ *   - Centralne zarządzanie baseURL i tokenem
  *
  * - ❌ Niedozwolone:
- *   - Tworzenie instancji usług na sztywno (to robi warstwa inicjalizacyjna)
- *   - Logika biznesowa lub UI
- *   - Operacje sieciowe
+ *   - Logika UI
+ *   - Cache’owanie domenowe
+ *   - Mutowanie danych biznesowych
  */
-class Context {
+class BackendAPI {
+  /** 
+   * Bazowy adres backendu
+   * @type {string} (bez końcowego slasha, pusty = względny)
+  */
+  static baseURL = "";
+
+  /** 
+   * Token autoryzacyjny Bearer 
+   * @type {string|null}
+  */
+  static authToken = null;
+
   /**
-   * Tworzy nowy kontekst z początkowym zestawem usług.
-   * @param {Record<string, any>} services - mapa nazw → instancji
+   * Ustawia bazowy adres względny backendu.
+   * @param {string} url - Adres URL bez końcowego slasha.
    */
-  constructor(services = {}) {
-    /** @private @type {Map<string, any>} */
-    this._registry = new Map(Object.entries(services));
+  static setBaseURL(url) {
+    if (!url || url === "/") {
+      // tryb względny — używamy hosta, z którego załadowano front
+      this.baseURL = "";
+    } else {
+      // czyścimy końcowe slashe
+      this.baseURL = url.replace(/\/+$/, "");
+    }
   }
 
   /**
-   * Rejestruje nową lub nadpisuje istniejącą zależność.
-   * @param {string} name - unikalna nazwa zależności
-   * @param {any} instance - instancja lub obiekt usługi
+   * Ustawia lub usuwa token autoryzacyjny.
+   * @param {string|null} token - Token Bearer lub null.
    */
-  register(name, instance) {
-    this._registry.set(name, instance);
+  static setAuthToken(token) {
+    this.authToken = token || null;
   }
 
   /**
-   * Pobiera zarejestrowaną zależność po nazwie.
-   * @param {string} name - nazwa zależności
-   * @returns {any} - instancja lub undefined
+   * Składa pełny URL względem baseURL.
+   * @param {string} path - Ścieżka względna (np. "/generate").
+   * @returns {string} Pełny URL.
+   * @private
    */
-  get(name) {
-    return this._registry.get(name);
+  static _url(path) {
+    if (!this.baseURL) return path;
+    return `${this.baseURL}${path.startsWith("/") ? "" : "/"}${path}`;
   }
 
-  // Wygodne gettery (opcjonalne)
-  get dom() {
-    return this.get("dom");
+  /**
+   * Buduje nagłówki HTTP z Content-Type, Accept i Authorization.
+   * @param {Record<string,string>} [extra] - Dodatkowe nagłówki.
+   * @returns {HeadersInit} Nagłówki HTTP.
+   * @private
+   */
+  static _headers(extra = {}) {
+    const h = {
+      Accept: "application/json",
+      ...extra,
+    };
+    if (!("Content-Type" in h)) h["Content-Type"] = "application/json";
+    if (this.authToken) h["Authorization"] = `Bearer ${this.authToken}`;
+    return h;
   }
-  get utils() {
-    return this.get("utils");
+
+  /**
+   * Wysyła żądanie POST z JSON i odbiera JSON z retry.
+   * @param {string} path - Ścieżka żądania.
+   * @param {any} body - Treść żądania.
+   * @param {RequestInit} [init] - Dodatkowe opcje fetch.
+   * @returns {Promise<any>} Odpowiedź z backendu.
+   * @private
+   */
+  static async _postJson(path, body, init = {}) {
+    const res = await RequestRetryManager.fetchWithRetry(
+      this._url(path),
+      {
+        method: "POST",
+        headers: this._headers(init.headers || {}),
+        body: JSON.stringify(body),
+        ...init,
+      },
+      3, // liczba prób
+      800, // opóźnienie początkowe
+      { maxTotalTime: 15_000 }
+    );
+    if (!res.ok) {
+      const text = await BackendAPI._safeText(res);
+      throw new Error(`POST ${path} -> HTTP ${res.status}: ${text}`);
+    }
+    return BackendAPI._safeJson(res);
   }
-  get userManager() {
-    return this.get("userManager");
+
+  /**
+   * Wysyła żądanie GET i odbiera JSON z retry.
+   * @param {string} path - Ścieżka żądania.
+   * @param {RequestInit} [init] - Dodatkowe opcje fetch.
+   * @returns {Promise<any>} Odpowiedź z backendu.
+   * @private
+   */
+  static async _getJson(path, init = {}) {
+    const res = await RequestRetryManager.fetchWithRetry(
+      this._url(path),
+      {
+        method: "GET",
+        headers: this._headers(init.headers || {}),
+        ...init,
+      },
+      3,
+      800,
+      { maxTotalTime: 15_000 }
+    );
+    if (!res.ok) {
+      const text = await BackendAPI._safeText(res);
+      throw new Error(`GET ${path} -> HTTP ${res.status}: ${text}`);
+    }
+    return BackendAPI._safeJson(res);
   }
-  get diagnostics() {
-    return this.get("diagnostics");
+
+  /**
+   * Bezpieczny parser JSON — zwraca pusty obiekt przy błędzie.
+   * @param {Response} res - Odpowiedź HTTP.
+   * @returns {Promise<any>} Parsowany JSON lub pusty obiekt.
+   * @private
+   */
+  static async _safeJson(res) {
+    try {
+      return await res.json();
+    } catch {
+      return {};
+    }
   }
-  get backendAPI() {
-    return this.get("backendAPI");
+
+  /**
+   * Bezpieczny odczyt tekstu — zwraca pusty string przy błędzie.
+   * @param {Response} res - Odpowiedź HTTP.
+   * @returns {Promise<string>} Tekst odpowiedzi.
+   * @private
+   */
+  static async _safeText(res) {
+    try {
+      return await res.text();
+    } catch {
+      return "";
+    }
+  }
+
+  // ── Publiczne metody API ───────────────────────────────────────────────────
+
+  /**
+   * Generuje identyfikator żądania dla deduplikacji po stronie backendu.
+   * @returns {string} Unikalny identyfikator.
+   */
+  static newRequestId() {
+    if (globalThis.crypto && typeof globalThis.crypto.randomUUID === "function") {
+      return globalThis.crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 11)}`;
+  }
+
+  /**
+   * Wysyła prompt użytkownika do backendu.
+   * `requestId` jest stały dla wszystkich ponowień tego samego wywołania,
+   * więc retry po timeoucie dołącza do trwającej generacji zamiast zaczynać nową.
+   * @param {string} prompt - Treść promptu.
+   * @param {string} [requestId] - Identyfikator żądania (domyślnie nowy).
+   * @returns {Promise<any>} Odpowiedź z backendu.
+   */
+  static async generate(prompt, requestId = BackendAPI.newRequestId()) {
+    return this._postJson("/generate", { prompt, requestId });
+  }
+
+  /**
+   * Przerywa trwającą generację po stronie backendu.
+   * @param {string} requestId - Identyfikator żądania przekazany do generate().
+   * @returns {Promise<any>} Odpowiedź z backendu.
+   */
+  static async cancel(requestId) {
+    return this._postJson("/cancel", { requestId });
+  }
+
+  /**
+   * Przesyła oceny odpowiedzi AI.
+   * @param {Record<string, any>} ratings - Obiekt ocen.
+   * @returns {Promise<any>} Odpowiedź z backendu.
+   */
+  static async rate(ratings) {
+    return this._postJson("/rate", ratings);
+  }
+
+  /**
+   * Przesyła edytowaną odpowiedź z tagami.
+   * @param {string} editedText - Nowa treść.
+   * @param {Record<string, any>} tags - Obiekt tagów.
+   * @param {string} sessionId - ID sesji.
+   * @param {string} msgId - ID wiadomości.
+   * @returns {Promise<any>} Odpowiedź z backendu.
+   */
+  static async edit(editedText, tags, sessionId, msgId) {
+    return this._postJson("/edit", { editedText, tags, sessionId, msgId });
+  }
+
+  /**
+   * Przesyła wiadomość użytkownika do backendu.
+   * @param {{ sender: string, text: string }} message - Nadawca i treść.
+   * @returns {Promise<any>} Odpowiedź z backendu.
+   */
+  static async postMessage({ sender, text }) {
+    return this._postJson("/messages", { sender, text });
+  }
+
+  /**
+   * Pobiera słownik tagów z backendu.
+   * @returns {Promise<any>} Lista tagów.
+   */
+  static async getTags() {
+    return this._getJson("/tags");
   }
 }
 
 /**
- * Warstwa odpornościowa dla zapytań HTTP z kontrolą retry i backoffem.
- * Zapewnia ponawianie zapytań w przypadku błędów sieciowych lub odpowiedzi serwera,
- * które kwalifikują się do ponowienia (retryable), z kontrolą liczby prób, odstępów
- * i maksymalnego czasu trwania operacji.
+ *
+ * Widok edycji wiadomości AI w czacie.
+ * Odpowiada za:
+ *  - Wyświetlenie formularza edycji (textarea + panel tagów + galeria obrazów)
+ *  - Walidację treści i tagów
+ *  - Obsługę zapisu i anulowania edycji
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Wielokrotne próby `fetch` z kontrolą limitu, odstępu i łącznego czasu.
- *   - Decyzja, czy błąd/odpowiedź jest retryowalna.
- *   - Wywołanie zdarzenia `onRetry` (np. do telemetrii lub logowania).
- *   - Parametryzacja backoffu (bazowe opóźnienie, mnożnik, jitter).
+ *   - Renderowanie UI edycji w miejscu wiadomości
+ *   - Integracja z TagsPanel i GalleryLoader
+ *   - Walidacja danych przed wysłaniem
+ *   - Wywołanie callbacków `onEditSubmit` i `onEditCancel`
  *
  * - ❌ Niedozwolone:
- *   - Logika UI lub domenowa.
- *   - Transformacje payloadu/JSON (to rola warstwy BackendAPI).
- *   - Obsługa specyficznych formatów odpowiedzi.
+ *   - Bezpośrednia komunikacja z backendem (poza pobraniem listy tagów)
+ *   - Mutowanie innych elementów UI poza edytowaną wiadomością
  */
-class RequestRetryManager {
+class ChatEditView {
   /**
-   * Sprawdza, czy błąd lub odpowiedź nadaje się do ponowienia.
-   *
-   * ## Zasady:
-   *  - Retry przy błędach sieciowych (`TypeError` z `fetch`)
-   *  - Retry przy kodach HTTP 5xx i 429
-   *  - Brak retry przy kodach 4xx (poza 429) i odpowiedziach `ok === true`
-   *
-   * @param {any} errOrRes - Obiekt błędu lub odpowiedzi `Response`
-   * @returns {boolean} - true, jeśli można ponowić
+   * @param {object} dom - Obiekt z referencjami do elementów DOM aplikacji
    */
-  static isRetryable(errOrRes) {
-    // Response
-    if (errOrRes && typeof errOrRes === "object" && "ok" in errOrRes) {
-      const res = /** @type {Response} */ (errOrRes);
-      if (res.ok) return false;
-      const s = res.status;
-      return s === 429 || (s >= 500 && s <= 599);
-    }
-    // Error
-    if (errOrRes instanceof Error) {
-      // Fetch w razie problemów sieciowych rzuca zwykle TypeError
-      return errOrRes.name === "TypeError";
-    }
-    return false;
+  constructor(dom) {
+    this.dom = dom;
+    /** @type {function(HTMLElement,string,string[],string,string):void|null} */
+    this.onEditSubmit = null;
+    /** @type {function(HTMLElement,object):void|null} */
+    this.onEditCancel = null;
   }
 
   /**
-   * Wykonuje `fetch` z mechanizmem retry i backoffem z jitterem.
-   *
-   * @param {string|Request} input - URL lub obiekt `Request`
-   * @param {RequestInit} [init={}] - Opcje `fetch` (method, headers, body itd.)
-   * @param {number} [retries=3] - Maksymalna liczba ponowień (bez pierwszej próby)
-   * @param {number} [baseDelay=800] - Bazowe opóźnienie (ms) dla backoffu
-   * @param {{
-   *   silent?: boolean,
-   *   maxTotalTime?: number,     // twardy limit łącznego czasu (ms)
-   *   onRetry?: (info:{
-   *     attempt:number,
-   *     retries:number,
-   *     delay:number,
-   *     reason:any,
-   *     input:string|Request
-   *   })=>void,
-   *   factor?: number,           // mnożnik backoffu, domyślnie 2
-   *   jitter?: number            // [0..1], odchylenie losowe, domyślnie 0.2
-   * } } [options={}] - Parametry dodatkowe
-   * @returns {Promise<Response>} - Odpowiedź `fetch`
-   *
-   * Przebieg:
-   *  1. Wykonuje pierwsze żądanie `fetch`.
-   *  2. Jeśli odpowiedź jest OK → zwraca ją.
-   *  3. Jeśli odpowiedź/błąd jest retryowalny → ponawia do `retries` razy.
-   *  4. Każde ponowienie ma opóźnienie wyliczone z backoffu + jitter.
-   *  5. Jeśli przekroczono `maxTotalTime` → rzuca błąd.
-   *  6. Wywołuje `onRetry` (jeśli podany) przy każdej próbie ponowienia.
-   */
-  static async fetchWithRetry(
-    input,
-    init = {},
-    retries = 3,
-    baseDelay = 800,
-    {
-      silent = false,
-      maxTotalTime = 15_000,
-      onRetry = null,
-      factor = 2,
-      jitter = 0.2,
-    } = {}
-  ) {
-    const start = Date.now();
-    let attempt = 0;
+   * Uruchamia tryb edycji dla wiadomości AI.
+   * @param {HTMLElement} msgElement - Element wiadomości do edycji
+   * @param {string} originalText - Oryginalny tekst wiadomości
+   * @param {string} messageId - ID wiadomości
+   * @param {string} [sessionId] - ID sesji
+   */
+  async enableEdit(msgElement, originalText, messageId, sessionId) {
+    // Zachowaj oryginalny HTML
+    msgElement.dataset.originalHTML = msgElement.innerHTML;
+    if (sessionId) {
+      msgElement.dataset.sessionId = sessionId;
+    }
 
-    while (true) {
-      try {
-        const res = await fetch(input, init);
-        if (!res.ok) {
-          if (!this.isRetryable(res)) return res; // oddaj nie-OK bez retry — nie jest retryowalne
-          throw res; // wymuś retry
-        }
-        return res;
-      } catch (err) {
-        if (!this.isRetryable(err)) {
-          // Błąd nieretryowalny — rzucamy od razu
-          LoggerService.record(
-            "error",
-            "[RequestRetryManager] Non-retryable error",
-            err
-          );
-          throw err;
-        }
+    // Wyczyść zawartość i dodaj textarea
+    msgElement.innerHTML = "";
+    const textarea = document.createElement("textarea");
+    textarea.value = originalText;
+    textarea.rows = 6;
+    textarea.className = "form-element textarea-base w-full mt-4";
 
-        if (attempt >= retries) {
-          LoggerService.record(
-            "error",
-            `[RequestRetryManager] Wyczerpane retry dla: ${
-              typeof input === "string" ? input : input.url
-            }`,
-            err
-          );
-          throw err;
-        }
+    const tagPanel = document.createElement("div");
+    tagPanel.className = "tag-panel";
+    msgElement.append(textarea, tagPanel);
 
-        // Kolejna próba
-        attempt += 1;
+    // Panel tagów + galeria
+    const tagsPanel = new TagsPanel(tagPanel);
+    const galleryLoader = new GalleryLoader(tagPanel);
 
-        // Exponential backoff + jitter
-        const exp = baseDelay * Math.pow(factor, attempt - 1);
-        const delta = exp * jitter;
-        const delay = Math.max(0, exp + (Math.random() * 2 - 1) * delta);
+    const rawTags = msgElement.dataset.tags || "";
+    const tagOptions = await BackendAPI.getTags();
 
-        if (Date.now() + delay - start > maxTotalTime) {
-          LoggerService.record(
-            "error",
-            "[RequestRetryManager] Przekroczono maxTotalTime",
-            { maxTotalTime }
-          );
-          throw err;
-        }
+    tagsPanel.setTagOptions(tagOptions);
+    tagsPanel.applyDefaultsFromDataTags(rawTags, tagOptions);
 
-        const level = silent ? "log" : "warn";
-        LoggerService.record(
-          level,
-          `[RequestRetryManager] Retry ${attempt}/${retries} za ${Math.round(
-            delay
-          )}ms`,
-          err
-        );
+    let boot = true;
+    tagsPanel.init(() => {
+      if (!boot) galleryLoader.renderFromTags(tagsPanel.getTagList());
+    });
+    galleryLoader.renderFromTags(tagsPanel.getTagList());
+    boot = false;
 
-        if (typeof onRetry === "function") {
-          try {
-            onRetry({ attempt, retries, delay, reason: err, input });
-          } catch {
-            // Ignorujemy błędy w callbacku onRetry
-          }
-        }
+    // Przycisk zapisu
+    const saveBtn = Utils.createButton("💾 Zapisz", async () => {
+      const editedText = textarea.value.trim();
+      const tags = tagsPanel.getTagList();
 
-        // Odczekaj wyliczony czas przed kolejną próbą
-        await new Promise((r) => setTimeout(r, delay));
+      const { valid, errors } = EditValidator.validate(editedText, tags);
+      if (!valid) {
+        LoggerService.record("warn", "[EditView] Błąd walidacji", errors);
+        return;
       }
-    }
+
+      // Preferuj wybór z galerii; fallback do resolvera
+      let imageUrl = "";
+      const chosen = tagPanel.querySelector(
+        'input[name="gallery-choice"]:checked'
+      );
+      if (chosen && chosen.value) {
+        imageUrl = chosen.value;
+      } else {
+        const urls = await ImageResolver.resolve(tags, { maxResults: 1 });
+        imageUrl = urls[0] || "";
+      }
+
+      this.onEditSubmit?.(
+        msgElement,
+        editedText,
+        tags,
+        imageUrl,
+        msgElement.dataset.sessionId
+      );
+    });
+    saveBtn.classList.add("button-base");
+
+    // Przycisk anulowania
+    const cancelBtn = Utils.createButton("❌ Anuluj", () => {
+      const data = {
+        id: msgElement.dataset.msgId,
+        sessionId: msgElement.dataset.sessionId || "sess-unknown",
+        tags: (msgElement.dataset.tags || "").split("_").filter(Boolean),
+        timestamp: msgElement.dataset.timestamp,
+        originalText: msgElement.dataset.originalText,
+        text: msgElement.dataset.originalText,
+        sender: msgElement.dataset.sender || "AI",
+        avatarUrl:
+          msgElement.dataset.avatarUrl || "/static/NarrativeIMG/Avatars/AI.png",
+        generation_time: parseFloat(msgElement.dataset.generation_time) || 0,
+        imageUrl: msgElement.dataset.imageUrl || "",
+      };
+
+      this.onEditCancel?.(msgElement, data);
+    });
+    cancelBtn.classList.add("button-base");
+
+    msgElement.append(saveBtn, cancelBtn);
   }
 }
 
 /**
  *
- * Buforowany logger do środowiska przeglądarkowego z ograniczeniem wieku wpisów.
- * Obsługuje poziomy logowania: 'log', 'warn', 'error'.
- * Wpisy są przechowywane w pamięci i mogą być filtrowane, czyszczone lub eksportowane.
+ * Główna warstwa logiki aplikacji — łączy widoki UI z backendem.
+ * Odpowiada za obsługę promptów, edycji i oceniania wiadomości.
+ * Integruje się z `ChatUIView`, `ChatEditView`, `BackendAPI`, `ImageResolver` i `LoggerService`.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - record(level, msg, ...args)
- *   - cleanup()
- *   - getHistory({clone})
- *   - clearHistory()
- *   - setMaxAge(ms)
- *   - filterByLevel(level)
- *   - recordOnce(level, msg, ...args)
+ *   - Obsługa promptów, edycji, oceniania
+ *   - Przekazywanie danych między widokami a BackendAPI
+ *   - Aktualizacja UI przez `ChatUIView` i `ChatEditView`
  *
  * - ❌ Niedozwolone:
- *   - logika aplikacji (business logic)
- *   - operacje sieciowe, DOM, storage
- *
+ *   - Renderowanie HTML bezpośrednio
+ *   - Mutowanie danych poza `dataset`/`msgEl`
+ *   - Logika domenowa (np. interpretacja tagów)
  */
-class LoggerService {
-  /**
-   * Bufor wpisów logowania.
-   * Każdy wpis zawiera znacznik czasu, poziom, wiadomość i dodatkowe argumenty.
-   * @type {Array<{timestamp: number, level: 'log'|'warn'|'error', msg: string, args: any[]}>}
-   */
-  static buffer = [];
-
+class ChatManager {
   /**
-   * Maksymalny wiek wpisów w milisekundach.
-   * Wpisy starsze niż ta wartość są usuwane przy każdym logowaniu i odczycie.
-   * @type {number}
+   * Inicjalizuje widoki UI i podpina zdarzenia.
+   * @param {{ dom: Dom }} context - Kontekst aplikacji z referencjami DOM.
    */
-  static maxAgeMs = 5 * 60 * 1000; // 5 minut
+  constructor(context) {
+    const { dom } = context;
+    this.chatView = new ChatUIView(
+      dom.chatContainer,
+      dom.inputArea,
+      dom.prompt
+    );
 
-  /**
-   * Ustawia nowy limit wieku wpisów i natychmiast czyści stare.
-   * @param {number} ms - nowy limit wieku w milisekundach
-   */
-  static setMaxAge(ms) {
-    this.maxAgeMs = ms;
-    this.cleanup();
-  }
+    this.promptVal = {
+      promptEl: dom.prompt,
+      errorEl: dom.promptError,
+      warningEl: dom.promptWarning,
+    };
 
-  /**
-   * Dodaje wpis do bufora i wypisuje go w konsoli z odpowiednim stylem.
-   * @param {'log'|'warn'|'error'} level - poziom logowania
-   * @param {string} msg - wiadomość do wyświetlenia
-   * @param {...any} args - dodatkowe dane (np. obiekty, błędy)
-   */
-  static record(level, msg, ...args) {
-    const emojiLevels = { log: "🌍", warn: "⚠️", error: "‼️" };
-    const timestamp = Date.now();
+    this.editView = new ChatEditView(dom);
 
-    this.buffer.push({ timestamp, level, msg, args });
-    this.cleanup();
+    // Identyfikator trwającego żądania /generate (do abortPrompt)
+    this.pendingRequestId = null;
 
-    const styleMap = {
-      log: "color: #444",
-      warn: "color: orange",
-      error: "color: red; font-weight: bold",
-    };
+    this.chatView.onEditRequested = (msgEl, text, id, ts, sessionId) =>
+      this.editView.enableEdit(msgEl, text, id, ts, sessionId);
 
-    const style = styleMap[level] || "";
-    const displayMsg = `${emojiLevels[level] || ""} ${msg}`;
-    console[level](
-      `%c[${new Date(timestamp).toLocaleTimeString()}] ${displayMsg}`,
-      style,
-      ...args
-    );
+    this.chatView.onRatingSubmit = (msgEl) => this.ratingView.open(msgEl);
   }
 
   /**
-   * Usuwa wpisy starsze niż maxAgeMs.
-   * Jeśli maxAgeMs <= 0, czyści cały bufor.
+   * Inicjalizuje widoki i podpina zdarzenia walidacji promptu oraz edycji i oceny.
    */
-  static cleanup() {
-    if (this.maxAgeMs <= 0) {
-      this.buffer = [];
-      return;
-    }
-    const cutoff = Date.now() - this.maxAgeMs;
-    this.buffer = this.buffer.filter((e) => e.timestamp >= cutoff);
-  }
-
-  /**
-   * Zwraca wpisy danego poziomu logowania.
-   * @param {'log'|'warn'|'error'} level - poziom do filtrowania
-   * @returns {Array<{timestamp: number, msg: string, args: any[]}>}
+  init() {
+    const { promptEl, errorEl, warningEl } = this.promptVal;
+    let hadInput = false;
+
+    const syncUI = (text) => {
+      const raw = typeof text === "string" ? text : promptEl.value;
+      const trimmed = raw.trim();
+      const len = raw.length;
+
+      // licznik znaków
+      warningEl.textContent = `${len}/${PromptValidator.maxLength} znaków`;
+
+      // klasa długości
+      if (len > PromptValidator.maxLength) {
+        warningEl.classList.add("error-text-length");
+      } else {
+        warningEl.classList.remove("error-text-length");
+      }
+
+      // walidacja
+      const { valid, errors } = PromptValidator.validate(raw);
+
+      // filtr błędów
+      const isEmpty = trimmed.length === 0;
+      const filteredErrors = errors.filter((msg) => {
+        const isEmptyError = msg.startsWith("Prompt nie może być pusty");
+        if (isEmptyError) return hadInput && isEmpty;
+        return true;
+      });
+
+      errorEl.textContent = filteredErrors.join(" ");
+      return { valid, filteredErrors };
+    };
+
+    // startowa synchronizacja
+    const initialText = promptEl.value || "";
+    if (initialText.length > 0) hadInput = true;
+    syncUI(initialText);
+
+    // live feedback
+    promptEl.addEventListener("input", () => {
+      const len = promptEl.value.length;
+      if (len > 0) hadInput = true;
+
+      const { filteredErrors } = syncUI();
+      if (len > 0) {
+        const keep = filteredErrors.filter(
+          (e) => !e.startsWith("Prompt nie może być pusty")
+        );
+        errorEl.textContent = keep.join(" ");
+      }
+    });
+
+    // walidacja na submit – zwraca true/false
+    this.chatView.onPromptSubmit = (text) => {
+      const raw = text;
+      const trimmed = raw.trim();
+      const len = raw.length;
+      const { valid } = PromptValidator.validate(raw);
+      const { filteredErrors } = syncUI(raw);
+
+      if (!valid) {
+        const empty = trimmed.length === 0;
+        const onlyEmptyError =
+          filteredErrors.length === 1 &&
+          filteredErrors[0].startsWith("Prompt nie może być pusty");
+
+        if (empty && !hadInput) {
+          return false; // odrzucone – brak wcześniejszego inputu
+        }
+
+        errorEl.textContent = filteredErrors.join(" ");
+        if (len > PromptValidator.maxLength) {
+          warningEl.classList.add("error-text-length");
+        }
+        return false; // odrzucone – błędy walidacji
+      }
+
+      warningEl.classList.remove("error-text-length");
+      errorEl.textContent = "";
+      this.sendPrompt(raw);
+      return true; // zaakceptowane – ChatUIView wyczyści pole
+    };
+
+    this.chatView.init();
+
+    this.editView.onEditSubmit = (msgEl, txt, tags, imageUrl) =>
+      this.sendEdit(msgEl, txt, tags, imageUrl);
+
+    this.editView.onEditCancel = (msgEl, data) => {
+      this.chatView.hydrateAIMessage(msgEl, data);
+    };
+
+    this.chatView.onRatingSubmit = (payload) => {
+      this.sendRating(payload);
+    };
+  }
+
+  /**
+   * Wysyła prompt użytkownika do backendu i renderuje odpowiedź.
+   * @param {string} prompt - Treść promptu.
+   * @returns {Promise<void>}
    */
-  static filterByLevel(level) {
-    this.cleanup();
-    return this.buffer
-      .filter((e) => e.level === level)
-      .map(({ timestamp, msg, args }) => ({ timestamp, msg, args }));
+  async sendPrompt(prompt) {
+    this.chatView.addUserMessage(prompt);
+    const { msgEl, timer } = this.chatView.addLoadingMessage();
+    const requestId = BackendAPI.newRequestId();
+    this.pendingRequestId = requestId;
+    try {
+      const data = await BackendAPI.generate(prompt, requestId);
+
+      // Rozwiąż URL ilustracji
+      const urls = await ImageResolver.resolve(data.tags);
+      data.imageUrl = urls[0] || "";
+
+      // Renderuj odpowiedź AI
+      this.chatView.hydrateAIMessage(msgEl, data);
+    } catch (err) {
+      this.chatView.showError(msgEl);
+      LoggerService.record("error", "[ChatManager] sendPrompt", err);
+    } finally {
+      clearInterval(timer);
+      if (this.pendingRequestId === requestId) this.pendingRequestId = null;
+    }
   }
 
   /**
-   * Zwraca całą historię wpisów.
-   * Jeśli clone = true, zwraca głęboką kopię wpisów.
-   * @param {boolean} [clone=false] - czy zwrócić kopię wpisów
-   * @returns {Array<{timestamp: number, level: string, msg: string, args: any[]}>}
+   * Przerywa trwające generowanie odpowiedzi (backend zapisze częściową odpowiedź).
+   * @returns {Promise<void>}
    */
-  static getHistory(clone = false) {
-    this.cleanup();
-    if (!clone) return [...this.buffer];
-    return this.buffer.map((entry) => structuredClone(entry));
+  async abortPrompt() {
+    const requestId = this.pendingRequestId;
+    if (!requestId) return;
+    try {
+      await BackendAPI.cancel(requestId);
+    } catch (err) {
+      LoggerService.record("warn", "[ChatManager] abortPrompt", err);
+    }
   }
 
   /**
-   * Czyści cały bufor logów bez względu na wiek wpisów.
+   * Przesyła edytowaną wiadomość do backendu i aktualizuje UI.
+   * @param {HTMLElement} msgEl - Element wiadomości.
+   * @param {string} editedText - Nowa treść.
+   * @param {Record<string, any>} tags - Tagowanie wiadomości.
+   * @param {string} imageUrl - URL ilustracji.
+   * @param {string} [sessionId] - ID sesji (opcjonalne).
+   * @returns {Promise<void>}
    */
-  static clearHistory() {
-    this.buffer = [];
+  async sendEdit(msgEl, editedText, tags, imageUrl, sessionId) {
+    this.chatView.hydrateAIMessage(
+      msgEl,
+      {
+        id: msgEl.dataset.msgId,
+        sessionId: sessionId || msgEl.dataset.sessionId,
+        tags,
+        timestamp: msgEl.dataset.timestamp,
+        originalText: editedText,
+        text: editedText,
+        sender: msgEl.dataset.sender,
+        avatarUrl: msgEl.dataset.avatarUrl,
+        generation_time: Number.isFinite(
+          parseFloat(msgEl.dataset.generation_time)
+        )
+          ? parseFloat(msgEl.dataset.generation_time)
+          : 0,
+
+        imageUrl,
+      },
+      true
+    );
+
+    try {
+      await BackendAPI.edit(editedText, tags, sessionId, msgEl.dataset.msgId);
+    } catch (err) {
+      LoggerService.record("error", "[ChatManager] sendEdit", err);
+    }
   }
 
   /**
-   * Dodaje wpis tylko jeśli nie istnieje już wpis o tym samym poziomie i wiadomości.
-   * @param {'log'|'warn'|'error'} level - poziom logowania
-   * @param {string} msg - wiadomość
-   * @param {...any} args - dodatkowe dane
+   * Przesyła ocenę wiadomości do backendu.
+   * @param {{ messageId: string, sessionId: string, ratings: Record<string, any> }} payload
+   * @returns {Promise<void>}
    */
-  static recordOnce(level, msg, ...args) {
-    if (!this.buffer.some((e) => e.level === level && e.msg === msg)) {
-      this.record(level, msg, ...args);
+  async sendRating({ messageId, sessionId, ratings }) {
+    try {
+      await BackendAPI.rate({ messageId, sessionId, ratings });
+    } catch (err) {
+      LoggerService.record("error", "[ChatManager] sendRating", err);
     }
   }
 }
 
 /**
  *
- * Fabryka elementów UI do wyboru tagów.
- * Tworzy pola wyboru w dwóch wariantach w zależności od środowiska:
- *  - Mobile → <select> z listą opcji
- *  - Desktop → <input> z przypisanym <datalist>
+ * Komponent UI odpowiedzialny za wyświetlanie i obsługę panelu ocen wiadomości AI.
+ * Funkcje:
+ *  - Renderuje panel ocen w formie <details> z listą kryteriów i suwakami (range input)
+ *  - Obsługuje zmianę wartości suwaków (aktualizacja widocznej wartości)
+ *  - Po kliknięciu "Wyślij ocenę" zbiera wszystkie wartości i przekazuje je w callbacku `onSubmit`
+ *  - Zapobiega duplikowaniu panelu ocen w tej samej wiadomości
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Generowanie elementów formularza dla tagów
- *   - Nadawanie etykiet polom na podstawie słownika
- *   - Obsługa wariantu mobilnego i desktopowego
+ *   - Tworzenie i osadzanie elementów DOM panelu ocen
+ *   - Obsługa interakcji użytkownika (zmiana wartości, wysyłka oceny)
  *
  * - ❌ Niedozwolone:
- *   - Walidacja wybranych tagów
- *   - Operacje sieciowe
- *   - Bezpośrednia integracja z backendem
+ *   - Samodzielne wysyłanie ocen do backendu (od tego jest logika wyżej)
+ *   - Modyfikowanie innych elementów wiadomości poza panelem ocen
  */
-class TagSelectorFactory {
+class ChatRatingView {
   /**
-   * Słownik etykiet dla pól tagów.
-   * Klucze odpowiadają nazwom pól, wartości to etykiety wyświetlane w UI.
-   * @type {Record<string,string>}
+   * @param {HTMLElement} msgEl - Element wiadomości, do którego ma zostać dodany panel ocen
+   * @param {function(object):void} [onSubmit] - Callback wywoływany po wysłaniu oceny
    */
-  static labels = {
-    location: "Lokalizacja",
-    character: "Postać",
-    action: "Czynność",
-    nsfw: "NSFW",
-    emotion: "Emocja",
-  };
+  constructor(msgEl, onSubmit) {
+    if (!(msgEl instanceof HTMLElement)) return;
+    this.onSubmit = onSubmit || null;
+
+    /**
+     * Lista kryteriów oceniania
+     * @type {{key: string, label: string}[]}
+     */
+    this.criteria = [
+      { key: "Narrative", label: "Narracja" },
+      { key: "Style", label: "Styl" },
+      { key: "Logic", label: "Logika" },
+      { key: "Quality", label: "Jakość" },
+      { key: "Emotions", label: "Emocje" },
+    ];
+
+    this.render(msgEl);
+  }
 
   /**
-   * Tworzy prosty element wyboru tagów (bez dodatkowych klas/stylów).
-   * Używany do generowania pojedynczych selektorów w UI.
-   *
-   * @param {string} type - Typ pola (np. 'location', 'character').
-   * @param {string[]} [options=[]] - Lista dostępnych opcji.
-   * @returns {HTMLLabelElement} - Element <label> zawierający kontrolkę wyboru.
+   * Renderuje panel ocen w wiadomości.
+   * @param {HTMLElement} msgEl - Element wiadomości
    */
-  static create(type, options = []) {
-    const labelEl = document.createElement("label");
-    labelEl.textContent = this.labels[type] || type;
-
-    if (Utils.isMobile()) {
-      // Mobile: <select> z opcjami
-      const select = document.createElement("select");
-      options.forEach((opt) => {
-        const optionEl = document.createElement("option");
-        optionEl.value = opt;
-        optionEl.textContent = opt;
-        select.appendChild(optionEl);
-      });
-      labelEl.appendChild(select);
-    } else {
-      // Desktop: <input> + <datalist>
-      const input = document.createElement("input");
-      input.setAttribute("list", `${type}-list`);
-      const datalist = document.createElement("datalist");
-      datalist.id = `${type}-list`;
-      options.forEach((opt) => {
-        const optionEl = document.createElement("option");
-        optionEl.value = opt;
-        datalist.appendChild(optionEl);
-      });
-      labelEl.append(input, datalist);
-    }
+  render(msgEl) {
+    // Unikamy duplikatów panelu ocen
+    if (msgEl.querySelector("details.rating-form")) return;
 
-    return labelEl;
-  }
+    const details = document.createElement("details");
+    details.className = "rating-form";
+    details.open = false;
 
-  /**
-   * Tworzy kompletny element pola tagu z etykietą i kontrolką wyboru.
-   * Używany w panelach tagów (np. TagsPanel) do renderowania pól kategorii.
-   *
-   * @param {string} name - Nazwa pola (np. "location", "character").
-   * @param {string[]} [options=[]] - Lista opcji do wyboru.
-   * @returns {HTMLLabelElement} - Gotowy element <label> z kontrolką.
-   */
-  static createTagField(name, options = []) {
-    const labelEl = document.createElement("label");
-    labelEl.className = "tag-field";
-    labelEl.textContent = this.labels?.[name] || name;
+    const summary = document.createElement("summary");
+    summary.textContent = "Oceń odpowiedź ⭐";
+    details.appendChild(summary);
 
-    if (Utils.isMobile()) {
-      // Mobile: <select> z pustą opcją na start
-      const select = document.createElement("select");
-      select.id = `tag-${name}`;
-      select.name = name;
+    const header = document.createElement("h3");
+    header.textContent = "Twoja ocena:";
+    details.appendChild(header);
 
-      const emptyOpt = document.createElement("option");
-      emptyOpt.value = "";
-      emptyOpt.textContent = "-- wybierz --";
-      select.appendChild(emptyOpt);
+    // Tworzenie wierszy z suwakami dla każdego kryterium
+    this.criteria.forEach(({ key, label }) => {
+      const row = document.createElement("label");
+      row.className = "rating-row";
 
-      options.forEach((opt) => {
-        const optionEl = document.createElement("option");
-        optionEl.value = opt;
-        optionEl.textContent = opt;
-        select.appendChild(optionEl);
-      });
+      const labelSpan = document.createElement("span");
+      labelSpan.textContent = `${label}: `;
+      row.appendChild(labelSpan);
 
-      labelEl.appendChild(select);
-    } else {
-      // Desktop: <input> + <datalist>
       const input = document.createElement("input");
-      input.id = `tag-${name}`;
-      input.name = name;
-      input.setAttribute("list", `${name}-list`);
-
-      const datalist = document.createElement("datalist");
-      datalist.id = `${name}-list`;
-
-      options.forEach((opt) => {
-        const optionEl = document.createElement("option");
-        optionEl.value = opt;
-        datalist.appendChild(optionEl);
-      });
-
-      labelEl.append(input, datalist);
-    }
-
-    return labelEl;
-  }
-}
-
-/**
- *
- * Centralny punkt dostępu do elementów DOM aplikacji.
- * Wymusza strukturę opartą na <main id="app"> jako kontenerze bazowym.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Przechowywanie i udostępnianie referencji do elementów
- *   - Wyszukiwanie elementów tylko wewnątrz <main id="app">
- *
- * - ❌ Niedozwolone:
- *   - Operacje poza <main id="app">
- *   - Modyfikowanie struktury DOM globalnie
- *
- */
-class Dom {
-  /**
-   * Inicjalizuje klasę Dom z wymuszeniem kontenera <main id="app">
-   * @param {string|HTMLElement} rootSelector - domyślnie "#app"
-   */
-  constructor(rootSelector = "#app") {
-    this.rootSelector = rootSelector;
-    this.root = null;
-    this.refs = {};
-  }
-
-  /**
-   * Inicjalizuje referencje do elementów wewnątrz <main id="app">
-   * @param {Record<string, string>} refMap - mapa nazw do selektorów
-   */
-  init(refMap) {
-    const rootCandidate =
-      typeof this.rootSelector === "string"
-        ? document.querySelector(this.rootSelector)
-        : this.rootSelector;
-
-    if (!(rootCandidate instanceof HTMLElement)) {
-      LoggerService.record(
-        "error",
-        '[Dom] Nie znaleziono <main id="app">. Wymagana struktura HTML.'
-      );
-      return;
-    }
-
-    if (rootCandidate.tagName !== "MAIN" || rootCandidate.id !== "app") {
-      LoggerService.record(
-        "error",
-        '[Dom] Kontener bazowy musi być <main id="app">. Otrzymano:',
-        rootCandidate
-      );
-      return;
-    }
-
-    this.root = rootCandidate;
-
-    Object.entries(refMap).forEach(([name, selector]) => {
-      const el =
-        selector === this.rootSelector
-          ? this.root
-          : this.root.querySelector(selector);
+      input.type = "range";
+      input.min = "1";
+      input.max = "5";
+      input.value = "3";
+      input.name = key;
 
-      if (!el) {
-        LoggerService.record("warn", `[Dom] Brak elementu: ${selector}`);
-      }
+      const val = document.createElement("span");
+      val.textContent = input.value;
+      input.addEventListener("input", () => (val.textContent = input.value));
 
-      this.refs[name] = el || null;
-      this[name] = el || null;
+      row.append(input, val);
+      details.appendChild(row);
     });
-  }
 
-  /**
-   * Wyszukuje element w obrębie <main id="app">
-   * @param {string} selector
-   * @returns {HTMLElement|null}
-   */
-  q(selector) {
-    return this.root?.querySelector(selector) || null;
-  }
+    // Przycisk wysyłki oceny
+    const btn = document.createElement("button");
+    btn.type = "button";
+    btn.textContent = "Wyślij ocenę";
+    btn.addEventListener("click", () => {
+      const ratings = {};
+      this.criteria.forEach(({ key }) => {
+        ratings[key] = Number(details.querySelector(`[name="${key}"]`).value);
+      });
+      const payload = {
+        messageId: msgEl.dataset.msgId,
+        sessionId: msgEl.dataset.sessionId,
+        ratings,
+      };
+      this.onSubmit?.(payload);
+    });
+    details.appendChild(btn);
 
-  /**
-   * Wyszukuje wszystkie elementy pasujące do selektora w obrębie <main id="app">
-   * @param {string} selector
-   * @returns {NodeListOf<HTMLElement>}
-   */
-  qa(selector) {
-    return this.root?.querySelectorAll(selector) || [];
+    // Panel trafia do stopki wiadomości lub bezpośrednio do elementu
+    const footer = msgEl.querySelector(".msg-footer") || msgEl;
+    footer.appendChild(details);
   }
 }
 
@@ -1605,1698 +1665,1787 @@ class ChatUIView {
 
 /**
  *
- * Komponent odpowiedzialny za renderowanie i obsługę pól tagów oraz synchronizację z galerią.
- * Integruje się z TagSelectorFactory i GalleryLoader, umożliwiając wybór tagów i podgląd obrazów.
+ * Kontener zależności aplikacji. Przechowuje i udostępnia instancje usług oraz
+ * zapewnia wygodne gettery do najczęściej używanych komponentów.
  *
  * - ✅ Dozwolone:
- *   - Tworzenie i aktualizacja pól tagów
- *   - Synchronizacja z galerią
- *   - Emisja zmian tagów do świata zewnętrznego
- *   - Obsługa wartości domyślnych z data-tags
+ *   - Rejestracja instancji usług i komponentów (np. Dom, Utils, UserManager)
+ *   - Pobieranie zależności po nazwie lub przez getter
+ *   - Dynamiczne dodawanie nowych zależności w trakcie działania
  *
  * - ❌ Niedozwolone:
- *   - Walidacja promptów/tekstu
- *   - Operacje sieciowe (np. pobieranie tagów z backendu)
- *   - Logika edycji, ocen, renderowania wiadomości
+ *   - Tworzenie instancji usług na sztywno (to robi warstwa inicjalizacyjna)
+ *   - Logika biznesowa lub UI
+ *   - Operacje sieciowe
  */
-class TagsPanel {
+class Context {
   /**
-   * Tworzy instancję panelu tagów.
-   * @param {HTMLElement} container - Kontener DOM z miejscem na pola tagów i galerię.
-   * @throws {Error} Gdy container nie jest HTMLElement.
+   * Tworzy nowy kontekst z początkowym zestawem usług.
+   * @param {Record<string, any>} services - mapa nazw → instancji
    */
-  constructor(container) {
-    if (!(container instanceof HTMLElement)) {
-      const actualType =
-        container === null
-          ? "null"
-          : Array.isArray(container)
-          ? "Array"
-          : container?.constructor?.name || typeof container;
+  constructor(services = {}) {
+    /** @private @type {Map<string, any>} */
+    this._registry = new Map(Object.entries(services));
+  }
 
-      throw new Error(
-        `[TagsPanel] Przekazany kontener nie jest elementem DOM. Otrzymano: ${actualType} → ${String(
-          container
-        )}`
-      );
-    }
-
-    this.container = container;
-
-    this.onTagsChanged = null;
-
-    this.fields = {};
-
-    this.buildTagFields();
-
-    const gallery = document.createElement("div");
-    gallery.id = "image-gallery";
-    gallery.className = "gallery-grid mt-10";
-    this.container.appendChild(gallery);
-
-    this.gallery = gallery;
-
-    this.galleryLoader = new GalleryLoader({ galleryContainer: gallery });
-    this.galleryLoader.setContainer(gallery);
-
-    this.notifyTagsChanged();
-  }
+  /**
+   * Rejestruje nową lub nadpisuje istniejącą zależność.
+   * @param {string} name - unikalna nazwa zależności
+   * @param {any} instance - instancja lub obiekt usługi
+   */
+  register(name, instance) {
+    this._registry.set(name, instance);
+  }
 
   /**
-   * Skrót do querySelector w obrębie panelu.
-   * @param {string} selector - CSS selektor
-   * @returns {HTMLElement|null}
+   * Pobiera zarejestrowaną zależność po nazwie.
+   * @param {string} name - nazwa zależności
+   * @returns {any} - instancja lub undefined
    */
-  q(selector) {
-    const el = this.container.querySelector(selector);
-    if (!el) {
-      LoggerService.record(
-        "warn",
-        `[TagsPanel] Nie znaleziono elementu: ${selector}`,
-        this.container
-      );
-    }
-    return el;
+  get(name) {
+    return this._registry.get(name);
   }
 
-  /**
-   * Domyślna konstrukcja pól tagów (fallback, gdy nie użyjesz setTagOptions()).
-   * W realu zwykle używasz setTagOptions(daneZBackendu).
-   */
-  buildTagFields() {
-    const tagNames = ["location", "character", "action", "nsfw", "emotion"];
-    const tagOptions = {
-      location: ["forest", "castle", "cave", "village"],
-      character: ["Lytha", "Aredia", "Xavier"],
-      action: ["healing", "combat", "ritual"],
-      nsfw: ["intimacy", "touch", "kiss"],
-      emotion: ["joy", "sadness", "fear", "love"],
-    };
-
-    tagNames.forEach((name) => {
-      const fieldWrapper = TagSelectorFactory.createTagField(
-        name,
-        tagOptions[name] || []
-      );
-      this.container.appendChild(fieldWrapper);
-      const field =
-        fieldWrapper.querySelector(`#tag-${name}`) ||
-        fieldWrapper.querySelector("input, select");
-
-      this.fields[name] = field;
-    });
+  // Wygodne gettery (opcjonalne)
+  get dom() {
+    return this.get("dom");
   }
-
-  /**
-   * Inicjalizuje nasłuchiwanie zmian w polach tagów.
-   * @param {(tagsObj:Record<string,string>)=>void} onChange - Callback wywoływany przy zmianie
-   */
-  init(onChange) {
-    const debouncedRefresh = Utils.debounce(
-      () => this.notifyTagsChanged(),
-      300
-    );
-
-    Object.values(this.fields).forEach((field) => {
-      if (!field) return;
-      const eventType = field.tagName === "SELECT" ? "change" : "input";
-      field.addEventListener(eventType, () => {
-        if (typeof onChange === "function")
-          onChange(this.getSelectedTagsObject());
-        debouncedRefresh();
-      });
-    });
+  get utils() {
+    return this.get("utils");
   }
-
-  /**
-   * Zwraca aktualne tagi jako obiekt {nazwaKategorii: wartość}.
-   * @returns {Record<string,string>}
-   */
-  getSelectedTagsObject() {
-    return Object.fromEntries(
-      Object.entries(this.fields).map(([k, el]) => [k, el?.value || ""])
-    );
+  get userManager() {
+    return this.get("userManager");
   }
-
-  /**
-   * Zwraca aktualne tagi jako lista stringów (bez pustych).
-   * @returns {string[]}
-   */
-  getTagList() {
-    return Object.values(this.getSelectedTagsObject()).filter(Boolean);
+  get diagnostics() {
+    return this.get("diagnostics");
   }
-
-  /**
-   * Emisja zmiany tagów i synchronizacja galerii.
-   */
-  notifyTagsChanged() {
-    const list = this.getTagList();
-    if (typeof this.onTagsChanged === "function") {
-      this.onTagsChanged(list);
-    }
-    this.galleryLoader?.renderFromTags(list);
+  get backendAPI() {
+    return this.get("backendAPI");
   }
+}
 
+/**
+ *
+ * Centralny punkt dostępu do elementów DOM aplikacji.
+ * Wymusza strukturę opartą na <main id="app"> jako kontenerze bazowym.
+ *
+ * ## Zasady:
+ *
+ * - ✅ Dozwolone:
+ *   - Przechowywanie i udostępnianie referencji do elementów
+ *   - Wyszukiwanie elementów tylko wewnątrz <main id="app">
+ *
+ * - ❌ Niedozwolone:
+ *   - Operacje poza <main id="app">
+ *   - Modyfikowanie struktury DOM globalnie
+ *
+ */
+class Dom {
   /**
-   * Czyści wszystkie pola tagów i odświeża galerię.
+   * Inicjalizuje klasę Dom z wymuszeniem kontenera <main id="app">
+   * @param {string|HTMLElement} rootSelector - domyślnie "#app"
    */
-  clearTags() {
-    Object.values(this.fields).forEach((field) => {
-      if (field) field.value = "";
-    });
-    this.notifyTagsChanged();
+  constructor(rootSelector = "#app") {
+    this.rootSelector = rootSelector;
+    this.root = null;
+    this.refs = {};
   }
 
   /**
-   * Zastępuje opcje tagów i przebudowuje pola na podstawie słownika z backendu.
-   * Oczekuje kluczy w postaci "tag-location", "tag-character", ... (tak jak w tags.json).
-   * Zachowuje this.gallery — pola idą przed galerią.
-   *
-   * @param {Record<string,string[]>} tagOptionsFromBackend
+   * Inicjalizuje referencje do elementów wewnątrz <main id="app">
+   * @param {Record<string, string>} refMap - mapa nazw do selektorów
    */
-  setTagOptions(tagOptionsFromBackend) {
-    const toFieldName = (k) => (k.startsWith("tag-") ? k.slice(4) : k);
+  init(refMap) {
+    const rootCandidate =
+      typeof this.rootSelector === "string"
+        ? document.querySelector(this.rootSelector)
+        : this.rootSelector;
 
-    Array.from(this.container.children).forEach((child) => {
-      if (child !== this.gallery) this.container.removeChild(child);
-    });
+    if (!(rootCandidate instanceof HTMLElement)) {
+      LoggerService.record(
+        "error",
+        '[Dom] Nie znaleziono <main id="app">. Wymagana struktura HTML.'
+      );
+      return;
+    }
 
-    this.fields = {};
-    Object.entries(tagOptionsFromBackend).forEach(([backendKey, options]) => {
-      const name = toFieldName(backendKey);
-      const fieldWrapper = TagSelectorFactory.createTagField(
-        name,
-        options || []
+    if (rootCandidate.tagName !== "MAIN" || rootCandidate.id !== "app") {
+      LoggerService.record(
+        "error",
+        '[Dom] Kontener bazowy musi być <main id="app">. Otrzymano:',
+        rootCandidate
       );
-      if (this.gallery && this.gallery.parentElement === this.container) {
-        this.container.insertBefore(fieldWrapper, this.gallery);
-      } else {
-        this.container.appendChild(fieldWrapper);
+      return;
+    }
+
+    this.root = rootCandidate;
+
+    Object.entries(refMap).forEach(([name, selector]) => {
+      const el =
+        selector === this.rootSelector
+          ? this.root
+          : this.root.querySelector(selector);
+
+      if (!el) {
+        LoggerService.record("warn", `[Dom] Brak elementu: ${selector}`);
       }
-      const field =
-        fieldWrapper.querySelector(`#tag-${name}`) ||
-        fieldWrapper.querySelector("input, select");
 
-      this.fields[name] = field;
+      this.refs[name] = el || null;
+      this[name] = el || null;
     });
   }
 
   /**
-   * Ustawia wartości domyślne na podstawie data-tags (np. "cave_kissing")
-   * i słownika tagów z backendu. Pomija tokeny, których nie ma w żadnej kategorii.
-   *
-   * @param {string} dataTags - np. "cave_kissing"
-   * @param {Record<string,string[]>} tagOptionsFromBackend
+   * Wyszukuje element w obrębie <main id="app">
+   * @param {string} selector
+   * @returns {HTMLElement|null}
    */
-  applyDefaultsFromDataTags(dataTags, tagOptionsFromBackend) {
-    if (!dataTags) return;
-
-    const tokens = dataTags.split("_").filter(Boolean);
-    const mapBackendKeyToField = (k) => (k.startsWith("tag-") ? k.slice(4) : k);
+  q(selector) {
+    return this.root?.querySelector(selector) || null;
+  }
 
-    for (const token of tokens) {
-      for (const [backendKey, options] of Object.entries(
-        tagOptionsFromBackend
-      )) {
-        if (Array.isArray(options) && options.includes(token)) {
-          const fieldName = mapBackendKeyToField(backendKey);
-          const field = this.fields[fieldName];
-          if (field) field.value = token;
-          break;
-        }
-      }
-    }
+  /**
+   * Wyszukuje wszystkie elementy pasujące do selektora w obrębie <main id="app">
+   * @param {string} selector
+   * @returns {NodeListOf<HTMLElement>}
+   */
+  qa(selector) {
+    return this.root?.querySelectorAll(selector) || [];
   }
 }
 
 /**
  *
- * Warstwa komunikacji z backendem HTTP — odporna na błędy sieciowe, spójna i centralnie konfigurowalna.
- * Umożliwia wysyłanie żądań POST/GET z automatycznym retry i backoffem.
- * Integruje się z `RequestRetryManager` i zarządza tokenem autoryzacyjnym.
+ * Walidator tekstu edytowanego przez AI oraz przypisanych tagów.
+ * Sprawdza długość tekstu i tagów oraz obecność treści.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Budowanie żądań HTTP (URL, headers, body)
- *   - Dekodowanie odpowiedzi JSON
- *   - Obsługa błędów sieciowych i retry
- *   - Centralne zarządzanie baseURL i tokenem
+ *   - Stałe limitów: maxTextLength, maxTagLength
+ *   - Metoda: validate(text, tags)
  *
  * - ❌ Niedozwolone:
- *   - Logika UI
- *   - Cache’owanie domenowe
- *   - Mutowanie danych biznesowych
+ *   - Operacje na DOM
+ *   - Zlecenia sieciowe (fetch, localStorage)
+ *   - Logika aplikacyjna (np. renderowanie, wysyłka)
+ *   - Efekty uboczne (np. console.log, mutacje zewnętrznych obiektów)
  */
-class BackendAPI {
-  /** 
-   * Bazowy adres backendu
-   * @type {string} (bez końcowego slasha, pusty = względny)
-  */
-  static baseURL = "";
-
-  /** 
-   * Token autoryzacyjny Bearer 
-   * @type {string|null}
-  */
-  static authToken = null;
-
+class EditValidator {
   /**
-   * Ustawia bazowy adres względny backendu.
-   * @param {string} url - Adres URL bez końcowego slasha.
+   * Maksymalna długość tekstu edycji.
+   * Tekst dłuższy niż ta wartość zostanie uznany za niepoprawny.
+   * @type {number}
    */
-  static setBaseURL(url) {
-    if (!url || url === "/") {
-      // tryb względny — używamy hosta, z którego załadowano front
-      this.baseURL = "";
-    } else {
-      // czyścimy końcowe slashe
-      this.baseURL = url.replace(/\/+$/, "");
-    }
-  }
+  static maxTextLength = 5000;
 
   /**
-   * Ustawia lub usuwa token autoryzacyjny.
-   * @param {string|null} token - Token Bearer lub null.
+   * Maksymalna długość pojedynczego tagu.
+   * Tag dłuższy niż ta wartość zostanie uznany za niepoprawny.
+   * @type {number}
    */
-  static setAuthToken(token) {
-    this.authToken = token || null;
-  }
+  static maxTagLength = 300;
 
   /**
-   * Składa pełny URL względem baseURL.
-   * @param {string} path - Ścieżka względna (np. "/generate").
-   * @returns {string} Pełny URL.
-   * @private
+   * Waliduje tekst i tagi pod kątem pustki i długości.
+   * - Tekst musi być niepusty po przycięciu.
+   * - Tekst nie może przekraczać maxTextLength.
+   * - Każdy tag musi być typu string i nie może przekraczać maxTagLength.
+   *
+   * @param {string} text - Edytowany tekst AI
+   * @param {string[]} tags - Lista tagów
+   * @returns {{ valid: boolean, errors: string[] }} - Obiekt z informacją o poprawności i listą błędów
    */
-  static _url(path) {
-    if (!this.baseURL) return path;
-    return `${this.baseURL}${path.startsWith("/") ? "" : "/"}${path}`;
-  }
+  static validate(text, tags) {
+    const errors = [];
 
-  /**
-   * Buduje nagłówki HTTP z Content-Type, Accept i Authorization.
-   * @param {Record<string,string>} [extra] - Dodatkowe nagłówki.
-   * @returns {HeadersInit} Nagłówki HTTP.
-   * @private
-   */
-  static _headers(extra = {}) {
-    const h = {
-      Accept: "application/json",
-      ...extra,
-    };
-    if (!("Content-Type" in h)) h["Content-Type"] = "application/json";
-    if (this.authToken) h["Authorization"] = `Bearer ${this.authToken}`;
-    return h;
-  }
+    // Przycięcie tekstu z obu stron
+    const trimmedText = text.trim();
+    const textLength = trimmedText.length;
 
-  /**
-   * Wysyła żądanie POST z JSON i odbiera JSON z retry.
-   * @param {string} path - Ścieżka żądania.
-   * @param {any} body - Treść żądania.
-   * @param {RequestInit} [init] - Dodatkowe opcje fetch.
-   * @returns {Promise<any>} Odpowiedź z backendu.
-   * @private
-   */
-  static async _postJson(path, body, init = {}) {
-    const res = await RequestRetryManager.fetchWithRetry(
-      this._url(path),
-      {
-        method: "POST",
-        headers: this._headers(init.headers || {}),
-        body: JSON.stringify(body),
-        ...init,
-      },
-      3, // liczba prób
-      800, // opóźnienie początkowe
-      { maxTotalTime: 15_000 }
-    );
-    if (!res.ok) {
-      const text = await BackendAPI._safeText(res);
-      throw new Error(`POST ${path} -> HTTP ${res.status}: ${text}`);
+    // Walidacja tekstu
+    if (!textLength) {
+      errors.push("Tekst edycji nie może być pusty.");
+    } else if (textLength > this.maxTextLength) {
+      errors.push(
+        `Maksymalna długość tekstu to ${this.maxTextLength} znaków, otrzymano ${textLength}.`
+      );
     }
-    return BackendAPI._safeJson(res);
-  }
 
-  /**
-   * Wysyła żądanie GET i odbiera JSON z retry.
-   * @param {string} path - Ścieżka żądania.
-   * @param {RequestInit} [init] - Dodatkowe opcje fetch.
-   * @returns {Promise<any>} Odpowiedź z backendu.
-   * @private
-   */
-  static async _getJson(path, init = {}) {
-    const res = await RequestRetryManager.fetchWithRetry(
-      this._url(path),
-      {
-        method: "GET",
-        headers: this._headers(init.headers || {}),
-        ...init,
-      },
-      3,
-      800,
-      { maxTotalTime: 15_000 }
-    );
-    if (!res.ok) {
-      const text = await BackendAPI._safeText(res);
-      throw new Error(`GET ${path} -> HTTP ${res.status}: ${text}`);
+    // Walidacja tagów
+    for (const tag of tags) {
+      if (typeof tag !== "string") continue; // ignoruj błędne typy
+      if (tag.length > this.maxTagLength) {
+        errors.push(
+          `Tag "${tag}" przekracza limit ${this.maxTagLength} znaków (ma ${tag.length}).`
+        );
+      }
     }
-    return BackendAPI._safeJson(res);
+
+    return {
+      valid: errors.length === 0,
+      errors,
+    };
   }
+}
 
+/**
+ *
+ * Komponent odpowiedzialny za renderowanie galerii obrazów w przekazanym kontenerze.
+ * Współpracuje z ImageResolver w celu wyszukiwania obrazów na podstawie tagów.
+ * Umożliwia wybór obrazu przez użytkownika (radio name="gallery-choice").
+ *
+ * ## Zasady:
+ *
+ * - ✅ Dozwolone:
+ *   - Renderowanie obrazów w kontenerze
+ *   - Współpraca z ImageResolver
+ *   - Obsługa wyboru obrazu przez użytkownika
+ *   - Pobieranie obrazów z API (GET)
+ *
+ * - ❌ Niedozwolone:
+ *   - Logika promptów, edycji, ocen
+ *   - Połączenia z BackendAPI poza prostym GET
+ *   - Mutacje globalnego stanu
+ *
+ */
+class GalleryLoader {
   /**
-   * Bezpieczny parser JSON — zwraca pusty obiekt przy błędzie.
-   * @param {Response} res - Odpowiedź HTTP.
-   * @returns {Promise<any>} Parsowany JSON lub pusty obiekt.
-   * @private
+   * @param {HTMLElement|{galleryContainer?:HTMLElement}} [root] - Kontener lub obiekt z polem galleryContainer.
    */
-  static async _safeJson(res) {
-    try {
-      return await res.json();
-    } catch {
-      return {};
-    }
+  constructor(root) {
+    /** @type {HTMLElement|null} */
+    this.container = null;
+    /** @type {HTMLElement|null} */
+    this.gallery = null;
+    /** @type {string|null} */
+    this.nextCursor = null;
+    if (root) this.setContainer(root.galleryContainer || root);
   }
 
   /**
-   * Bezpieczny odczyt tekstu — zwraca pusty string przy błędzie.
-   * @param {Response} res - Odpowiedź HTTP.
-   * @returns {Promise<string>} Tekst odpowiedzi.
-   * @private
+   * Ustawia kontener galerii. Obsługuje:
+   * - <div id="image-gallery"> jako bezpośrednią galerię,
+   * - dowolny <div> (galeria = ten div),
+   * - wrapper zawierający element #image-gallery.
+   *
+   * @param {HTMLElement} el - Element kontenera
    */
-  static async _safeText(res) {
-    try {
-      return await res.text();
-    } catch {
-      return "";
+  setContainer(el) {
+    if (!(el instanceof HTMLElement)) {
+      LoggerService.record(
+        "error",
+        "[GalleryLoader] setContainer: brak HTMLElement",
+        el
+      );
+      return;
     }
+    this.container = el;
+    this.gallery = el.querySelector?.("#image-gallery") || el;
   }
 
-  // ── Publiczne metody API ───────────────────────────────────────────────────
-
   /**
-   * Wysyła prompt użytkownika do backendu.
-   * @param {string} prompt - Treść promptu.
-   * @returns {Promise<any>} Odpowiedź z backendu.
+   * Czyści zawartość galerii.
    */
-  static async generate(prompt) {
-    return this._postJson("/generate", { prompt });
+  clearGallery() {
+    if (this.gallery) this.gallery.innerHTML = "";
   }
 
   /**
-   * Przesyła oceny odpowiedzi AI.
-   * @param {Record<string, any>} ratings - Obiekt ocen.
-   * @returns {Promise<any>} Odpowiedź z backendu.
+   * Pokazuje komunikat w galerii, czyszcząc poprzednią zawartość.
+   *
+   * @param {string} message - Treść komunikatu
    */
-  static async rate(ratings) {
-    return this._postJson("/rate", ratings);
+  showMessage(message) {
+    if (!this.gallery) return;
+    this.clearGallery();
+    const msg = document.createElement("div");
+    msg.classList.add("gallery-message");
+    msg.textContent = message;
+    this.gallery.appendChild(msg);
   }
 
   /**
-   * Przesyła edytowaną odpowiedź z tagami.
-   * @param {string} editedText - Nowa treść.
-   * @param {Record<string, any>} tags - Obiekt tagów.
-   * @param {string} sessionId - ID sesji.
-   * @param {string} msgId - ID wiadomości.
-   * @returns {Promise<any>} Odpowiedź z backendu.
+   * Renderuje obrazy jako label z ukrytym input[type=radio] name="gallery-choice".
+   * Dzięki temu EditManager może odczytać wybór.
+   * Element może być obiektem `{ url, thumb }` — wtedy wyświetlana jest miniatura,
+   * a wybór nadal wskazuje pełny obraz.
+   *
+   * @param {Array<string|{url:string, thumb?:string}>} urls - Lista URL-i obrazów
+   * @param {boolean} [append=false] - Dopisz do istniejących zamiast czyścić
    */
-  static async edit(editedText, tags, sessionId, msgId) {
-    return this._postJson("/edit", { editedText, tags, sessionId, msgId });
-  }
+  renderImages(urls, append = false) {
+    if (!this.gallery) return;
+    if (!append) this.clearGallery();
+    const offset = this.gallery.querySelectorAll(".image-option").length;
+    urls.forEach((entry, i) => {
+      const idx = offset + i;
+      const url = typeof entry === "string" ? entry : entry.url;
+      const thumb = typeof entry === "string" ? entry : entry.thumb || entry.url;
+      const label = document.createElement("label");
+      label.className = "image-option";
 
-  /**
-   * Przesyła wiadomość użytkownika do backendu.
-   * @param {{ sender: string, text: string }} message - Nadawca i treść.
-   * @returns {Promise<any>} Odpowiedź z backendu.
-   */
-  static async postMessage({ sender, text }) {
-    return this._postJson("/messages", { sender, text });
-  }
-
-  /**
-   * Pobiera słownik tagów z backendu.
-   * @returns {Promise<any>} Lista tagów.
-   */
-  static async getTags() {
-    return this._getJson("/tags");
-  }
-}
-
-/**
- *
- * Menedżer widoczności paneli bocznych w aplikacji.
- * Zapewnia kontrolę nad otwieraniem, zamykaniem i przełączaniem paneli w interfejsie użytkownika.
- * Obsługuje tryb mobilny (wyłączność paneli) oraz desktopowy (współistnienie).
- * Utrzymuje stan wybranych paneli w cookie — tylko na desktopie.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Rejestracja paneli i ich przycisków
- *   - Obsługa zdarzeń kliknięcia
- *   - Przełączanie widoczności paneli
- *   - Zapisywanie stanu paneli w cookie (desktop only)
- *
- * - ❌ Niedozwolone:
- *   - Deklaracja paneli statycznie
- *   - Modyfikacja zawartości paneli
- *   - Logika niezwiązana z UI paneli
- *
- */
-class PanelsController {
-  /**
-   * @param {Dom} dom - Instancja klasy Dom
-   * @param {Array<{button: HTMLElement, panel: HTMLElement, id: string}>} panels - lista paneli
-   * @param {string[]} persistentPanels - identyfikatory paneli, które mają być zapamiętywane (desktop only)
-   */
-  constructor(dom, panels = [], persistentPanels = []) {
-    this.dom = dom;
-    this.panels = panels;
-    this.cookiePanels = new Set(persistentPanels);
-    this._unbinders = new Map();
-  }
-
-  /**
-   * Inicjalizuje nasłuchiwacze kliknięć i przywraca stan z cookie (desktop only).
-   */
-  init() {
-    this.panels.forEach(({ button, panel, id }) => {
-      if (!button || !panel) return;
+      const input = document.createElement("input");
+      input.type = "radio";
+      input.name = "gallery-choice";
+      input.value = url;
+      input.style.display = "none";
 
-      if (!Utils.isMobile() && this.cookiePanels.has(id)) {
-        const saved = AppStorageManager.getWithTTL(`panel:${id}`);
-        if (saved === true) panel.classList.add("open");
-      }
+      const img = document.createElement("img");
+      img.src = thumb;
+      img.alt = `Obraz ${idx + 1}`;
+      img.loading = "lazy";
 
-      const handler = () => this.togglePanel(panel);
-      button.addEventListener("click", handler);
-      this._unbinders.set(button, () =>
-        button.removeEventListener("click", handler)
-      );
+      label.append(input, img);
+      this.gallery.appendChild(label);
+      label.addEventListener("click", () => this._highlight(label));
     });
   }
 
   /**
-   * Otwiera panel. Na mobile zamyka inne.
-   * @param {HTMLElement} panel
+   * Renderuje obrazy na podstawie tagów, używając ImageResolver.resolve().
+   *
+   * @param {string[]} tags - Lista tagów
+   * @returns {Promise<void>}
    */
-  openPanel(panel) {
-    if (Utils.isMobile()) {
-      this.closeAllPanels();
+  async renderFromTags(tags) {
+    if (!this.gallery) {
+      LoggerService.record(
+        "error",
+        "[GalleryLoader] Brak container w renderFromTags"
+      );
+      return;
     }
-    panel.classList.add("open");
-
-    if (!Utils.isMobile() && this.cookiePanels.has(panel.id)) {
-      AppStorageManager.set(`panel:${panel.id}`, true);
+    try {
+      const urls = await ImageResolver.resolve(tags, { maxResults: 6 });
+      if (urls.length === 0) {
+        this.showMessage("❌ Brak obrazu dla tych tagów");
+        return;
+      }
+      this.renderImages(urls);
+      await this.highlightSelected(tags);
+    } catch (err) {
+      LoggerService.record(
+        "error",
+        "[GalleryLoader] renderFromTags error",
+        err
+      );
+      this.showMessage("❌ Błąd renderowania galerii.");
     }
   }
 
   /**
-   * Zamyka panel.
-   * @param {HTMLElement} panel
+   * Podświetla obraz dopasowany do aktualnych tagów (pierwszy pasujący).
+   * Ustawia również stan zaznaczenia radio.
+   *
+   * @param {string[]} tags - Lista tagów
+   * @returns {Promise<void>}
    */
-  closePanel(panel) {
-    panel.classList.remove("open");
-
-    if (!Utils.isMobile() && this.cookiePanels.has(panel.id)) {
-      AppStorageManager.set(`panel:${panel.id}`, false);
-    }
+  async highlightSelected(tags) {
+    if (!this.gallery) return;
+    const target = await ImageResolver.resolveBest(tags);
+    if (!target) return;
+    const items = this.gallery.querySelectorAll(".image-option");
+    items.forEach((label) => {
+      const radio = label.querySelector('input[type="radio"]');
+      const img = label.querySelector("img");
+      const src = radio?.value || img?.src || "";
+      const match = src && (src.endsWith(target) || src.includes(target));
+      label.classList.toggle("selected", !!match);
+      if (radio) radio.checked = !!match;
+    });
   }
 
   /**
-   * Przełącza widoczność panelu.
-   * @param {HTMLElement} panel
+   * Ładuje obrazy z API i renderuje listę URL-i.
+   * Endpoint może zwrócić: string[], { images: string[] }
+   * lub { items: {url, thumb}[], nextCursor } (stronicowane API galerii).
+   *
+   * @param {string} endpoint - URL endpointu API
+   * @param {Record<string,string>} [params] - Parametry zapytania
+   * @param {boolean} [append=false] - Dopisz kolejną stronę zamiast czyścić galerię
+   * @returns {Promise<void>}
    */
-  togglePanel(panel) {
-    if (!panel) return;
-    const isOpen = panel.classList.contains("open");
-    if (isOpen) {
-      this.closePanel(panel);
-    } else {
-      this.openPanel(panel);
+  async loadFromAPI(endpoint, params = {}, append = false) {
+    if (!this.gallery) return;
+    try {
+      if (!append) this.showMessage("Ładowanie...");
+      const url = new URL(endpoint, window.location.origin);
+      Object.entries(params).forEach(
+        ([k, v]) => v && url.searchParams.append(k, v)
+      );
+      const res = await fetch(url);
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const data = await res.json();
+      const images = Array.isArray(data)
+        ? data
+        : Array.isArray(data.items)
+        ? data.items
+        : Array.isArray(data.images)
+        ? data.images
+        : [];
+      this.nextCursor = (!Array.isArray(data) && data.nextCursor) || null;
+      if (!images.length && !append) return this.showMessage("Brak wyników.");
+      this.renderImages(images, append);
+    } catch (err) {
+      LoggerService.record(
+        "error",
+        "[GalleryLoader] Błąd ładowania obrazów",
+        err
+      );
+      this.showMessage("❌ Błąd ładowania obrazów.");
     }
   }
 
-  /** Zamyka wszystkie panele. */
-  closeAllPanels() {
-    this.panels.forEach(({ panel }) => panel?.classList.remove("open"));
-  }
-
-  /**
-   * Sprawdza, czy panel jest otwarty.
-   * @param {HTMLElement} panel
-   * @returns {boolean}
-   */
-  isPanelOpen(panel) {
-    return !!panel?.classList.contains("open");
-  }
-
-  /**
-   * Zwraca pierwszy otwarty panel.
-   * @returns {HTMLElement|null}
-   */
-  getOpenPanel() {
-    const item = this.panels.find(({ panel }) =>
-      panel?.classList.contains("open")
-    );
-    return item?.panel || null;
-  }
-
   /**
-   * Zwraca wszystkie otwarte panele.
-   * @returns {HTMLElement[]}
+   * Dociąga kolejną stronę galerii (jeśli API zwróciło nextCursor).
+   *
+   * @param {string} endpoint - URL endpointu API
+   * @param {Record<string,string>} [params] - Parametry zapytania
+   * @returns {Promise<boolean>} true, jeśli była kolejna strona
    */
-  getOpenPanels() {
-    return this.panels
-      .map(({ panel }) => panel)
-      .filter((p) => p && p.classList.contains("open"));
+  async loadMore(endpoint, params = {}) {
+    if (!this.nextCursor) return false;
+    await this.loadFromAPI(endpoint, { ...params, cursor: this.nextCursor }, true);
+    return true;
   }
 
   /**
-   * Usuwa nasłuchiwacze i czyści zasoby.
+   * Zaznacza wybraną opcję i odznacza pozostałe.
+   *
+   * @param {HTMLElement} selected - Element label z klasą .image-option
+   * @private
    */
-  destroy() {
-    this._unbinders.forEach((off) => off?.());
-    this._unbinders.clear();
+  _highlight(selected) {
+    if (!this.gallery) return;
+    this.gallery
+      .querySelectorAll(".image-option")
+      .forEach((el) => el.classList.remove("selected"));
+    selected.classList.add("selected");
+    const radio = selected.querySelector('input[type="radio"]');
+    if (radio) radio.checked = true;
   }
 }
 
 /**
  *
- * Statyczna klasa do zarządzania nazwą użytkownika w aplikacji.
- * Umożliwia zapis, odczyt i czyszczenie imienia użytkownika oraz dynamiczną podmianę placeholderów w tekstach.
- * Integruje się z polem input `#user_name`, umożliwiając automatyczny zapis zmian.
+ * Narzędzie do wyszukiwania istniejących obrazów na podstawie tagów.
+ * Obsługuje permutacje nazw plików, cache wyników oraz preload obrazów.
  *
- * ## Zasady:
+ * # Zasady:
  *
  * - ✅ Dozwolone:
- *   - Przechowywanie i odczytywanie imienia użytkownika z AppStorageManager
- *   - Obsługa pola input `#user_name` (wypełnianie i nasłuchiwanie zmian)
- *   - Podmiana placeholderów w tekstach (np. `{{user}}`)
+ *   - resolve(tags, opts?): Promise<string[]>
+ *   - resolveBest(tags, opts?): Promise<string>
+ *   - clearCache(): void
+ *   - preload(url): void
  *
  * - ❌ Niedozwolone:
- *   - Przechowywanie innych danych użytkownika niż imię
- *   - Logika niezwiązana z nazwą użytkownika
- *   - Modyfikacja innych pól formularza
+ *   - Renderowanie DOM (poza preload <img>)
+ *   - Logika UI lub biznesowa
+ *   - Zależności od klas domenowych
  */
-class UserManager {
+class ImageResolver {
   /**
-   * @type {string} Klucz używany w AppStorageManager
+   * Bazowa ścieżka do folderu z obrazami
+   * @type {string}
    */
-  static storageKey = "user_name";
+  static basePath = "/static/NarrativeIMG/";
 
   /**
-   * Zapisuje imię użytkownika w AppStorageManager.
-   * @param {string} name - Imię użytkownika.
+   * Lista rozszerzeń (bez kropki) do wyszukiwania obrazów w kolejności indeksu
+   * @type {string[]}
    */
-  static setName(name) {
-    AppStorageManager.set(this.storageKey, name.trim());
-  }
+  static extensions = ["jpg", "jpeg", "png", "gif", "webp"];
 
   /**
-   * Odczytuje imię użytkownika z AppStorageManager.
-   * @returns {string} Imię użytkownika lub pusty string.
-   */
-  static getName() {
-    const raw = AppStorageManager.getWithTTL(this.storageKey);
-    return typeof raw === "string" ? raw : raw ?? "";
-  }
-
-  /**
-   * Sprawdza, czy imię użytkownika jest ustawione.
-   * @returns {boolean} True, jeśli imię istnieje i nie jest puste.
+   * Prefiks klucza cache w AppStorageManager.
+   * Wartość: JSON.stringify({ exists: boolean, ts: number })
+   * @type {string}
    */
-  static hasName() {
-    return !!this.getName().trim();
-  }
+  static cachePrefix = "img-exists:";
 
   /**
-   * Usuwa zapisane imię użytkownika.
+   * Czas ważności negatywnego cache (ms). Po upływie — ponowne sprawdzenie.
+   * @type {number}
    */
-  static clearName() {
-    AppStorageManager.remove(this.storageKey);
-  }
+  static negativeCacheTTL = 60 * 60 * 1000; // 1h
 
   /**
-   * Zwraca typ pamięci, w której aktualnie przechowywane jest imię.
-   * @returns {"localStorage"|"cookie"}
+   * Endpoint indeksu obrazów po stronie backendu (jedno żądanie zamiast serii HEAD).
+   * @type {string}
    */
-  static getStorageType() {
-    return AppStorageManager.type();
-  }
+  static indexEndpoint = "/images/resolve";
 
   /**
-   * Podłącza pole input #user_name:
-   * - wypełnia istniejącą wartością,
-   * - zapisuje każdą zmianę.
-   * @param {Dom} dom - Instancja klasy Dom z metodą `q()`.
+   * Czy backend udostępnia indeks: null = nie sprawdzono, false = brak (np. statyczny hosting).
+   * @type {boolean|null}
    */
-  static init(dom) {
-    const input = dom.q("#user_name");
-    if (!input) return;
-    input.value = this.getName();
-    input.addEventListener("input", () => {
-      this.setName(input.value);
-    });
-  }
+  static indexAvailable = null;
 
   /**
-   * Podmienia placeholdery w tekście na aktualne imię użytkownika.
-   * @param {string} text - Tekst zawierający placeholdery (np. {{user}}).
-   * @param {Object<string,string>} [map] - Opcjonalna mapa dodatkowych placeholderów do podmiany.
-   * @returns {string} Tekst z podmienionymi wartościami.
+   * Zwraca listę istniejących URL-i obrazów pasujących do tagów, w kolejności priorytetu:
+   * - pełna lista tagów (exact),
+   * - wszystkie podzbiory (od największych do najmniejszych) i ich permutacje,
+   * - maksymalnie `maxResults` wyników.
+   * Najpierw pyta indeks backendu; gdy go brak — sprawdza kandydatów żądaniami HEAD.
+   *
+   * @param {string[]} tags - Lista tagów (1–5)
+   * @param {{ maxResults?: number }} [opts]
+   * @returns {Promise<string[]>}
    */
-  static replacePlaceholders(text, map = {}) {
-    const name = this.getName() || "Użytkowniku";
-    let result = text.replace(/{{\s*user\s*}}/gi, name);
-    for (const [key, value] of Object.entries(map)) {
-      const regex = new RegExp(`{{\\s*${key}\\s*}}`, "gi");
-      result = result.replace(regex, value);
+  static async resolve(tags, { maxResults = 4 } = {}) {
+    if (!Array.isArray(tags) || tags.length === 0) return [];
+
+    const indexed = await this._resolveFromIndex(tags, maxResults);
+    if (indexed) return indexed;
+
+    const candidates = [];
+    const exact = tags.join("_");
+
+    // 1) exact match
+    for (const ext of this.extensions) {
+      candidates.push(`${this.basePath}${exact}.${ext}`);
     }
-    return result;
+
+    // 2) kombinacje i permutacje
+    const uniq = new Set(candidates);
+    for (let k = tags.length; k >= 1; k--) {
+      for (const subset of this._combinations(tags, k)) {
+        for (const perm of this._permutations(subset)) {
+          const name = perm.join("_");
+          if (name === exact) continue;
+          for (const ext of this.extensions) {
+            const url = `${this.basePath}${name}.${ext}`;
+            if (!uniq.has(url)) {
+              candidates.push(url);
+              uniq.add(url);
+            }
+          }
+        }
+      }
+    }
+
+    // 3) HEAD + cache
+    const results = [];
+    for (const url of candidates) {
+      if (await this._checkExists(url)) {
+        results.push(url);
+        if (results.length >= maxResults) break;
+      }
+    }
+    return results;
   }
-}
 
-/**
- *
- * Uniwersalny mediator przechowywania danych z automatycznym fallbackiem
- * z `localStorage` do `cookie` w przypadku braku dostępu lub błędu.
- * Obsługuje TTL w sekundach, czyszczenie wpisów z prefiksem,
- * oraz mechanizmy obronne przy przekroczeniu limitu pamięci (`QuotaExceededError`).
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Zapisywanie, odczytywanie i usuwanie danych w `localStorage` lub `cookie`
- *   - Obsługa TTL i czyszczenie danych tymczasowych
- *   - Reakcja na błędy pamięci i komunikacja z użytkownikiem
- *
- * - ❌ Niedozwolone:
- *   - Wymuszanie prefiksów
- *   - Logika aplikacyjna (np. interpretacja danych)
- */
-class AppStorageManager {
   /**
-   * Sprawdza, czy `localStorage` jest dostępny i funkcjonalny.
-   * Wykonuje testowy zapis i usunięcie wpisu.
-   * @returns {boolean} True, jeśli można bezpiecznie używać `localStorage`.
+   * Pyta indeks obrazów backendu. Zwraca null, gdy indeks jest niedostępny.
+   * @param {string[]} tags
+   * @param {number} maxResults
+   * @returns {Promise<string[]|null>}
+   * @private
    */
-  static _hasLocalStorage() {
+  static async _resolveFromIndex(tags, maxResults) {
+    if (this.indexAvailable === false) return null;
+    const query = encodeURIComponent(tags.join(","));
     try {
-      const testKey = "__storage_test__";
-      localStorage.setItem(testKey, "1");
-      localStorage.removeItem(testKey);
-      return true;
-    } catch {
-      return false;
+      const res = await fetch(`${this.indexEndpoint}?tags=${query}&max=${maxResults}`);
+      if (!res.ok) {
+        this.indexAvailable = false;
+        return null;
+      }
+      const data = await res.json();
+      this.indexAvailable = true;
+      return Array.isArray(data.urls) ? data.urls : [];
+    } catch (err) {
+      this.indexAvailable = false;
+      LoggerService.record("warn", "[ImageResolver] Indeks obrazów niedostępny", err);
+      return null;
     }
   }
 
   /**
-   * Zwraca typ aktualnie używanego magazynu.
-   * @returns {"localStorage"|"cookie"} Typ aktywnego backendu.
+   * Zwraca pierwszy istniejący URL według tej samej polityki co resolve().
+   * @param {string[]} tags
+   * @param {{ maxResults?: number }} [opts]
+   * @returns {Promise<string>}
    */
-  static type() {
-    return this._hasLocalStorage() ? "localStorage" : "cookie";
+  static async resolveBest(tags, opts = {}) {
+    const arr = await this.resolve(tags, { maxResults: 1, ...opts });
+    return arr[0] || "";
   }
 
   /**
-   * Zapisuje wartość pod wskazanym kluczem z opcjonalnym TTL.
-   * TTL wyrażony w sekundach. Domyślnie 30 dni (2592000 sekund).
-   * Wartość jest serializowana do JSON.
+   * Sprawdza, czy dany URL istnieje — używając AppStorageManager (pozytywny/negatywny cache)
+   * oraz fetch HEAD. Negatywny cache wygasa po negativeCacheTTL.
    *
-   * @param {string} key - Klucz pod którym zapisywana jest wartość.
-   * @param {any} value - Dowolna wartość do zapisania.
-   * @param {number} [ttl=2592000] - Czas życia w sekundach.
+   * @param {string} url
+   * @returns {Promise<boolean>}
+   * @private
    */
-  static set(key, value, ttl = 2592000) {
-    const now = Date.now();
-    const payload = ttl ? { value, ts: now, ttl: ttl * 1000 } : value;
-
-    const serialized = JSON.stringify(payload);
+  static async _checkExists(url) {
+    const key = this.cachePrefix + url;
+    const cached = AppStorageManager.getWithTTL(key);
+    if (cached === true) return true;
+    if (cached === false) return false;
 
-    if (this._hasLocalStorage()) {
-      try {
-        localStorage.setItem(key, serialized);
-      } catch (err) {
-        if (err.name === "QuotaExceededError") {
-          this.purgeByPrefix("img-exists:");
-          try {
-            localStorage.setItem(key, serialized);
-          } catch (e) {
-            this._handleStorageFailure("localStorage", key, e);
-          }
-        } else {
-          this._handleStorageFailure("localStorage", key, err);
-        }
-      }
-    } else {
-      let cookie = `${encodeURIComponent(key)}=${encodeURIComponent(
-        serialized
-      )}; path=/`;
-      if (ttl) {
-        cookie += `; max-age=${ttl}`;
-      }
-      document.cookie = cookie;
+    try {
+      const res = await fetch(url, { method: "HEAD" });
+      const exists = res.ok;
+      AppStorageManager.set(key, exists, this.negativeCacheTTL / 1000);
 
-      // Sprawdzenie skuteczności zapisu
-      if (!document.cookie.includes(`${encodeURIComponent(key)}=`)) {
-        this._handleStorageFailure("cookie", key);
-      }
+      if (exists) LoggerService.record("log", `[ImageResolver] HEAD ✓ ${url}`);
+      return exists;
+    } catch (err) {
+      AppStorageManager.set(key, false, this.negativeCacheTTL / 1000);
+      LoggerService.record("error", `[ImageResolver] HEAD error ${url}`, err);
+      return false;
     }
   }
 
   /**
-   * Odczytuje wartość spod wskazanego klucza.
-   * Deserializuje JSON, jeśli to możliwe.
-   * @param {string} key - Klucz do odczytu.
-   * @returns {any|null} Wartość lub null, jeśli brak.
+   * Preloaduje obraz w przeglądarce (niewidoczny <img>).
+   * @param {string} url
    */
-  static get(key) {
-    let raw = null;
-    if (this._hasLocalStorage()) {
-      raw = localStorage.getItem(key);
-    } else {
-      const match = document.cookie.match(
-        new RegExp(`(?:^|; )${encodeURIComponent(key)}=([^;]*)`)
-      );
-      raw = match ? decodeURIComponent(match[1]) : null;
-    }
-    try {
-      return raw ? JSON.parse(raw) : null;
-    } catch {
-      return raw;
-    }
+  static preload(url) {
+    if (!url) return;
+    const img = new Image();
+    img.src = url;
+    img.style.display = "none";
+    document.body.appendChild(img);
   }
 
   /**
-   * Odczytuje wartość z TTL. Jeśli wygasła — usuwa i zwraca null.
-   * @param {string} key - Klucz do odczytu.
-   * @returns {any|null} Wartość lub null, jeśli wygasła lub nie istnieje.
+   * Czyści wpisy cache (zarówno pozytywne, jak i negatywne).
    */
-  static getWithTTL(key) {
-    const raw = this.get(key);
-    if (!raw || typeof raw !== "object") return raw;
-
-    if (raw.ttl && raw.ts && Date.now() - raw.ts > raw.ttl) {
-      this.remove(key);
-      return null;
-    }
-    return raw.value ?? raw;
+  static clearCache() {
+    AppStorageManager.keys()
+      .filter((k) => k.startsWith(this.cachePrefix))
+      .forEach((k) => AppStorageManager.remove(k));
   }
 
   /**
-   * Usuwa wartość spod wskazanego klucza.
-   * @param {string} key - Klucz do usunięcia.
+   * Zwraca wszystkie kombinacje k-elementowe z tablicy.
+   * @param {string[]} arr
+   * @param {number} k
+   * @returns {string[][]}
+   * @private
    */
-  static remove(key) {
-    if (this._hasLocalStorage()) {
-      localStorage.removeItem(key);
-    } else {
-      document.cookie = `${encodeURIComponent(key)}=; max-age=0; path=/`;
-    }
-  }
-
-  /**
-   * Zwraca listę wszystkich kluczy z aktualnego backendu.
-   * @returns {string[]} Tablica kluczy.
-   */
-  static keys() {
-    if (this._hasLocalStorage()) {
-      return Object.keys(localStorage);
-    } else {
-      return document.cookie
-        .split(";")
-        .map((c) => decodeURIComponent(c.split("=")[0].trim()))
-        .filter((k) => k.length > 0);
-    }
-  }
-
-  /**
-   * Usuwa wszystkie wpisy z danym prefiksem.
-   * @param {string} prefix - Prefiks kluczy do usunięcia.
-   */
-  static purgeByPrefix(prefix) {
-    this.keys()
-      .filter((k) => k.startsWith(prefix))
-      .forEach((k) => this.remove(k));
+  static _combinations(arr, k) {
+    const res = [];
+    (function rec(start, comb) {
+      if (comb.length === k) return res.push(comb.slice());
+      for (let i = start; i < arr.length; i++) {
+        comb.push(arr[i]);
+        rec(i + 1, comb);
+        comb.pop();
+      }
+    })(0, []);
+    return res;
   }
 
   /**
-   * Obsługuje błędy zapisu do pamięci (`QuotaExceededError` lub inne).
-   * Informuje użytkownika i oferuje czyszczenie pamięci.
-   * @param {"localStorage"|"cookie"} type - Typ pamięci.
-   * @param {string} key - Klucz, który nie został zapisany.
-   * @param {Error} [error] - Opcjonalny obiekt błędu.
+   * Zwraca wszystkie permutacje elementów tablicy.
+   * @param {string[]} arr
+   * @returns {string[][]}
+   * @private
    */
-  static _handleStorageFailure(type, key, error) {
-    LoggerService?.record(
-      "warn",
-      `[AppStorageManager] ${type} niedostępny lub pełny przy zapisie ${key}`,
-      error
-    );
-
-    const confirmed = window.confirm(
-      `Pamięć ${type} jest pełna lub niedostępna. Czy chcesz ją wyczyścić, aby kontynuować?`
-    );
-
-    if (confirmed) {
-      if (type === "localStorage") localStorage.clear();
-      if (type === "cookie") {
-        document.cookie.split(";").forEach((c) => {
-          document.cookie = c
-            .replace(/^ +/, "")
-            .replace(
-              /=.*/,
-              "=;expires=" + new Date().toUTCString() + ";path=/"
-            );
-        });
+  static _permutations(arr) {
+    const res = [];
+    (function perm(a, l = 0) {
+      if (l === a.length - 1) return res.push(a.slice());
+      for (let i = l; i < a.length; i++) {
+        [a[l], a[i]] = [a[i], a[l]];
+        perm(a, l + 1);
+        [a[l], a[i]] = [a[i], a[l]];
       }
-      LoggerService?.record(
-        "info",
-        `[AppStorageManager] ${type} wyczyszczony przez użytkownika.`
-      );
-    } else {
-      LoggerService?.record(
-        "info",
-        `[AppStorageManager] Użytkownik odmówił czyszczenia ${type}.`
-      );
-    }
+    })(arr.slice(), 0);
+    return res;
   }
 }
 
 /**
  *
- * Walidator tekstu edytowanego przez AI oraz przypisanych tagów.
- * Sprawdza długość tekstu i tagów oraz obecność treści.
+ * Buforowany logger do środowiska przeglądarkowego z ograniczeniem wieku wpisów.
+ * Obsługuje poziomy logowania: 'log', 'warn', 'error'.
+ * Wpisy są przechowywane w pamięci i mogą być filtrowane, czyszczone lub eksportowane.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Stałe limitów: maxTextLength, maxTagLength
- *   - Metoda: validate(text, tags)
+ *   - record(level, msg, ...args)
+ *   - cleanup()
+ *   - getHistory({clone})
+ *   - clearHistory()
+ *   - setMaxAge(ms)
+ *   - filterByLevel(level)
+ *   - recordOnce(level, msg, ...args)
  *
  * - ❌ Niedozwolone:
- *   - Operacje na DOM
- *   - Zlecenia sieciowe (fetch, localStorage)
- *   - Logika aplikacyjna (np. renderowanie, wysyłka)
- *   - Efekty uboczne (np. console.log, mutacje zewnętrznych obiektów)
+ *   - logika aplikacji (business logic)
+ *   - operacje sieciowe, DOM, storage
+ *
  */
-class EditValidator {
+class LoggerService {
   /**
-   * Maksymalna długość tekstu edycji.
-   * Tekst dłuższy niż ta wartość zostanie uznany za niepoprawny.
-   * @type {number}
+   * Bufor wpisów logowania.
+   * Każdy wpis zawiera znacznik czasu, poziom, wiadomość i dodatkowe argumenty.
+   * @type {Array<{timestamp: number, level: 'log'|'warn'|'error', msg: string, args: any[]}>}
    */
-  static maxTextLength = 5000;
+  static buffer = [];
 
   /**
-   * Maksymalna długość pojedynczego tagu.
-   * Tag dłuższy niż ta wartość zostanie uznany za niepoprawny.
+   * Maksymalny wiek wpisów w milisekundach.
+   * Wpisy starsze niż ta wartość są usuwane przy każdym logowaniu i odczycie.
    * @type {number}
    */
-  static maxTagLength = 300;
+  static maxAgeMs = 5 * 60 * 1000; // 5 minut
 
   /**
-   * Waliduje tekst i tagi pod kątem pustki i długości.
-   * - Tekst musi być niepusty po przycięciu.
-   * - Tekst nie może przekraczać maxTextLength.
-   * - Każdy tag musi być typu string i nie może przekraczać maxTagLength.
-   *
-   * @param {string} text - Edytowany tekst AI
-   * @param {string[]} tags - Lista tagów
-   * @returns {{ valid: boolean, errors: string[] }} - Obiekt z informacją o poprawności i listą błędów
+   * Ustawia nowy limit wieku wpisów i natychmiast czyści stare.
+   * @param {number} ms - nowy limit wieku w milisekundach
    */
-  static validate(text, tags) {
-    const errors = [];
+  static setMaxAge(ms) {
+    this.maxAgeMs = ms;
+    this.cleanup();
+  }
 
-    // Przycięcie tekstu z obu stron
-    const trimmedText = text.trim();
-    const textLength = trimmedText.length;
+  /**
+   * Dodaje wpis do bufora i wypisuje go w konsoli z odpowiednim stylem.
+   * @param {'log'|'warn'|'error'} level - poziom logowania
+   * @param {string} msg - wiadomość do wyświetlenia
+   * @param {...any} args - dodatkowe dane (np. obiekty, błędy)
+   */
+  static record(level, msg, ...args) {
+    const emojiLevels = { log: "🌍", warn: "⚠️", error: "‼️" };
+    const timestamp = Date.now();
 
-    // Walidacja tekstu
-    if (!textLength) {
-      errors.push("Tekst edycji nie może być pusty.");
-    } else if (textLength > this.maxTextLength) {
-      errors.push(
-        `Maksymalna długość tekstu to ${this.maxTextLength} znaków, otrzymano ${textLength}.`
-      );
-    }
+    this.buffer.push({ timestamp, level, msg, args });
+    this.cleanup();
 
-    // Walidacja tagów
-    for (const tag of tags) {
-      if (typeof tag !== "string") continue; // ignoruj błędne typy
-      if (tag.length > this.maxTagLength) {
-        errors.push(
-          `Tag "${tag}" przekracza limit ${this.maxTagLength} znaków (ma ${tag.length}).`
-        );
-      }
+    const styleMap = {
+      log: "color: #444",
+      warn: "color: orange",
+      error: "color: red; font-weight: bold",
+    };
+
+    const style = styleMap[level] || "";
+    const displayMsg = `${emojiLevels[level] || ""} ${msg}`;
+    console[level](
+      `%c[${new Date(timestamp).toLocaleTimeString()}] ${displayMsg}`,
+      style,
+      ...args
+    );
+  }
+
+  /**
+   * Usuwa wpisy starsze niż maxAgeMs.
+   * Jeśli maxAgeMs <= 0, czyści cały bufor.
+   */
+  static cleanup() {
+    if (this.maxAgeMs <= 0) {
+      this.buffer = [];
+      return;
     }
+    const cutoff = Date.now() - this.maxAgeMs;
+    this.buffer = this.buffer.filter((e) => e.timestamp >= cutoff);
+  }
 
-    return {
-      valid: errors.length === 0,
-      errors,
-    };
+  /**
+   * Zwraca wpisy danego poziomu logowania.
+   * @param {'log'|'warn'|'error'} level - poziom do filtrowania
+   * @returns {Array<{timestamp: number, msg: string, args: any[]}>}
+   */
+  static filterByLevel(level) {
+    this.cleanup();
+    return this.buffer
+      .filter((e) => e.level === level)
+      .map(({ timestamp, msg, args }) => ({ timestamp, msg, args }));
+  }
+
+  /**
+   * Zwraca całą historię wpisów.
+   * Jeśli clone = true, zwraca głęboką kopię wpisów.
+   * @param {boolean} [clone=false] - czy zwrócić kopię wpisów
+   * @returns {Array<{timestamp: number, level: string, msg: string, args: any[]}>}
+   */
+  static getHistory(clone = false) {
+    this.cleanup();
+    if (!clone) return [...this.buffer];
+    return this.buffer.map((entry) => structuredClone(entry));
+  }
+
+  /**
+   * Czyści cały bufor logów bez względu na wiek wpisów.
+   */
+  static clearHistory() {
+    this.buffer = [];
+  }
+
+  /**
+   * Dodaje wpis tylko jeśli nie istnieje już wpis o tym samym poziomie i wiadomości.
+   * @param {'log'|'warn'|'error'} level - poziom logowania
+   * @param {string} msg - wiadomość
+   * @param {...any} args - dodatkowe dane
+   */
+  static recordOnce(level, msg, ...args) {
+    if (!this.buffer.some((e) => e.level === level && e.msg === msg)) {
+      this.record(level, msg, ...args);
+    }
   }
 }
 
 /**
  *
- * Główna warstwa logiki aplikacji — łączy widoki UI z backendem.
- * Odpowiada za obsługę promptów, edycji i oceniania wiadomości.
- * Integruje się z `ChatUIView`, `ChatEditView`, `BackendAPI`, `ImageResolver` i `LoggerService`.
+ * Menedżer widoczności paneli bocznych w aplikacji.
+ * Zapewnia kontrolę nad otwieraniem, zamykaniem i przełączaniem paneli w interfejsie użytkownika.
+ * Obsługuje tryb mobilny (wyłączność paneli) oraz desktopowy (współistnienie).
+ * Utrzymuje stan wybranych paneli w cookie — tylko na desktopie.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Obsługa promptów, edycji, oceniania
- *   - Przekazywanie danych między widokami a BackendAPI
- *   - Aktualizacja UI przez `ChatUIView` i `ChatEditView`
- *
- * - ❌ Niedozwolone:
- *   - Renderowanie HTML bezpośrednio
- *   - Mutowanie danych poza `dataset`/`msgEl`
- *   - Logika domenowa (np. interpretacja tagów)
+ *   - Rejestracja paneli i ich przycisków
+ *   - Obsługa zdarzeń kliknięcia
+ *   - Przełączanie widoczności paneli
+ *   - Zapisywanie stanu paneli w cookie (desktop only)
+ *
+ * - ❌ Niedozwolone:
+ *   - Deklaracja paneli statycznie
+ *   - Modyfikacja zawartości paneli
+ *   - Logika niezwiązana z UI paneli
+ *
  */
-class ChatManager {
+class PanelsController {
   /**
-   * Inicjalizuje widoki UI i podpina zdarzenia.
-   * @param {{ dom: Dom }} context - Kontekst aplikacji z referencjami DOM.
+   * @param {Dom} dom - Instancja klasy Dom
+   * @param {Array<{button: HTMLElement, panel: HTMLElement, id: string}>} panels - lista paneli
+   * @param {string[]} persistentPanels - identyfikatory paneli, które mają być zapamiętywane (desktop only)
    */
-  constructor(context) {
-    const { dom } = context;
-    this.chatView = new ChatUIView(
-      dom.chatContainer,
-      dom.inputArea,
-      dom.prompt
-    );
-
-    this.promptVal = {
-      promptEl: dom.prompt,
-      errorEl: dom.promptError,
-      warningEl: dom.promptWarning,
-    };
+  constructor(dom, panels = [], persistentPanels = []) {
+    this.dom = dom;
+    this.panels = panels;
+    this.cookiePanels = new Set(persistentPanels);
+    this._unbinders = new Map();
+  }
 
-    this.editView = new ChatEditView(dom);
+  /**
+   * Inicjalizuje nasłuchiwacze kliknięć i przywraca stan z cookie (desktop only).
+   */
+  init() {
+    this.panels.forEach(({ button, panel, id }) => {
+      if (!button || !panel) return;
 
-    this.chatView.onEditRequested = (msgEl, text, id, ts, sessionId) =>
-      this.editView.enableEdit(msgEl, text, id, ts, sessionId);
+      if (!Utils.isMobile() && this.cookiePanels.has(id)) {
+        const saved = AppStorageManager.getWithTTL(`panel:${id}`);
+        if (saved === true) panel.classList.add("open");
+      }
 
-    this.chatView.onRatingSubmit = (msgEl) => this.ratingView.open(msgEl);
+      const handler = () => this.togglePanel(panel);
+      button.addEventListener("click", handler);
+      this._unbinders.set(button, () =>
+        button.removeEventListener("click", handler)
+      );
+    });
   }
 
   /**
-   * Inicjalizuje widoki i podpina zdarzenia walidacji promptu oraz edycji i oceny.
+   * Otwiera panel. Na mobile zamyka inne.
+   * @param {HTMLElement} panel
    */
-  init() {
-    const { promptEl, errorEl, warningEl } = this.promptVal;
-    let hadInput = false;
+  openPanel(panel) {
+    if (Utils.isMobile()) {
+      this.closeAllPanels();
+    }
+    panel.classList.add("open");
 
-    const syncUI = (text) => {
-      const raw = typeof text === "string" ? text : promptEl.value;
-      const trimmed = raw.trim();
-      const len = raw.length;
+    if (!Utils.isMobile() && this.cookiePanels.has(panel.id)) {
+      AppStorageManager.set(`panel:${panel.id}`, true);
+    }
+  }
 
-      // licznik znaków
-      warningEl.textContent = `${len}/${PromptValidator.maxLength} znaków`;
+  /**
+   * Zamyka panel.
+   * @param {HTMLElement} panel
+   */
+  closePanel(panel) {
+    panel.classList.remove("open");
 
-      // klasa długości
-      if (len > PromptValidator.maxLength) {
-        warningEl.classList.add("error-text-length");
-      } else {
-        warningEl.classList.remove("error-text-length");
-      }
+    if (!Utils.isMobile() && this.cookiePanels.has(panel.id)) {
+      AppStorageManager.set(`panel:${panel.id}`, false);
+    }
+  }
 
-      // walidacja
-      const { valid, errors } = PromptValidator.validate(raw);
+  /**
+   * Przełącza widoczność panelu.
+   * @param {HTMLElement} panel
+   */
+  togglePanel(panel) {
+    if (!panel) return;
+    const isOpen = panel.classList.contains("open");
+    if (isOpen) {
+      this.closePanel(panel);
+    } else {
+      this.openPanel(panel);
+    }
+  }
 
-      // filtr błędów
-      const isEmpty = trimmed.length === 0;
-      const filteredErrors = errors.filter((msg) => {
-        const isEmptyError = msg.startsWith("Prompt nie może być pusty");
-        if (isEmptyError) return hadInput && isEmpty;
-        return true;
-      });
+  /** Zamyka wszystkie panele. */
+  closeAllPanels() {
+    this.panels.forEach(({ panel }) => panel?.classList.remove("open"));
+  }
 
-      errorEl.textContent = filteredErrors.join(" ");
-      return { valid, filteredErrors };
-    };
+  /**
+   * Sprawdza, czy panel jest otwarty.
+   * @param {HTMLElement} panel
+   * @returns {boolean}
+   */
+  isPanelOpen(panel) {
+    return !!panel?.classList.contains("open");
+  }
 
-    // startowa synchronizacja
-    const initialText = promptEl.value || "";
-    if (initialText.length > 0) hadInput = true;
-    syncUI(initialText);
+  /**
+   * Zwraca pierwszy otwarty panel.
+   * @returns {HTMLElement|null}
+   */
+  getOpenPanel() {
+    const item = this.panels.find(({ panel }) =>
+      panel?.classList.contains("open")
+    );
+    return item?.panel || null;
+  }
 
-    // live feedback
-    promptEl.addEventListener("input", () => {
-      const len = promptEl.value.length;
-      if (len > 0) hadInput = true;
+  /**
+   * Zwraca wszystkie otwarte panele.
+   * @returns {HTMLElement[]}
+   */
+  getOpenPanels() {
+    return this.panels
+      .map(({ panel }) => panel)
+      .filter((p) => p && p.classList.contains("open"));
+  }
 
-      const { filteredErrors } = syncUI();
-      if (len > 0) {
-        const keep = filteredErrors.filter(
-          (e) => !e.startsWith("Prompt nie może być pusty")
-        );
-        errorEl.textContent = keep.join(" ");
-      }
-    });
+  /**
+   * Usuwa nasłuchiwacze i czyści zasoby.
+   */
+  destroy() {
+    this._unbinders.forEach((off) => off?.());
+    this._unbinders.clear();
+  }
+}
 
-    // walidacja na submit – zwraca true/false
-    this.chatView.onPromptSubmit = (text) => {
-      const raw = text;
-      const trimmed = raw.trim();
-      const len = raw.length;
-      const { valid } = PromptValidator.validate(raw);
-      const { filteredErrors } = syncUI(raw);
+/**
+ * Walidator promptów użytkownika przed wysłaniem do AI.
+ * Sprawdza typ, długość i obecność niedozwolonych znaków.
+ *
+ * ## Zasady:
+ *
+ * - ✅ Dozwolone:
+ *   - Stałe limitów: minLength, maxLength
+ *   - Wzorzec niedozwolonych znaków: forbidden
+ *   - Metoda: validate(prompt)
+ *
+ * - ❌ Niedozwolone:
+ *   - Operacje na DOM
+ *   - Zlecenia sieciowe (fetch, localStorage)
+ *   - Logika aplikacyjna (np. renderowanie, wysyłka)
+ *   - Efekty uboczne (np. console.log, mutacje zewnętrznych obiektów)
+ */
+class PromptValidator {
+  /**
+   * Minimalna długość promptu po przycięciu.
+   * Prompt krótszy niż ta wartość zostanie uznany za niepoprawny.
+   * @type {number}
+   */
+  static minLength = 1;
 
-      if (!valid) {
-        const empty = trimmed.length === 0;
-        const onlyEmptyError =
-          filteredErrors.length === 1 &&
-          filteredErrors[0].startsWith("Prompt nie może być pusty");
+  /**
+   * Maksymalna długość promptu po przycięciu.
+   * Prompt dłuższy niż ta wartość zostanie uznany za niepoprawny.
+   * @type {number}
+   */
+  static maxLength = 300;
 
-        if (empty && !hadInput) {
-          return false; // odrzucone – brak wcześniejszego inputu
-        }
+  /**
+   * Wzorzec niedozwolonych znaków w promptach.
+   * Domyślnie: < oraz >
+   * @type {RegExp}
+   */
+  static forbidden = /[<>]/;
 
-        errorEl.textContent = filteredErrors.join(" ");
-        if (len > PromptValidator.maxLength) {
-          warningEl.classList.add("error-text-length");
-        }
-        return false; // odrzucone – błędy walidacji
-      }
+  /**
+   * Waliduje prompt użytkownika.
+   * Sprawdza:
+   * - czy jest typu string
+   * - czy nie jest pusty po przycięciu
+   * - czy mieści się w limicie długości
+   * - czy nie zawiera niedozwolonych znaków
+   *
+   * @param {string} prompt - Tekst promptu od użytkownika
+   * @returns {{ valid: boolean, errors: string[] }} - Obiekt z informacją o poprawności i listą błędów
+   */
+  static validate(prompt) {
+    const errors = [];
 
-      warningEl.classList.remove("error-text-length");
-      errorEl.textContent = "";
-      this.sendPrompt(raw);
-      return true; // zaakceptowane – ChatUIView wyczyści pole
-    };
+    // Typ musi być string
+    if (typeof prompt !== "string") {
+      errors.push("Prompt musi być typu string.");
+      return { valid: false, errors };
+    }
 
-    this.chatView.init();
+    // Przycięcie spacji
+    const trimmed = prompt.trim();
+    const len = trimmed.length;
 
-    this.editView.onEditSubmit = (msgEl, txt, tags, imageUrl) =>
-      this.sendEdit(msgEl, txt, tags, imageUrl);
+    // Walidacja długości
+    if (len < this.minLength) {
+      errors.push("Prompt nie może być pusty.");
+    } else if (len > this.maxLength) {
+      errors.push(
+        `Maksymalna długość promptu to ${this.maxLength} znaków, otrzymano ${len}.`
+      );
+    }
 
-    this.editView.onEditCancel = (msgEl, data) => {
-      this.chatView.hydrateAIMessage(msgEl, data);
-    };
+    // Walidacja znaków
+    if (this.forbidden.test(trimmed)) {
+      errors.push("Prompt zawiera niedozwolone znaki: < lub >.");
+    }
 
-    this.chatView.onRatingSubmit = (payload) => {
-      this.sendRating(payload);
+    return {
+      valid: errors.length === 0,
+      errors,
     };
   }
+}
 
+/**
+ * Warstwa odpornościowa dla zapytań HTTP z kontrolą retry i backoffem.
+ * Zapewnia ponawianie zapytań w przypadku błędów sieciowych lub odpowiedzi serwera,
+ * które kwalifikują się do ponowienia (retryable), z kontrolą liczby prób, odstępów
+ * i maksymalnego czasu trwania operacji.
+ *
+ * ## Zasady:
+ *
+ * - ✅ Dozwolone:
+ *   - Wielokrotne próby `fetch` z kontrolą limitu, odstępu i łącznego czasu.
+ *   - Decyzja, czy błąd/odpowiedź jest retryowalna.
+ *   - Wywołanie zdarzenia `onRetry` (np. do telemetrii lub logowania).
+ *   - Parametryzacja backoffu (bazowe opóźnienie, mnożnik, jitter).
+ *
+ * - ❌ Niedozwolone:
+ *   - Logika UI lub domenowa.
+ *   - Transformacje payloadu/JSON (to rola warstwy BackendAPI).
+ *   - Obsługa specyficznych formatów odpowiedzi.
+ */
+class RequestRetryManager {
   /**
-   * Wysyła prompt użytkownika do backendu i renderuje odpowiedź.
-   * @param {string} prompt - Treść promptu.
-   * @returns {Promise<void>}
+   * Sprawdza, czy błąd lub odpowiedź nadaje się do ponowienia.
+   *
+   * ## Zasady:
+   *  - Retry przy błędach sieciowych (`TypeError` z `fetch`)
+   *  - Retry przy kodach HTTP 5xx i 429
+   *  - Brak retry przy kodach 4xx (poza 429) i odpowiedziach `ok === true`
+   *
+   * @param {any} errOrRes - Obiekt błędu lub odpowiedzi `Response`
+   * @returns {boolean} - true, jeśli można ponowić
    */
-  async sendPrompt(prompt) {
-    this.chatView.addUserMessage(prompt);
-    const { msgEl, timer } = this.chatView.addLoadingMessage();
-    try {
-      const data = await BackendAPI.generate(prompt);
-
-      // Rozwiąż URL ilustracji
-      const urls = await ImageResolver.resolve(data.tags);
-      data.imageUrl = urls[0] || "";
-
-      // Renderuj odpowiedź AI
-      this.chatView.hydrateAIMessage(msgEl, data);
-    } catch (err) {
-      this.chatView.showError(msgEl);
-      LoggerService.record("error", "[ChatManager] sendPrompt", err);
-    } finally {
-      clearInterval(timer);
+  static isRetryable(errOrRes) {
+    // Response
+    if (errOrRes && typeof errOrRes === "object" && "ok" in errOrRes) {
+      const res = /** @type {Response} */ (errOrRes);
+      if (res.ok) return false;
+      const s = res.status;
+      return s === 429 || (s >= 500 && s <= 599);
+    }
+    // Error
+    if (errOrRes instanceof Error) {
+      // Fetch w razie problemów sieciowych rzuca zwykle TypeError
+      return errOrRes.name === "TypeError";
     }
+    return false;
   }
 
   /**
-   * Przesyła edytowaną wiadomość do backendu i aktualizuje UI.
-   * @param {HTMLElement} msgEl - Element wiadomości.
-   * @param {string} editedText - Nowa treść.
-   * @param {Record<string, any>} tags - Tagowanie wiadomości.
-   * @param {string} imageUrl - URL ilustracji.
-   * @param {string} [sessionId] - ID sesji (opcjonalne).
-   * @returns {Promise<void>}
+   * Wykonuje `fetch` z mechanizmem retry i backoffem z jitterem.
+   *
+   * @param {string|Request} input - URL lub obiekt `Request`
+   * @param {RequestInit} [init={}] - Opcje `fetch` (method, headers, body itd.)
+   * @param {number} [retries=3] - Maksymalna liczba ponowień (bez pierwszej próby)
+   * @param {number} [baseDelay=800] - Bazowe opóźnienie (ms) dla backoffu
+   * @param {{
+   *   silent?: boolean,
+   *   maxTotalTime?: number,     // twardy limit łącznego czasu (ms)
+   *   onRetry?: (info:{
+   *     attempt:number,
+   *     retries:number,
+   *     delay:number,
+   *     reason:any,
+   *     input:string|Request
+   *   })=>void,
+   *   factor?: number,           // mnożnik backoffu, domyślnie 2
+   *   jitter?: number            // [0..1], odchylenie losowe, domyślnie 0.2
+   * } } [options={}] - Parametry dodatkowe
+   * @returns {Promise<Response>} - Odpowiedź `fetch`
+   *
+   * Przebieg:
+   *  1. Wykonuje pierwsze żądanie `fetch`.
+   *  2. Jeśli odpowiedź jest OK → zwraca ją.
+   *  3. Jeśli odpowiedź/błąd jest retryowalny → ponawia do `retries` razy.
+   *  4. Każde ponowienie ma opóźnienie wyliczone z backoffu + jitter.
+   *  5. Jeśli przekroczono `maxTotalTime` → rzuca błąd.
+   *  6. Wywołuje `onRetry` (jeśli podany) przy każdej próbie ponowienia.
    */
-  async sendEdit(msgEl, editedText, tags, imageUrl, sessionId) {
-    this.chatView.hydrateAIMessage(
-      msgEl,
-      {
-        id: msgEl.dataset.msgId,
-        sessionId: sessionId || msgEl.dataset.sessionId,
-        tags,
-        timestamp: msgEl.dataset.timestamp,
-        originalText: editedText,
-        text: editedText,
-        sender: msgEl.dataset.sender,
-        avatarUrl: msgEl.dataset.avatarUrl,
-        generation_time: Number.isFinite(
-          parseFloat(msgEl.dataset.generation_time)
-        )
-          ? parseFloat(msgEl.dataset.generation_time)
-          : 0,
+  static async fetchWithRetry(
+    input,
+    init = {},
+    retries = 3,
+    baseDelay = 800,
+    {
+      silent = false,
+      maxTotalTime = 15_000,
+      onRetry = null,
+      factor = 2,
+      jitter = 0.2,
+    } = {}
+  ) {
+    const start = Date.now();
+    let attempt = 0;
+
+    while (true) {
+      try {
+        const res = await fetch(input, init);
+        if (!res.ok) {
+          if (!this.isRetryable(res)) return res; // oddaj nie-OK bez retry — nie jest retryowalne
+          throw res; // wymuś retry
+        }
+        return res;
+      } catch (err) {
+        if (!this.isRetryable(err)) {
+          // Błąd nieretryowalny — rzucamy od razu
+          LoggerService.record(
+            "error",
+            "[RequestRetryManager] Non-retryable error",
+            err
+          );
+          throw err;
+        }
+
+        if (attempt >= retries) {
+          LoggerService.record(
+            "error",
+            `[RequestRetryManager] Wyczerpane retry dla: ${
+              typeof input === "string" ? input : input.url
+            }`,
+            err
+          );
+          throw err;
+        }
+
+        // Kolejna próba
+        attempt += 1;
+
+        // Exponential backoff + jitter
+        const exp = baseDelay * Math.pow(factor, attempt - 1);
+        const delta = exp * jitter;
+        const delay = Math.max(0, exp + (Math.random() * 2 - 1) * delta);
 
-        imageUrl,
-      },
-      true
-    );
+        if (Date.now() + delay - start > maxTotalTime) {
+          LoggerService.record(
+            "error",
+            "[RequestRetryManager] Przekroczono maxTotalTime",
+            { maxTotalTime }
+          );
+          throw err;
+        }
 
-    try {
-      await BackendAPI.edit(editedText, tags, sessionId, msgEl.dataset.msgId);
-    } catch (err) {
-      LoggerService.record("error", "[ChatManager] sendEdit", err);
-    }
-  }
+        const level = silent ? "log" : "warn";
+        LoggerService.record(
+          level,
+          `[RequestRetryManager] Retry ${attempt}/${retries} za ${Math.round(
+            delay
+          )}ms`,
+          err
+        );
 
-  /**
-   * Przesyła ocenę wiadomości do backendu.
-   * @param {{ messageId: string, sessionId: string, ratings: Record<string, any> }} payload
-   * @returns {Promise<void>}
-   */
-  async sendRating({ messageId, sessionId, ratings }) {
-    try {
-      await BackendAPI.rate({ messageId, sessionId, ratings });
-    } catch (err) {
-      LoggerService.record("error", "[ChatManager] sendRating", err);
+        if (typeof onRetry === "function") {
+          try {
+            onRetry({ attempt, retries, delay, reason: err, input });
+          } catch {
+            // Ignorujemy błędy w callbacku onRetry
+          }
+        }
+
+        // Odczekaj wyliczony czas przed kolejną próbą
+        await new Promise((r) => setTimeout(r, delay));
+      }
     }
   }
 }
 
 /**
- * Walidator promptów użytkownika przed wysłaniem do AI.
- * Sprawdza typ, długość i obecność niedozwolonych znaków.
+ *
+ * Rejestr przypisujący klasę CSS (kolor) każdemu nadawcy wiadomości.
+ * Umożliwia rotacyjne przypisywanie kolorów z palety oraz zarządzanie rejestrem.
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Stałe limitów: minLength, maxLength
- *   - Wzorzec niedozwolonych znaków: forbidden
- *   - Metoda: validate(prompt)
+ *   - Mapowanie nadawca → indeks → klasa CSS
+ *   - Rotacja indeksów po przekroczeniu długości palety
+ *   - Przechowywanie stanu w Map
  *
  * - ❌ Niedozwolone:
  *   - Operacje na DOM
- *   - Zlecenia sieciowe (fetch, localStorage)
- *   - Logika aplikacyjna (np. renderowanie, wysyłka)
- *   - Efekty uboczne (np. console.log, mutacje zewnętrznych obiektów)
+ *   - Logika aplikacyjna (np. renderowanie wiadomości)
+ *   - Zlecenia sieciowe, localStorage, fetch
  */
-class PromptValidator {
+class SenderRegistry {
   /**
-   * Minimalna długość promptu po przycięciu.
-   * Prompt krótszy niż ta wartość zostanie uznany za niepoprawny.
-   * @type {number}
+   * Lista dostępnych klas CSS dla nadawców.
+   * Kolory są przypisywane rotacyjnie na podstawie indeksu.
+   * @type {string[]}
    */
-  static minLength = 1;
+  static palette = [
+    "sender-color-1",
+    "sender-color-2",
+    "sender-color-3",
+    "sender-color-4",
+    "sender-color-5",
+    "sender-color-6",
+    "sender-color-7",
+    "sender-color-8",
+    "sender-color-9",
+    "sender-color-10",
+    "sender-color-11",
+    "sender-color-12",
+    "sender-color-13",
+    "sender-color-14",
+  ];
 
   /**
-   * Maksymalna długość promptu po przycięciu.
-   * Prompt dłuższy niż ta wartość zostanie uznany za niepoprawny.
-   * @type {number}
+   * Rejestr przypisań nadawca → indeks palety.
+   * @type {Map<string, number>}
    */
-  static maxLength = 300;
+  static registry = new Map();
 
   /**
-   * Wzorzec niedozwolonych znaków w promptach.
-   * Domyślnie: < oraz >
-   * @type {RegExp}
+   * Licznik rotacyjny dla kolejnych nadawców.
+   * Wykorzystywany do wyznaczania indeksu w palecie.
+   * @type {number}
    */
-  static forbidden = /[<>]/;
+  static nextIndex = 0;
 
   /**
-   * Waliduje prompt użytkownika.
-   * Sprawdza:
-   * - czy jest typu string
-   * - czy nie jest pusty po przycięciu
-   * - czy mieści się w limicie długości
-   * - czy nie zawiera niedozwolonych znaków
-   *
-   * @param {string} prompt - Tekst promptu od użytkownika
-   * @returns {{ valid: boolean, errors: string[] }} - Obiekt z informacją o poprawności i listą błędów
+   * Zwraca klasę CSS dla danego nadawcy.
+   * Jeśli nadawca nie był wcześniej zarejestrowany, przypisuje mu nową klasę z palety.
+   * @param {string} sender - Nazwa nadawcy
+   * @returns {string} - Klasa CSS przypisana nadawcy
    */
-  static validate(prompt) {
-    const errors = [];
+  static getClass(sender) {
+    if (!sender || typeof sender !== "string") return "sender-color-default";
 
-    // Typ musi być string
-    if (typeof prompt !== "string") {
-      errors.push("Prompt musi być typu string.");
-      return { valid: false, errors };
+    if (!this.registry.has(sender)) {
+      const index = this.nextIndex % this.palette.length;
+      this.registry.set(sender, index);
+      this.nextIndex++;
     }
 
-    // Przycięcie spacji
-    const trimmed = prompt.trim();
-    const len = trimmed.length;
+    const idx = this.registry.get(sender);
+    return this.palette[idx];
+  }
 
-    // Walidacja długości
-    if (len < this.minLength) {
-      errors.push("Prompt nie może być pusty.");
-    } else if (len > this.maxLength) {
-      errors.push(
-        `Maksymalna długość promptu to ${this.maxLength} znaków, otrzymano ${len}.`
-      );
-    }
+  /**
+   * Czyści rejestr nadawców i resetuje licznik.
+   * Używane np. przy resecie czatu.
+   */
+  static reset() {
+    this.registry.clear();
+    this.nextIndex = 0;
+  }
 
-    // Walidacja znaków
-    if (this.forbidden.test(trimmed)) {
-      errors.push("Prompt zawiera niedozwolone znaki: < lub >.");
-    }
+  /**
+   * Sprawdza, czy nadawca jest już zarejestrowany.
+   * @param {string} sender - Nazwa nadawcy
+   * @returns {boolean} - Czy nadawca istnieje w rejestrze
+   */
+  static hasSender(sender) {
+    return this.registry.has(sender);
+  }
 
-    return {
-      valid: errors.length === 0,
-      errors,
-    };
+  /**
+   * Zwraca indeks przypisany nadawcy w palecie.
+   * @param {string} sender - Nazwa nadawcy
+   * @returns {number | undefined} - Indeks w palecie lub undefined
+   */
+  static getSenderIndex(sender) {
+    return this.registry.get(sender);
   }
-}
 
-/**
- *
- * Główny koordynator cyklu życia aplikacji. Odpowiada za uruchamianie przekazanych modułów
- * w ustalonej kolejności. Sam nie tworzy modułów – dostaje je z warstwy inicjalizacyjnej
- * (np. init_chat.js) jako listę obiektów implementujących metodę `init(ctx)`.
- *
- * ## Zasady:
- *
- * - ✅ Dozwolone:
- *   - Sekwencyjne uruchamianie modułów
- *   - Przekazywanie kontekstu (`Context`) do modułów
- *   - Obsługa modułów synchronicznych i asynchronicznych
- *
- * - ❌ Niedozwolone:
- *   - Tworzenie instancji modułów na sztywno
- *   - Logika biznesowa lub UI
- *   - Bezpośrednia manipulacja DOM
- */
-class App {
   /**
-   * Tworzy instancję aplikacji.
-   * @param {Context} context - kontener zależności
-   * @param {Array<{ init: (ctx: Context) => void | Promise<void> }>} modules - lista modułów do uruchomienia
+   * Zwraca aktualną paletę kolorów.
+   * @returns {string[]} - Kopia tablicy z klasami CSS
    */
-  constructor(context, modules = []) {
-    this.ctx = context;
-    this.modules = modules;
+  static getPalette() {
+    return [...this.palette];
   }
 
   /**
-   * Uruchamia wszystkie moduły w kolejności, przekazując im kontekst.
-   * Obsługuje moduły synchroniczne i asynchroniczne.
-   * @returns {Promise<void>}
+   * Ustawia nową paletę kolorów i resetuje rejestr.
+   * @param {string[]} newPalette - Nowa lista klas CSS
    */
-  async init() {
-    LoggerService.record("log", "[App] Inicjalizacja aplikacji...");
-    for (const m of this.modules) {
-      if (m && typeof m.init === "function") {
-        await m.init(this.ctx);
-      }
+  static setPalette(newPalette) {
+    if (Array.isArray(newPalette) && newPalette.length > 0) {
+      this.palette = newPalette;
+      this.reset();
     }
-    LoggerService.record("log", "[App] Aplikacja gotowa.");
   }
 }
 
 /**
  *
- * Komponent odpowiedzialny za dostosowanie położenia elementu docka (np. paska narzędzi, przycisków)
- * w momencie pojawienia się lub zniknięcia wirtualnej klawiatury na urządzeniach mobilnych.
- * Funkcje:
- *  - Nasłuchuje zdarzeń `focus` i `blur` na polach tekstowych, aby wykryć aktywację klawiatury.
- *  - Reaguje na zdarzenia `resize`/`visualViewport`/`keyboardchange` w celu aktualizacji pozycji docka.
- *  - Ustawia odpowiedni `bottom` docka tak, aby nie był zasłaniany przez klawiaturę.
- *  - Ukrywa dock, gdy klawiatura jest schowana (opcjonalnie).
+ * Fabryka elementów UI do wyboru tagów.
+ * Tworzy pola wyboru w dwóch wariantach w zależności od środowiska:
+ *  - Mobile → <select> z listą opcji
+ *  - Desktop → <input> z przypisanym <datalist>
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Manipulacja stylem docka w reakcji na zmiany widoczności klawiatury.
- *   - Obsługa zdarzeń wejściowych i zmian rozmiaru widoku.
+ *   - Generowanie elementów formularza dla tagów
+ *   - Nadawanie etykiet polom na podstawie słownika
+ *   - Obsługa wariantu mobilnego i desktopowego
  *
  * - ❌ Niedozwolone:
- *   - Modyfikowanie innych elementów UI poza dockiem.
- *   - Wysyłanie żądań sieciowych.
+ *   - Walidacja wybranych tagów
+ *   - Operacje sieciowe
+ *   - Bezpośrednia integracja z backendem
  */
-class VirtualKeyboardDock {
+class TagSelectorFactory {
   /**
-   * @param {HTMLElement} dockEl - Element docka, który ma być pozycjonowany.
+   * Słownik etykiet dla pól tagów.
+   * Klucze odpowiadają nazwom pól, wartości to etykiety wyświetlane w UI.
+   * @type {Record<string,string>}
    */
-  constructor(dockEl, forceEnable = false) {
-    this.dock = dockEl;
-    this.isVisible = false;
-    this.boundUpdate = this.updatePosition.bind(this);
-    this.forceEnable = forceEnable;
-  }
+  static labels = {
+    location: "Lokalizacja",
+    character: "Postać",
+    action: "Czynność",
+    nsfw: "NSFW",
+    emotion: "Emocja",
+  };
+
   /**
-   * Podpina nasłuchy zdarzeń i ustawia początkową pozycję docka.
+   * Tworzy prosty element wyboru tagów (bez dodatkowych klas/stylów).
+   * Używany do generowania pojedynczych selektorów w UI.
+   *
+   * @param {string} type - Typ pola (np. 'location', 'character').
+   * @param {string[]} [options=[]] - Lista dostępnych opcji.
+   * @returns {HTMLLabelElement} - Element <label> zawierający kontrolkę wyboru.
    */
-  init() {
-    if (!this.forceEnable && Utils.isMobile() === false) return;
-    document.addEventListener("focusin", (e) => {
-      if (e.target.tagName === "INPUT" || e.target.tagName === "TEXTAREA") {
-        this.show();
-      }
-    });
-    document.addEventListener("focusout", (e) => {
-      if (e.target.tagName === "INPUT" || e.target.tagName === "TEXTAREA") {
-        this.hide();
-      }
-    });
+  static create(type, options = []) {
+    const labelEl = document.createElement("label");
+    labelEl.textContent = this.labels[type] || type;
 
-    window.addEventListener("resize", this.boundUpdate);
-    if (window.visualViewport) {
-      window.visualViewport.addEventListener("resize", this.boundUpdate);
+    if (Utils.isMobile()) {
+      // Mobile: <select> z opcjami
+      const select = document.createElement("select");
+      options.forEach((opt) => {
+        const optionEl = document.createElement("option");
+        optionEl.value = opt;
+        optionEl.textContent = opt;
+        select.appendChild(optionEl);
+      });
+      labelEl.appendChild(select);
+    } else {
+      // Desktop: <input> + <datalist>
+      const input = document.createElement("input");
+      input.setAttribute("list", `${type}-list`);
+      const datalist = document.createElement("datalist");
+      datalist.id = `${type}-list`;
+      options.forEach((opt) => {
+        const optionEl = document.createElement("option");
+        optionEl.value = opt;
+        datalist.appendChild(optionEl);
+      });
+      labelEl.append(input, datalist);
     }
-  }
 
-  /**
-   * Aktualizuje pozycję docka względem dolnej krawędzi okna.
-   */
-  updatePosition() {
-    if (!this.isVisible) return;
-    const offset = window.visualViewport
-      ? window.innerHeight - window.visualViewport.height
-      : 0;
-    this.dock.style.bottom = `${offset}px`;
+    return labelEl;
   }
 
   /**
-   * Pokazuje dock i aktualizuje jego pozycję.
+   * Tworzy kompletny element pola tagu z etykietą i kontrolką wyboru.
+   * Używany w panelach tagów (np. TagsPanel) do renderowania pól kategorii.
+   *
+   * @param {string} name - Nazwa pola (np. "location", "character").
+   * @param {string[]} [options=[]] - Lista opcji do wyboru.
+   * @returns {HTMLLabelElement} - Gotowy element <label> z kontrolką.
    */
-  show() {
-    this.isVisible = true;
-    this.dock.style.display = "block";
-    this.updatePosition();
-  }
+  static createTagField(name, options = []) {
+    const labelEl = document.createElement("label");
+    labelEl.className = "tag-field";
+    labelEl.textContent = this.labels?.[name] || name;
 
-  /**
-   * Ukrywa dock.
-   */
-  hide() {
-    this.isVisible = false;
-    this.dock.style.display = "none";
-    this.dock.style.bottom = "0px";
+    if (Utils.isMobile()) {
+      // Mobile: <select> z pustą opcją na start
+      const select = document.createElement("select");
+      select.id = `tag-${name}`;
+      select.name = name;
+
+      const emptyOpt = document.createElement("option");
+      emptyOpt.value = "";
+      emptyOpt.textContent = "-- wybierz --";
+      select.appendChild(emptyOpt);
+
+      options.forEach((opt) => {
+        const optionEl = document.createElement("option");
+        optionEl.value = opt;
+        optionEl.textContent = opt;
+        select.appendChild(optionEl);
+      });
+
+      labelEl.appendChild(select);
+    } else {
+      // Desktop: <input> + <datalist>
+      const input = document.createElement("input");
+      input.id = `tag-${name}`;
+      input.name = name;
+      input.setAttribute("list", `${name}-list`);
+
+      const datalist = document.createElement("datalist");
+      datalist.id = `${name}-list`;
+
+      options.forEach((opt) => {
+        const optionEl = document.createElement("option");
+        optionEl.value = opt;
+        datalist.appendChild(optionEl);
+      });
+
+      labelEl.append(input, datalist);
+    }
+
+    return labelEl;
   }
 }
 
 /**
  *
- * Komponent UI odpowiedzialny za wyświetlanie i obsługę panelu ocen wiadomości AI.
- * Funkcje:
- *  - Renderuje panel ocen w formie <details> z listą kryteriów i suwakami (range input)
- *  - Obsługuje zmianę wartości suwaków (aktualizacja widocznej wartości)
- *  - Po kliknięciu "Wyślij ocenę" zbiera wszystkie wartości i przekazuje je w callbacku `onSubmit`
- *  - Zapobiega duplikowaniu panelu ocen w tej samej wiadomości
- *
- * ## Zasady:
+ * Komponent odpowiedzialny za renderowanie i obsługę pól tagów oraz synchronizację z galerią.
+ * Integruje się z TagSelectorFactory i GalleryLoader, umożliwiając wybór tagów i podgląd obrazów.
  *
  * - ✅ Dozwolone:
- *   - Tworzenie i osadzanie elementów DOM panelu ocen
- *   - Obsługa interakcji użytkownika (zmiana wartości, wysyłka oceny)
+ *   - Tworzenie i aktualizacja pól tagów
+ *   - Synchronizacja z galerią
+ *   - Emisja zmian tagów do świata zewnętrznego
+ *   - Obsługa wartości domyślnych z data-tags
  *
  * - ❌ Niedozwolone:
- *   - Samodzielne wysyłanie ocen do backendu (od tego jest logika wyżej)
- *   - Modyfikowanie innych elementów wiadomości poza panelem ocen
+ *   - Walidacja promptów/tekstu
+ *   - Operacje sieciowe (np. pobieranie tagów z backendu)
+ *   - Logika edycji, ocen, renderowania wiadomości
  */
-class ChatRatingView {
+class TagsPanel {
   /**
-   * @param {HTMLElement} msgEl - Element wiadomości, do którego ma zostać dodany panel ocen
-   * @param {function(object):void} [onSubmit] - Callback wywoływany po wysłaniu oceny
+   * Tworzy instancję panelu tagów.
+   * @param {HTMLElement} container - Kontener DOM z miejscem na pola tagów i galerię.
+   * @throws {Error} Gdy container nie jest HTMLElement.
    */
-  constructor(msgEl, onSubmit) {
-    if (!(msgEl instanceof HTMLElement)) return;
-    this.onSubmit = onSubmit || null;
+  constructor(container) {
+    if (!(container instanceof HTMLElement)) {
+      const actualType =
+        container === null
+          ? "null"
+          : Array.isArray(container)
+          ? "Array"
+          : container?.constructor?.name || typeof container;
 
-    /**
-     * Lista kryteriów oceniania
-     * @type {{key: string, label: string}[]}
-     */
-    this.criteria = [
-      { key: "Narrative", label: "Narracja" },
-      { key: "Style", label: "Styl" },
-      { key: "Logic", label: "Logika" },
-      { key: "Quality", label: "Jakość" },
-      { key: "Emotions", label: "Emocje" },
-    ];
+      throw new Error(
+        `[TagsPanel] Przekazany kontener nie jest elementem DOM. Otrzymano: ${actualType} → ${String(
+          container
+        )}`
+      );
+    }
 
-    this.render(msgEl);
-  }
+    this.container = container;
 
-  /**
-   * Renderuje panel ocen w wiadomości.
-   * @param {HTMLElement} msgEl - Element wiadomości
-   */
-  render(msgEl) {
-    // Unikamy duplikatów panelu ocen
-    if (msgEl.querySelector("details.rating-form")) return;
+    this.onTagsChanged = null;
 
-    const details = document.createElement("details");
-    details.className = "rating-form";
-    details.open = false;
+    this.fields = {};
 
-    const summary = document.createElement("summary");
-    summary.textContent = "Oceń odpowiedź ⭐";
-    details.appendChild(summary);
+    this.buildTagFields();
 
-    const header = document.createElement("h3");
-    header.textContent = "Twoja ocena:";
-    details.appendChild(header);
+    const gallery = document.createElement("div");
+    gallery.id = "image-gallery";
+    gallery.className = "gallery-grid mt-10";
+    this.container.appendChild(gallery);
 
-    // Tworzenie wierszy z suwakami dla każdego kryterium
-    this.criteria.forEach(({ key, label }) => {
-      const row = document.createElement("label");
-      row.className = "rating-row";
+    this.gallery = gallery;
 
-      const labelSpan = document.createElement("span");
-      labelSpan.textContent = `${label}: `;
-      row.appendChild(labelSpan);
+    this.galleryLoader = new GalleryLoader({ galleryContainer: gallery });
+    this.galleryLoader.setContainer(gallery);
 
-      const input = document.createElement("input");
-      input.type = "range";
-      input.min = "1";
-      input.max = "5";
-      input.value = "3";
-      input.name = key;
+    this.notifyTagsChanged();
+  }
+
+  /**
+   * Skrót do querySelector w obrębie panelu.
+   * @param {string} selector - CSS selektor
+   * @returns {HTMLElement|null}
+   */
+  q(selector) {
+    const el = this.container.querySelector(selector);
+    if (!el) {
+      LoggerService.record(
+        "warn",
+        `[TagsPanel] Nie znaleziono elementu: ${selector}`,
+        this.container
+      );
+    }
+    return el;
+  }
+
+  /**
+   * Domyślna konstrukcja pól tagów (fallback, gdy nie użyjesz setTagOptions()).
+   * W realu zwykle używasz setTagOptions(daneZBackendu).
+   */
+  buildTagFields() {
+    const tagNames = ["location", "character", "action", "nsfw", "emotion"];
+    const tagOptions = {
+      location: ["forest", "castle", "cave", "village"],
+      character: ["Lytha", "Aredia", "Xavier"],
+      action: ["healing", "combat", "ritual"],
+      nsfw: ["intimacy", "touch", "kiss"],
+      emotion: ["joy", "sadness", "fear", "love"],
+    };
 
-      const val = document.createElement("span");
-      val.textContent = input.value;
-      input.addEventListener("input", () => (val.textContent = input.value));
+    tagNames.forEach((name) => {
+      const fieldWrapper = TagSelectorFactory.createTagField(
+        name,
+        tagOptions[name] || []
+      );
+      this.container.appendChild(fieldWrapper);
+      const field =
+        fieldWrapper.querySelector(`#tag-${name}`) ||
+        fieldWrapper.querySelector("input, select");
 
-      row.append(input, val);
-      details.appendChild(row);
+      this.fields[name] = field;
     });
+  }
 
-    // Przycisk wysyłki oceny
-    const btn = document.createElement("button");
-    btn.type = "button";
-    btn.textContent = "Wyślij ocenę";
-    btn.addEventListener("click", () => {
-      const ratings = {};
-      this.criteria.forEach(({ key }) => {
-        ratings[key] = Number(details.querySelector(`[name="${key}"]`).value);
+  /**
+   * Inicjalizuje nasłuchiwanie zmian w polach tagów.
+   * @param {(tagsObj:Record<string,string>)=>void} onChange - Callback wywoływany przy zmianie
+   */
+  init(onChange) {
+    const debouncedRefresh = Utils.debounce(
+      () => this.notifyTagsChanged(),
+      300
+    );
+
+    Object.values(this.fields).forEach((field) => {
+      if (!field) return;
+      const eventType = field.tagName === "SELECT" ? "change" : "input";
+      field.addEventListener(eventType, () => {
+        if (typeof onChange === "function")
+          onChange(this.getSelectedTagsObject());
+        debouncedRefresh();
       });
-      const payload = {
-        messageId: msgEl.dataset.msgId,
-        sessionId: msgEl.dataset.sessionId,
-        ratings,
-      };
-      this.onSubmit?.(payload);
     });
-    details.appendChild(btn);
-
-    // Panel trafia do stopki wiadomości lub bezpośrednio do elementu
-    const footer = msgEl.querySelector(".msg-footer") || msgEl;
-    footer.appendChild(details);
   }
-}
 
-/**
- *
- * Narzędzie do wyszukiwania istniejących obrazów na podstawie tagów.
- * Obsługuje permutacje nazw plików, cache wyników oraz preload obrazów.
- *
- * # Zasady:
- *
- * - ✅ Dozwolone:
- *   - resolve(tags, opts?): Promise<string[]>
- *   - resolveBest(tags, opts?): Promise<string>
- *   - clearCache(): void
- *   - preload(url): void
- *
- * - ❌ Niedozwolone:
- *   - Renderowanie DOM (poza preload <img>)
- *   - Logika UI lub biznesowa
- *   - Zależności od klas domenowych
- */
-class ImageResolver {
   /**
-   * Bazowa ścieżka do folderu z obrazami
-   * @type {string}
+   * Zwraca aktualne tagi jako obiekt {nazwaKategorii: wartość}.
+   * @returns {Record<string,string>}
    */
-  static basePath = "/static/NarrativeIMG/";
+  getSelectedTagsObject() {
+    return Object.fromEntries(
+      Object.entries(this.fields).map(([k, el]) => [k, el?.value || ""])
+    );
+  }
 
   /**
-   * Lista rozszerzeń (bez kropki) do wyszukiwania obrazów w kolejności indeksu
-   * @type {string[]}
+   * Zwraca aktualne tagi jako lista stringów (bez pustych).
+   * @returns {string[]}
    */
-  static extensions = ["jpg", "jpeg", "png", "gif", "webp"];
+  getTagList() {
+    return Object.values(this.getSelectedTagsObject()).filter(Boolean);
+  }
 
   /**
-   * Prefiks klucza cache w AppStorageManager.
-   * Wartość: JSON.stringify({ exists: boolean, ts: number })
-   * @type {string}
+   * Emisja zmiany tagów i synchronizacja galerii.
    */
-  static cachePrefix = "img-exists:";
+  notifyTagsChanged() {
+    const list = this.getTagList();
+    if (typeof this.onTagsChanged === "function") {
+      this.onTagsChanged(list);
+    }
+    this.galleryLoader?.renderFromTags(list);
+  }
 
   /**
-   * Czas ważności negatywnego cache (ms). Po upływie — ponowne sprawdzenie.
-   * @type {number}
+   * Czyści wszystkie pola tagów i odświeża galerię.
    */
-  static negativeCacheTTL = 60 * 60 * 1000; // 1h
+  clearTags() {
+    Object.values(this.fields).forEach((field) => {
+      if (field) field.value = "";
+    });
+    this.notifyTagsChanged();
+  }
 
   /**
-   * Zwraca listę istniejących URL-i obrazów pasujących do tagów, w kolejności priorytetu:
-   * - pełna lista tagów (exact),
-   * - wszystkie podzbiory (od największych do najmniejszych) i ich permutacje,
-   * - maksymalnie `maxResults` wyników.
+   * Zastępuje opcje tagów i przebudowuje pola na podstawie słownika z backendu.
+   * Oczekuje kluczy w postaci "tag-location", "tag-character", ... (tak jak w tags.json).
+   * Zachowuje this.gallery — pola idą przed galerią.
    *
-   * @param {string[]} tags - Lista tagów (1–5)
-   * @param {{ maxResults?: number }} [opts]
-   * @returns {Promise<string[]>}
+   * @param {Record<string,string[]>} tagOptionsFromBackend
    */
-  static async resolve(tags, { maxResults = 4 } = {}) {
-    if (!Array.isArray(tags) || tags.length === 0) return [];
-
-    const candidates = [];
-    const exact = tags.join("_");
+  setTagOptions(tagOptionsFromBackend) {
+    const toFieldName = (k) => (k.startsWith("tag-") ? k.slice(4) : k);
 
-    // 1) exact match
-    for (const ext of this.extensions) {
-      candidates.push(`${this.basePath}${exact}.${ext}`);
-    }
+    Array.from(this.container.children).forEach((child) => {
+      if (child !== this.gallery) this.container.removeChild(child);
+    });
 
-    // 2) kombinacje i permutacje
-    const uniq = new Set(candidates);
-    for (let k = tags.length; k >= 1; k--) {
-      for (const subset of this._combinations(tags, k)) {
-        for (const perm of this._permutations(subset)) {
-          const name = perm.join("_");
-          if (name === exact) continue;
-          for (const ext of this.extensions) {
-            const url = `${this.basePath}${name}.${ext}`;
-            if (!uniq.has(url)) {
-              candidates.push(url);
-              uniq.add(url);
-            }
-          }
-        }
+    this.fields = {};
+    Object.entries(tagOptionsFromBackend).forEach(([backendKey, options]) => {
+      const name = toFieldName(backendKey);
+      const fieldWrapper = TagSelectorFactory.createTagField(
+        name,
+        options || []
+      );
+      if (this.gallery && this.gallery.parentElement === this.container) {
+        this.container.insertBefore(fieldWrapper, this.gallery);
+      } else {
+        this.container.appendChild(fieldWrapper);
       }
-    }
+      const field =
+        fieldWrapper.querySelector(`#tag-${name}`) ||
+        fieldWrapper.querySelector("input, select");
 
-    // 3) HEAD + cache
-    const results = [];
-    for (const url of candidates) {
-      if (await this._checkExists(url)) {
-        results.push(url);
-        if (results.length >= maxResults) break;
+      this.fields[name] = field;
+    });
+  }
+
+  /**
+   * Ustawia wartości domyślne na podstawie data-tags (np. "cave_kissing")
+   * i słownika tagów z backendu. Pomija tokeny, których nie ma w żadnej kategorii.
+   *
+   * @param {string} dataTags - np. "cave_kissing"
+   * @param {Record<string,string[]>} tagOptionsFromBackend
+   */
+  applyDefaultsFromDataTags(dataTags, tagOptionsFromBackend) {
+    if (!dataTags) return;
+
+    const tokens = dataTags.split("_").filter(Boolean);
+    const mapBackendKeyToField = (k) => (k.startsWith("tag-") ? k.slice(4) : k);
+
+    for (const token of tokens) {
+      for (const [backendKey, options] of Object.entries(
+        tagOptionsFromBackend
+      )) {
+        if (Array.isArray(options) && options.includes(token)) {
+          const fieldName = mapBackendKeyToField(backendKey);
+          const field = this.fields[fieldName];
+          if (field) field.value = token;
+          break;
+        }
       }
     }
-    return results;
   }
+}
 
+/**
+ *
+ * Statyczna klasa do zarządzania nazwą użytkownika w aplikacji.
+ * Umożliwia zapis, odczyt i czyszczenie imienia użytkownika oraz dynamiczną podmianę placeholderów w tekstach.
+ * Integruje się z polem input `#user_name`, umożliwiając automatyczny zapis zmian.
+ *
+ * ## Zasady:
+ *
+ * - ✅ Dozwolone:
+ *   - Przechowywanie i odczytywanie imienia użytkownika z AppStorageManager
+ *   - Obsługa pola input `#user_name` (wypełnianie i nasłuchiwanie zmian)
+ *   - Podmiana placeholderów w tekstach (np. `{{user}}`)
+ *
+ * - ❌ Niedozwolone:
+ *   - Przechowywanie innych danych użytkownika niż imię
+ *   - Logika niezwiązana z nazwą użytkownika
+ *   - Modyfikacja innych pól formularza
+ */
+class UserManager {
   /**
-   * Zwraca pierwszy istniejący URL według tej samej polityki co resolve().
-   * @param {string[]} tags
-   * @param {{ maxResults?: number }} [opts]
-   * @returns {Promise<string>}
+   * @type {string} Klucz używany w AppStorageManager
    */
-  static async resolveBest(tags, opts = {}) {
-    const arr = await this.resolve(tags, { maxResults: 1, ...opts });
-    return arr[0] || "";
-  }
+  static storageKey = "user_name";
 
   /**
-   * Sprawdza, czy dany URL istnieje — używając AppStorageManager (pozytywny/negatywny cache)
-   * oraz fetch HEAD. Negatywny cache wygasa po negativeCacheTTL.
-   *
-   * @param {string} url
-   * @returns {Promise<boolean>}
-   * @private
+   * Zapisuje imię użytkownika w AppStorageManager.
+   * @param {string} name - Imię użytkownika.
    */
-  static async _checkExists(url) {
-    const key = this.cachePrefix + url;
-    const cached = AppStorageManager.getWithTTL(key);
-    if (cached === true) return true;
-    if (cached === false) return false;
+  static setName(name) {
+    AppStorageManager.set(this.storageKey, name.trim());
+  }
 
-    try {
-      const res = await fetch(url, { method: "HEAD" });
-      const exists = res.ok;
-      AppStorageManager.set(key, exists, this.negativeCacheTTL / 1000);
+  /**
+   * Odczytuje imię użytkownika z AppStorageManager.
+   * @returns {string} Imię użytkownika lub pusty string.
+   */
+  static getName() {
+    const raw = AppStorageManager.getWithTTL(this.storageKey);
+    return typeof raw === "string" ? raw : raw ?? "";
+  }
 
-      if (exists) LoggerService.record("log", `[ImageResolver] HEAD ✓ ${url}`);
-      return exists;
-    } catch (err) {
-      AppStorageManager.set(key, false, this.negativeCacheTTL / 1000);
-      LoggerService.record("error", `[ImageResolver] HEAD error ${url}`, err);
-      return false;
-    }
+  /**
+   * Sprawdza, czy imię użytkownika jest ustawione.
+   * @returns {boolean} True, jeśli imię istnieje i nie jest puste.
+   */
+  static hasName() {
+    return !!this.getName().trim();
   }
 
   /**
-   * Preloaduje obraz w przeglądarce (niewidoczny <img>).
-   * @param {string} url
+   * Usuwa zapisane imię użytkownika.
    */
-  static preload(url) {
-    if (!url) return;
-    const img = new Image();
-    img.src = url;
-    img.style.display = "none";
-    document.body.appendChild(img);
+  static clearName() {
+    AppStorageManager.remove(this.storageKey);
   }
 
   /**
-   * Czyści wpisy cache (zarówno pozytywne, jak i negatywne).
+   * Zwraca typ pamięci, w której aktualnie przechowywane jest imię.
+   * @returns {"localStorage"|"cookie"}
    */
-  static clearCache() {
-    AppStorageManager.keys()
-      .filter((k) => k.startsWith(this.cachePrefix))
-      .forEach((k) => AppStorageManager.remove(k));
+  static getStorageType() {
+    return AppStorageManager.type();
   }
 
   /**
-   * Zwraca wszystkie kombinacje k-elementowe z tablicy.
-   * @param {string[]} arr
-   * @param {number} k
-   * @returns {string[][]}
-   * @private
+   * Podłącza pole input #user_name:
+   * - wypełnia istniejącą wartością,
+   * - zapisuje każdą zmianę.
+   * @param {Dom} dom - Instancja klasy Dom z metodą `q()`.
    */
-  static _combinations(arr, k) {
-    const res = [];
-    (function rec(start, comb) {
-      if (comb.length === k) return res.push(comb.slice());
-      for (let i = start; i < arr.length; i++) {
-        comb.push(arr[i]);
-        rec(i + 1, comb);
-        comb.pop();
-      }
-    })(0, []);
-    return res;
+  static init(dom) {
+    const input = dom.q("#user_name");
+    if (!input) return;
+    input.value = this.getName();
+    input.addEventListener("input", () => {
+      this.setName(input.value);
+    });
   }
 
   /**
-   * Zwraca wszystkie permutacje elementów tablicy.
-   * @param {string[]} arr
-   * @returns {string[][]}
-   * @private
+   * Podmienia placeholdery w tekście na aktualne imię użytkownika.
+   * @param {string} text - Tekst zawierający placeholdery (np. {{user}}).
+   * @param {Object<string,string>} [map] - Opcjonalna mapa dodatkowych placeholderów do podmiany.
+   * @returns {string} Tekst z podmienionymi wartościami.
    */
-  static _permutations(arr) {
-    const res = [];
-    (function perm(a, l = 0) {
-      if (l === a.length - 1) return res.push(a.slice());
-      for (let i = l; i < a.length; i++) {
-        [a[l], a[i]] = [a[i], a[l]];
-        perm(a, l + 1);
-        [a[l], a[i]] = [a[i], a[l]];
-      }
-    })(arr.slice(), 0);
-    return res;
+  static replacePlaceholders(text, map = {}) {
+    const name = this.getName() || "Użytkowniku";
+    let result = text.replace(/{{\s*user\s*}}/gi, name);
+    for (const [key, value] of Object.entries(map)) {
+      const regex = new RegExp(`{{\\s*${key}\\s*}}`, "gi");
+      result = result.replace(regex, value);
+    }
+    return result;
   }
 }
 
@@ -3425,120 +3574,83 @@ const Utils = {
 
 /**
  *
- * Rejestr przypisujący klasę CSS (kolor) każdemu nadawcy wiadomości.
- * Umożliwia rotacyjne przypisywanie kolorów z palety oraz zarządzanie rejestrem.
+ * Komponent odpowiedzialny za dostosowanie położenia elementu docka (np. paska narzędzi, przycisków)
+ * w momencie pojawienia się lub zniknięcia wirtualnej klawiatury na urządzeniach mobilnych.
+ * Funkcje:
+ *  - Nasłuchuje zdarzeń `focus` i `blur` na polach tekstowych, aby wykryć aktywację klawiatury.
+ *  - Reaguje na zdarzenia `resize`/`visualViewport`/`keyboardchange` w celu aktualizacji pozycji docka.
+ *  - Ustawia odpowiedni `bottom` docka tak, aby nie był zasłaniany przez klawiaturę.
+ *  - Ukrywa dock, gdy klawiatura jest schowana (opcjonalnie).
  *
  * ## Zasady:
  *
  * - ✅ Dozwolone:
- *   - Mapowanie nadawca → indeks → klasa CSS
- *   - Rotacja indeksów po przekroczeniu długości palety
- *   - Przechowywanie stanu w Map
+ *   - Manipulacja stylem docka w reakcji na zmiany widoczności klawiatury.
+ *   - Obsługa zdarzeń wejściowych i zmian rozmiaru widoku.
  *
  * - ❌ Niedozwolone:
- *   - Operacje na DOM
- *   - Logika aplikacyjna (np. renderowanie wiadomości)
- *   - Zlecenia sieciowe, localStorage, fetch
+ *   - Modyfikowanie innych elementów UI poza dockiem.
+ *   - Wysyłanie żądań sieciowych.
  */
-class SenderRegistry {
-  /**
-   * Lista dostępnych klas CSS dla nadawców.
-   * Kolory są przypisywane rotacyjnie na podstawie indeksu.
-   * @type {string[]}
-   */
-  static palette = [
-    "sender-color-1",
-    "sender-color-2",
-    "sender-color-3",
-    "sender-color-4",
-    "sender-color-5",
-    "sender-color-6",
-    "sender-color-7",
-    "sender-color-8",
-    "sender-color-9",
-    "sender-color-10",
-    "sender-color-11",
-    "sender-color-12",
-    "sender-color-13",
-    "sender-color-14",
-  ];
-
-  /**
-   * Rejestr przypisań nadawca → indeks palety.
-   * @type {Map<string, number>}
-   */
-  static registry = new Map();
-
-  /**
-   * Licznik rotacyjny dla kolejnych nadawców.
-   * Wykorzystywany do wyznaczania indeksu w palecie.
-   * @type {number}
-   */
-  static nextIndex = 0;
-
+class VirtualKeyboardDock {
   /**
-   * Zwraca klasę CSS dla danego nadawcy.
-   * Jeśli nadawca nie był wcześniej zarejestrowany, przypisuje mu nową klasę z palety.
-   * @param {string} sender - Nazwa nadawcy
-   * @returns {string} - Klasa CSS przypisana nadawcy
+   * @param {HTMLElement} dockEl - Element docka, który ma być pozycjonowany.
    */
-  static getClass(sender) {
-    if (!sender || typeof sender !== "string") return "sender-color-default";
-
-    if (!this.registry.has(sender)) {
-      const index = this.nextIndex % this.palette.length;
-      this.registry.set(sender, index);
-      this.nextIndex++;
-    }
-
-    const idx = this.registry.get(sender);
-    return this.palette[idx];
+  constructor(dockEl, forceEnable = false) {
+    this.dock = dockEl;
+    this.isVisible = false;
+    this.boundUpdate = this.updatePosition.bind(this);
+    this.forceEnable = forceEnable;
   }
-
   /**
-   * Czyści rejestr nadawców i resetuje licznik.
-   * Używane np. przy resecie czatu.
+   * Podpina nasłuchy zdarzeń i ustawia początkową pozycję docka.
    */
-  static reset() {
-    this.registry.clear();
-    this.nextIndex = 0;
-  }
+  init() {
+    if (!this.forceEnable && Utils.isMobile() === false) return;
+    document.addEventListener("focusin", (e) => {
+      if (e.target.tagName === "INPUT" || e.target.tagName === "TEXTAREA") {
+        this.show();
+      }
+    });
+    document.addEventListener("focusout", (e) => {
+      if (e.target.tagName === "INPUT" || e.target.tagName === "TEXTAREA") {
+        this.hide();
+      }
+    });
 
-  /**
-   * Sprawdza, czy nadawca jest już zarejestrowany.
-   * @param {string} sender - Nazwa nadawcy
-   * @returns {boolean} - Czy nadawca istnieje w rejestrze
-   */
-  static hasSender(sender) {
-    return this.registry.has(sender);
+    window.addEventListener("resize", this.boundUpdate);
+    if (window.visualViewport) {
+      window.visualViewport.addEventListener("resize", this.boundUpdate);
+    }
   }
 
   /**
-   * Zwraca indeks przypisany nadawcy w palecie.
-   * @param {string} sender - Nazwa nadawcy
-   * @returns {number | undefined} - Indeks w palecie lub undefined
+   * Aktualizuje pozycję docka względem dolnej krawędzi okna.
    */
-  static getSenderIndex(sender) {
-    return this.registry.get(sender);
+  updatePosition() {
+    if (!this.isVisible) return;
+    const offset = window.visualViewport
+      ? window.innerHeight - window.visualViewport.height
+      : 0;
+    this.dock.style.bottom = `${offset}px`;
   }
 
   /**
-   * Zwraca aktualną paletę kolorów.
-   * @returns {string[]} - Kopia tablicy z klasami CSS
+   * Pokazuje dock i aktualizuje jego pozycję.
    */
-  static getPalette() {
-    return [...this.palette];
+  show() {
+    this.isVisible = true;
+    this.dock.style.display = "block";
+    this.updatePosition();
   }
 
   /**
-   * Ustawia nową paletę kolorów i resetuje rejestr.
-   * @param {string[]} newPalette - Nowa lista klas CSS
+   * Ukrywa dock.
    */
-  static setPalette(newPalette) {
-    if (Array.isArray(newPalette) && newPalette.length > 0) {
-      this.palette = newPalette;
-      this.reset();
-    }
+  hide() {
+    this.isVisible = false;
+    this.dock.style.display = "none";
+    this.dock.style.bottom = "0px";
   }
 }
 
@@ -4288,6 +4400,26 @@ document.addEventListener("DOMContentLoaded", () => {
       Diagnostics.expect(urls.every((u) => typeof u === "string")).toBeTruthy();
     });
 
+    Diagnostics.it("resolve() korzysta z indeksu backendu jednym żądaniem", async () => {
+      const originalFetch = window.fetch;
+      const originalAvailable = ImageResolver.indexAvailable;
+      const calls = [];
+      try {
+        ImageResolver.indexAvailable = null;
+        window.fetch = async (url, init) => {
+          calls.push({ url, init });
+          return { ok: true, json: async () => ({ urls: ["/static/NarrativeIMG/night_forest.png"] }) };
+        };
+        const urls = await ImageResolver.resolve(["forest", "night"]);
+        Diagnostics.expect(calls.length).toBe(1);
+        Diagnostics.expect(calls[0].url.startsWith(ImageResolver.indexEndpoint)).toBeTruthy();
+        Diagnostics.expect(urls[0]).toBe("/static/NarrativeIMG/night_forest.png");
+      } finally {
+        window.fetch = originalFetch;
+        ImageResolver.indexAvailable = originalAvailable;
+      }
+    });
+
     Diagnostics.it(
       "resolveBest() zwraca pojedynczy URL lub pusty string",
       async () => {
@@ -4427,6 +4559,32 @@ document.addEventListener("DOMContentLoaded", () => {
       }
     });
 
+    Diagnostics.it("loadFromAPI() wyświetla miniatury i zapamiętuje kursor", async () => {
+      const originalFetch = window.fetch;
+      try {
+        const gallery = document.createElement("div");
+        gallery.id = "image-gallery";
+        const loader = new GalleryLoader(gallery);
+
+        window.fetch = async () => ({
+          ok: true,
+          json: async () => ({
+            items: [{ url: "/full/a.png", thumb: "/gallery/thumbs/256/resources/a.png" }],
+            nextCursor: "YS5wbmc",
+          }),
+        });
+
+        await loader.loadFromAPI("/api/gallery");
+        const img = gallery.querySelector("img");
+        const radio = gallery.querySelector('input[type="radio"]');
+        Diagnostics.expect(img.src.endsWith("/gallery/thumbs/256/resources/a.png")).toBeTruthy();
+        Diagnostics.expect(radio.value).toBe("/full/a.png");
+        Diagnostics.expect(loader.nextCursor).toBe("YS5wbmc");
+      } finally {
+        window.fetch = originalFetch;
+      }
+    });
+
     Diagnostics.it("_highlight() zaznacza wybrany obraz", () => {
       const gallery = document.createElement("div");
       gallery.id = "image-gallery";
@@ -6340,3 +6498,4 @@ document.addEventListener("DOMContentLoaded", () => {
   });
 });
 
+//# sourceMappingURL=chat.js.map
@@ -0,0 +1,26 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py konfiguruje się z env przy imporcie — testy jadą na fałszywym backendzie, bez opóźnień i bez zapisu do ratings/
+os.environ.setdefault("INFERENCE_BACKEND", "fake")
+os.environ.setdefault("FAKE_PREFILL_MS", "0")
+os.environ.setdefault("FAKE_TOKEN_MS", "0")
+os.environ.setdefault("RATINGS_DIR", tempfile.mkdtemp(prefix="ratings-"))
+
+
+@pytest.fixture(scope="session")
+def chat():
+    """Moduł app.py (ścieżki postaci/lokacji są względne, więc import z katalogu repozytorium)."""
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("rjsmin")
+import builderJS  # noqa: E402
+
+
+def test_rebuilds_never_overlap(monkeypatch):
+    active, overlaps, built = [0], [], []
+    lock = threading.Lock()
+
+    def slow_rebuild(paths):
+        with lock:
+            active[0] += 1
+            overlaps.append(active[0])
+        time.sleep(0.05)
+        built.append(set(paths))
+        with lock:
+            active[0] -= 1
+
+    monkeypatch.setattr(builderJS, "rebuild_changed", slow_rebuild)
+    collector = builderJS.ChangeCollector()
+    collector.add("src/class/A.js")
+    flushes = [threading.Thread(target=collector.flush) for _ in range(3)]
+    for t in flushes:
+        t.start()
+    time.sleep(0.01)
+    collector.add("src/class/B.js")
+    for t in flushes:
+        t.join()
+    collector.flush()
+    if collector.timer:
+        collector.timer.cancel()
+
+    assert max(overlaps) == 1
+    assert set().union(*built) == {"src/class/A.js", "src/class/B.js"}
+
+
+def test_write_hashed_prunes_old_bundles_with_their_maps(monkeypatch, tmp_path):
+    monkeypatch.setattr(builderJS, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(builderJS, "MANIFEST", str(tmp_path / "manifest.json"))
+    old = "chat.0123456789.js"
+    for name in (old, old + ".map", old + ".gz", old + ".map.br", "chat.js", "chat.js.map", "home.0123456789.js"):
+        (tmp_path / name).write_text("x", encoding="utf-8")
+
+    hashed = builderJS.write_hashed("chat.js", "console.log(1);")
+    (tmp_path / (hashed + ".map")).write_text("{}", encoding="utf-8")
+    assert builderJS.write_hashed("chat.js", "console.log(1);") == hashed
+
+    left = sorted(p.name for p in tmp_path.iterdir())
+    assert left == sorted(["chat.js", "chat.js.map", "home.0123456789.js", hashed, hashed + ".map", "manifest.json"])
@@ -0,0 +1,94 @@
+import threading
+
+import core.cache
+from core.cache import CachingBackend, ResponseCache
+
+
+class CountingBackend:
+    name = "counting"
+    model_path = "model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, cancel_event=None, timer=None, **gen_kwargs):
+        self.calls += 1
+        return f"{prompt} #{self.calls}"
+
+
+def test_key_is_deterministic_and_depends_on_every_part():
+    key = ResponseCache.make_key("m", "prompt", {"temperature": 0.7, "top_p": 0.9})
+    assert key == ResponseCache.make_key("m", "prompt", {"top_p": 0.9, "temperature": 0.7})
+    assert key != ResponseCache.make_key("m2", "prompt", {"temperature": 0.7, "top_p": 0.9})
+    assert key != ResponseCache.make_key("m", "prompt!", {"temperature": 0.7, "top_p": 0.9})
+    assert key != ResponseCache.make_key("m", "prompt", {"temperature": 0.8, "top_p": 0.9})
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(core.cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(max_entries=4, ttl=10)
+    cache.put("k", "v")
+    now[0] += 9
+    assert cache.get("k") == "v"
+    now[0] += 2
+    assert cache.get("k") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_only_deterministic_calls_are_cached_by_default():
+    inner = CountingBackend()
+    backend = CachingBackend(inner, ResponseCache())
+    assert backend.generate("p", do_sample=False) == backend.generate("p", do_sample=False)
+    assert inner.calls == 1
+    assert backend.generate("p", do_sample=True) != backend.generate("p", do_sample=True)
+    assert inner.calls == 3
+
+
+def test_sampled_calls_cached_when_opted_in():
+    inner = CountingBackend()
+    backend = CachingBackend(inner, ResponseCache(), cache_sampled=True)
+    assert backend.generate("p", do_sample=True) == backend.generate("p", do_sample=True)
+    assert inner.calls == 1
+
+
+def test_cancelled_output_is_not_cached():
+    inner = CountingBackend()
+    backend = CachingBackend(inner, ResponseCache())
+    cancelled = threading.Event()
+    cancelled.set()
+    backend.generate("p", cancel_event=cancelled)
+    backend.generate("p")
+    assert inner.calls == 2
+
+
+
+def test_summaries_are_cached_through_real_call_site():
+    from core.session import summarize_chat
+
+    inner = CountingBackend()
+    backend = CachingBackend(inner, ResponseCache())
+    history = [{"sender": "Użytkownik", "text": "Cześć"}, {"sender": "Lytha", "text": "Witaj w lesie."}]
+    assert summarize_chat(history, backend) == summarize_chat(history, backend)
+    assert inner.calls == 1
+
+
+def test_replies_and_retries_are_not_cached_by_default():
+    from core.utils import retry_if_empty
+
+    inner = CountingBackend()
+    backend = CachingBackend(inner, ResponseCache())
+    retry_if_empty("", "prompt", backend)
+    retry_if_empty("", "prompt", backend)
+    assert inner.calls == 2
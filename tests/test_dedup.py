@@ -0,0 +1,100 @@
+import threading
+
+from core.dedup import PendingRequest, RequestRegistry
+from core.metrics import RequestTimer
+
+
+def test_duplicate_attaches_and_gets_owner_result():
+    registry = RequestRegistry()
+    pending, owner, _ = registry.begin("r1")
+    assert owner
+    duplicate, owner, result = registry.begin("r1")
+    assert duplicate is pending and not owner and result is None
+    registry.finish(pending, {"messageID": "1 x", "quality": "ok"})
+    assert registry.wait(duplicate)["messageID"] == "1 x"
+    assert registry.begin("r1")[2] == {"messageID": "1 x", "quality": "ok"}
+    assert registry.in_flight() == 0
+
+
+def test_cancelled_result_is_not_remembered():
+    registry = RequestRegistry()
+    pending, _, _ = registry.begin("r1")
+    registry.finish(pending, {"messageID": None, "quality": "cancelled"})
+    retry, owner, result = registry.begin("r1")
+    assert owner and result is None and retry is not pending
+
+
+def test_failed_request_can_be_retried():
+    registry = RequestRegistry()
+    pending, _, _ = registry.begin("r1")
+    registry.fail(pending, RuntimeError("boom"))
+    assert registry.begin("r1")[1]
+
+
+def test_abandon_without_waiters_cancels_after_grace():
+    registry = RequestRegistry(abandon_grace=0.05)
+    pending, _, _ = registry.begin("r1")
+    assert registry.abandon(pending)
+    assert pending.cancelled.is_set()
+
+
+def test_retry_within_grace_keeps_generation_alive():
+    registry = RequestRegistry(abandon_grace=5)
+    pending, _, _ = registry.begin("r1")
+    outcome = []
+    watcher = threading.Thread(target=lambda: outcome.append(registry.abandon(pending)))
+    watcher.start()
+    registry.begin("r1")  # retry klienta dołącza w trakcie okresu łaski
+    watcher.join(2)
+    assert outcome == [False]
+    assert not pending.cancelled.is_set()
+
+
+def test_abandon_returns_when_generation_finishes():
+    registry = RequestRegistry(abandon_grace=5)
+    pending, _, _ = registry.begin("r1")
+    outcome = []
+    watcher = threading.Thread(target=lambda: outcome.append(registry.abandon(pending)))
+    watcher.start()
+    registry.finish(pending, {"quality": "ok"})
+    watcher.join(2)
+    assert outcome == [False]
+
+
+def test_abandon_without_request_id_skips_grace():
+    registry = RequestRegistry(abandon_grace=60)
+    pending = PendingRequest(None)
+    assert registry.abandon(pending)
+
+
+def test_cancel_sets_flag_of_in_flight_request():
+    registry = RequestRegistry()
+    pending, _, _ = registry.begin("r1")
+    assert registry.cancel("r1") and pending.cancelled.is_set()
+    assert not registry.cancel("nieznane")
+
+
+def test_cancelled_request_does_not_take_free_slot(chat):
+    cancelled = threading.Event()
+    cancelled.set()
+    assert not chat.acquire_slot(cancelled)
+    # slot nadal wolny
+    assert chat.generation_slots.acquire(blocking=False)
+    chat.generation_slots.release()
+
+
+def test_cancel_while_queued_leaves_history_untouched(chat):
+    history = list(chat.session.history)
+    cancelled = threading.Event()
+    cancelled.set()
+    payload = chat.run_generation("Cześć", cancelled, RequestTimer("generate"))
+    assert payload["quality"] == "cancelled" and payload["messageID"] is None
+    assert chat.session.history == history
+
+
+def test_generation_persists_user_turn_and_reply(chat):
+    before = len(chat.session.history)
+    payload = chat.run_generation("Cześć, Lytha", threading.Event(), RequestTimer("generate"))
+    assert payload["messageID"] is not None
+    assert chat.session.history[before]["text"] == "Cześć, Lytha"
+    assert len(chat.session.history) == before + 2
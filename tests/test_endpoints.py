@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+
+@pytest.mark.parametrize("body,content_type", [
+    (b"", None),
+    (b"nie json", "application/json"),
+    (b"[1, 2]", "application/json"),
+    (b'{"requestId": "nieznane"}', "application/json"),
+])
+def test_cancel_without_valid_request_id_is_not_found(chat, body, content_type):
+    client = chat.app.test_client()
+    resp = client.post("/cancel", data=body, content_type=content_type)
+    assert resp.status_code == 404
+    assert resp.get_json() == {"status": "not_found"}
+
+
+def test_cancel_in_flight_request(chat):
+    pending, _, _ = chat.request_registry.begin("do-przerwania")
+    try:
+        resp = chat.app.test_client().post("/cancel", json={"requestId": "do-przerwania"})
+        assert resp.get_json() == {"status": "cancelled"} and pending.cancelled.is_set()
+    finally:
+        chat.request_registry.fail(pending, RuntimeError("koniec testu"))
+
+
+@pytest.mark.parametrize("body", [b"", b"nie json", b"[1, 2]"])
+def test_asgi_cancel_with_bad_body_is_not_found(chat, body):
+    pytest.importorskip("starlette")
+    from starlette.requests import Request
+
+    import asgi
+
+    async def call():
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        request = Request({"type": "http", "method": "POST", "path": "/cancel", "headers": []}, receive)
+        return await asgi.cancel(request)
+
+    assert asyncio.run(call()).status_code == 404
+
+
+def test_asgi_messages_runs_off_the_event_loop(chat, monkeypatch):
+    pytest.importorskip("starlette")
+    import threading
+
+    from starlette.requests import Request
+
+    import asgi
+
+    threads = []
+
+    def post_message(data):
+        threads.append(threading.current_thread())
+        return {"status": "ok"}
+
+    monkeypatch.setattr(chat, "post_message", post_message)
+
+    async def call():
+        async def receive():
+            return {"type": "http.request", "body": b'{"text": "Witaj"}', "more_body": False}
+
+        request = Request({"type": "http", "method": "POST", "path": "/messages", "headers": []}, receive)
+        return await asgi.messages(request), threading.current_thread()
+
+    response, loop_thread = asyncio.run(call())
+    assert response.status_code == 200
+    assert threads and threads[0] is not loop_thread
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+from flask import Flask
+
+from core.gallery import GalleryCollection, ThumbnailCache, create_gallery_blueprint, decode_cursor, encode_cursor
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def collection(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    Image.new("RGB", (640, 480), "red").save(folder / "a.png")
+    Image.new("RGB", (640, 480), "blue").save(folder / "a.jpg")
+    (folder / "broken.png").write_bytes(b"to nie jest obraz")
+    c = GalleryCollection("resources", str(folder), "/static/resources/")
+    c.refresh(force=True)
+    return c
+
+
+def test_same_stem_different_extension_do_not_collide(tmp_path, collection):
+    thumbs = ThumbnailCache(str(tmp_path / "thumbs"))
+    png, jpg = thumbs.path_for(collection, "a.png", 128), thumbs.path_for(collection, "a.jpg", 128)
+    assert png != jpg
+    assert png.endswith(os.path.join("128", "resources", "a.png.webp"))
+    assert thumbs.get(collection, "a.png", 128) == png
+    assert thumbs.get(collection, "a.jpg", 128) == jpg
+    with Image.open(png) as p, Image.open(jpg) as j:
+        assert max(p.size) == 128
+        assert p.getpixel((0, 0))[:3] != j.getpixel((0, 0))[:3]
+
+
+def test_undecodable_image_falls_back_to_original(tmp_path, collection):
+    thumbs = ThumbnailCache(str(tmp_path / "thumbs"))
+    assert thumbs.get(collection, "broken.png", 256) == os.path.join(collection.folder, "broken.png")
+    assert not os.path.exists(thumbs.path_for(collection, "broken.png", 256))
+
+
+def test_thumb_endpoint_serves_original_for_broken_file(tmp_path, collection):
+    app = Flask(__name__)
+    app.register_blueprint(create_gallery_blueprint([collection], ThumbnailCache(str(tmp_path / "thumbs"))))
+    client = app.test_client()
+    assert client.get("/gallery/thumbs/256/resources/broken.png").data == b"to nie jest obraz"
+    assert client.get("/gallery/thumbs/256/resources/a.png").status_code == 200
+    assert client.get("/gallery/thumbs/100/resources/a.png").status_code == 404
+
+
+def test_cursor_round_trip(collection):
+    assert decode_cursor(encode_cursor("zażółć.png")) == "zażółć.png"
+    first, cursor = collection.page(limit=2)
+    rest, end = collection.page(cursor, limit=2)
+    assert first + rest == sorted(["a.jpg", "a.png", "broken.png"]) and end is None
@@ -0,0 +1,86 @@
+import threading
+
+from core.metrics import RequestTimer
+
+
+def scripted_plans(chat, monkeypatch, modes):
+    """Kolejne odpowiedzi fałszywego backendu w zadanych trybach (empty / cut / ok), potem już tylko ok."""
+    original = chat.backend.plan_response
+    modes = iter(modes)
+
+    def plan(max_new_tokens):
+        n, start, jitter, _ = original(max_new_tokens)
+        return max(n, 8), start, jitter + [0.0] * 8, next(modes, "ok")
+
+    monkeypatch.setattr(chat.backend, "plan_response", plan)
+
+
+def test_retried_reply_does_not_contain_prompt(chat, monkeypatch):
+    monkeypatch.setattr(chat.engine, "chat", None)  # tryb szablonu: backend zwraca prompt + odpowiedź
+    scripted_plans(chat, monkeypatch, ["empty", "ok"])
+    timer = RequestTimer("generate")
+    payload = chat.run_generation("Opowiedz mi o lesie", threading.Event(), timer)
+    assert "retry" in timer.phases
+    reply = payload["response"]
+    assert reply and "Opowiedz mi o lesie" not in reply
+    assert chat.session.history[-1]["text"] == reply
+    assert len(reply) < 400
+
+
+def test_quality_after_retry_describes_the_reply(chat, monkeypatch):
+    from core.quality import QualityClassifier
+
+    classifier, _ = QualityClassifier.train(ratings_dir="", synthetic=1000)
+    scored = []
+    original_assess = classifier.assess
+
+    def assess(text, eos_prob=None):
+        scored.append(text)
+        return original_assess(text, eos_prob)
+
+    monkeypatch.setattr(classifier, "assess", assess)
+    monkeypatch.setattr(chat, "quality_classifier", classifier)
+    monkeypatch.setattr(chat.engine, "chat", None)
+    scripted_plans(chat, monkeypatch, ["cut", "ok"])
+    payload = chat.run_generation("Opowiedz mi o zamku", threading.Event(), RequestTimer("generate"))
+    assert len(scored) == 2  # ocena pierwszej (urwanej) odpowiedzi i odpowiedzi po retry
+    assert all("Opowiedz mi o zamku" not in text for text in scored)
+    expected = original_assess(payload["response"], None)
+    assert payload["quality"] == expected["quality"]
+    assert payload["quality_confidence"] == expected["confidence"]
+
+
+def test_cancel_during_retry_stops_it_and_marks_turn_cancelled(chat, monkeypatch):
+    cancel_event = threading.Event()
+    original = chat.backend.plan_response
+    calls = []
+
+    def plan(max_new_tokens):
+        n, start, jitter, _ = original(max_new_tokens)
+        calls.append(max_new_tokens)
+        if len(calls) == 1:
+            return 0, start, jitter, "empty"
+        cancel_event.set()  # /cancel przychodzi, gdy model zaczął ponowną generację
+        return max(n, 8), start, jitter + [0.0] * 8, "ok"
+
+    monkeypatch.setattr(chat.backend, "plan_response", plan)
+    before = len(chat.session.history)
+    payload = chat.run_generation("Opowiedz mi o jaskini", cancel_event, RequestTimer("generate"))
+    assert len(calls) == 2  # retry ruszył, ale nie wygenerował ani słowa
+    assert payload["quality"] == "cancelled" and payload["response"] == ""
+    assert len(chat.session.history) == before + 1  # tylko tura użytkownika
+
+
+def test_summary_receives_cancel_event():
+    from core.session import summarize_chat
+
+    seen = []
+
+    class Recorder:
+        def generate(self, prompt, cancel_event=None, **gen_kwargs):
+            seen.append(cancel_event)
+            return "Streszczenie."
+
+    cancel_event = threading.Event()
+    summarize_chat([{"sender": "Lytha", "text": "Witaj."}], Recorder(), cancel_event=cancel_event)
+    assert seen == [cancel_event]
@@ -0,0 +1,41 @@
+import pytest
+
+from core.images import ImageIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    for name in ("dark_forest_elf.png", "elf_forest.jpg", "forest_elf.png", "forest_elf.webp", "elf.gif",
+                 "Lytha_Forest.png", "cave.PNG", "notatki.txt"):
+        (tmp_path / name).write_bytes(b"")
+    return ImageIndex(str(tmp_path), "/img/", refresh_interval=0)
+
+
+def test_tag_containing_underscore_resolves(index):
+    assert index.resolve(["dark_forest", "elf"], 1) == ["/img/dark_forest_elf.png"]
+
+
+def test_order_matches_client_candidates(index):
+    # pełny zestaw w podanej kolejności, jego permutacje, potem podzbiory; w nazwie — kolejność rozszerzeń
+    assert index.resolve(["forest", "elf"], 10) == [
+        "/img/forest_elf.png", "/img/forest_elf.webp", "/img/elf_forest.jpg", "/img/elf.gif",
+    ]
+
+
+def test_names_are_case_sensitive_like_static_files(index):
+    assert index.resolve(["Lytha", "Forest"]) == ["/img/Lytha_Forest.png"]
+    assert index.resolve(["lytha", "forest"]) == []
+    assert index.resolve(["cave"]) == []  # klient pyta tylko o rozszerzenia małymi literami
+
+
+def test_duplicate_tags_and_limit(index):
+    assert index.resolve(["elf", "elf"], 10) == ["/img/elf.gif"]
+    assert len(index.resolve(["forest", "elf"], 2)) == 2
+    assert index.resolve(["", None]) == []
+
+
+def test_index_picks_up_new_files(index, tmp_path):
+    assert index.resolve(["smok"]) == []
+    (tmp_path / "smok.jpg").write_bytes(b"")
+    index.refresh(force=True)
+    assert index.resolve(["smok"]) == ["/img/smok.jpg"]
@@ -0,0 +1,62 @@
+import pytest
+
+import core.lore as lore
+from core.lore import LoreIndex, chunk_lines, terms
+
+
+def build_world(max_postings, monkeypatch):
+    monkeypatch.setattr(lore, "MAX_POSTINGS", max_postings)
+    index = LoreIndex()
+    for i in range(40):
+        # „zamek” jest prawie wszędzie (częste słowo), „smok”/„runy” tylko w kilku wpisach
+        text = "Stary zamek na wzgórzu." + " Zamek ma mury." * (i % 3)
+        if i % 10 == 3:
+            text += " W podziemiach śpi smok."
+        if i in (7, 21):
+            text += " Na ścianach wyryto runy."
+        index.add_entry(f"Wpis {i}", {"opis": text})
+    index.build()
+    return index
+
+
+def test_terms_are_stemmed_and_filtered():
+    assert terms("Polana, polany i polanie oraz się") == ["polan", "polan", "polan"]
+
+
+def test_long_field_is_split_into_chunks():
+    line = "historia: " + " ".join(f"Zdanie numer {i}." for i in range(40))
+    chunks = chunk_lines([line], max_words=30)
+    assert len(chunks) > 1 and all(len(c.split()) <= 30 for c in chunks)
+
+
+def test_frequent_term_keeps_postings_truncated(monkeypatch):
+    index = build_world(5, monkeypatch)
+    assert "zamek" in index.frequent and len(index.impacts["zamek"]) == 5
+    assert "smok" not in index.frequent
+
+
+@pytest.mark.parametrize("query", ["smok zamek", "runy zamek", "zamek smok runy"])
+def test_candidates_of_rare_terms_get_exact_scores(monkeypatch, query):
+    exact = build_world(10 ** 9, monkeypatch).keyword_scores(query)
+    truncated = build_world(5, monkeypatch)
+    scores = truncated.keyword_scores(query)
+    rare = {i for t in terms(query) if t not in truncated.frequent for i, _ in truncated.impacts.get(t, ())}
+    assert rare
+    for i in rare:
+        assert scores[i] == pytest.approx(exact[i])
+    top = [i for i, _ in truncated.search(query, k=3)]
+    assert top == sorted(exact, key=exact.get, reverse=True)[:3]
+
+
+def test_frequent_only_query_returns_its_best_chunks(monkeypatch):
+    exact = build_world(10 ** 9, monkeypatch).keyword_scores("zamek")
+    truncated = build_world(5, monkeypatch)
+    best = [i for i, _ in truncated.search("zamek", k=5)]
+    assert {exact[i] for i in best} == set(sorted(exact.values(), reverse=True)[:5])
+
+
+def test_select_respects_budget_and_excluded_titles(monkeypatch):
+    index = build_world(5, monkeypatch)
+    selected = index.select("smok", budget=30, k=6, exclude_titles=("Wpis 3",))
+    assert selected and all(c["title"] != "Wpis 3" for c in selected)
+    assert sum(c["tokens"] for c in selected) <= 30
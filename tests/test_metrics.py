@@ -0,0 +1,33 @@
+import threading
+import time
+
+import pytest
+
+from core.metrics import RequestTimer
+
+
+def test_queue_wait_sums_executor_and_slot_phases():
+    timer = RequestTimer("generate")
+    assert timer.queue_wait is None
+    timer.add("slot_wait", 0.25)
+    assert timer.queue_wait == 0.25
+    timer.add("executor_wait", 0.5)
+    assert timer.queue_wait == 0.75
+
+
+def test_flask_path_records_slot_wait_once(chat):
+    timer = RequestTimer("generate")
+    chat.run_generation("Cześć", threading.Event(), timer)
+    assert "slot_wait" in timer.phases and "executor_wait" not in timer.phases
+    assert "queue_wait" not in timer.phases
+
+
+def test_asgi_path_records_each_wait_under_its_own_name(chat):
+    pytest.importorskip("starlette")
+    import asgi
+
+    timer = RequestTimer("generate")
+    asgi.queued_generation("Cześć", threading.Event(), timer, time.perf_counter())
+    assert {"executor_wait", "slot_wait"} <= timer.phases.keys()
+    assert "queue_wait" not in timer.phases
+    assert timer.queue_wait == timer.phases["executor_wait"] + timer.phases["slot_wait"]
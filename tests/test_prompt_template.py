@@ -0,0 +1,29 @@
+import pytest
+
+from core.prompt_template import PromptTemplate, compile_fragment
+
+
+def test_fragment_fills_fields_positionally():
+    render = compile_fragment("{name}: {text}\n", ("name", "text"))
+    assert render("Lytha", "Witaj") == "Lytha: Witaj\n"
+
+
+def test_fragment_keeps_literal_braces_specs_and_conversions():
+    render = compile_fragment("{{dosłownie}} {a!r} [{b:>4}] {a}", ("a", "b"))
+    assert render("x", 7) == "{dosłownie} 'x' [   7] x"
+    assert compile_fragment("", ("a",))("x") == ""
+
+
+def test_unknown_field_fails_when_template_is_loaded():
+    with pytest.raises(ValueError, match="Nieznane pole"):
+        compile_fragment("{imie}", ("name",), "pl.header")
+    with pytest.raises(ValueError, match="Nieobsługiwana"):
+        compile_fragment("{a:{b}}", ("a", "b"))
+
+
+def test_template_renders_turn_from_fragments():
+    parts = {key: "" for key in PromptTemplate.FRAGMENTS}
+    parts.update({"summary": "S: {summary}\n", "history": "{sender}: {text}\n", "tail": "{user_input}\n{name}:"})
+    template = PromptTemplate(parts, name="test")
+    history = [{"sender": "Lytha", "text": "Hej"}, {"sender": "Lytha", "text": "Hej"}]
+    assert template.render_turn("Lytha", "Cześć", "krótko", history) == "S: krótko\nLytha: Hej\nCześć\nLytha:"
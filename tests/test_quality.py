@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from benchmarks.bench_quality import GOLDEN  # noqa: E402
+from core.quality import FEATURES, QualityClassifier, feature_matrix  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    # tylko dane syntetyczne ze stałym ziarnem — wynik nie zależy od zawartości ratings/
+    clf, rated = QualityClassifier.train(ratings_dir="")
+    assert rated == 0
+    return clf
+
+
+@pytest.mark.parametrize("text,cut", GOLDEN, ids=[t[:30] or "<pusta>" for t, _ in GOLDEN])
+def test_assess_on_hand_labelled_responses(classifier, text, cut):
+    result = classifier.assess(text)
+    expected = ("empty" if not text else "cut") if cut else "ok"
+    assert result["quality"] == expected
+    assert result["confidence"] >= 0.9
+    assert classifier.is_incomplete(text) == bool(cut)
+
+
+def test_batch_score_matches_single_assess(classifier):
+    texts = [t for t, _ in GOLDEN if t]
+    scores = classifier.score(texts)
+    assert [round(float(p), 4) for p in scores] == [classifier.assess(t)["p_incomplete"] for t in texts]
+    assert feature_matrix(texts).shape == (len(texts), len(FEATURES))
+
+
+def test_eos_probability_lowers_incomplete_score(classifier):
+    text = "Lytha uśmiecha się i patrzy w stronę lasu"
+    assert classifier.assess(text, 0.95)["p_incomplete"] < classifier.assess(text, 0.0)["p_incomplete"]
+
+
+def test_saved_weights_give_same_decisions(classifier, tmp_path):
+    path = tmp_path / "quality.json"
+    classifier.save(str(path))
+    loaded = QualityClassifier.load(str(path), classifier.threshold)
+    texts = [t for t, _ in GOLDEN]
+    assert [loaded.assess(t)["quality"] for t in texts] == [classifier.assess(t)["quality"] for t in texts]
@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pytest
+
+from core.backend import PrefixCache, TransformersBackend
+from core.location import Location, SceneCatalog
+from core.metrics import RequestTimer
+from core.tagger import TagEngine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FOREST = Location("Leśna polana", "Mglista ścieżka wśród drzew", key="forest")
+CASTLE = Location("Zamek Grani", "Kamienne mury na wzgórzu", key="castle")
+
+
+def test_catalog_finds_location_by_key_or_name():
+    scenes = SceneCatalog([FOREST, CASTLE])
+    assert scenes.get("castle") is CASTLE
+    assert scenes.get("  leśna POLANA ") is FOREST
+    assert scenes.get("jaskinia") is None
+
+
+def test_scene_block_is_rendered_once():
+    scenes = SceneCatalog([FOREST, CASTLE])
+    blocks = scenes.compile()
+    assert "Leśna polana" in blocks["forest"] and "Zamek Grani" in blocks["castle"]
+    assert scenes.block(FOREST) is blocks["forest"]
+
+
+def test_tagger_detects_earliest_location_and_prefers_longer_stem():
+    tagger = TagEngine(tag_file="")
+    tagger.load_rules({"location": {"forest": ["las"], "castle": ["zamek"], "cave": ["lasso-grota"]}})
+    assert tagger.detect("Wracamy do zamku? Nie, idziemy w las.", "location") == "forest"
+    assert tagger.detect("Zamek na horyzoncie, za nim las.", "location") == "castle"
+    assert tagger.detect("Lasso-grota!", "location") == "cave"
+    assert tagger.detect("Nic tu nie ma.", "location") is None
+    assert tagger.detect("las", "emotion") is None
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("Idziemy do lasu", "forest"),
+    ("Leśna ścieżka", "forest"),
+    ("Wracamy do zamku", "castle"),
+    ("Za murami jest bezpiecznie", "castle"),
+    ("Chowamy się w grocie", "cave"),
+    ("Zamknij drzwi", None),
+    ("To klasyczny błąd", None),
+    ("Groteska tej sytuacji", None),
+    ("Pomurnik siedzi na skale", None),
+])
+def test_location_rules_match_only_at_word_start(text, expected):
+    tagger = TagEngine(os.path.join(ROOT, "core", "tags.json"))
+    assert tagger.detect(text, "location") == expected
+
+
+def test_switch_location_changes_scene_in_prompt(chat):
+    previous = chat.session.location
+    try:
+        assert chat.switch_location({"location": "nie-istnieje"}) is None
+        result = chat.switch_location({"location": "forest"})
+        assert result["status"] == "ok" and chat.session.location.key == "forest"
+        assert chat.list_locations()["current"] == "forest"
+        prompt, character = chat.engine.build_prompt("Cześć", "", [], location=chat.session.location)
+        assert chat.scenes.block(chat.session.location) in prompt
+        prefix = chat.engine.prompt_prefix(character, chat.session.location)
+        assert prefix is None or prompt.startswith(prefix)
+    finally:
+        chat.session.location = previous
+
+
+def test_engine_detects_only_known_locations(chat):
+    if chat.scene_tagger.categories.get("location", {}).get("forest"):
+        assert chat.engine.detect_location("Idziemy do lasu") is chat.scenes.get("forest")
+    assert chat.engine.detect_location("Nic o miejscu") is None
+
+
+class FakeKV:
+    """Cache KV z crop() jak transformers.DynamicCache — pamięta tylko długość."""
+
+    def __init__(self, length):
+        self.length = length
+
+    def crop(self, length):
+        self.length = length
+
+
+class PrefixBackend(TransformersBackend):
+    def __init__(self, prefix_ids, kv=FakeKV):
+        super().__init__("model")
+        self.prefix_cache = PrefixCache(4)
+        self.prefix_ids = prefix_ids
+        self.kv = kv
+        self.prefills = 0
+
+    def prefill_prefix(self, prefix, add_special_tokens):
+        self.prefills += 1
+        return list(self.prefix_ids), self.kv(len(self.prefix_ids))
+
+
+def prompt(*ids):
+    return np.array([ids])
+
+
+def test_prefix_state_is_computed_once_and_copied_per_turn():
+    backend = PrefixBackend([1, 2, 3])
+    timer = RequestTimer("generate")
+    first = backend.prefix_state("persona", prompt(1, 2, 3, 9, 9), True, timer)
+    second = backend.prefix_state("persona", prompt(1, 2, 3, 7), True)
+    _, cached = backend.prefix_cache.get("persona")
+    assert backend.prefills == 1 and "prefix_prefill" in timer.phases
+    assert first is not cached and second is not cached and first is not second
+    assert first.length == second.length == cached.length == 3
+
+
+def test_prefix_state_crops_to_tokens_shared_with_prompt():
+    backend = PrefixBackend([1, 2, 3, 4])
+    # tokenizacja na granicy prefiksu różni się od całego promptu
+    assert backend.prefix_state("persona", prompt(1, 2, 5, 6), True).length == 2
+    # prompt równy prefiksowi — jeden token musi zostać dla generate
+    assert backend.prefix_state("persona", prompt(1, 2, 3, 4), True).length == 3
+    _, cached = backend.prefix_cache.get("persona")
+    assert cached.length == 4
+
+
+def test_prefix_state_without_shared_tokens_or_crop_support():
+    assert PrefixBackend([1, 2]).prefix_state("persona", prompt(7, 8, 9), True) is None
+    legacy = PrefixBackend([1, 2, 3], kv=lambda n: ((n,),))  # krotki zamiast Cache — nie da się przyciąć
+    assert legacy.prefix_state("persona", prompt(1, 2, 5), True) is None
+    assert legacy.prefix_state("persona", prompt(1, 2, 3, 4), True) == ((3,),)